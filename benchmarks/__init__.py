@@ -0,0 +1,3 @@
+# benchmarks/__init__.py - Yerel Shopify/Sentos simülatörleri ve verim (ürün/sn) ölçümleri
+#
+# Kullanım: python -m benchmarks.run_benchmarks --sizes 1k --workloads full,stock,price,analytics
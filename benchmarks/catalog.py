@@ -0,0 +1,116 @@
+# benchmarks/catalog.py - Benchmark'lar için sentetik Sentos kataloğu, siparişler ve Shopify başlangıç durumu
+#
+# Aynı seed ile her zaman aynı veri üretilir; böylece farklı commit'lerin ölçümleri karşılaştırılabilir.
+
+import random
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+COLORS = ('Siyah', 'Beyaz', 'Lacivert', 'Bej', 'Kırmızı', 'Yeşil')
+SIZES = ('XS', 'S', 'M', 'L', 'XL', 'XXL')
+ITEMS = (('Gömlek', 'Gömlek'), ('Elbise', 'Elbise'), ('Etek', 'Etek'), ('Pantolon', 'Pantolon'),
+         ('Ceket', 'Dış Giyim'), ('Bluz', 'Bluz'), ('Kazak', 'Triko'), ('Tulum', 'Tulum'))
+ADJECTIVES = ('Keten', 'İpek', 'Pamuklu', 'Kadife', 'Saten', 'Triko', 'Denim', 'Şifon')
+MARKETPLACES = ('TRENDYOL', 'HEPSIBURADA', 'SHOPIFY', 'N11')
+
+
+def parse_size(value: str) -> int:
+    """'1k' / '10k' / '50000' -> ürün sayısı."""
+    value = str(value).strip().lower()
+    return int(float(value[:-1]) * 1000) if value.endswith('k') else int(value)
+
+
+def generate_catalog(size: int, seed: int = 0, variants_per_product: int = 4, images_per_product: int = 3) -> List[dict]:
+    """Sentos /products yanıtındaki biçimde `size` adet ürün üretir (varyant başına renk/beden ve stok)."""
+    rng = random.Random(seed)
+    products = []
+    for i in range(1, size + 1):
+        item, category = ITEMS[i % len(ITEMS)]
+        model_code = f"BM{i:06d}"
+        purchase = rng.randint(80, 900)
+        sale = round(purchase * rng.uniform(1.8, 2.6), 2)
+        colors = rng.sample(COLORS, k=max(1, (variants_per_product + len(SIZES) - 1) // len(SIZES)))
+        combos = [(color, size_) for color in colors for size_ in SIZES][:variants_per_product]
+        variants = [{
+            'sku': f"{model_code}-{color[:3].upper()}-{size_}",
+            'barcode': f"869{i:07d}{n:03d}",
+            'color': color,
+            'model': {'name': 'Beden', 'value': size_},
+            'options': [{'name': 'Renk', 'value': color}, {'name': 'Beden', 'value': size_}],
+            'stocks': [{'warehouse_id': 1, 'stock': rng.randint(0, 25)}],
+            'purchase_price': f"{purchase:.2f}",
+        } for n, (color, size_) in enumerate(combos)]
+        products.append({
+            'id': i,
+            'sku': model_code,
+            'name': f"{ADJECTIVES[(i // len(ITEMS)) % len(ADJECTIVES)]} {item} {model_code}",
+            'description': f"<p>{item} - model {model_code}</p>",
+            'category': category,
+            'vendor': 'Vervegrand',
+            'purchase_price': f"{purchase:.2f}",
+            'sale_price': f"{sale:.2f}",
+            'prices': {'shopify': {'sale_price': f"{sale:.2f}"}},
+            'images': [f"o_{i}_{n}.jpg" for n in range(images_per_product)],
+            'variants': variants,
+        })
+    return products
+
+
+def generate_orders(products: List[dict], count: int, days: int = 30, seed: int = 0,
+                    end: Optional[datetime] = None) -> List[dict]:
+    """Son `days` güne yayılmış, katalogdaki varyantlardan satırlar içeren siparişler üretir."""
+    rng = random.Random(seed)
+    end = end or datetime.now().replace(microsecond=0)
+    orders = []
+    for n in range(1, count + 1):
+        lines = []
+        for _ in range(rng.choice((1, 1, 1, 2, 3))):
+            product = rng.choice(products)
+            variant = rng.choice(product['variants'])
+            quantity = rng.choice((1, 1, 1, 2))
+            price = float(product['sale_price'])
+            lines.append({'sku': variant['sku'], 'barcode': variant['barcode'], 'name': product['name'],
+                          'quantity': quantity, 'price': f"{price:.2f}", 'amount': f"{price * quantity:.2f}",
+                          'status': 'RETURNED' if rng.random() < 0.03 else 'DELIVERED'})
+        created = end - timedelta(seconds=rng.randint(0, days * 86400))
+        orders.append({
+            'id': n,
+            'order_code': f"SIP{n:08d}",
+            'order_date': created.strftime('%Y-%m-%d %H:%M:%S'),
+            'status': 'CANCELLED' if rng.random() < 0.04 else 'DELIVERED',
+            'source': rng.choice(MARKETPLACES),
+            'lines': lines,
+            'total': f"{sum(float(line['amount']) for line in lines):.2f}",
+        })
+    return orders
+
+
+def seed_shopify(store, products: List[dict], image_url: Callable[[str], str], seed: int = 0,
+                 stock_drift: float = 0.2, price_drift: float = 0.2, missing_ratio: float = 0.0) -> int:
+    """
+    Mağazayı kataloğun daha önce senkronize edilmiş hali gibi doldurur.
+    stock_drift / price_drift oranındaki varyantların stoğu ve fiyatı Sentos'tan farklıdır (senkronizasyonun
+    yapacak işi olsun diye); missing_ratio oranındaki ürünler hiç eklenmez (oluşturma yolunu ölçmek için).
+    Dönüş: mağazaya eklenen ürün sayısı.
+    """
+    rng = random.Random(seed + 1)
+    added = 0
+    for product in products:
+        if rng.random() < missing_ratio:
+            continue
+        price = float(product['sale_price'])
+        variants = []
+        for variant in product['variants']:
+            stock = sum(s.get('stock', 0) for s in variant['stocks'])
+            variants.append({
+                'sku': variant['sku'],
+                'barcode': variant['barcode'],
+                'price': f"{price * (1.1 if rng.random() < price_drift else 1):.2f}",
+                'options': variant['options'],
+                'quantity': stock + rng.randint(1, 5) if rng.random() < stock_drift else stock,
+            })
+        store.add_product(product['name'], variants, description_html=product['description'],
+                          product_type=product['category'], vendor=product['vendor'],
+                          media_urls=[image_url(name) for name in product['images']])
+        added += 1
+    return added
@@ -0,0 +1,261 @@
+# benchmarks/graphql_parser.py - Simülatör için küçük GraphQL ayrıştırıcı
+#
+# Sadece bağlayıcıların gönderdiği sorgu biçimlerini kapsar: isimli/isimsiz query ve mutation,
+# değişken tanımları (varsayılan değerlerle), alias, argümanlar (değişken, literal, liste, nesne, enum),
+# iç içe seçimler, inline fragment (... on Product) ve isimli fragment. Şema doğrulaması yapılmaz.
+
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+_TOKEN = re.compile(r'''
+    (?P<ignored>[\s,]+|\#[^\n]*)
+  | (?P<spread>\.\.\.)
+  | (?P<block>"""(?:[^"\\]|\\.|"(?!""))*""")
+  | (?P<string>"(?:[^"\\\n]|\\.)*")
+  | (?P<number>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+  | (?P<name>[_A-Za-z][_0-9A-Za-z]*)
+  | (?P<punct>[!$():=@\[\]{}|&])
+''', re.VERBOSE)
+
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class GraphQLSyntaxError(Exception):
+    pass
+
+
+class Variable(NamedTuple):
+    name: str
+
+
+class EnumValue(NamedTuple):
+    name: str
+
+
+class Field(NamedTuple):
+    alias: Optional[str]
+    name: str
+    args: Dict[str, Any]
+    selections: List[Any]
+
+    @property
+    def key(self) -> str:
+        return self.alias or self.name
+
+
+class InlineFragment(NamedTuple):
+    type_condition: Optional[str]
+    selections: List[Any]
+
+
+class FragmentSpread(NamedTuple):
+    name: str
+
+
+class Operation(NamedTuple):
+    kind: str
+    name: Optional[str]
+    variable_defaults: Dict[str, Any]
+    selections: List[Any]
+
+
+class Document(NamedTuple):
+    operations: List[Operation]
+    fragments: Dict[str, InlineFragment]
+
+    def operation(self, name: Optional[str] = None) -> Operation:
+        if name:
+            for operation in self.operations:
+                if operation.name == name:
+                    return operation
+            raise GraphQLSyntaxError(f"Unknown operation named '{name}'.")
+        if len(self.operations) != 1:
+            raise GraphQLSyntaxError("An operation name is required when the document has several operations.")
+        return self.operations[0]
+
+
+def _unescape(raw: str) -> str:
+    out, i = [], 0
+    while i < len(raw):
+        ch = raw[i]
+        if ch == '\\' and i + 1 < len(raw):
+            nxt = raw[i + 1]
+            if nxt == 'u':
+                out.append(chr(int(raw[i + 2:i + 6], 16)))
+                i += 6
+                continue
+            out.append(_ESCAPES.get(nxt, nxt))
+            i += 2
+            continue
+        out.append(ch)
+        i += 1
+    return ''.join(out)
+
+
+def tokenize(source: str) -> List[Tuple[str, str]]:
+    tokens, pos = [], 0
+    while pos < len(source):
+        match = _TOKEN.match(source, pos)
+        if not match:
+            raise GraphQLSyntaxError(f"Unexpected character '{source[pos]}' at position {pos}.")
+        kind = match.lastgroup
+        if kind != 'ignored':
+            tokens.append((kind, match.group()))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, source: str):
+        self.tokens = tokenize(source)
+        self.pos = 0
+
+    def peek(self, offset=0) -> Tuple[Optional[str], Optional[str]]:
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+
+    def take(self, value: Optional[str] = None, kind: Optional[str] = None) -> str:
+        token_kind, token_value = self.peek()
+        if token_kind is None or (value is not None and token_value != value) or (kind is not None and token_kind != kind):
+            raise GraphQLSyntaxError(f"Expected {value or kind}, found {token_value or 'end of document'}.")
+        self.pos += 1
+        return token_value
+
+    def accept(self, value: str) -> bool:
+        if self.peek()[1] == value:
+            self.pos += 1
+            return True
+        return False
+
+    def document(self) -> Document:
+        operations, fragments = [], {}
+        while self.peek()[0] is not None:
+            kind, value = self.peek()
+            if value == '{':
+                operations.append(Operation('query', None, {}, self.selection_set()))
+            elif value == 'fragment':
+                self.take()
+                name = self.take(kind='name')
+                self.take('on')
+                type_condition = self.take(kind='name')
+                self.directives()
+                fragments[name] = InlineFragment(type_condition, self.selection_set())
+            elif value in ('query', 'mutation'):
+                self.take()
+                name = self.take(kind='name') if self.peek()[0] == 'name' else None
+                defaults = self.variable_definitions() if self.peek()[1] == '(' else {}
+                self.directives()
+                operations.append(Operation(value, name, defaults, self.selection_set()))
+            else:
+                raise GraphQLSyntaxError(f"Unexpected '{value}'.")
+        if not operations:
+            raise GraphQLSyntaxError("Document does not contain an operation.")
+        return Document(operations, fragments)
+
+    def variable_definitions(self) -> Dict[str, Any]:
+        defaults = {}
+        self.take('(')
+        while not self.accept(')'):
+            self.take('$')
+            name = self.take(kind='name')
+            self.take(':')
+            self.type_reference()
+            if self.accept('='):
+                defaults[name] = self.value()
+            self.directives()
+        return defaults
+
+    def type_reference(self):
+        if self.accept('['):
+            self.type_reference()
+            self.take(']')
+        else:
+            self.take(kind='name')
+        self.accept('!')
+
+    def directives(self):
+        while self.accept('@'):
+            self.take(kind='name')
+            if self.peek()[1] == '(':
+                self.arguments()
+
+    def selection_set(self) -> List[Any]:
+        selections = []
+        self.take('{')
+        while not self.accept('}'):
+            if self.accept('...'):
+                if self.peek()[1] == 'on':
+                    self.take()
+                    type_condition = self.take(kind='name')
+                    self.directives()
+                    selections.append(InlineFragment(type_condition, self.selection_set()))
+                elif self.peek()[1] == '{' or self.peek()[1] == '@':
+                    self.directives()
+                    selections.append(InlineFragment(None, self.selection_set()))
+                else:
+                    selections.append(FragmentSpread(self.take(kind='name')))
+                continue
+            alias, name = None, self.take(kind='name')
+            if self.accept(':'):
+                alias, name = name, self.take(kind='name')
+            args = self.arguments() if self.peek()[1] == '(' else {}
+            self.directives()
+            children = self.selection_set() if self.peek()[1] == '{' else []
+            selections.append(Field(alias, name, args, children))
+        return selections
+
+    def arguments(self) -> Dict[str, Any]:
+        args = {}
+        self.take('(')
+        while not self.accept(')'):
+            name = self.take(kind='name')
+            self.take(':')
+            args[name] = self.value()
+        return args
+
+    def value(self) -> Any:
+        kind, value = self.peek()
+        if value == '$':
+            self.take()
+            return Variable(self.take(kind='name'))
+        if value == '[':
+            self.take()
+            items = []
+            while not self.accept(']'):
+                items.append(self.value())
+            return items
+        if value == '{':
+            self.take()
+            fields = {}
+            while not self.accept('}'):
+                name = self.take(kind='name')
+                self.take(':')
+                fields[name] = self.value()
+            return fields
+        self.take()
+        if kind == 'string':
+            return _unescape(value[1:-1])
+        if kind == 'block':
+            return value[3:-3]
+        if kind == 'number':
+            return float(value) if any(c in value for c in '.eE') else int(value)
+        if kind == 'name':
+            return {'true': True, 'false': False, 'null': None}[value] if value in ('true', 'false', 'null') else EnumValue(value)
+        raise GraphQLSyntaxError(f"Unexpected '{value}' in value position.")
+
+
+def parse(source: str) -> Document:
+    return _Parser(source).document()
+
+
+def resolve_value(value: Any, variables: Dict[str, Any]) -> Any:
+    """AST değerini değişkenlerle çözülmüş Python değerine çevirir (enum'lar isim olarak döner)."""
+    if isinstance(value, Variable):
+        return variables.get(value.name)
+    if isinstance(value, EnumValue):
+        return value.name
+    if isinstance(value, list):
+        return [resolve_value(v, variables) for v in value]
+    if isinstance(value, dict):
+        return {k: resolve_value(v, variables) for k, v in value.items()}
+    return value
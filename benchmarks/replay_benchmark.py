@@ -0,0 +1,183 @@
+# benchmarks/replay_benchmark.py - Kasetten tekrar oynatmalı (ağsız) verim ölçümü
+#
+# record: Simülatörlere (veya HTTP_CASSETTE ile gerçek mağazaya) karşı iş yüklerini çalıştırır, her iş yükünün
+#         istek/yanıt çiftlerini <dizin>/<iş yükü>.jsonl.gz kasetine yazar.
+# replay: Aynı iş yüklerini ağ olmadan kasetten çalıştırır; sync_runner._run_core_sync_logic ve
+#         SalesAnalytics.analyze_sales_data'nın CPU tarafı (ayrıştırma, eşleştirme, kopyalar) ölçülür.
+#         --latency-scale 0 -> ağ bekleme yok, 1 -> kaydedilen gecikmeler aynen uygulanır.
+#
+# Örnek:
+#   python -m benchmarks.replay_benchmark record --size 500
+#   python -m benchmarks.replay_benchmark replay --repeat 3 --json replay.json
+# Not: İstemci tarafındaki bilinçli beklemeler (ShopifyAPI hız sınırlayıcısı, sayfa arası sleep) duvar saatine dahildir;
+#      CPU regresyonları için 'cpu_sn' sütununa bakın.
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.catalog import generate_catalog, generate_orders, parse_size, seed_shopify
+from benchmarks.sentos_simulator import SentosSimulator, SentosStore
+from benchmarks.shopify_simulator import ShopifySimulator, ShopifyStore
+from connectors import http_transport
+
+WORKLOADS = ('full', 'stock', 'analytics')
+DEFAULT_DIR = os.path.join(project_root, 'benchmarks', 'cassettes')
+MANIFEST = 'manifest.json'
+# Tekrar oynatmada host anahtara dahil değildir; bu adresler hiçbir zaman aranmaz
+REPLAY_SHOPIFY_URL, REPLAY_SENTOS_URL = 'http://shopify.replay', 'http://sentos.replay'
+ACCESS_TOKEN = 'shpat_benchmark'
+SENTOS_KEY, SENTOS_SECRET, SENTOS_COOKIE = 'benchmark', 'benchmark', 'PHPSESSID=benchmark'
+
+
+def _run_sync(shopify_url, sentos_url, workload, workers):
+    import sync_runner
+    final = {}
+
+    def on_progress(update):
+        if update.get('status') in ('done', 'error'):
+            final.update(update)
+
+    sync_mode = sync_runner.FULL_SYNC_MODE if workload == 'full' else sync_runner.STOCK_ONLY_MODE
+    shopify_config = {'store_url': shopify_url, 'access_token': ACCESS_TOKEN}
+    sentos_config = {'api_url': sentos_url, 'api_key': SENTOS_KEY, 'api_secret': SENTOS_SECRET, 'cookie': SENTOS_COOKIE}
+    sync_runner._run_core_sync_logic(shopify_config, sentos_config, sync_mode, workers, False, on_progress, threading.Event())
+    if final.get('status') != 'done':
+        raise RuntimeError(f"Senkronizasyon başarısız: {final.get('message')}")
+    stats = final['results']['stats']
+    return stats['processed'], {k: stats[k] for k in ('created', 'updated', 'skipped', 'failed')}
+
+
+def _run_analytics(sentos_url, start_date, end_date):
+    from connectors.sentos_api import SentosAPI
+    from operations.sales_analytics import SalesAnalytics
+
+    api = SentosAPI(sentos_url, SENTOS_KEY, SENTOS_SECRET, SENTOS_COOKIE)
+    analysis = SalesAnalytics(api).analyze_sales_data(start_date=start_date, end_date=end_date) or {}
+    summary = analysis.get('summary', {})
+    return summary.get('total_orders', 0), {'orders': summary.get('total_orders', 0)}
+
+
+def run_workload(workload, shopify_url, sentos_url, manifest):
+    if workload == 'analytics':
+        return _run_analytics(sentos_url, manifest['start_date'], manifest['end_date'])
+    return _run_sync(shopify_url, sentos_url, workload, manifest['workers'])
+
+
+def record(args):
+    """Her iş yükünü taze simülatörlere karşı çalıştırıp kasete kaydeder; manifest dosyasını yazar."""
+    os.makedirs(args.dir, exist_ok=True)
+    end = datetime.now()
+    manifest = {'size': args.size, 'seed': args.seed, 'workers': args.workers, 'workloads': {},
+                'start_date': (end - timedelta(days=31)).strftime('%Y-%m-%d'), 'end_date': end.strftime('%Y-%m-%d'),
+                'recorded_at': end.isoformat(timespec='seconds')}
+    for workload in args.workloads:
+        path = os.path.join(args.dir, f"{workload}.jsonl.gz")
+        if os.path.exists(path):
+            os.remove(path)
+        catalog = generate_catalog(args.size, seed=args.seed)
+        orders = generate_orders(catalog, args.size, seed=args.seed, end=end) if workload == 'analytics' else []
+        shopify = ShopifySimulator(ShopifyStore(processing_seconds=0.05))
+        sentos = SentosSimulator(SentosStore(catalog, orders), seed=args.seed)
+        if workload != 'analytics':
+            seed_shopify(shopify.store, catalog, sentos.image_url, seed=args.seed,
+                         missing_ratio=args.missing_ratio if workload == 'full' else 0.0)
+
+        print(f"⏺️ {workload} / {args.size} ürün kaydediliyor -> {path}")
+        cassette = http_transport.Cassette(path)
+        with shopify, sentos, http_transport.use_transport(http_transport.RecordingTransport(cassette)):
+            started = time.monotonic()
+            count, detail = run_workload(workload, shopify.url, sentos.url, manifest)
+        manifest['workloads'][workload] = {'items': count, 'detail': detail, 'interactions': len(cassette.interactions),
+                                           'seconds': round(time.monotonic() - started, 2)}
+    with open(os.path.join(args.dir, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def replay(args, manifest):
+    """Kasetleri ağsız oynatır; her tekrar için duvar saati ve CPU süresini ölçer."""
+    results = []
+    for workload in args.workloads:
+        if workload not in manifest['workloads']:
+            logging.warning(f"⚠️ {workload} için kaset yok, atlanıyor")
+            continue
+        cassette = http_transport.Cassette.load(os.path.join(args.dir, f"{workload}.jsonl.gz"))
+        for run in range(1, args.repeat + 1):
+            transport = http_transport.ReplayTransport(cassette, latency_scale=args.latency_scale)
+            with http_transport.use_transport(transport):
+                wall, cpu = time.monotonic(), time.process_time()
+                count, detail = run_workload(workload, REPLAY_SHOPIFY_URL, REPLAY_SENTOS_URL, manifest)
+                wall, cpu = time.monotonic() - wall, time.process_time() - cpu
+            results.append({
+                'workload': workload, 'run': run, 'items': count, 'seconds': round(wall, 3), 'cpu_seconds': round(cpu, 3),
+                'per_second': round(count / wall, 2) if wall else 0.0,
+                'unit': 'sipariş/sn' if workload == 'analytics' else 'ürün/sn',
+                'detail': detail, 'replay': dict(transport.stats),
+            })
+            print(f"✅ {workload} #{run}: {results[-1]['per_second']} {results[-1]['unit']} "
+                  f"({results[-1]['seconds']} sn, CPU {results[-1]['cpu_seconds']} sn, kaset: {transport.stats})")
+    return results
+
+
+def print_report(results):
+    print(f"\n{'İş yükü':<10} {'#':>3} {'Öğe':>7} {'Süre (sn)':>10} {'CPU (sn)':>9} {'Verim':>16} {'Birebir':>8} {'Yedek':>6} {'Eksik':>6}")
+    for r in results:
+        print(f"{r['workload']:<10} {r['run']:>3} {r['items']:>7} {r['seconds']:>10} {r['cpu_seconds']:>9} "
+              f"{str(r['per_second']) + ' ' + r['unit']:>16} {r['replay']['exact'] + r['replay']['repeated']:>8} "
+              f"{r['replay']['loose']:>6} {r['replay']['missed']:>6}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kasete kaydedilmiş HTTP trafiğiyle ağsız verim ölçümü")
+    parser.add_argument('command', choices=('record', 'replay'), nargs='?', default='replay')
+    parser.add_argument('--dir', default=DEFAULT_DIR, help="Kaset dizini")
+    parser.add_argument('--workloads', default=','.join(WORKLOADS), help=f"Virgülle ayrılmış: {','.join(WORKLOADS)}")
+    parser.add_argument('--size', default='200', help="Kayıt için katalog boyutu, örn. 200 veya 1k")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--missing-ratio', type=float, default=0.1)
+    parser.add_argument('--latency-scale', type=float, default=0.0, help="Kaydedilen gecikmelerin çarpanı (0 = sadece CPU)")
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--workdir', default=None, help="Log/önbellek dosyalarının yazılacağı dizin (varsayılan: geçici dizin)")
+    parser.add_argument('--json', dest='json_path', default=None, help="Sonuçları JSON olarak kaydet")
+    args = parser.parse_args(argv)
+
+    args.workloads = [w.strip() for w in args.workloads.split(',') if w.strip()]
+    if unknown := [w for w in args.workloads if w not in WORKLOADS]:
+        parser.error(f"Bilinmeyen iş yükü: {', '.join(unknown)}")
+    args.size = parse_size(args.size)
+    args.dir = os.path.abspath(args.dir)
+    json_path = os.path.abspath(args.json_path) if args.json_path else None
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    os.chdir(args.workdir or tempfile.mkdtemp(prefix='sync-replay-'))
+
+    manifest_path = os.path.join(args.dir, MANIFEST)
+    if args.command == 'record' or not os.path.exists(manifest_path):
+        manifest = record(args)
+        if args.command == 'record':
+            return manifest
+    else:
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+
+    results = replay(args, manifest)
+    print_report(results)
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return results
+
+
+if __name__ == '__main__':
+    main()
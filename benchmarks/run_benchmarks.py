@@ -0,0 +1,172 @@
+# benchmarks/run_benchmarks.py - Simülatörlere karşı verim ölçümü (ürün/sn)
+#
+# Her iş yükü için yeni bir Shopify ve Sentos simülatörü başlatılır, sentetik katalog yüklenir ve uygulamanın
+# gerçek kod yolu (sync_runner, price_sync, SalesAnalytics) çalıştırılır:
+#   full      -> Tam senkronizasyon (ürünlerin missing_ratio kadarı Shopify'da yok, oluşturulur)
+#   stock     -> Sadece Stok ve Varyantlar (anlık görüntü motoru ile)
+#   price     -> Shopify fiyatlarını çekme + fark + paralel productVariantsBulkUpdate (Fiyat Hesaplayıcı sayfasının yolu)
+#   analytics -> Sentos sipariş çekimi, maliyet eşleştirme ve analiz
+#
+# Örnek: python -m benchmarks.run_benchmarks --sizes 1k,10k --workloads stock,price --json sonuc.json
+# Not: İstemci tarafındaki bekleme süreleri (sayfa arası sleep, Sentos 429/500 geri çekilmesi) ölçüme dahildir.
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.catalog import generate_catalog, generate_orders, parse_size, seed_shopify
+from benchmarks.sentos_simulator import SentosSimulator, SentosStore
+from benchmarks.shopify_simulator import ShopifySimulator, ShopifyStore
+
+WORKLOADS = ('full', 'stock', 'price', 'analytics')
+ACCESS_TOKEN = 'shpat_benchmark'
+SENTOS_KEY, SENTOS_SECRET, SENTOS_COOKIE = 'benchmark', 'benchmark', 'PHPSESSID=benchmark'
+
+
+def _run_sync(shopify, sentos, sync_mode, workers):
+    import sync_runner
+    final = {}
+
+    def on_progress(update):
+        if update.get('status') in ('done', 'error'):
+            final.update(update)
+
+    sync_runner.sync_products_from_sentos_api(shopify.url, ACCESS_TOKEN, sentos.url, SENTOS_KEY, SENTOS_SECRET, SENTOS_COOKIE,
+                                              False, on_progress, threading.Event(), max_workers=workers, sync_mode=sync_mode)
+    if final.get('status') != 'done':
+        raise RuntimeError(f"Senkronizasyon başarısız: {final.get('message')}")
+    stats = final['results']['stats']
+    return stats['processed'], {k: stats[k] for k in ('created', 'updated', 'skipped', 'failed')}
+
+
+def _run_price(shopify, sentos, catalog, workers):
+    """pages/6_Fiyat_Hesaplayıcı.py'deki güncelleme yolu: mevcut fiyatlar -> fark -> ürün başına toplu güncelleme."""
+    import pandas as pd
+    from connectors.shopify_api import ShopifyAPI
+    from operations.price_sync import SmartRateLimiter, compute_price_updates, update_prices_for_single_product
+
+    api = ShopifyAPI(shopify.url, ACCESS_TOKEN)
+    price_df = pd.DataFrame({'MODEL KODU': [p['sku'] for p in catalog], 'NIHAI_SATIS_FIYATI': [float(p['sale_price']) for p in catalog]})
+    variants_df = pd.DataFrame([{'MODEL KODU': v['sku'], 'base_sku': p['sku']} for p in catalog for v in p['variants']])
+    updates, _ = compute_price_updates(api.get_all_products_prices(), price_df, variants_df, 'NIHAI_SATIS_FIYATI')
+
+    limiter = SmartRateLimiter(max_requests_per_second=2.5, burst_capacity=15)
+    outcome = defaultdict(int)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(update_prices_for_single_product, api, gid, payload, limiter) for gid, payload in updates.items()]
+        for future in as_completed(futures):
+            outcome[future.result().get('status', 'failed')] += 1
+    return len(catalog), {'updated': outcome['success'], 'failed': outcome['failed'], 'unchanged': len(catalog) - len(updates)}
+
+
+def _run_analytics(shopify, sentos, catalog, orders):
+    from connectors.sentos_api import SentosAPI
+    from operations.sales_analytics import SalesAnalytics
+
+    api = SentosAPI(sentos.url, SENTOS_KEY, SENTOS_SECRET, SENTOS_COOKIE)
+    start = (datetime.now() - timedelta(days=31)).strftime('%Y-%m-%d')
+    end = datetime.now().strftime('%Y-%m-%d')
+    analysis = SalesAnalytics(api).analyze_sales_data(start_date=start, end_date=end) or {}
+    summary = analysis.get('summary', {})
+    return len(orders), {'orders': summary.get('total_orders', len(orders))}
+
+
+def run_workload(workload, size, args):
+    """Tek bir iş yükünü taze simülatörlerle çalıştırır; ölçüm sonucunu sözlük olarak döndürür."""
+    catalog = generate_catalog(size, seed=args.seed)
+    orders = generate_orders(catalog, size, seed=args.seed) if workload == 'analytics' else []
+    shopify = ShopifySimulator(ShopifyStore(bucket_max=args.bucket, restore_rate=args.restore_rate,
+                                            processing_seconds=args.media_processing), latency=args.shopify_latency)
+    sentos = SentosSimulator(SentosStore(catalog, orders), latency=args.sentos_latency, jitter=args.sentos_jitter,
+                             error_rate=args.sentos_error_rate, seed=args.seed)
+    if workload != 'analytics':
+        seed_shopify(shopify.store, catalog, sentos.image_url, seed=args.seed,
+                     missing_ratio=args.missing_ratio if workload == 'full' else 0.0)
+
+    with shopify, sentos:
+        started = time.monotonic()
+        if workload == 'full':
+            from sync_runner import FULL_SYNC_MODE
+            count, detail = _run_sync(shopify, sentos, FULL_SYNC_MODE, args.workers)
+        elif workload == 'stock':
+            from sync_runner import STOCK_ONLY_MODE
+            count, detail = _run_sync(shopify, sentos, STOCK_ONLY_MODE, args.workers)
+        elif workload == 'price':
+            count, detail = _run_price(shopify, sentos, catalog, args.workers)
+        else:
+            count, detail = _run_analytics(shopify, sentos, catalog, orders)
+        elapsed = time.monotonic() - started
+
+    return {
+        'workload': workload, 'catalog': size, 'items': count, 'seconds': round(elapsed, 2),
+        'per_second': round(count / elapsed, 2) if elapsed else 0.0,
+        'unit': 'sipariş/sn' if workload == 'analytics' else 'ürün/sn',
+        'detail': detail,
+        'shopify': dict(shopify.store.metrics),
+        'sentos': dict(sentos.metrics),
+    }
+
+
+def print_report(results):
+    print(f"\n{'İş yükü':<10} {'Katalog':>8} {'Öğe':>8} {'Süre (sn)':>10} {'Verim':>16} {'Shopify istek':>14} {'THROTTLED':>10} {'Sentos istek':>13}")
+    for r in results:
+        print(f"{r['workload']:<10} {r['catalog']:>8} {r['items']:>8} {r['seconds']:>10} {str(r['per_second']) + ' ' + r['unit']:>16} "
+              f"{r['shopify']['requests']:>14} {r['shopify']['throttled']:>10} {r['sentos']['requests']:>13}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shopify/Sentos simülatörlerine karşı verim ölçümü")
+    parser.add_argument('--sizes', default='1k', help="Katalog boyutları, örn. 1k,10k,50k")
+    parser.add_argument('--workloads', default=','.join(WORKLOADS), help=f"Virgülle ayrılmış: {','.join(WORKLOADS)}")
+    parser.add_argument('--workers', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--missing-ratio', type=float, default=0.1, help="Tam senkronizasyonda Shopify'da olmayan ürün oranı")
+    parser.add_argument('--shopify-latency', type=float, default=0.05, help="Shopify yanıt gecikmesi (sn)")
+    parser.add_argument('--bucket', type=float, default=1000.0, help="Shopify maliyet bütçesi (Plus: 2000)")
+    parser.add_argument('--restore-rate', type=float, default=50.0, help="Saniyede geri dolan puan (Plus: 100)")
+    parser.add_argument('--media-processing', type=float, default=0.5, help="Yeni medyanın READY olma süresi (sn)")
+    parser.add_argument('--sentos-latency', type=float, default=0.02)
+    parser.add_argument('--sentos-jitter', type=float, default=0.0)
+    parser.add_argument('--sentos-error-rate', type=float, default=0.0,
+                        help="429/500 oranı (0-1); SentosAPI 15 sn'den başlayan geri çekilme uygular")
+    parser.add_argument('--workdir', default=None, help="Log/önbellek dosyalarının yazılacağı dizin (varsayılan: geçici dizin)")
+    parser.add_argument('--json', dest='json_path', default=None, help="Sonuçları JSON olarak kaydet")
+    args = parser.parse_args(argv)
+
+    workloads = [w.strip() for w in args.workloads.split(',') if w.strip()]
+    if unknown := [w for w in workloads if w not in WORKLOADS]:
+        parser.error(f"Bilinmeyen iş yükü: {', '.join(unknown)}")
+
+    json_path = os.path.abspath(args.json_path) if args.json_path else None
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    # sync_logs.db, parmak izi ve checkpoint dosyaları gerçek çalışmaların verisine karışmasın
+    os.chdir(args.workdir or tempfile.mkdtemp(prefix='sync-bench-'))
+
+    results = []
+    for size in [parse_size(s) for s in args.sizes.split(',') if s.strip()]:
+        for workload in workloads:
+            print(f"▶️ {workload} / {size} ürün çalışıyor...")
+            results.append(run_workload(workload, size, args))
+            print(f"✅ {workload} / {size}: {results[-1]['per_second']} {results[-1]['unit']} ({results[-1]['seconds']} sn)")
+
+    print_report(results)
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+# benchmarks/sentos_simulator.py - Yerel Sentos API simülatörü
+#
+# connectors/sentos_api.py'nin kullandığı uçları sunar:
+#   GET  /products?page=&size=            -> {'data', 'total_elements', 'total_pages'} (sku/barcode/name/q filtreleri)
+#   GET  /orders?page=&size=&startDate=... -> {'data', 'total', 'totalPages'}
+#   GET  /orders/<id>                      -> sipariş detayı
+#   POST /urun_sayfalari/include/ajax/fetch_urunresimler.php -> sıralı resim listesi (cookie ile)
+#   GET  /images/<ad>                      -> resim içeriği (medya parmak izi hash'i için)
+# Her isteğe sabit gecikme (+ rastgele sapma) eklenir; error_rate oranında 429/500 döndürülür.
+
+import hashlib
+import random
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.server import BackgroundServer, JSONRequestHandler
+
+IMAGES_ENDPOINT = '/urun_sayfalari/include/ajax/fetch_urunresimler.php'
+
+
+class SentosStore:
+    """Ürün ve sipariş verisi; SKU ve barkod aramaları indeksten yapılır."""
+
+    def __init__(self, products: Sequence[dict] = (), orders: Sequence[dict] = ()):
+        self.products: List[dict] = list(products)
+        self.orders: List[dict] = list(orders)
+        self.orders_by_id = {str(order.get('id')): order for order in self.orders}
+        self.products_by_id = {str(product.get('id')): product for product in self.products}
+        # Ürünlerdeki 'images' dosya adlarıdır; tam adres simülatörün adresiyle kurulur
+        self.base_url = ''
+        self._by_sku: Dict[str, dict] = {}
+        self._by_barcode: Dict[str, dict] = {}
+        for product in self.products:
+            for record in [product] + list(product.get('variants') or []):
+                if sku := str(record.get('sku') or '').strip().lower():
+                    self._by_sku.setdefault(sku, product)
+                if barcode := str(record.get('barcode') or '').strip().lower():
+                    self._by_barcode.setdefault(barcode, product)
+
+    @staticmethod
+    def _page(items: list, params: dict):
+        page = max(1, int(params.get('page', 1)))
+        size = max(1, int(params.get('size', 100)))
+        total_pages = (len(items) + size - 1) // size
+        return items[(page - 1) * size:page * size], total_pages
+
+    def product_page(self, params: dict) -> dict:
+        if sku := params.get('sku'):
+            items = [p for p in [self._by_sku.get(sku.strip().lower())] if p]
+        elif barcode := params.get('barcode'):
+            items = [p for p in [self._by_barcode.get(barcode.strip().lower())] if p]
+        elif text := (params.get('name') or params.get('q')):
+            text = text.strip().lower()
+            items = [p for p in self.products if text in str(p.get('name', '')).lower() or text in str(p.get('sku', '')).lower()]
+        else:
+            items = self.products
+        data, total_pages = self._page(items, params)
+        return {'data': data, 'total_elements': len(items), 'total_pages': total_pages}
+
+    def order_page(self, params: dict) -> dict:
+        start = params.get('startDate') or params.get('start_date')
+        end = params.get('endDate') or params.get('end_date')
+        marketplace = (params.get('marketplace') or '').upper()
+        status = params.get('status')
+        items = [o for o in self.orders
+                 if (not start or o['order_date'][:10] >= start) and (not end or o['order_date'][:10] <= end)
+                 and (not marketplace or o.get('source', '').upper() == marketplace)
+                 and (not status or o.get('status') == status)]
+        # sort=createdDate,desc: en yeni siparişler önce
+        items.sort(key=lambda o: o['order_date'], reverse=True)
+        data, total_pages = self._page(items, params)
+        return {'data': data, 'total': len(items), 'totalPages': total_pages}
+
+    def image_rows(self, product_id: str) -> dict:
+        product = self.products_by_id.get(str(product_id)) or {}
+        urls = [f"{self.base_url}/images/{name}" for name in product.get('images') or []]
+        return {'data': [[str(i), '', f'<a href="{url}" target="_blank"><img src="{url}"></a>'] for i, url in enumerate(urls)]}
+
+
+class _SentosHandler(JSONRequestHandler):
+    def _prepare(self) -> bool:
+        """Gecikme ve hata enjeksiyonu; istek devam etmeli ise True döner."""
+        simulator = self.server.simulator
+        simulator.count('requests')
+        if delay := simulator.next_delay():
+            time.sleep(delay)
+        if status := simulator.next_error():
+            simulator.count(f'errors_{status}')
+            self.send_json(status, {'message': 'Too Many Requests' if status == 429 else 'Internal Server Error'})
+            return False
+        return True
+
+    def _authorized(self, cookie=False) -> bool:
+        if (self.headers.get('Cookie') if cookie else self.headers.get('Authorization', '').startswith('Basic ')):
+            return True
+        self.send_json(401, {'message': 'Unauthorized'})
+        return False
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        store = self.server.simulator.store
+        if match := re.fullmatch(r'/images/([\w.-]+)', parsed.path):
+            # Resim içeriği URL'e göre sabittir (aynı URL -> aynı hash)
+            return self.send_payload(200, hashlib.sha256(match.group(1).encode()).digest() * 64, 'image/jpeg')
+        if not self._prepare() or not self._authorized():
+            return
+        if parsed.path == '/products':
+            return self.send_json(200, store.product_page(params))
+        if parsed.path == '/orders':
+            return self.send_json(200, store.order_page(params))
+        if match := re.fullmatch(r'/orders/([\w-]+)', parsed.path):
+            if order := store.orders_by_id.get(match.group(1)):
+                return self.send_json(200, order)
+        self.send_json(404, {'message': 'Not Found'})
+
+    def do_POST(self):
+        parsed = urlparse(self.path)
+        if parsed.path != IMAGES_ENDPOINT:
+            return self.send_json(404, {'message': 'Not Found'})
+        form = {k: v[-1] for k, v in parse_qs(self.read_body().decode('utf-8')).items()}
+        if not self._prepare() or not self._authorized(cookie=True):
+            return
+        self.send_json(200, self.server.simulator.store.image_rows(form.get('urun', '')))
+
+
+class SentosSimulator:
+    """
+    Arka planda çalışan Sentos simülatörü. SentosAPI(simulator.url, key, secret, cookie) ile kullanılır.
+    latency/jitter saniye cinsindendir; error_rate (0-1) oranındaki isteklere error_statuses içinden biri döner.
+    """
+
+    def __init__(self, store: SentosStore, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_statuses: Sequence[int] = (429, 500), seed: Optional[int] = 0, port: int = 0):
+        self.store = store
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.metrics: Dict[str, int] = {'requests': 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = BackgroundServer(_SentosHandler, self, port=port)
+        self.store.base_url = self._server.url
+
+    @property
+    def url(self) -> str:
+        return self._server.url
+
+    def image_url(self, name: str) -> str:
+        return f"{self.url}/images/{name}"
+
+    def count(self, key: str):
+        with self._lock:
+            self.metrics[key] = self.metrics.get(key, 0) + 1
+
+    def next_delay(self) -> float:
+        with self._lock:
+            return max(0.0, self.latency + (self._random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0))
+
+    def next_error(self) -> Optional[int]:
+        with self._lock:
+            if self.error_rate and self._random.random() < self.error_rate:
+                return self._random.choice(self.error_statuses)
+        return None
+
+    def start(self) -> 'SentosSimulator':
+        self._server.start()
+        return self
+
+    def close(self):
+        self._server.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,66 @@
+# benchmarks/server.py - Simülatörlerin ortak arka plan HTTP sunucusu
+
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class JSONRequestHandler(BaseHTTPRequestHandler):
+    """JSON yanıt yardımcıları; erişim logları sessize alınır (benchmark çıktısını kirletmesin)."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        logging.debug("%s - %s", self.address_string(), format % args)
+
+    def read_body(self) -> bytes:
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def send_payload(self, status: int, body: bytes, content_type: str = 'application/json', headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, status: int, payload, headers=None):
+        self.send_payload(status, json.dumps(payload).encode('utf-8'), headers=headers)
+
+
+class BackgroundServer:
+    """
+    Handler sınıfını 127.0.0.1 üzerinde (port=0 ise boş bir portta) daemon thread'de çalıştırır.
+    Handler'lar simülatör durumuna self.server.simulator üzerinden erişir.
+    """
+
+    def __init__(self, handler_class, simulator, host: str = '127.0.0.1', port: int = 0):
+        self.httpd = ThreadingHTTPServer((host, port), handler_class)
+        self.httpd.daemon_threads = True
+        self.httpd.simulator = simulator
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'BackgroundServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name=f"Simulator-{self.httpd.server_address[1]}", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,778 @@
+# benchmarks/shopify_simulator.py - Yerel Shopify GraphQL Admin API simülatörü
+#
+# Bağlayıcıların (connectors/shopify_api.py ve operations/*) kullandığı sorgu ve mutation'ları bellekteki
+# bir mağaza üzerinde çalıştırır. Maliyet modeli Shopify'ınkine benzer:
+#   - Sorgu maliyeti statik hesaplanır: nesne 1, bağlantı 2 + first × düğüm maliyeti, nodes(ids) id başına,
+#     mutation alanı başına 10 puan. Bütçeyi aşan sorgular bütçe kadar maliyetli sayılır (reddedilmez).
+#   - Leaky bucket: maximumAvailable puan, saniyede restoreRate puan dolar. Bütçe yetmezse istek THROTTLED
+#     hatasıyla döner; başarılı isteklerde gerçek maliyet (dönen nesne sayısı) hesaplanıp fark iade edilir.
+#   - Her yanıtta extensions.cost.throttleStatus bulunur (inventory_batcher ve plan tahmini bunu okur).
+# Medyalar processing_seconds boyunca PROCESSING kalır; bulk operation sonucu JSONL olarak sunucudan indirilir.
+
+import base64
+import bisect
+import itertools
+import json
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from benchmarks.graphql_parser import (Document, Field, FragmentSpread, GraphQLSyntaxError, InlineFragment,
+                                       parse, resolve_value)
+from benchmarks.server import BackgroundServer, JSONRequestHandler
+
+MUTATION_COST = 10
+MAX_PAGE_SIZE = 250
+# Tip koşulu arayüz adıyla yazılmış fragment'lar (örn. ... on Media) bu tiplerle eşleşir
+INTERFACES = {'MediaImage': ('Media', 'Node'), 'Product': ('Node',), 'ProductVariant': ('Node',),
+              'InventoryItem': ('Node',), 'Location': ('Node',), 'BulkOperation': ('Node',)}
+# Maliyet hesabında nesne sayılmayan yardımcı tipler
+_FREE_TYPES = ('Edge', 'PageInfo')
+_SEARCH_TERM = re.compile(r'(?:(\w+):)?("(?:[^"\\]|\\.)*"|\S+)')
+_TAGS = re.compile(r'<[^>]+>')
+
+
+class QueryError(Exception):
+    def __init__(self, message: str, code: Optional[str] = None):
+        super().__init__(message)
+        self.code = code
+
+    def as_dict(self) -> dict:
+        error = {'message': str(self)}
+        if self.code:
+            error['extensions'] = {'code': self.code}
+        return error
+
+
+def _cursor(index: int) -> str:
+    return base64.b64encode(f"idx:{index}".encode()).decode()
+
+
+def _cursor_index(cursor: str) -> int:
+    try:
+        return int(base64.b64decode(cursor).decode().split(':', 1)[1])
+    except Exception:
+        raise QueryError(f"Invalid cursor for current pagination sort.")
+
+
+def _numeric_id(gid: str) -> str:
+    return str(gid).rsplit('/', 1)[-1]
+
+
+class LeakyBucket:
+    """Shopify'ın sorgu maliyeti bütçesi: maximum puan, saniyede restore_rate puan dolar."""
+
+    def __init__(self, maximum: float = 1000.0, restore_rate: float = 50.0, clock=time.monotonic):
+        self.maximum = float(maximum)
+        self.restore_rate = float(restore_rate)
+        self.clock = clock
+        self._available = float(maximum)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self._available = min(self.maximum, self._available + (now - self._updated) * self.restore_rate)
+        self._updated = now
+
+    def try_consume(self, cost: float) -> bool:
+        with self._lock:
+            self._refill()
+            if cost > self._available:
+                return False
+            self._available -= cost
+            return True
+
+    def refund(self, amount: float):
+        with self._lock:
+            self._refill()
+            self._available = min(self.maximum, self._available + max(0.0, amount))
+
+    def status(self) -> dict:
+        with self._lock:
+            self._refill()
+            return {'maximumAvailable': self.maximum, 'currentlyAvailable': int(self._available),
+                    'restoreRate': self.restore_rate}
+
+
+def _search_clauses(query: Optional[str]) -> List[List[tuple]]:
+    """'sku:A* OR title:"B C"' -> [[('sku', 'a*')], [('title', 'b c')]] (OR ile ayrılmış, içerisi AND)."""
+    if not query or not query.strip():
+        return []
+    clauses = []
+    for part in re.split(r'\s+OR\s+', query.strip()):
+        terms = []
+        for field, value in _SEARCH_TERM.findall(part):
+            if value.upper() == 'AND':
+                continue
+            if value.startswith('"') and value.endswith('"') and len(value) >= 2:
+                value = json.loads(value)
+            terms.append((field.lower() or None, value.lower()))
+        clauses.append(terms)
+    return clauses
+
+
+def _text_match(candidate: str, value: str) -> bool:
+    candidate = (candidate or '').lower()
+    return candidate.startswith(value[:-1]) if value.endswith('*') else candidate == value
+
+
+class ShopifyStore:
+    """Bellekteki mağaza ve GraphQL yürütücüsü."""
+
+    def __init__(self, bucket_max: float = 1000.0, restore_rate: float = 50.0, processing_seconds: float = 0.5,
+                 bulk_objects_per_second: float = 20000.0, clock=time.monotonic):
+        self.clock = clock
+        self.bucket = LeakyBucket(bucket_max, restore_rate, clock)
+        self.processing_seconds = processing_seconds
+        self.bulk_objects_per_second = bulk_objects_per_second
+        self.base_url = ''
+        self.lock = threading.RLock()
+        self._ids = itertools.count(1000)
+        self.products: Dict[str, dict] = {}
+        self.variants: Dict[str, dict] = {}
+        self.items: Dict[str, dict] = {}
+        self.media: Dict[str, dict] = {}
+        self.locations: Dict[str, dict] = {}
+        self.bulk_operations: Dict[str, dict] = {}
+        self.bulk_results: Dict[str, str] = {}
+        self._sku_index: Dict[str, set] = {}
+        self._sorted_skus: Optional[List[str]] = None
+        self.metrics = {'requests': 0, 'throttled': 0, 'errors': 0, 'requested_cost': 0, 'actual_cost': 0}
+        self.add_location("Ana Depo")
+        self.resolvers = {
+            'QueryRoot': {
+                'products': self._q_products, 'product': self._q_node, 'productVariants': self._q_variants,
+                'nodes': self._q_nodes, 'node': self._q_node, 'locations': self._q_locations,
+                'currentBulkOperation': self._q_current_bulk, 'shop': lambda obj, args, ex: {
+                    '__typename': 'Shop', 'name': 'Simulator', 'currencyCode': 'TRY', 'myshopifyDomain': 'simulator.myshopify.com'},
+            },
+            'Mutation': {
+                'productCreate': self._m_product_create, 'productUpdate': self._m_product_update,
+                'productVariantsBulkCreate': self._m_variants_create, 'productVariantsBulkUpdate': self._m_variants_update,
+                'inventoryBulkToggleActivation': self._m_toggle_activation, 'inventorySetQuantities': self._m_set_quantities,
+                'productCreateMedia': self._m_create_media, 'productDeleteMedia': self._m_delete_media,
+                'productReorderMedia': self._m_reorder_media, 'bulkOperationRunQuery': self._m_bulk_run,
+            },
+            'Product': {
+                'variants': lambda obj, args, ex: ex.connection([self.variants[v] for v in obj['_variants']], args),
+                'media': lambda obj, args, ex: ex.connection([self.media[m] for m in obj['_media']], args),
+                'description': lambda obj, args, ex: _TAGS.sub('', obj.get('descriptionHtml') or ''),
+                'totalInventory': lambda obj, args, ex: sum(self._variant_quantity(self.variants[v]) for v in obj['_variants']),
+                'variantsCount': lambda obj, args, ex: {'__typename': 'Count', 'count': len(obj['_variants'])},
+                'featuredMedia': lambda obj, args, ex: self.media[obj['_media'][0]] if obj['_media'] else None,
+            },
+            'ProductVariant': {
+                'product': lambda obj, args, ex: self.products.get(obj['_product']),
+                'inventoryItem': lambda obj, args, ex: self.items[obj['_item']],
+                'inventoryQuantity': lambda obj, args, ex: self._variant_quantity(obj),
+                'title': lambda obj, args, ex: " / ".join(o['value'] for o in obj['selectedOptions']) or "Default Title",
+                'displayName': lambda obj, args, ex: f"{self.products[obj['_product']]['title']} - "
+                                                     f"{' / '.join(o['value'] for o in obj['selectedOptions']) or 'Default Title'}",
+            },
+            'InventoryItem': {
+                'sku': lambda obj, args, ex: self.variants[obj['_variant']]['sku'],
+                'variant': lambda obj, args, ex: self.variants[obj['_variant']],
+                'inventoryLevel': lambda obj, args, ex: self._level(obj, args.get('locationId')),
+                'inventoryLevels': lambda obj, args, ex: ex.connection([self._level(obj, loc) for loc in obj['_levels']], args),
+            },
+            'InventoryLevel': {
+                'quantities': lambda obj, args, ex: [
+                    {'__typename': 'InventoryQuantity', 'name': name,
+                     'quantity': obj['_item']['_levels'].get(obj['_location'], 0) if name in ('available', 'on_hand') else 0}
+                    for name in (args.get('names') or ['available'])],
+                'available': lambda obj, args, ex: obj['_item']['_levels'].get(obj['_location'], 0),
+                'location': lambda obj, args, ex: self.locations[obj['_location']],
+                'item': lambda obj, args, ex: obj['_item'],
+            },
+            'MediaImage': {
+                'status': lambda obj, args, ex: self._media_status(obj),
+                'image': lambda obj, args, ex: obj['_image'] if self._media_status(obj) == 'READY' else None,
+                'preview': lambda obj, args, ex: {'__typename': 'MediaPreviewImage', 'status': self._media_status(obj),
+                                                  'image': obj['_image'] if self._media_status(obj) == 'READY' else None},
+            },
+            'BulkOperation': {
+                'status': lambda obj, args, ex: self._bulk_state(obj)[0],
+                'url': lambda obj, args, ex: self._bulk_state(obj)[1],
+            },
+        }
+
+    # --- Veri kurulumu -------------------------------------------------------------------------
+
+    def _gid(self, kind: str) -> str:
+        return f"gid://shopify/{kind}/{next(self._ids)}"
+
+    def add_location(self, name: str) -> str:
+        gid = self._gid('Location')
+        self.locations[gid] = {'__typename': 'Location', 'id': gid, 'name': name, 'isActive': True,
+                               'address': {'__typename': 'LocationAddress', 'city': 'İstanbul', 'country': 'Türkiye'}}
+        return gid
+
+    @property
+    def default_location(self) -> str:
+        return next(iter(self.locations))
+
+    def add_product(self, title: str, variants: List[dict], description_html: str = '', product_type: str = '',
+                    vendor: str = '', status: str = 'ACTIVE', media_urls: List[str] = (), media_alt: Optional[str] = None) -> str:
+        """
+        Hazır ürün ekler (benchmark öncesi mağazayı doldurmak için). variants öğeleri:
+        {'sku', 'barcode', 'price', 'compareAtPrice', 'options': [{'name', 'value'}], 'quantity'}
+        quantity None ise varyant lokasyonda aktif değildir.
+        """
+        with self.lock:
+            product = self._new_product({'title': title, 'descriptionHtml': description_html, 'productType': product_type,
+                                         'vendor': vendor, 'status': status})
+            for variant in variants:
+                created = self._new_variant(product, variant.get('sku', ''), variant.get('barcode'), variant.get('price', '0.00'),
+                                            variant.get('compareAtPrice'), variant.get('options') or [])
+                if variant.get('quantity') is not None:
+                    self.items[created['_item']]['_levels'][self.default_location] = int(variant['quantity'])
+            for url in media_urls:
+                self._new_media(product, url, media_alt if media_alt is not None else url, ready=True)
+            return product['id']
+
+    def _new_product(self, fields: dict) -> dict:
+        gid = self._gid('Product')
+        title = fields.get('title') or ''
+        product = {'__typename': 'Product', 'id': gid, 'title': title, 'handle': re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-'),
+                   'descriptionHtml': fields.get('descriptionHtml') or '', 'productType': fields.get('productType') or '',
+                   'vendor': fields.get('vendor') or '', 'status': fields.get('status') or 'ACTIVE', 'tags': list(fields.get('tags') or []),
+                   'options': [], 'seo': {'__typename': 'SEO', 'title': None, 'description': None},
+                   'createdAt': '2024-01-01T00:00:00Z', 'updatedAt': '2024-01-01T00:00:00Z', 'onlineStoreUrl': None,
+                   '_variants': [], '_media': []}
+        self.products[gid] = product
+        return product
+
+    def _new_variant(self, product: dict, sku: str, barcode, price, compare_at, options: List[dict], standalone=False) -> dict:
+        gid, item_gid = self._gid('ProductVariant'), self._gid('InventoryItem')
+        variant = {'__typename': 'ProductVariant', 'id': gid, 'sku': sku or '', 'barcode': barcode, 'price': str(price or '0.00'),
+                   'compareAtPrice': None if compare_at is None else str(compare_at),
+                   'selectedOptions': [{'__typename': 'SelectedOption', 'name': o['name'], 'value': o['value']} for o in options],
+                   '_product': product['id'], '_item': item_gid, '_standalone': standalone}
+        self.variants[gid] = variant
+        self.items[item_gid] = {'__typename': 'InventoryItem', 'id': item_gid, 'tracked': True, '_variant': gid, '_levels': {}}
+        product['_variants'].append(gid)
+        self._index_sku(variant['sku'], product['id'])
+        return variant
+
+    def _remove_variant(self, product: dict, gid: str):
+        variant = self.variants.pop(gid)
+        self.items.pop(variant['_item'], None)
+        product['_variants'].remove(gid)
+        self._sku_index.get(variant['sku'].lower(), set()).discard(product['id'])
+
+    def _new_media(self, product: dict, source: str, alt: str, ready=False) -> dict:
+        gid = self._gid('MediaImage')
+        url = f"https://cdn.shopify.com/s/files/simulator/{_numeric_id(gid)}.jpg"
+        media = {'__typename': 'MediaImage', 'id': gid, 'alt': alt, 'mediaContentType': 'IMAGE', 'mediaErrors': [],
+                 '_source': source, '_ready_at': float('-inf') if ready else self.clock() + self.processing_seconds,
+                 '_image': {'__typename': 'Image', 'url': url, 'originalSrc': url, 'src': url, 'altText': alt}}
+        self.media[gid] = media
+        product['_media'].append(gid)
+        return media
+
+    def _index_sku(self, sku: str, product_gid: str):
+        if sku:
+            self._sku_index.setdefault(sku.lower(), set()).add(product_gid)
+            self._sorted_skus = None
+
+    # --- Hesaplanan alanlar ----------------------------------------------------------------------
+
+    def _variant_quantity(self, variant: dict) -> int:
+        return sum(self.items[variant['_item']]['_levels'].values())
+
+    def _level(self, item: dict, location_id: Optional[str]):
+        if location_id not in item['_levels']:
+            return None
+        return {'__typename': 'InventoryLevel', 'id': f"gid://shopify/InventoryLevel/{_numeric_id(item['id'])}?inventory_item_id={_numeric_id(location_id)}",
+                '_item': item, '_location': location_id}
+
+    def _media_status(self, media: dict) -> str:
+        return 'READY' if self.clock() >= media['_ready_at'] else 'PROCESSING'
+
+    def _bulk_state(self, operation: dict):
+        if operation['_ready_at'] > self.clock():
+            return 'RUNNING', None
+        return 'COMPLETED', operation['_url']
+
+    # --- Arama --------------------------------------------------------------------------------------
+
+    def _skus_matching(self, value: str) -> set:
+        if not value.endswith('*'):
+            return set(self._sku_index.get(value, ()))
+        prefix = value[:-1]
+        if self._sorted_skus is None:
+            self._sorted_skus = sorted(self._sku_index)
+        matched = set()
+        for sku in self._sorted_skus[bisect.bisect_left(self._sorted_skus, prefix):]:
+            if not sku.startswith(prefix):
+                break
+            matched |= self._sku_index[sku]
+        return matched
+
+    def _product_matches(self, product: dict, terms: List[tuple]) -> bool:
+        for field, value in terms:
+            if field == 'sku':
+                ok = product['id'] in self._skus_matching(value)
+            elif field == 'barcode':
+                ok = any(_text_match(self.variants[v].get('barcode'), value) for v in product['_variants'])
+            elif field in ('title', None):
+                ok = value.rstrip('*') in product['title'].lower()
+            elif field == 'status':
+                ok = product['status'].lower() == value
+            elif field == 'product_type':
+                ok = _text_match(product['productType'], value)
+            elif field == 'vendor':
+                ok = _text_match(product['vendor'], value)
+            elif field == 'handle':
+                ok = _text_match(product['handle'], value)
+            elif field == 'id':
+                ok = _numeric_id(product['id']) == value
+            else:
+                ok = True
+            if not ok:
+                return False
+        return True
+
+    def search_products(self, query: Optional[str]) -> List[dict]:
+        clauses = _search_clauses(query)
+        if not clauses:
+            return list(self.products.values())
+        # Sadece SKU terimlerinden oluşan aramalar indeksten cevaplanır (fiyat senkronizasyonu ürün başına arama yapar)
+        if all(len(terms) == 1 and terms[0][0] == 'sku' for terms in clauses):
+            gids = set().union(*(self._skus_matching(terms[0][1]) for terms in clauses))
+            return sorted((self.products[g] for g in gids if g in self.products), key=lambda p: int(_numeric_id(p['id'])))
+        return [p for p in self.products.values() if any(self._product_matches(p, terms) for terms in clauses)]
+
+    # --- Sorgu kökleri -------------------------------------------------------------------------------
+
+    def _q_products(self, obj, args, ex):
+        items = self.search_products(args.get('query'))
+        if args.get('reverse'):
+            items.reverse()
+        return ex.connection(items, args)
+
+    def _q_variants(self, obj, args, ex):
+        clauses = _search_clauses(args.get('query'))
+        variants = [v for v in self.variants.values()
+                    if not clauses or any(all(_text_match(v['sku'], value) for field, value in terms if field == 'sku') for terms in clauses)]
+        return ex.connection(variants, args)
+
+    def node(self, gid: str):
+        for table in (self.products, self.variants, self.items, self.media, self.locations, self.bulk_operations):
+            if gid in table:
+                return table[gid]
+        return None
+
+    def _q_node(self, obj, args, ex):
+        return self.node(args.get('id'))
+
+    def _q_nodes(self, obj, args, ex):
+        ids = args.get('ids') or []
+        if len(ids) > MAX_PAGE_SIZE:
+            raise QueryError(f"The ids argument must contain at most {MAX_PAGE_SIZE} ids.")
+        return [self.node(gid) for gid in ids]
+
+    def _q_locations(self, obj, args, ex):
+        items = [loc for loc in self.locations.values() if loc['isActive'] or 'status:active' not in (args.get('query') or '')]
+        return ex.connection(items, args)
+
+    def _q_current_bulk(self, obj, args, ex):
+        return self.bulk_operations[next(reversed(self.bulk_operations))] if self.bulk_operations else None
+
+    # --- Mutation'lar -------------------------------------------------------------------------------------
+
+    @staticmethod
+    def _payload(typename: str, **fields) -> dict:
+        fields.setdefault('userErrors', [])
+        return {'__typename': typename, **fields}
+
+    @staticmethod
+    def _user_error(field, message: str, code: Optional[str] = None) -> dict:
+        return {'__typename': 'UserError', 'field': field, 'message': message, 'code': code}
+
+    def _m_product_create(self, obj, args, ex):
+        fields = args.get('input') or args.get('product') or {}
+        if not (fields.get('title') or '').strip():
+            return self._payload('ProductCreatePayload', product=None, userErrors=[self._user_error(['title'], "Title can't be blank")])
+        product = self._new_product({**fields, 'status': fields.get('status') or 'ACTIVE'})
+        # Shopify seçeneklerin ilk değerleriyle tek bir "standalone" varyant oluşturur
+        options = [{'name': o['name'], 'value': (o.get('values') or [{'name': 'Default Title'}])[0]['name']}
+                   for o in fields.get('productOptions') or []]
+        product['options'] = [{'__typename': 'ProductOption', 'name': o['name'], 'values': [v['name'] for v in o.get('values') or []]}
+                              for o in fields.get('productOptions') or []]
+        self._new_variant(product, '', None, '0.00', None, options, standalone=True)
+        return self._payload('ProductCreatePayload', product=product)
+
+    def _m_product_update(self, obj, args, ex):
+        fields = dict(args.get('input') or args.get('product') or {})
+        product = self.products.get(fields.pop('id', None))
+        if product is None:
+            return self._payload('ProductUpdatePayload', product=None, userErrors=[self._user_error(['id'], "Product does not exist")])
+        for key in ('title', 'descriptionHtml', 'productType', 'vendor', 'status', 'tags', 'handle'):
+            if key in fields:
+                product[key] = fields[key]
+        if 'seo' in fields:
+            product['seo'] = {'__typename': 'SEO', **fields['seo']}
+        return self._payload('ProductUpdatePayload', product=product)
+
+    def _m_variants_create(self, obj, args, ex):
+        product = self.products.get(args.get('productId'))
+        if product is None:
+            return self._payload('ProductVariantsBulkCreatePayload', productVariants=None, product=None,
+                                 userErrors=[self._user_error(['productId'], "Product does not exist")])
+        if args.get('strategy') == 'REMOVE_STANDALONE_VARIANT':
+            for gid in [g for g in product['_variants'] if self.variants[g]['_standalone']]:
+                self._remove_variant(product, gid)
+        created = []
+        for variant in args.get('variants') or []:
+            inventory = variant.get('inventoryItem') or {}
+            options = [{'name': o.get('optionName', ''), 'value': o.get('name', '')} for o in variant.get('optionValues') or []]
+            if not options and variant.get('options'):
+                options = [{'name': f"Option{i + 1}", 'value': value} for i, value in enumerate(variant['options'])]
+            created.append(self._new_variant(product, inventory.get('sku') or variant.get('sku', ''), variant.get('barcode'),
+                                             variant.get('price', '0.00'), variant.get('compareAtPrice'), options))
+        return self._payload('ProductVariantsBulkCreatePayload', productVariants=created, product=product)
+
+    def _m_variants_update(self, obj, args, ex):
+        product = self.products.get(args.get('productId'))
+        if product is None:
+            return self._payload('ProductVariantsBulkUpdatePayload', productVariants=None, product=None,
+                                 userErrors=[self._user_error(['productId'], "Product does not exist", 'PRODUCT_DOES_NOT_EXIST')])
+        inputs = args.get('variants') or []
+        errors = [self._user_error(['variants', str(i), 'id'], "Product variant does not exist", 'PRODUCT_VARIANT_DOES_NOT_EXIST')
+                  for i, v in enumerate(inputs) if v.get('id') not in product['_variants']]
+        if errors:
+            return self._payload('ProductVariantsBulkUpdatePayload', productVariants=None, product=product, userErrors=errors)
+        updated = []
+        for change in inputs:
+            variant = self.variants[change['id']]
+            for key in ('price', 'compareAtPrice', 'barcode'):
+                if key in change:
+                    variant[key] = None if change[key] is None else str(change[key])
+            if sku := (change.get('inventoryItem') or {}).get('sku'):
+                variant['sku'] = sku
+                self._index_sku(sku, product['id'])
+            updated.append(variant)
+        return self._payload('ProductVariantsBulkUpdatePayload', productVariants=updated, product=product)
+
+    def _m_toggle_activation(self, obj, args, ex):
+        item = self.items.get(args.get('inventoryItemId'))
+        if item is None:
+            return self._payload('InventoryBulkToggleActivationPayload', inventoryItem=None, inventoryLevels=None,
+                                 userErrors=[self._user_error(['inventoryItemId'], "The inventory item could not be found.")])
+        errors, levels = [], []
+        for i, update in enumerate(args.get('inventoryItemUpdates') or []):
+            location = update.get('locationId')
+            if location not in self.locations:
+                errors.append(self._user_error(['inventoryItemUpdates', str(i), 'locationId'], "The location could not be found."))
+            elif update.get('activate', True):
+                item['_levels'].setdefault(location, 0)
+                levels.append(self._level(item, location))
+            else:
+                item['_levels'].pop(location, None)
+        return self._payload('InventoryBulkToggleActivationPayload', inventoryItem=item, inventoryLevels=levels, userErrors=errors)
+
+    def _m_set_quantities(self, obj, args, ex):
+        data = args.get('input') or {}
+        quantities = data.get('quantities') or []
+        errors = []
+        if data.get('name') not in ('available', 'on_hand'):
+            errors.append(self._user_error(['input', 'name'], "The quantity name is invalid.", 'INVALID_NAME'))
+        for i, change in enumerate(quantities):
+            item = self.items.get(change.get('inventoryItemId'))
+            if item is None:
+                errors.append(self._user_error(['input', 'quantities', str(i), 'inventoryItemId'],
+                                               "The specified inventory item could not be found.", 'INVALID_INVENTORY_ITEM'))
+            elif change.get('locationId') not in item['_levels']:
+                errors.append(self._user_error(['input', 'quantities', str(i), 'locationId'],
+                                               "The specified inventory item is not stocked at the location.", 'ITEM_NOT_STOCKED_AT_LOCATION'))
+        # Shopify gibi: tek bir hata varsa hiçbir miktar yazılmaz
+        if errors:
+            return self._payload('InventorySetQuantitiesPayload', inventoryAdjustmentGroup=None, userErrors=errors)
+        changes = []
+        for change in quantities:
+            item = self.items[change['inventoryItemId']]
+            before = item['_levels'][change['locationId']]
+            item['_levels'][change['locationId']] = int(change.get('quantity') or 0)
+            changes.append({'__typename': 'InventoryChange', 'name': data['name'], 'delta': item['_levels'][change['locationId']] - before})
+        group = {'__typename': 'InventoryAdjustmentGroup', 'id': self._gid('InventoryAdjustmentGroup'),
+                 'reason': data.get('reason'), 'changes': changes, 'createdAt': '2024-01-01T00:00:00Z'}
+        return self._payload('InventorySetQuantitiesPayload', inventoryAdjustmentGroup=group)
+
+    def _m_create_media(self, obj, args, ex):
+        product = self.products.get(args.get('productId'))
+        if product is None:
+            return self._payload('ProductCreateMediaPayload', media=None, product=None, mediaUserErrors=[
+                self._user_error(['productId'], "Product does not exist")])
+        created = [self._new_media(product, m.get('originalSource', ''), m.get('alt') or '') for m in args.get('media') or []]
+        return self._payload('ProductCreateMediaPayload', media=created, product=product, mediaUserErrors=[])
+
+    def _m_delete_media(self, obj, args, ex):
+        product = self.products.get(args.get('productId'))
+        if product is None:
+            return self._payload('ProductDeleteMediaPayload', deletedMediaIds=None, product=None, mediaUserErrors=[
+                self._user_error(['productId'], "Product does not exist")])
+        deleted = [gid for gid in args.get('mediaIds') or [] if gid in product['_media']]
+        for gid in deleted:
+            product['_media'].remove(gid)
+            self.media.pop(gid, None)
+        return self._payload('ProductDeleteMediaPayload', deletedMediaIds=deleted, deletedProductImageIds=[], product=product, mediaUserErrors=[])
+
+    def _m_reorder_media(self, obj, args, ex):
+        product = self.products.get(args.get('id'))
+        if product is None:
+            return self._payload('ProductReorderMediaPayload', job=None, mediaUserErrors=[], userErrors=[
+                self._user_error(['id'], "Product does not exist")])
+        order = list(product['_media'])
+        for move in args.get('moves') or []:
+            if move.get('id') in order:
+                order.remove(move['id'])
+                order.insert(min(int(move.get('newPosition') or 0), len(order)), move['id'])
+        product['_media'] = order
+        return self._payload('ProductReorderMediaPayload', job={'__typename': 'Job', 'id': self._gid('Job'), 'done': True}, mediaUserErrors=[])
+
+    def _m_bulk_run(self, obj, args, ex):
+        if running := [op for op in self.bulk_operations.values() if self._bulk_state(op)[0] == 'RUNNING']:
+            return self._payload('BulkOperationRunQueryPayload', bulkOperation=None, userErrors=[self._user_error(
+                None, f"A bulk query operation for this app and shop is already in progress: {running[0]['id']}.")])
+        try:
+            document = parse(args.get('query') or '')
+            data = _Executor(self, document, document.operation(), {}, bulk=True).run()
+        except (GraphQLSyntaxError, QueryError) as e:
+            return self._payload('BulkOperationRunQueryPayload', bulkOperation=None, userErrors=[self._user_error(['query'], str(e))])
+        lines = []
+        for value in data.values():
+            for edge in (value or {}).get('edges', []) if isinstance(value, dict) else []:
+                _flatten_bulk(edge['node'], None, lines)
+        gid = self._gid('BulkOperation')
+        self.bulk_results[_numeric_id(gid)] = "".join(json.dumps(line, ensure_ascii=False) + "\n" for line in lines)
+        operation = {'__typename': 'BulkOperation', 'id': gid, 'errorCode': None, 'objectCount': str(len(lines)),
+                     'rootObjectCount': str(sum(1 for line in lines if '__parentId' not in line)),
+                     'fileSize': str(len(self.bulk_results[_numeric_id(gid)])), 'query': args.get('query'),
+                     'createdAt': '2024-01-01T00:00:00Z', 'partialDataUrl': None,
+                     '_ready_at': self.clock() + len(lines) / self.bulk_objects_per_second,
+                     '_url': f"{self.base_url}/bulk/{_numeric_id(gid)}.jsonl" if lines else None}
+        self.bulk_operations[gid] = operation
+        return self._payload('BulkOperationRunQueryPayload', bulkOperation=operation)
+
+    # --- İstek işleme -------------------------------------------------------------------------------
+
+    def execute(self, query: str, variables: Optional[dict] = None, operation_name: Optional[str] = None) -> dict:
+        """Tek bir GraphQL isteğini bütçe kontrolüyle yürütür ve Shopify biçiminde yanıt döndürür."""
+        with self.lock:
+            self.metrics['requests'] += 1
+            try:
+                document = parse(query)
+                operation = document.operation(operation_name)
+                executor = _Executor(self, document, operation, variables or {})
+                requested = int(min(executor.requested_cost(), self.bucket.maximum))
+            except (GraphQLSyntaxError, QueryError) as e:
+                self.metrics['errors'] += 1
+                return {'errors': [{'message': str(e)}]}
+
+            if not self.bucket.try_consume(requested):
+                self.metrics['throttled'] += 1
+                return {'errors': [{'message': 'Throttled', 'extensions': {
+                            'code': 'THROTTLED', 'documentation': 'https://shopify.dev/api/usage/rate-limits'}}],
+                        'extensions': {'cost': {'requestedQueryCost': requested, 'actualQueryCost': None,
+                                                'throttleStatus': self.bucket.status()}}}
+            try:
+                data = executor.run()
+            except QueryError as e:
+                self.bucket.refund(requested)
+                self.metrics['errors'] += 1
+                return {'errors': [e.as_dict()]}
+            actual = min(requested, executor.actual_cost)
+            self.bucket.refund(requested - actual)
+            self.metrics['requested_cost'] += requested
+            self.metrics['actual_cost'] += actual
+            return {'data': data, 'extensions': {'cost': {'requestedQueryCost': requested, 'actualQueryCost': actual,
+                                                          'throttleStatus': self.bucket.status()}}}
+
+
+def _flatten_bulk(node: dict, parent_id: Optional[str], lines: List[dict]):
+    """Bulk operation JSONL biçimi: iç içe bağlantıların düğümleri ayrı satır olur ve __parentId taşır."""
+    record, children = {}, []
+    for key, value in node.items():
+        if isinstance(value, dict) and 'edges' in value:
+            children.append(value)
+        else:
+            record[key] = value
+    if parent_id:
+        record['__parentId'] = parent_id
+    lines.append(record)
+    for connection in children:
+        for edge in connection['edges']:
+            _flatten_bulk(edge['node'], node.get('id'), lines)
+
+
+class _Executor:
+    def __init__(self, store: ShopifyStore, document: Document, operation, variables: dict, bulk: bool = False):
+        self.store = store
+        self.document = document
+        self.operation = operation
+        self.variables = {**{k: resolve_value(v, {}) for k, v in operation.variable_defaults.items()}, **(variables or {})}
+        self.bulk = bulk
+        self.actual_cost = 0
+
+    # Maliyet -----------------------------------------------------------------------------------------
+
+    def _flatten(self, selections, typename=None):
+        """Fragment'ları açar; typename verilmezse tüm tip koşulları dahil edilir (statik maliyet için)."""
+        for selection in selections:
+            if isinstance(selection, Field):
+                yield selection
+                continue
+            fragment = self.document.fragments.get(selection.name) if isinstance(selection, FragmentSpread) else selection
+            if fragment is None:
+                raise QueryError(f"Fragment {selection.name} was not found.")
+            condition = fragment.type_condition
+            if typename is None or condition is None or condition == typename or condition in INTERFACES.get(typename, ()):
+                yield from self._flatten(fragment.selections, typename)
+
+    def _static_cost(self, field: Field) -> int:
+        if not field.selections:
+            return 0
+        args = {k: resolve_value(v, self.variables) for k, v in field.args.items()}
+        children = list(self._flatten(field.selections))
+        if 'first' in args or 'last' in args:
+            size = int(args.get('first') or args.get('last') or 0)
+            node_fields = []
+            for child in children:
+                if child.name == 'edges':
+                    node_fields += [f for edge_child in self._flatten(child.selections) if edge_child.name == 'node'
+                                    for f in self._flatten(edge_child.selections)]
+                elif child.name == 'nodes':
+                    node_fields += list(self._flatten(child.selections))
+            return 2 + size * (1 + sum(self._static_cost(f) for f in node_fields))
+        per_object = 1 + sum(self._static_cost(child) for child in children)
+        return len(args['ids']) * per_object if isinstance(args.get('ids'), list) else per_object
+
+    def requested_cost(self) -> int:
+        fields = list(self._flatten(self.operation.selections))
+        if self.operation.kind == 'mutation':
+            return MUTATION_COST * len(fields)
+        return max(1, sum(self._static_cost(f) for f in fields))
+
+    # Yürütme -------------------------------------------------------------------------------------------
+
+    def run(self) -> dict:
+        if self.operation.kind == 'mutation':
+            root = {'__typename': 'Mutation'}
+            self.actual_cost += MUTATION_COST * len(list(self._flatten(self.operation.selections)))
+            self._counting = False
+        else:
+            root = {'__typename': 'QueryRoot'}
+            self._counting = True
+        return self._select(root, self.operation.selections)
+
+    def _select(self, obj: dict, selections) -> dict:
+        result = {}
+        typename = obj.get('__typename')
+        for field in self._flatten(selections, typename):
+            result[field.key] = self._resolve(obj, typename, field)
+        return result
+
+    def _resolve(self, obj: dict, typename: str, field: Field):
+        if field.name == '__typename':
+            return typename
+        args = {k: resolve_value(v, self.variables) for k, v in field.args.items()}
+        resolver = self.store.resolvers.get(typename, {}).get(field.name)
+        if resolver is not None:
+            value = resolver(obj, args, self)
+        elif field.name in obj and not field.name.startswith('_'):
+            value = obj[field.name]
+        else:
+            raise QueryError(f"Field '{field.name}' doesn't exist on type '{typename}'", 'undefinedField')
+        return self._complete(value, field)
+
+    def _complete(self, value, field: Field):
+        if value is None:
+            return None
+        if isinstance(value, list):
+            return [self._complete(v, field) for v in value]
+        if not field.selections:
+            return value
+        if not isinstance(value, dict):
+            raise QueryError(f"Selections can't be made on scalars (field '{field.name}')", 'selectionMismatch')
+        if self._counting:
+            typename = value.get('__typename')
+            self.actual_cost += 0 if typename in _FREE_TYPES else 2 if typename == 'Connection' else 1
+        return self._select(value, field.selections)
+
+    def connection(self, items: List[Any], args: dict) -> dict:
+        first, last = args.get('first'), args.get('last')
+        if first is None and last is None and not self.bulk:
+            raise QueryError("you must provide one of first or last")
+        for size in (first, last):
+            if size is not None and not 0 <= size <= MAX_PAGE_SIZE:
+                raise QueryError(f"The first or last argument must be between 0 and {MAX_PAGE_SIZE}.")
+        start = _cursor_index(args['after']) + 1 if args.get('after') else 0
+        end = _cursor_index(args['before']) if args.get('before') else len(items)
+        indexes = range(start, min(end, len(items)))
+        if first is not None:
+            indexes = indexes[:first]
+        if last is not None:
+            indexes = indexes[-last:] if last else indexes[:0]
+        edges = [{'__typename': 'Edge', 'cursor': _cursor(i), 'node': items[i]} for i in indexes]
+        return {'__typename': 'Connection', 'edges': edges, 'nodes': [e['node'] for e in edges],
+                'pageInfo': {'__typename': 'PageInfo', 'hasNextPage': bool(indexes) and indexes[-1] + 1 < min(end, len(items)),
+                             'hasPreviousPage': bool(indexes) and indexes[0] > 0,
+                             'startCursor': edges[0]['cursor'] if edges else None,
+                             'endCursor': edges[-1]['cursor'] if edges else None}}
+
+
+class _ShopifyHandler(JSONRequestHandler):
+    def do_POST(self):
+        simulator = self.server.simulator
+        if not re.fullmatch(r'/admin/api/[\w-]+/graphql\.json', urlparse(self.path).path):
+            return self.send_json(404, {'errors': 'Not Found'})
+        if not self.headers.get('X-Shopify-Access-Token'):
+            return self.send_json(401, {'errors': '[API] Invalid API key or access token (unrecognized login or wrong password)'})
+        try:
+            body = json.loads(self.read_body() or b'{}')
+        except ValueError:
+            return self.send_json(400, {'errors': 'Bad Request'})
+        if simulator.latency:
+            time.sleep(simulator.latency)
+        self.send_json(200, simulator.store.execute(body.get('query') or '', body.get('variables'), body.get('operationName')))
+
+    def do_GET(self):
+        simulator = self.server.simulator
+        if match := re.fullmatch(r'/bulk/(\d+)\.jsonl', urlparse(self.path).path):
+            if (content := simulator.store.bulk_results.get(match.group(1))) is not None:
+                return self.send_payload(200, content.encode('utf-8'), 'application/jsonl')
+        self.send_json(404, {'errors': 'Not Found'})
+
+
+class ShopifySimulator:
+    """
+    Arka planda çalışan Shopify simülatörü. ShopifyAPI(simulator.url, "token") ile kullanılır
+    (http:// ile başlayan mağaza adresi olduğu gibi kullanılır).
+    """
+
+    def __init__(self, store: Optional[ShopifyStore] = None, latency: float = 0.0, port: int = 0, **store_options):
+        self.store = store or ShopifyStore(**store_options)
+        self.latency = latency
+        self._server = BackgroundServer(_ShopifyHandler, self, port=port)
+        self.store.base_url = self._server.url
+
+    @property
+    def url(self) -> str:
+        return self._server.url
+
+    def start(self) -> 'ShopifySimulator':
+        self._server.start()
+        return self
+
+    def close(self):
+        self._server.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -2,7 +2,9 @@
 🧹 Duplicate Resim Temizleme Aracı
 
 SEO modunun yanlışlıkla oluşturduğu duplicate resimleri temizler.
-Sadece ALT text'i SEO formatında olan ve duplicate olan resimleri siler.
+İki yöntem vardır:
+- ALT text: Aynı ALT text'e sahip resimler (ürün ürün GraphQL taraması)
+- İçerik hash'i: Senkronizasyonun kaydettiği medya parmak izlerinden bayt bazında aynı resimler (tarama yok)
 
 UYARI: Bu script sadece test modunda çalışır (ilk 20 ürün).
 Tüm ürünler için çalıştırmadan önce test edin!
@@ -12,6 +14,7 @@ import logging
 import time
 import os
 from connectors.shopify_api import ShopifyAPI
+from operations.media_fingerprint import MediaFingerprintStore
 
 # Loglama
 logging.basicConfig(
@@ -141,6 +144,47 @@ def find_and_remove_duplicates(shopify_api, product_gid, product_title, dry_run=
         return {'deleted': 0, 'message': f'Hata: {str(e)}'}
 
 
+def find_and_remove_hash_duplicates(shopify_api, store, dry_run=True, product_gids=None):
+    """
+    Medya parmak izi deposundaki içerik hash'lerine göre bayt bazında aynı olan resimleri bulur ve siler.
+    Her grupta ilk yüklenen resim korunur. Ürün başına tek silme isteği gönderilir.
+
+    Returns:
+        dict: {product_gid: {'duplicates': [...], 'deleted': n}}
+    """
+    duplicates = store.find_duplicates(product_gids)
+    results = {}
+    for product_gid, media_ids in duplicates.items():
+        results[product_gid] = {'duplicates': media_ids, 'deleted': 0}
+        if dry_run:
+            logging.info(f"  🔍 DRY RUN: {product_gid} için {len(media_ids)} aynı içerikli resim silinecekti")
+            continue
+
+        mutation = """
+        mutation deleteMedia($productId: ID!, $mediaIds: [ID!]!) {
+            productDeleteMedia(productId: $productId, mediaIds: $mediaIds) {
+                deletedMediaIds
+                mediaUserErrors {
+                    field
+                    message
+                }
+            }
+        }
+        """
+        try:
+            delete_result = shopify_api.execute_graphql(mutation, {"productId": product_gid, "mediaIds": media_ids})
+            payload = delete_result.get('productDeleteMedia', {}) or {}
+            if errors := payload.get('mediaUserErrors', []):
+                logging.error(f"    ❌ Silme hatası: {product_gid} - {errors}")
+            deleted_ids = payload.get('deletedMediaIds') or []
+            store.forget(deleted_ids)
+            results[product_gid]['deleted'] = len(deleted_ids)
+            logging.info(f"    ✅ {product_gid}: {len(deleted_ids)} aynı içerikli resim silindi")
+        except Exception as e:
+            logging.error(f"Duplicate temizleme hatası ({product_gid}): {e}")
+    return results
+
+
 def main():
     """Ana fonksiyon"""
     print("🧹 Duplicate Resim Temizleme Aracı")
@@ -163,6 +207,9 @@ def main():
     print("   İlk olarak DRY RUN modunda çalışacak (sadece gösterir)")
     print()
     
+    method_input = input("Tespit yöntemi - ALT text (a) / İçerik hash'i (h) [a]: ").strip().lower()
+    use_hash = method_input == 'h'
+
     dry_run_input = input("DRY RUN modunda başlat? (E/h): ").strip().lower()
     dry_run = dry_run_input != 'h'
     
@@ -179,6 +226,20 @@ def main():
     # Config yükle
     try:
         shopify_api = ShopifyAPI(store_url, access_token)
+
+        if use_hash:
+            # Tüm mağaza için kayıtlı parmak izlerinden çalışır, ürün taraması gerekmez
+            results = find_and_remove_hash_duplicates(shopify_api, MediaFingerprintStore(store_url), dry_run=dry_run)
+            found = sum(len(r['duplicates']) for r in results.values())
+            deleted = sum(r['deleted'] for r in results.values())
+            print("=" * 60)
+            print("📊 ÖZET (İçerik hash'i):")
+            print(f"   Duplicate bulunan ürün: {len(results)}")
+            print(f"   Aynı içerikli resim: {found}")
+            if not dry_run:
+                print(f"   Silinen resim: {deleted}")
+            print("=" * 60)
+            return
         
         print("📦 Shopify'dan ürünler yükleniyor...")
         shopify_api.load_all_products_for_cache()
@@ -0,0 +1,272 @@
+# connectors/http_transport.py - Bağlayıcılar için takılabilir HTTP katmanı (kayıt / tekrar oynatma)
+#
+# ShopifyAPI, AsyncShopifyAPI ve SentosAPI istekleri bu katman üzerinden yapar:
+#   - RequestsTransport : varsayılan; doğrudan `requests` çağrılır (davranış değişmez)
+#   - RecordingTransport: gerçek istek/yanıt çiftlerini sırları temizlenmiş halde sıkıştırılmış kasete yazar
+#   - ReplayTransport   : kasetteki yanıtları ağ olmadan, kaydedilen (veya ölçeklenmiş) gecikmeyle döndürür
+# Kaset gzip'li JSON satırlarıdır; istek anahtarı host içermez (yöntem + yol + sıralı query + gövde),
+# böylece bir mağazada kaydedilen kaset başka bir adresle tekrar oynatılabilir.
+#
+# Global kullanım: install(transport) veya ortam değişkenleri
+#   HTTP_CASSETTE=/yol/kaset.jsonl.gz  HTTP_CASSETTE_MODE=record|replay  HTTP_REPLAY_LATENCY_SCALE=0
+
+import base64
+import gzip
+import http.client
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+CASSETTE_VERSION = 1
+# Bu adları taşıyan header/query/gövde alanlarının değeri kasete yazılmaz
+SECRET_KEYS = ('access_token', 'accesstoken', 'x-shopify-access-token', 'authorization', 'cookie', 'set-cookie', 'password',
+               'api_key', 'api_secret', 'apikey', 'secret', 'token', 'signature', 'credential', 'x-goog-signature',
+               'x-goog-credential', 'x-amz-signature', 'x-amz-credential')
+SCRUBBED = '***'
+# Yanıttan saklanan header'lar (diğerleri sunucuya/oturuma özgüdür)
+KEPT_RESPONSE_HEADERS = ('content-type',)
+_OPERATION = re.compile(r'^\s*(query|mutation)\s*(\w*)[^{]*\{\s*(?:\w+\s*:\s*)?(\w+)', re.S)
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """Kasette karşılığı olmayan istek (ağ hatası gibi ele alınır)."""
+
+
+def _is_secret(key) -> bool:
+    key = str(key).lower()
+    return any(secret == key or key.endswith('_' + secret) or key.endswith('-' + secret) for secret in SECRET_KEYS)
+
+
+def scrub(value):
+    """Sözlük/liste içindeki sır alanlarını maskeler."""
+    if isinstance(value, dict):
+        return {k: SCRUBBED if _is_secret(k) else scrub(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [scrub(v) for v in value]
+    return value
+
+
+def _scrub_query(pairs) -> List[tuple]:
+    return sorted((k, SCRUBBED if _is_secret(k) else v) for k, v in pairs)
+
+
+def request_key(method: str, url: str, params=None, json_body=None, data=None) -> str:
+    """Host'tan bağımsız, sırları temizlenmiş istek anahtarı."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if isinstance(params, dict):
+        query += [(k, str(v)) for k, v in params.items() if v is not None]
+    key = f"{method.upper()} {parts.path}"
+    if query:
+        key += "?" + urlencode(_scrub_query(query))
+    if json_body is not None:
+        key += "\n" + json.dumps(scrub(json_body), sort_keys=True, ensure_ascii=False)
+    elif isinstance(data, dict):
+        key += "\n" + urlencode(_scrub_query(data.items()))
+    elif isinstance(data, (bytes, str)) and data:
+        key += "\n" + (data.decode('utf-8', 'replace') if isinstance(data, bytes) else data)
+    return key
+
+
+def loose_key(method: str, url: str, json_body=None) -> str:
+    """Gövdesi birebir tutmayan istekler için yedek anahtar: yol + GraphQL işlem adı (yoksa kök alan)."""
+    key = f"{method.upper()} {urlsplit(url).path}"
+    if isinstance(json_body, dict) and (match := _OPERATION.match(str(json_body.get('query') or ''))):
+        key += "#" + (match.group(2) or match.group(3))
+    return key
+
+
+def _build_response(record: dict, method: str, url: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = record['status']
+    response.reason = http.client.responses.get(record['status'], '')
+    response.headers = CaseInsensitiveDict(record.get('headers') or {})
+    response._content = base64.b64decode(record['content']) if record.get('binary') else (record.get('content') or '').encode('utf-8')
+    response.encoding = 'utf-8'
+    response.url = url
+    response.request = requests.Request(method.upper(), url).prepare()
+    return response
+
+
+class RequestsTransport:
+    """Varsayılan taşıma: `requests` modülünü çağrı anında kullanır (testlerdeki requests.post yamaları da çalışır)."""
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        return getattr(requests, method.lower())(url, **kwargs)
+
+
+class Cassette:
+    """Kayıtlı etkileşimler; dosyaya her kayıtta eklenir (yarıda kalan kayıt da kullanılabilir)."""
+
+    def __init__(self, path: Optional[str] = None, interactions: Optional[List[dict]] = None):
+        self.path = path
+        self.interactions: List[dict] = list(interactions or [])
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> 'Cassette':
+        interactions = []
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    if 'key' in record:
+                        interactions.append(record)
+        return cls(path, interactions)
+
+    def append(self, record: dict):
+        with self._lock:
+            self.interactions.append(record)
+            if self.path:
+                new_file = not os.path.exists(self.path)
+                if new_file and os.path.dirname(self.path):
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with gzip.open(self.path, 'at', encoding='utf-8') as f:
+                    if new_file:
+                        f.write(json.dumps({'version': CASSETTE_VERSION, 'created_at': time.time()}) + "\n")
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class RecordingTransport:
+    """İstekleri iç taşımaya iletir, yanıtları kasete yazar."""
+
+    def __init__(self, cassette: Cassette, inner=None):
+        self.cassette = cassette
+        self.inner = inner or RequestsTransport()
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        started = time.monotonic()
+        response = self.inner.request(method, url, **kwargs)
+        elapsed = time.monotonic() - started
+        content = response.content or b''
+        record = {
+            'key': request_key(method, url, kwargs.get('params'), kwargs.get('json'), kwargs.get('data')),
+            'loose_key': loose_key(method, url, kwargs.get('json')),
+            'status': response.status_code,
+            'headers': {k: v for k, v in response.headers.items() if k.lower() in KEPT_RESPONSE_HEADERS},
+            'elapsed': round(elapsed, 4),
+        }
+        try:
+            text = content.decode('utf-8')
+            if 'json' in record['headers'].get('Content-Type', record['headers'].get('content-type', '')):
+                text = json.dumps(scrub(json.loads(text)), ensure_ascii=False) if text.strip() else text
+            record['content'] = text
+        except (UnicodeDecodeError, ValueError):
+            record['content'], record['binary'] = base64.b64encode(content).decode('ascii'), True
+        self.cassette.append(record)
+        return response
+
+
+class ReplayTransport:
+    """
+    Kasetteki yanıtları döndürür. Aynı anahtarlı istekler kayıt sırasıyla eşleşir; kayıt biterse son yanıt
+    tekrar kullanılır (örn. durum sorgulama döngüleri). Birebir karşılığı olmayan istek, strict değilse aynı
+    yol + GraphQL işlemine ait bir kayıtla yanıtlanır (örn. farklı gruplanmış toplu stok yazmaları).
+    latency_scale: 1 = kaydedilen süre kadar bekler, 0 = beklemez.
+    """
+
+    def __init__(self, cassette: Cassette, latency_scale: float = 0.0, strict: bool = False):
+        self.latency_scale = latency_scale
+        self.strict = strict
+        self._exact: Dict[str, deque] = defaultdict(deque)
+        self._loose: Dict[str, deque] = defaultdict(deque)
+        self._last: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self.stats = {'exact': 0, 'repeated': 0, 'loose': 0, 'missed': 0}
+        for record in cassette.interactions:
+            self._exact[record['key']].append(record)
+            self._loose[record.get('loose_key', '')].append(record)
+
+    def _find(self, key: str, fallback: str) -> Optional[dict]:
+        with self._lock:
+            if self._exact.get(key):
+                self.stats['exact'] += 1
+                record = self._last[key] = self._exact[key].popleft()
+                return record
+            if key in self._last:
+                self.stats['repeated'] += 1
+                return self._last[key]
+            if not self.strict and self._loose.get(fallback):
+                self.stats['loose'] += 1
+                queue = self._loose[fallback]
+                record = queue[0] if len(queue) == 1 else queue.popleft()
+                return record
+            self.stats['missed'] += 1
+            return None
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        key = request_key(method, url, kwargs.get('params'), kwargs.get('json'), kwargs.get('data'))
+        record = self._find(key, loose_key(method, url, kwargs.get('json')))
+        if record is None:
+            raise CassetteMiss(f"Kasette kayıt yok: {key.splitlines()[0]}")
+        if self.latency_scale and record.get('elapsed'):
+            time.sleep(record['elapsed'] * self.latency_scale)
+        return _build_response(record, method, url)
+
+
+_default = RequestsTransport()
+_installed = None
+_env_checked = False
+_install_lock = threading.Lock()
+
+
+def install(transport):
+    """Taşımayı tüm bağlayıcılar için varsayılan yapar (None -> doğrudan requests)."""
+    global _installed, _env_checked
+    with _install_lock:
+        _installed = transport
+        _env_checked = True
+
+
+@contextmanager
+def use_transport(transport):
+    previous = _installed
+    install(transport)
+    try:
+        yield transport
+    finally:
+        install(previous)
+
+
+def transport_from_env():
+    """HTTP_CASSETTE / HTTP_CASSETTE_MODE ortam değişkenlerinden taşıma kurar (tanımlı değilse None)."""
+    path = os.getenv('HTTP_CASSETTE')
+    if not path:
+        return None
+    mode = os.getenv('HTTP_CASSETTE_MODE', 'replay').lower()
+    if mode == 'record':
+        logging.info(f"🎞️ HTTP istekleri kasete kaydediliyor: {path}")
+        return RecordingTransport(Cassette(path))
+    logging.info(f"🎞️ HTTP istekleri kasetten oynatılıyor: {path}")
+    return ReplayTransport(Cassette.load(path), latency_scale=float(os.getenv('HTTP_REPLAY_LATENCY_SCALE', '0')))
+
+
+def installed_transport():
+    """Kurulmuş global taşıma (yoksa None); ilk çağrıda ortam değişkenlerine bakılır."""
+    global _installed, _env_checked
+    if not _env_checked:
+        with _install_lock:
+            if not _env_checked:
+                _installed = transport_from_env()
+                _env_checked = True
+    return _installed
+
+
+def transport_for(api=None):
+    """Nesneye özel taşıma (api.transport), yoksa global taşıma; ikisi de yoksa None."""
+    return getattr(api, 'transport', None) or installed_transport()
+
+
+def client_for(api=None):
+    """İstek yapılacak taşıma: özel/global taşıma veya doğrudan requests."""
+    return transport_for(api) or _default
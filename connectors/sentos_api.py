@@ -8,6 +8,7 @@ import json
 from urllib.parse import urljoin, urlparse
 from requests.auth import HTTPBasicAuth
 import concurrent.futures
+from connectors import http_transport
 
 class SentosAPI:
     """Sentos API ile iletişimi yöneten sınıf."""
@@ -19,6 +20,10 @@ class SentosAPI:
         # Yeniden deneme ayarları
         self.max_retries = 5
         self.base_delay = 15 # saniye cinsinden
+        # İsteğe bağlı aşama zamanlayıcısı (operations.sync_timing.SyncTimer)
+        self.sync_timer = None
+        # İsteğe bağlı HTTP taşıması (connectors.http_transport; kayıt/tekrar oynatma), yoksa global/requests
+        self.transport = None
 
     def _make_request(self, method, endpoint, auth_type='basic', data=None, params=None, is_internal_call=False):
         if is_internal_call:
@@ -41,7 +46,9 @@ class SentosAPI:
 
         for attempt in range(self.max_retries):
             try:
-                response = requests.request(method, url, headers=headers, auth=auth, data=data, params=params, timeout=90)
+                if self.sync_timer:
+                    self.sync_timer.count_request()
+                response = http_transport.client_for(self).request(method, url, headers=headers, auth=auth, data=data, params=params, timeout=90)
                 response.raise_for_status()
                 return response
             except requests.exceptions.HTTPError as e:
@@ -7,6 +7,7 @@ import logging
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any, Union
 from data_models import Order, Product, Customer
+from connectors import http_transport
 
 class ShopifyAPI:
     """Shopify Admin API ile iletişimi yöneten sınıf."""
@@ -25,6 +26,22 @@ class ShopifyAPI:
             'User-Agent': 'Sentos-Sync-Python/Modular-v1.0'
         }
         self.product_cache = {}
+        # İsteğe bağlı harici limiter (acquire/handle_throttle_error/handle_success), örn. process'ler arası paylaşılan bütçe
+        self.rate_limiter = None
+        # İsteğe bağlı toplu stok yazıcı (operations.inventory_batcher.InventoryBatcher)
+        self.inventory_batcher = None
+        # İsteğe bağlı çok ürünlü varyant okuyucu (operations.variant_fetcher.VariantFetcher)
+        self.variant_fetcher = None
+        # İsteğe bağlı ertelenmiş medya sıralama kuyruğu (operations.media_reorder_queue.MediaReorderQueue)
+        self.media_reorder_queue = None
+        # İsteğe bağlı medya kaynak/içerik hash deposu (operations.media_fingerprint.MediaFingerprintStore)
+        self.media_fingerprints = None
+        # Son GraphQL yanıtındaki maliyet bütçesi (extensions.cost.throttleStatus)
+        self.last_throttle_status = None
+        # İsteğe bağlı aşama zamanlayıcısı (operations.sync_timing.SyncTimer); her HTTP isteği sayılır
+        self.sync_timer = None
+        # İsteğe bağlı HTTP taşıması (connectors.http_transport; kayıt/tekrar oynatma), yoksa global/requests
+        self.transport = None
         self.location_id = None
         self.locations_cache = None  # Caching for get_locations
         
@@ -85,10 +102,12 @@ class ShopifyAPI:
             else:
                 url = endpoint if endpoint.startswith('http') else self.graphql_url
             
-            response = requests.request(method, url, headers=req_headers, 
-                                        json=data if isinstance(data, dict) else None, 
-                                        data=data if isinstance(data, bytes) else None,
-                                        files=files, timeout=90)
+            if self.sync_timer:
+                self.sync_timer.count_request()
+            response = http_transport.client_for(self).request(method, url, headers=req_headers, 
+                                                               json=data if isinstance(data, dict) else None,
+                                                               data=data if isinstance(data, bytes) else None,
+                                                               files=files, timeout=90)
             response.raise_for_status()
             if response.content and 'application/json' in response.headers.get('Content-Type', ''):
                 return response.json()
@@ -111,7 +130,11 @@ class ShopifyAPI:
             
         for attempt in range(max_retries):
             try:
-                response = requests.post(self.graphql_url, headers=self.headers, json=payload, timeout=90)
+                if self.rate_limiter:
+                    self.rate_limiter.acquire()
+                if self.sync_timer:
+                    self.sync_timer.count_request()
+                response = http_transport.client_for(self).request('POST', self.graphql_url, headers=self.headers, json=payload, timeout=90)
                 response.raise_for_status()
                 response_data = response.json()
                 
@@ -123,6 +146,8 @@ class ShopifyAPI:
                         err.get('extensions', {}).get('code') == 'THROTTLED' 
                         for err in errors
                     )
+                    if is_throttled and self.rate_limiter:
+                        self.rate_limiter.handle_throttle_error()
                     if is_throttled and attempt < max_retries - 1:
                         # ✅ Daha agresif exponential backoff
                         wait_time = min(retry_delay * (2.5 ** attempt), 30)  # Max 30 saniye
@@ -156,8 +181,14 @@ class ShopifyAPI:
                     
                     raise Exception(f"GraphQL Error: {'; '.join(error_messages)}")
 
+                if throttle_status := response_data.get('extensions', {}).get('cost', {}).get('throttleStatus'):
+                    self.last_throttle_status = throttle_status
+                if self.rate_limiter:
+                    self.rate_limiter.handle_success()
                 return response_data.get("data", {})
             except requests.exceptions.HTTPError as e:
+                if e.response is not None and e.response.status_code == 429 and self.rate_limiter:
+                    self.rate_limiter.handle_throttle_error()
                 if e.response and e.response.status_code == 429 and attempt < max_retries - 1:
                     wait_time = retry_delay * (2 ** attempt)
                     logging.warning(f"HTTP 429 Rate Limit! {wait_time} saniye beklenip tekrar denenecek...")
@@ -931,10 +962,13 @@ class ShopifyAPI:
                 id
                 title
                 description
+                descriptionHtml
+                productType
                 variants(first: 100) {
                   edges {
                     node {
                       sku
+                      barcode
                       selectedOptions {
                         name
                         value
@@ -976,6 +1010,7 @@ class ShopifyAPI:
                         ]
                         variants.append({
                             'sku': sku,
+                            'barcode': variant.get('barcode') or '',
                             'options': options
                         })
                     
@@ -984,6 +1019,8 @@ class ShopifyAPI:
                         'gid': product["id"],
                         'title': product_title,
                         'description': product_description,
+                        'description_html': product.get('descriptionHtml', ''),
+                        'product_type': product.get('productType', ''),
                         'variants': variants
                     }
                     
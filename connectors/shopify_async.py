@@ -4,6 +4,7 @@ import logging
 import time
 from typing import Optional, Dict, Any, List
 from data_models import Product
+from connectors import http_transport
 
 class AsyncShopifyAPI:
     """
@@ -30,6 +31,8 @@ class AsyncShopifyAPI:
         self.refill_rate = 2.0 # tokens per second (approx 1000 cost points / 50 cost per query = 20 qps, being conservative)
         self.last_refill = time.monotonic()
         self.lock = asyncio.Lock()
+        # Optional HTTP transport (connectors.http_transport, record/replay); requests run in a worker thread
+        self.transport = None
 
     async def _wait_for_token(self, cost: int = 1):
         """Asynchronously waits for rate limit tokens."""
@@ -52,7 +55,21 @@ class AsyncShopifyAPI:
         await self._wait_for_token()
         
         payload = {'query': query, 'variables': variables or {}}
-        
+
+        transport = http_transport.transport_for(self)
+        if transport is not None:
+            try:
+                response = await asyncio.to_thread(transport.request, 'POST', self.graphql_url,
+                                                   headers=self.headers, json=payload, timeout=90)
+                response.raise_for_status()
+                data = response.json()
+                if "errors" in data:
+                    raise Exception(f"GraphQL Error: {data['errors']}")
+                return data.get("data", {})
+            except Exception as e:
+                logging.error(f"Async GraphQL Request Failed: {e}")
+                raise e
+
         async with aiohttp.ClientSession() as session:
             try:
                 async with session.post(self.graphql_url, headers=self.headers, json=payload) as response:
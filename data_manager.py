@@ -2,11 +2,32 @@
 
 import streamlit as st
 import os
+import io
 import json
+import struct
+import logging
 from cryptography.fernet import Fernet
 
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:
+    pa = None
+
 DATA_CACHE_DIR = "data_cache" # Veri dosyaları için ayrı bir klasör
 
+# --- Şifreli sütunsal tablo biçimi ---
+# DataFrame'ler JSON yerine satır grupları x sütunlar halinde parçalanır; her parça tek sütunluk bir Arrow IPC
+# akışıdır (zstd sıkıştırmalı) ve ayrı bir Fernet belirteciyle şifrelenir. Dosya sonundaki şifreli dizin parçaların
+# konumlarını tutar; okuyucu sadece istenen sütunların parçalarını çözer, yazıcı yeni satır gruplarını dosyanın
+# sonuna ekleyebilir.
+#   [MAGIC] [parça]... [şifreli dizin] [dizin uzunluğu: 8 bayt] [MAGIC]
+FRAME_MAGIC = b"VGCOLv1\n"
+FRAME_CHUNK_ROWS = 50000
+INDEX_COLUMN = "__index__"
+
 def get_fernet():
     """Streamlit secrets'tan Fernet anahtarını yükler ve bir Fernet nesnesi döndürür."""
     fernet_key = st.secrets.get("FERNET_KEY")
@@ -20,14 +41,194 @@ def _get_user_data_file(username):
         os.makedirs(DATA_CACHE_DIR)
     return os.path.join(DATA_CACHE_DIR, f"data_{username}.enc")
 
+def _get_user_frame_file(username, name):
+    """Kullanıcıya özel tablo dosyasının yolunu döndürür."""
+    if not os.path.exists(DATA_CACHE_DIR):
+        os.makedirs(DATA_CACHE_DIR)
+    safe_name = "".join(ch for ch in str(name) if ch.isalnum() or ch in "-_")
+    return os.path.join(DATA_CACHE_DIR, f"frame_{username}_{safe_name}.encf")
+
+
+def _arrow_column(series):
+    """Tek sütunu Arrow tablosuna çevirir; karışık tipli object sütunlar metin olarak saklanır."""
+    frame = series.to_frame()
+    try:
+        return pa.Table.from_pandas(frame, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+        frame[series.name] = series.map(lambda value: value if value is None or value != value else str(value))
+        return pa.Table.from_pandas(frame, preserve_index=False)
+
+
+class EncryptedFrameWriter:
+    """
+    DataFrame'leri şifreli sütunsal dosyaya yazar. append() her çağrıda yeni satır grupları ekler; close() dizini yazar.
+    Var olan bir dosyayı açarsa (mode='a') yeni gruplar eski dizinin yerine yazılır ve sonuna güncel dizin eklenir.
+    """
+
+    def __init__(self, path, fernet, mode='w', chunk_rows=FRAME_CHUNK_ROWS):
+        if pa is None:
+            raise ImportError("Şifreli sütunsal tablo biçimi için pyarrow gerekli.")
+        self.path = path
+        self.fernet = fernet
+        self.chunk_rows = chunk_rows
+        self.index = {'columns': None, 'row_groups': [], 'rows': 0}
+        if mode == 'a' and os.path.exists(path):
+            self.index, footer_start = _read_frame_index(path, fernet)
+            # Yeni parçalar eski dizinin üzerine yazılır, close() yeni dizini ekler
+            self.file = open(path, 'r+b')
+            self.file.seek(footer_start)
+        else:
+            self.file = open(path, 'wb')
+            self.file.write(FRAME_MAGIC)
+        try:
+            self.options = pa.ipc.IpcWriteOptions(compression='zstd')
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            self.options = pa.ipc.IpcWriteOptions()
+
+    def _write_chunk(self, table):
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema, options=self.options) as writer:
+            writer.write_table(table)
+        token = self.fernet.encrypt(sink.getvalue())
+        offset = self.file.tell()
+        self.file.write(token)
+        return [offset, len(token)]
+
+    def append(self, df):
+        df = df if isinstance(df.index, pd.RangeIndex) else df.reset_index(names=INDEX_COLUMN)
+        df = df.rename(columns=str)
+        columns = list(df.columns)
+        if self.index['columns'] is None:
+            self.index['columns'] = columns
+        elif columns != self.index['columns']:
+            raise ValueError(f"Sütunlar dosyadakiyle uyuşmuyor: {columns} != {self.index['columns']}")
+        for start in range(0, len(df), self.chunk_rows):
+            part = df.iloc[start:start + self.chunk_rows]
+            chunks = {column: self._write_chunk(_arrow_column(part[column])) for column in columns}
+            self.index['row_groups'].append({'rows': len(part), 'chunks': chunks})
+            self.index['rows'] += len(part)
+
+    def close(self):
+        if self.index['columns'] is None:
+            self.index['columns'] = []
+        token = self.fernet.encrypt(json.dumps(self.index).encode('utf-8'))
+        self.file.write(token)
+        self.file.write(struct.pack('<Q', len(token)))
+        self.file.write(FRAME_MAGIC)
+        self.file.truncate()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.file.close()
+
+
+def _read_frame_index(path, fernet):
+    """Dosya sonundaki şifreli dizini ve dizinin başladığı konumu döndürür."""
+    with open(path, 'rb') as file:
+        if file.read(len(FRAME_MAGIC)) != FRAME_MAGIC:
+            raise ValueError(f"Geçersiz tablo dosyası: {path}")
+        file.seek(-(8 + len(FRAME_MAGIC)), os.SEEK_END)
+        footer = file.read()
+        if footer[8:] != FRAME_MAGIC:
+            raise ValueError(f"Geçersiz veya yarım kalmış tablo dosyası: {path}")
+        (length,) = struct.unpack('<Q', footer[:8])
+        footer_start = file.seek(-(8 + len(FRAME_MAGIC) + length), os.SEEK_END)
+        return json.loads(fernet.decrypt(file.read(length))), footer_start
+
+
+def read_encrypted_frame(path, fernet, columns=None):
+    """Şifreli sütunsal dosyayı okur; columns verilirse yalnızca o sütunların parçaları çözülür."""
+    if pa is None:
+        raise ImportError("Şifreli sütunsal tablo biçimi için pyarrow gerekli.")
+    index, _ = _read_frame_index(path, fernet)
+    stored = index['columns']
+    wanted = [column for column in stored if columns is None or column in columns or column == INDEX_COLUMN]
+    missing = set(columns or []) - set(stored)
+    if missing:
+        raise KeyError(f"Tabloda olmayan sütunlar: {sorted(missing)}")
+    tables = {column: [] for column in wanted}
+    with open(path, 'rb') as file:
+        for group in index['row_groups']:
+            for column in wanted:
+                offset, length = group['chunks'][column]
+                file.seek(offset)
+                data = fernet.decrypt(file.read(length))
+                tables[column].append(pa.ipc.open_stream(data).read_all())
+    frames = [pa.concat_tables(parts, promote_options='permissive').to_pandas() if parts else pd.DataFrame({column: []}) for column, parts in tables.items()]
+    df = pd.concat(frames, axis=1) if frames else pd.DataFrame(index=pd.RangeIndex(0))
+    if INDEX_COLUMN in df.columns:
+        df = df.set_index(INDEX_COLUMN)
+        df.index.name = None
+    return df
+
+
+def save_user_frame(username, name, df, fernet=None, append=False):
+    """Kullanıcının tablosunu şifreli sütunsal dosyaya yazar (append=True ise satırları sona ekler)."""
+    if not username or df is None:
+        return False
+    fernet = fernet or get_fernet()
+    file_path = _get_user_frame_file(username, name)
+    try:
+        if append:
+            with EncryptedFrameWriter(file_path, fernet, mode='a') as writer:
+                writer.append(df)
+        else:
+            # Yarım kalan yazım eski dosyayı bozmasın
+            with EncryptedFrameWriter(file_path + '.tmp', fernet) as writer:
+                writer.append(df)
+            os.replace(file_path + '.tmp', file_path)
+        return True
+    except Exception as e:
+        st.error(f"Kullanıcı tablosu '{username}/{name}' kaydedilirken hata: {e}")
+        return False
+
+
+def load_user_frame(username, name, columns=None, fernet=None):
+    """Kullanıcının tablosunu okur; dosya yoksa None. columns ile sadece gereken sütunlar çözülür."""
+    if not username:
+        return None
+    file_path = _get_user_frame_file(username, name)
+    if not os.path.exists(file_path):
+        return None
+    try:
+        return read_encrypted_frame(file_path, fernet or get_fernet(), columns)
+    except Exception as e:
+        st.warning(f"Kullanıcı tablosu '{username}/{name}' yüklenirken bir sorun oluştu: {e}")
+        return None
+
+
 def save_user_data(username, **data):
-    """Belirtilen kullanıcı için verilen sözlüğü şifreleyerek dosyaya kaydeder."""
+    """
+    Belirtilen kullanıcı için verilen sözlüğü şifreleyerek dosyaya kaydeder.
+    DataFrame değerleri JSON'a gömülmez; anahtar adıyla şifreli sütunsal tablo olarak ayrı yazılır (load_user_frame).
+    """
     if not username:
         return False
-    
+
+    try:
+        fernet = get_fernet()
+    except Exception as e:
+        logging.warning(f"⚠️ Kullanıcı verisi '{username}' kaydedilmedi: {e}")
+        return False
+    frames = {key: value for key, value in data.items() if isinstance(value, pd.DataFrame)}
+    data = {key: value for key, value in data.items() if key not in frames}
+    if pa is None:
+        # pyarrow yoksa eski biçim: split JSON
+        data.update({f"{key}_json": df.to_json(orient='split') for key, df in frames.items()})
+        frames = {}
+    for key, df in frames.items():
+        if not save_user_frame(username, key, df, fernet=fernet):
+            return False
+    if frames and not data:
+        return True
+
     file_path = _get_user_data_file(username)
-    fernet = get_fernet()
-    
     try:
         data_to_encrypt = json.dumps(data).encode('utf-8')
         encrypted_data = fernet.encrypt(data_to_encrypt)
@@ -38,26 +239,51 @@ def save_user_data(username, **data):
         st.error(f"Kullanıcı verisi '{username}' kaydedilirken hata: {e}")
         return False
 
+def _migrate_legacy_frames(username, data, fernet):
+    """Eski '<ad>_json' (orient='split') tablolarını sütunsal dosyalara taşır ve JSON'dan çıkarır."""
+    legacy_keys = [key for key, value in data.items() if key.endswith('_df_json') and isinstance(value, str)]
+    if not legacy_keys or pa is None:
+        return data
+    # Taşıma hatası kullanıcı verisini silmemeli: hata olursa .enc dosyası ve veri olduğu gibi kalır
+    migrated = dict(data)
+    try:
+        for key in legacy_keys:
+            try:
+                df = pd.read_json(io.StringIO(migrated[key]), orient='split')
+            except ValueError as e:
+                logging.warning(f"⚠️ '{key}' eski tablo verisi okunamadı: {e}")
+                continue
+            if save_user_frame(username, key[:-len('_json')], df, fernet=fernet):
+                migrated.pop(key)
+        with open(_get_user_data_file(username), "wb") as file:
+            file.write(fernet.encrypt(json.dumps(migrated).encode('utf-8')))
+    except Exception as e:
+        logging.warning(f"⚠️ '{username}' kullanıcısının eski tabloları taşınamadı, bir sonraki yüklemede tekrar denenecek: {e}")
+        return data
+    logging.info(f"✅ '{username}' kullanıcısının {len(legacy_keys)} tablosu sütunsal biçime taşındı.")
+    return migrated
+
 def load_user_data(username):
     """Belirtilen kullanıcının verilerini dosyadan okur ve şifresini çözer."""
     if not username:
         return {}
-        
+
     file_path = _get_user_data_file(username)
     if not os.path.exists(file_path):
         return {}
 
     fernet = get_fernet()
-    
+
     try:
         with open(file_path, "rb") as file:
             encrypted_data = file.read()
         if not encrypted_data: return {}
-            
+
         decrypted_data = fernet.decrypt(encrypted_data)
-        return json.loads(decrypted_data.decode('utf-8'))
+        data = json.loads(decrypted_data.decode('utf-8'))
     except Exception as e:
         st.warning(f"Kullanıcı verisi '{username}' yüklenirken bir sorun oluştu, veri sıfırlanıyor. Hata: {e}")
         if os.path.exists(file_path):
             os.remove(file_path)
-        return {}
\ No newline at end of file
+        return {}
+    return _migrate_legacy_frames(username, data, fernet)
@@ -7,13 +7,15 @@ import json
 # Try-except bloğu ile gerekli tüm bağımlılıkları kontrol et
 try:
     import gspread
-    from gspread_dataframe import set_with_dataframe
     from google.oauth2.service_account import Credentials
     import gspread.exceptions
 except ImportError as e:
     st.error(f"Gerekli Google Sheets bağımlılıkları yüklenemedi. Lütfen 'requirements.txt' dosyanızı kontrol edin ve `pip install -r requirements.txt` komutunu çalıştırın. Hata: {e}")
     st.stop()
     
+from operations.sheets_snapshot import load_sheets_cached
+from operations.sheets_sync import SpreadsheetSync
+
 # --- Sabitler ---
 SPREADSHEET_NAME = "Vervegrand Fiyat Yönetim"
 SHEET_NAMES = {
@@ -65,60 +67,57 @@ def save_pricing_data_to_gsheets(main_df, discount_df, wholesale_df, variants_df
             SHEET_NAMES["variants"]: variants_df
         }
 
-        for sheet_name, df in data_map.items():
-            try:
-                worksheet = spreadsheet.worksheet(sheet_name)
-                st.info(f"'{sheet_name}' sayfası güncelleniyor...")
-            except gspread.exceptions.WorksheetNotFound:
-                st.info(f"'{sheet_name}' sayfası bulunamadı, yeni sayfa oluşturuluyor...")
-                worksheet = spreadsheet.add_worksheet(title=sheet_name, rows="1000", cols="50")
-            
-            worksheet.clear()
-            # DataFrame'i yazarken NaN değerlerini boş string ile değiştir
-            set_with_dataframe(worksheet, df.fillna(""), allow_formulas=False, resize=True)
-            
+        # Sadece değişen hücreler gönderilir (son yazılan değerler data_cache/sheets_state altında tutulur)
+        report = SpreadsheetSync(spreadsheet).save(data_map)
+        for sheet_name, sheet_report in report.items():
+            if sheet_report['requests']:
+                st.info(f"'{sheet_name}' güncellendi: {sheet_report['changed_cells']} hücre, "
+                        f"{sheet_report['appended_rows']} yeni satır, {sheet_report['cleared_rows']} silinen satır.")
+            else:
+                st.info(f"'{sheet_name}' zaten güncel.")
+
         return True, spreadsheet.url
     except Exception as e:
         st.error(f"Google E-Tablolar'a veri kaydedilirken hata oluştu: {e}")
         return False, None
 
 # --- Veri Yükleme Fonksiyonu ---
+def _normalize_pricing_frame(sheet_name, df):
+    """E-tablodan okunan sayfanın tiplerini düzeltir (yerel anlık görüntüye bu haliyle yazılır)."""
+    if df.empty:
+        return df
+    # Veri tipi tutarsızlığını ve Arrow hatasını kalıcı olarak çözmek için
+    # MODEL KODU ve base_sku sütunlarının veri tipini metin (string) olarak zorunlu kılıyoruz.
+    for col in ('MODEL KODU', 'base_sku'):
+        if col in df.columns:
+            df[col] = df[col].astype(str)
+
+    # Sayısal olması gereken sütunları sayısal yap
+    if sheet_name == SHEET_NAMES["main"]:
+        numeric_cols = ['ALIŞ FİYATI', 'SATIS_FIYATI_KDVSIZ', 'NIHAI_SATIS_FIYATI', 'KÂR', 'KÂR ORANI (%)']
+        for col in numeric_cols:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
 def load_pricing_data_from_gsheets():
-    """Google E-Tablosundan 'Ana Fiyat' ve 'Varyantlar' sayfalarını okur ve DataFrame olarak döndürür."""
+    """
+    Google E-Tablosundan 'Ana Fiyat' ve 'Varyantlar' sayfalarını okur ve DataFrame olarak döndürür.
+    E-tablo son yüklemeden beri değişmediyse veriler yerel anlık görüntüden (data_cache/sheets_snapshots) okunur.
+    """
     try:
         client = get_gsheet_client()
         spreadsheet = client.open(SPREADSHEET_NAME)
         
-        ws_main = spreadsheet.worksheet(SHEET_NAMES["main"])
-        ws_variants = spreadsheet.worksheet(SHEET_NAMES["variants"])
-        
-        st.info(f"'{SPREADSHEET_NAME}' e-tablosundan veriler okunuyor...")
-        
-        data_main = ws_main.get_all_records()
-        df_main = pd.DataFrame(data_main) if data_main else pd.DataFrame()
-        
-        data_variants = ws_variants.get_all_records()
-        df_variants = pd.DataFrame(data_variants) if data_variants else pd.DataFrame()
-
-        # --- YENİ EKLENEN KISIM BURASI ---
-        # Veri tipi tutarsızlığını ve Arrow hatasını kalıcı olarak çözmek için
-        # MODEL KODU ve base_sku sütunlarının veri tipini metin (string) olarak zorunlu kılıyoruz.
-        if not df_main.empty and 'MODEL KODU' in df_main.columns:
-            df_main['MODEL KODU'] = df_main['MODEL KODU'].astype(str)
-        
-        if not df_variants.empty and 'MODEL KODU' in df_variants.columns:
-            df_variants['MODEL KODU'] = df_variants['MODEL KODU'].astype(str)
-            if 'base_sku' in df_variants.columns:
-                df_variants['base_sku'] = df_variants['base_sku'].astype(str)
-        # --- YENİ KISIM BİTİŞ ---
-
-        # Sayısal olması gereken sütunları sayısal yap
-        numeric_cols = ['ALIŞ FİYATI', 'SATIS_FIYATI_KDVSIZ', 'NIHAI_SATIS_FIYATI', 'KÂR', 'KÂR ORANI (%)']
-        for col in numeric_cols:
-            if col in df_main.columns:
-                df_main[col] = pd.to_numeric(df_main[col], errors='coerce')
+        frames, source = load_sheets_cached(spreadsheet, [SHEET_NAMES["main"], SHEET_NAMES["variants"]],
+                                            normalize=_normalize_pricing_frame)
+        if source == 'cache':
+            st.info(f"'{SPREADSHEET_NAME}' değişmemiş, veriler yerel kopyadan yüklendi.")
+        else:
+            st.info(f"'{SPREADSHEET_NAME}' e-tablosundan veriler okundu.")
         
-        return df_main, df_variants
+        return frames[SHEET_NAMES["main"]], frames[SHEET_NAMES["variants"]]
         
     except gspread.exceptions.SpreadsheetNotFound:
         st.warning(f"'{SPREADSHEET_NAME}' adında bir Google E-Tablosu bulunamadı.")
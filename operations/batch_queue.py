@@ -0,0 +1,79 @@
+# operations/batch_queue.py - Worker'lar arası istek birleştirme kuyruğu
+
+import logging
+import threading
+import time
+from typing import Any, List
+
+
+class BatchQueue:
+    """
+    Birden çok worker'ın gönderdiği öğeleri toplayıp tek çağrıda işleyen kuyruk (group commit).
+    Gönderen thread, kendi öğelerinin sonucu gelene kadar bekler.
+    flush_fn öğe listesini alır ve aynı sırada sonuç listesi döndürür; hata durumunda
+    tüm öğeler için error_result(exception) kullanılır.
+    """
+
+    def __init__(self, name: str, flush_fn, max_items: int, linger: float, error_result=str):
+        self.name = name
+        self.flush_fn = flush_fn
+        self.error_result = error_result
+        self.max_items = max_items
+        self.linger = linger
+        self.cond = threading.Condition()
+        self._items: List[tuple] = []
+        self._oldest = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"BatchQueue-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, items: List) -> List[Any]:
+        if not items:
+            return []
+        done = threading.Event()
+        results: List[Any] = [None] * len(items)
+        with self.cond:
+            if self._closed:
+                raise RuntimeError(f"{self.name} kuyruğu kapatıldı")
+            for position, item in enumerate(items):
+                self._items.append((item, results, position, done))
+            self._oldest = self._oldest or time.monotonic()
+            self.cond.notify_all()
+        done.wait()
+        return results
+
+    def _take_batch(self) -> List[tuple]:
+        with self.cond:
+            while True:
+                if self._items and (self._closed or len(self._items) >= self.max_items
+                                    or time.monotonic() - self._oldest >= self.linger):
+                    break
+                if self._closed:
+                    return []
+                timeout = self.linger - (time.monotonic() - self._oldest) if self._items else None
+                self.cond.wait(timeout)
+            batch, self._items = self._items[:self.max_items], self._items[self.max_items:]
+            self._oldest = time.monotonic() if self._items else None
+            return batch
+
+    def _run(self):
+        while batch := self._take_batch():
+            try:
+                outcomes = self.flush_fn([entry[0] for entry in batch])
+            except Exception as e:
+                logging.error(f"{self.name} toplu işlem hatası: {e}")
+                outcomes = [self.error_result(e)] * len(batch)
+            for (_item, results, position, _done), outcome in zip(batch, outcomes):
+                results[position] = outcome
+            # Bir gönderenin tüm öğeleri sonuçlandığında uyandırılır
+            with self.cond:
+                pending_owners = {id(entry[1]) for entry in self._items}
+            for _item, results, _position, done in batch:
+                if id(results) not in pending_owners:
+                    done.set()
+
+    def close(self):
+        with self.cond:
+            self._closed = True
+            self.cond.notify_all()
+        self._thread.join()
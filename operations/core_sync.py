@@ -1,82 +1,164 @@
 # operations/core_sync.py (ProductUpdateInput Hatası Düzeltilmiş Sürüm)
 
 import logging
+import re
 import sys
 import os
+from html.parser import HTMLParser
 
 # Proje kök dizinini Python path'ine ekle
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-def sync_details(shopify_api, product_gid, sentos_product):
-    """Ürün başlığı ve açıklamasını doğru input tipiyle günceller."""
-    changes = []
-    
-    try:
-        # ✅ FIX: Shopify 2024-10'da productUpdate mutation ProductInput kullanıyor!
-        # API docs yanlış - gerçek mutation ProductInput bekliyor
-        query = """
-        mutation productUpdate($input: ProductInput!) {
-            productUpdate(input: $input) {
-                product { id }
-                userErrors { field message }
-            }
-        }
-        """
-        
-        input_data = {
-            "id": product_gid, 
-            "title": sentos_product.get('name', '').strip(), 
-            "descriptionHtml": sentos_product.get('description_detail') or sentos_product.get('description', '')
+# ✅ FIX: Shopify 2024-10'da productUpdate mutation ProductInput kullanıyor!
+# API docs yanlış - gerçek mutation ProductInput bekliyor
+PRODUCT_UPDATE_MUTATION = """
+mutation productUpdate($input: ProductInput!) {
+    productUpdate(input: $input) {
+        product { id }
+        userErrors { field message }
+    }
+}
+"""
+
+# Ürün düzeyindeki alanların product_cache anahtarları
+_CACHE_KEYS = {'title': 'title', 'descriptionHtml': 'description_html', 'productType': 'product_type'}
+
+class _CanonicalHtml(HTMLParser):
+    """
+    HTML'i karşılaştırma için tek biçime çevirir: Shopify açıklamayı kaydederken tırnakları, <br>/<br/> yazımını,
+    entity'leri ve boşlukları yeniden düzenler; aynı içerik farklı yazıldığı için güncellenmemeli.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+
+    def _tag(self, tag, attrs):
+        attrs = ''.join(f' {name}="{" ".join((value or "").split())}"' for name, value in sorted(attrs))
+        return f"<{tag}{attrs}>"
+
+    def handle_starttag(self, tag, attrs):
+        self.parts.append(self._tag(tag, attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        self.parts.append(self._tag(tag, attrs))
+
+    def handle_endtag(self, tag):
+        self.parts.append(f"</{tag}>")
+
+    def handle_data(self, data):
+        self.parts.append(data)
+
+def _normalize(value):
+    """Shopify'ın HTML'i yeniden biçimlendirmesi (boşluk, tırnak, <br/>, entity) gereksiz güncellemeye yol açmasın."""
+    text = str(value or '')
+    if '<' in text or '&' in text:
+        parser = _CanonicalHtml()
+        try:
+            parser.feed(text)
+            parser.close()
+            text = ''.join(parser.parts)
+        except Exception:
+            pass
+    text = re.sub(r'\s+', ' ', text)
+    # Etiketler arasındaki boşluk görüntüyü değiştirmez
+    return re.sub(r'\s*(<[^>]*>)\s*', r'\1', text).strip()
+
+def fetch_current_product_fields(shopify_api, product_gids, batch_size=50):
+    """Karşılaştırma için ürünlerin mevcut başlık/açıklama/tip değerlerini tek sorguda toplu okur."""
+    query = """
+    query getProductFields($ids: [ID!]!) {
+        nodes(ids: $ids) {
+            ... on Product { id title descriptionHtml productType }
         }
-        
-        result = shopify_api.execute_graphql(query, {'input': input_data})
-        
-        if errors := result.get('productUpdate', {}).get('userErrors', []):
-            logging.error(f"Ürün detay güncelleme hataları: {errors}")
-            changes.append(f"Hata: {errors[0].get('message', 'Bilinmeyen güncelleme hatası')}")
-        else:
-            changes.append("Başlık ve açıklama güncellendi.")
-            logging.info(f"Ürün {product_gid} için temel detaylar güncellendi.")
-            
-    except Exception as e:
-        error_msg = f"Ürün detay güncelleme sırasında kritik hata: {e}"
-        logging.error(error_msg)
-        changes.append(error_msg)
-    
-    return changes
+    }
+    """
+    current = {}
+    gids = list(product_gids)
+    for i in range(0, len(gids), batch_size):
+        try:
+            result = shopify_api.execute_graphql(query, {'ids': gids[i:i + batch_size]})
+            for node in result.get('nodes', []) or []:
+                if node and node.get('id'):
+                    current[node['id']] = {
+                        'title': node.get('title', ''),
+                        'description_html': node.get('descriptionHtml', ''),
+                        'product_type': node.get('productType', ''),
+                    }
+        except Exception as e:
+            logging.error(f"Mevcut ürün alanları okunurken hata: {e}")
+    return current
 
-def sync_product_type(shopify_api, product_gid, sentos_product):
-    """Ürün kategorisini (productType) doğru input tipiyle günceller."""
+def build_product_update(current, sentos_product, facets=('details', 'type')):
+    """
+    Sentos verisini mevcut Shopify değerleriyle karşılaştırır ve sadece değişen alanları döndürür.
+    current None ise karşılaştırma yapılamaz ve tüm alanlar gönderilir.
+    """
+    desired = {}
+    if 'details' in facets:
+        desired['title'] = sentos_product.get('name', '').strip()
+        desired['descriptionHtml'] = sentos_product.get('description_detail') or sentos_product.get('description', '')
+    if 'type' in facets and (category := sentos_product.get('category')):
+        desired['productType'] = str(category)
+
+    if current is None:
+        return desired
+    return {
+        field: value for field, value in desired.items()
+        if _CACHE_KEYS[field] not in current or _normalize(current.get(_CACHE_KEYS[field])) != _normalize(value)
+    }
+
+def sync_product_fields(shopify_api, product_gid, sentos_product, current=None, facets=('details', 'type'), with_status=False,
+                        on_updated=None):
+    """
+    Başlık, açıklama ve kategoriyi tek bir productUpdate ile günceller.
+    Shopify'daki değerler zaten aynıysa hiç mutation gönderilmez.
+    current değiştirilmez; başarılı güncellemeden sonra on_updated({önbellek anahtarı: yeni değer}) çağrılır.
+    with_status=True ise (değişiklikler, başarılı_mı) döner.
+    """
     changes = []
-    
+    ok = True
+
     try:
-        if category := sentos_product.get('category'):
-            # ✅ FIX: Shopify 2024-10'da productUpdate mutation ProductInput kullanıyor!
-            query = """
-            mutation productUpdate($input: ProductInput!) {
-                productUpdate(input: $input) {
-                    product { id }
-                    userErrors { field message }
-                }
-            }
-            """
-            
-            input_data = {"id": product_gid, "productType": str(category)}
-            
-            result = shopify_api.execute_graphql(query, {'input': input_data})
-            
+        if current is None or not all(key in current for key in _CACHE_KEYS.values()):
+            current = fetch_current_product_fields(shopify_api, [product_gid]).get(product_gid, current)
+
+        update_fields = build_product_update(current, sentos_product, facets)
+        if not update_fields:
+            changes.append("Başlık, açıklama ve kategori kontrol edildi (Değişiklik yok).")
+        else:
+            result = shopify_api.execute_graphql(PRODUCT_UPDATE_MUTATION, {'input': {"id": product_gid, **update_fields}})
+
             if errors := result.get('productUpdate', {}).get('userErrors', []):
-                logging.error(f"Kategori güncelleme hataları: {errors}")
-                changes.append(f"Kategori güncelleme hatası: {errors[0].get('message', 'Bilinmeyen güncelleme hatası')}")
+                logging.error(f"Ürün güncelleme hataları: {errors}")
+                changes.append(f"Hata: {errors[0].get('message', 'Bilinmeyen güncelleme hatası')}")
+                ok = False
             else:
-                changes.append(f"Kategori '{category}' olarak ayarlandı.")
-                logging.info(f"Ürün {product_gid} için kategori '{category}' olarak ayarlandı.")
-                
+                if on_updated:
+                    # Önbelleği çağıran günceller (paylaşılan kayıt iş parçacıkları arasında burada değiştirilmez)
+                    on_updated({_CACHE_KEYS[field]: value for field, value in update_fields.items()})
+                if 'title' in update_fields or 'descriptionHtml' in update_fields:
+                    changes.append("Başlık ve açıklama güncellendi.")
+                if 'productType' in update_fields:
+                    changes.append(f"Kategori '{update_fields['productType']}' olarak ayarlandı.")
+                logging.info(f"Ürün {product_gid} için {len(update_fields)} alan tek mutation ile güncellendi: {', '.join(update_fields)}")
+
     except Exception as e:
-        error_msg = f"Kategori güncelleme sırasında kritik hata: {e}"
+        error_msg = f"Ürün detay güncelleme sırasında kritik hata: {e}"
         logging.error(error_msg)
         changes.append(error_msg)
-    
-    return changes
\ No newline at end of file
+        ok = False
+
+    return (changes, ok) if with_status else changes
+
+def sync_details(shopify_api, product_gid, sentos_product, current=None):
+    """Ürün başlığı ve açıklamasını doğru input tipiyle günceller."""
+    return sync_product_fields(shopify_api, product_gid, sentos_product, current, facets=('details',))
+
+def sync_product_type(shopify_api, product_gid, sentos_product, current=None):
+    """Ürün kategorisini (productType) doğru input tipiyle günceller."""
+    if not sentos_product.get('category'):
+        return []
+    return sync_product_fields(shopify_api, product_gid, sentos_product, current, facets=('type',))
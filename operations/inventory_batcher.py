@@ -0,0 +1,206 @@
+# operations/inventory_batcher.py - Ürünler arası toplu stok yazma ve inventory aktivasyonu
+
+import logging
+import time
+from typing import List, Optional
+
+from operations.batch_queue import BatchQueue
+from operations.sync_timing import bind_phase
+
+# inventorySetQuantities tek çağrıda en fazla 250 miktar kabul eder
+MAX_QUANTITIES_PER_CALL = 250
+# Aktivasyon mutation'ı inventory item başına ayrı çağrıdır; alias'larla tek istekte birleştirilir
+MAX_ACTIVATIONS_PER_CALL = 25
+# Tahmini sorgu maliyetleri (Shopify mutation başına ~10 puan, toplu girdide öğe başına ek ~1 puan)
+MUTATION_COST = 10
+QUANTITY_ITEM_COST = 1
+# Hatalı öğeler çıkarıldıktan sonra kalanların kaç kez daha deneneceği
+QUANTITY_RETRIES = 2
+
+INVENTORY_SET_MUTATION = """
+mutation inventorySetQuantities($input: InventorySetQuantitiesInput!) {
+    inventorySetQuantities(input: $input) {
+        inventoryAdjustmentGroup {
+            id
+            reason
+        }
+        userErrors {
+            field
+            message
+            code
+        }
+    }
+}
+"""
+
+
+def _budget_items(shopify_api, max_items: int, cost_per_item: float, base_cost: float = 0) -> int:
+    """Son yanıttaki throttleStatus'a göre bu istekte gönderilebilecek öğe sayısı."""
+    status = getattr(shopify_api, 'last_throttle_status', None)
+    if not status or not cost_per_item:
+        return max_items
+    available = float(status.get('currentlyAvailable', 0))
+    return max(1, min(max_items, int((available - base_cost) // cost_per_item)))
+
+
+def _wait_for_budget(shopify_api, cost: float):
+    """Bütçe bu isteğe yetmiyorsa geri dolum hızına göre bekler (throttle hatası almamak için)."""
+    status = getattr(shopify_api, 'last_throttle_status', None)
+    if not status:
+        return
+    available = float(status.get('currentlyAvailable', cost))
+    restore_rate = float(status.get('restoreRate', 50)) or 50
+    if available < cost:
+        time.sleep((cost - available) / restore_rate)
+
+
+def _error_index(error: dict) -> Optional[int]:
+    """userErrors.field içindeki liste indeksini döndürür, örn. ['input', 'quantities', '3', 'quantity'] -> 3"""
+    for part in error.get('field') or []:
+        if str(part).isdigit():
+            return int(part)
+    return None
+
+
+def set_quantities(shopify_api, location_id: str, adjustments: List[dict], reason: str = "correction") -> List[Optional[str]]:
+    """
+    Verilen stok miktarlarını inventorySetQuantities çağrılarıyla yazar.
+    Dönüş: adjustments ile aynı sırada, her öğe için hata mesajı veya None.
+    """
+    results: List[Optional[str]] = [None] * len(adjustments)
+    start = 0
+    while start < len(adjustments):
+        size = _budget_items(shopify_api, MAX_QUANTITIES_PER_CALL, cost_per_item=QUANTITY_ITEM_COST, base_cost=MUTATION_COST)
+        indexes = list(range(start, min(start + size, len(adjustments))))
+        start += len(indexes)
+
+        # Hatalı öğeler çıkarılıp kalanlar yeniden denenir (mutation hata varsa hiçbirini uygulamaz)
+        for _attempt in range(1 + QUANTITY_RETRIES):
+            if not indexes:
+                break
+            _wait_for_budget(shopify_api, MUTATION_COST + QUANTITY_ITEM_COST * len(indexes))
+            variables = {
+                "input": {
+                    "reason": reason,
+                    "name": "available",
+                    "ignoreCompareQuantity": True,
+                    "quantities": [{
+                        "inventoryItemId": adjustments[i]["inventoryItemId"],
+                        "locationId": location_id,
+                        "quantity": adjustments[i]["availableQuantity"],
+                    } for i in indexes],
+                }
+            }
+            try:
+                result = shopify_api.execute_graphql(INVENTORY_SET_MUTATION, variables).get('inventorySetQuantities', {}) or {}
+            except Exception as e:
+                logging.error(f"❌ Toplu stok güncelleme hatası ({len(indexes)} varyant): {e}")
+                for i in indexes:
+                    results[i] = str(e)
+                break
+
+            errors = result.get('userErrors', [])
+            if not errors:
+                logging.info(f"✅ {len(indexes)} varyant stoğu tek çağrıda güncellendi")
+                break
+
+            failed = set()
+            for error in errors:
+                position = _error_index(error)
+                if position is None or position >= len(indexes):
+                    # Öğeye bağlanamayan hata: tüm batch başarısız sayılır
+                    failed = set(range(len(indexes)))
+                    for i in indexes:
+                        results[i] = error.get('message', 'Bilinmeyen hata')
+                    break
+                failed.add(position)
+                results[indexes[position]] = error.get('message', 'Bilinmeyen hata')
+            logging.error(f"❌ Stok güncelleme hataları: {errors}")
+
+            if result.get('inventoryAdjustmentGroup'):
+                break
+            indexes = [idx for pos, idx in enumerate(indexes) if pos not in failed]
+        else:
+            # Son denemede de uygulanmayan öğeler yazılmış sayılmamalı
+            for i in indexes:
+                results[i] = results[i] or "Aynı istekteki diğer hatalar nedeniyle stok yazılamadı"
+            if indexes:
+                logging.error(f"❌ {len(indexes)} varyant stoğu {1 + QUANTITY_RETRIES} denemede yazılamadı")
+    return results
+
+
+def activate_items(shopify_api, location_id: str, inventory_item_ids: List[str]) -> List[Optional[str]]:
+    """
+    Inventory item'ları lokasyonda aktive eder. Her item ayrı bir alias olarak tek istekte gönderilir.
+    Dönüş: inventory_item_ids ile aynı sırada, her öğe için hata mesajı veya None.
+    """
+    results: List[Optional[str]] = [None] * len(inventory_item_ids)
+    start = 0
+    while start < len(inventory_item_ids):
+        size = _budget_items(shopify_api, MAX_ACTIVATIONS_PER_CALL, cost_per_item=MUTATION_COST)
+        chunk = list(range(start, min(start + size, len(inventory_item_ids))))
+        start += len(chunk)
+
+        params = ", ".join(f"$item{n}: ID!" for n in range(len(chunk)))
+        fields = "\n".join(
+            f"a{n}: inventoryBulkToggleActivation(inventoryItemId: $item{n}, "
+            f"inventoryItemUpdates: [{{locationId: $locationId, activate: true}}]) {{ userErrors {{ field message }} }}"
+            for n in range(len(chunk))
+        )
+        mutation = f"mutation activateInventory($locationId: ID!, {params}) {{\n{fields}\n}}"
+        variables = {"locationId": location_id, **{f"item{n}": inventory_item_ids[i] for n, i in enumerate(chunk)}}
+
+        _wait_for_budget(shopify_api, MUTATION_COST * len(chunk))
+        try:
+            data = shopify_api.execute_graphql(mutation, variables)
+        except Exception as e:
+            logging.error(f"Inventory aktivasyon hatası ({len(chunk)} varyant): {e}")
+            for i in chunk:
+                results[i] = str(e)
+            continue
+
+        for n, i in enumerate(chunk):
+            if errors := (data.get(f"a{n}") or {}).get('userErrors', []):
+                results[i] = "; ".join(err.get('message', '') for err in errors)
+        if failed := sum(1 for i in chunk if results[i]):
+            logging.error(f"Inventory aktivasyonunda {failed}/{len(chunk)} varyant başarısız oldu")
+        else:
+            logging.info(f"✅ {len(chunk)} varyant inventory aktivasyonu tamamlandı")
+    return results
+
+
+class InventoryBatcher:
+    """
+    Senkronizasyon boyunca tüm worker'ların stok ve aktivasyon yazmalarını toplayan global toplayıcı.
+    ShopifyAPI.inventory_batcher olarak takılır; stock_sync fonksiyonları varsa otomatik kullanır.
+    Her çağrı, kendi varyantlarına ait hataları (aynı sırada) geri alır.
+    """
+
+    def __init__(self, shopify_api, linger: float = 0.25):
+        self.shopify_api = shopify_api
+        self.location_id = shopify_api.get_default_location_id()
+        self._previous = getattr(shopify_api, 'inventory_batcher', None)
+        self.quantities = BatchQueue(
+            "quantities", lambda items: self._flush(set_quantities, items), MAX_QUANTITIES_PER_CALL, linger)
+        self.activations = BatchQueue(
+            "activations", lambda items: self._flush(activate_items, items), MAX_QUANTITIES_PER_CALL, linger)
+        shopify_api.inventory_batcher = self
+
+    def _flush(self, write_fn, items):
+        # Öncelikli şeritler açıksa toplu yazmalar stok şeridinin rate payından harcanır
+        if bind_lane := getattr(self.shopify_api.rate_limiter, 'bind_lane', None):
+            bind_lane('inventory')
+        with bind_phase(self.shopify_api, 'stock'):
+            return write_fn(self.shopify_api, self.location_id, items)
+
+    def set_quantities(self, adjustments: List[dict]) -> List[Optional[str]]:
+        return self.quantities.submit(adjustments)
+
+    def activate(self, inventory_item_ids: List[str]) -> List[Optional[str]]:
+        return self.activations.submit(inventory_item_ids)
+
+    def close(self):
+        """Kuyruktaki her şeyi yazar ve ShopifyAPI'yi önceki durumuna döndürür."""
+        self.activations.close()
+        self.quantities.close()
+        self.shopify_api.inventory_batcher = self._previous
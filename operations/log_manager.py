@@ -74,6 +74,34 @@ class LogManager:
             conn.execute("CREATE INDEX IF NOT EXISTS idx_timestamp ON sync_logs(timestamp)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_log_type ON sync_logs(log_type)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_status ON sync_logs(status)")
+
+            # Aşama bazında süre/istek dökümü (operations.sync_timing)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sync_phase_timings (
+                    log_id INTEGER NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    sync_mode TEXT,
+                    phase TEXT NOT NULL,
+                    wall_seconds REAL DEFAULT 0,
+                    busy_seconds REAL DEFAULT 0,
+                    calls INTEGER DEFAULT 0,
+                    requests INTEGER DEFAULT 0,
+                    PRIMARY KEY (log_id, phase)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sync_latency (
+                    log_id INTEGER PRIMARY KEY,
+                    timestamp TEXT NOT NULL,
+                    sync_mode TEXT,
+                    products INTEGER DEFAULT 0,
+                    p50 REAL DEFAULT 0,
+                    p90 REAL DEFAULT 0,
+                    p99 REAL DEFAULT 0,
+                    max_seconds REAL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_phase_timestamp ON sync_phase_timings(timestamp)")
     
     def log_sync_start(self, sync_mode: str, source: str, user_id: str = None, worker_count: int = 0) -> int:
         """Start a new sync operation log"""
@@ -129,6 +157,50 @@ class LogManager:
                     log_id
                 ))
     
+    def log_sync_timings(self, log_id: int, sync_mode: str, timings: Dict[str, Any]):
+        """Save per-phase timings and product latency percentiles of a sync run"""
+        timestamp = datetime.now().isoformat()
+        latency = timings.get('latency', {})
+        try:
+            with self.lock:
+                with sqlite3.connect(self.db_path) as conn:
+                    conn.executemany("""
+                        INSERT OR REPLACE INTO sync_phase_timings
+                        (log_id, timestamp, sync_mode, phase, wall_seconds, busy_seconds, calls, requests)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """, [
+                        (log_id, timestamp, sync_mode, phase, t.get('wall_seconds', 0), t.get('busy_seconds', 0),
+                         t.get('calls', 0), t.get('requests', 0))
+                        for phase, t in timings.get('phases', {}).items()
+                    ])
+                    conn.execute("""
+                        INSERT OR REPLACE INTO sync_latency (log_id, timestamp, sync_mode, products, p50, p90, p99, max_seconds)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """, (log_id, timestamp, sync_mode, latency.get('products', 0), latency.get('p50', 0),
+                          latency.get('p90', 0), latency.get('p99', 0), latency.get('max', 0)))
+        except sqlite3.Error as e:
+            logging.error(f"Senkronizasyon süre dökümü kaydedilemedi: {e}")
+
+    def get_phase_timings(self, limit_runs: int = 30, sync_mode: str = None) -> List[Dict]:
+        """Get per-phase timings of the last N runs (oldest first)"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            params = []
+            where = ""
+            if sync_mode:
+                where = "WHERE sync_mode = ?"
+                params.append(sync_mode)
+            params.append(limit_runs)
+            cursor = conn.execute(f"""
+                SELECT t.*, l.p50, l.p90, l.p99, l.max_seconds, l.products FROM sync_phase_timings t
+                LEFT JOIN sync_latency l ON l.log_id = t.log_id
+                WHERE t.log_id IN (
+                    SELECT log_id FROM sync_latency {where} ORDER BY timestamp DESC LIMIT ?
+                )
+                ORDER BY t.timestamp, t.phase
+            """, params)
+            return [dict(row) for row in cursor.fetchall()]
+
     def log_error(self, error_message: str, source: str, details: Dict[str, Any] = None):
         """Log an error"""
         entry = LogEntry(
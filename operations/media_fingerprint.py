@@ -0,0 +1,143 @@
+# operations/media_fingerprint.py - Shopify medyaları için kaynak URL ve içerik hash'i deposu
+#
+# Shopify medyanın originalSrc'sini kendi CDN adresiyle değiştirdiği için, bir medyanın hangi Sentos
+# görselinden geldiği Shopify'dan okunamaz. Bu depo yükleme sonuçlarından beslenir:
+#   media_id -> (ürün, kaynak URL, içerik hash'i)
+# Senkronizasyon bu sayede aynı görseli tekrar yüklemez; temizlik araçları da bayt bazında aynı olan
+# kopyaları ürün ürün GraphQL taraması yapmadan bulur.
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+import requests
+
+from connectors import http_transport
+
+DEFAULT_DB_PATH = os.path.join("data_cache", "media_fingerprints.db")
+
+
+def content_hash_for_url(url: str, timeout: float = 30) -> Optional[str]:
+    """Görseli indirip içeriğinin sha256 özetini döndürür; indirilemezse None."""
+    try:
+        response = http_transport.client_for().request('GET', url, timeout=timeout)
+        response.raise_for_status()
+        return hashlib.sha256(response.content).hexdigest()
+    except requests.exceptions.RequestException as e:
+        logging.warning(f"Görsel hash'i hesaplanamadı ({url}): {e}")
+        return None
+
+
+class MediaFingerprintStore:
+    """Mağaza bazında medya kaynak URL'i ve içerik hash'lerini SQLite'ta tutar."""
+
+    def __init__(self, store_url: str, db_path: str = DEFAULT_DB_PATH):
+        self.store = str(store_url or '').replace('https://', '').replace('http://', '').strip().rstrip('/')
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self._ensure_db_exists()
+
+    def _ensure_db_exists(self):
+        if directory := os.path.dirname(self.db_path):
+            os.makedirs(directory, exist_ok=True)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS media_fingerprints (
+                    store TEXT NOT NULL,
+                    media_id TEXT NOT NULL,
+                    product_gid TEXT NOT NULL,
+                    source_url TEXT,
+                    content_hash TEXT,
+                    recorded_at REAL NOT NULL,
+                    PRIMARY KEY (store, media_id)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_media_product ON media_fingerprints(store, product_gid)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_media_hash ON media_fingerprints(store, content_hash)")
+            # Aynı kaynak görselin tekrar tekrar indirilmemesi için URL -> hash önbelleği
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS source_hashes (
+                    source_url TEXT PRIMARY KEY,
+                    content_hash TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+            """)
+
+    def hash_for_url(self, url: str) -> Optional[str]:
+        """Kaynak URL'in içerik hash'i (önbellekte yoksa indirip hesaplar)."""
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute("SELECT content_hash FROM source_hashes WHERE source_url = ?", (url,)).fetchone()
+        if row:
+            return row[0]
+        if content_hash := content_hash_for_url(url):
+            with self.lock, sqlite3.connect(self.db_path) as conn:
+                conn.execute("INSERT OR REPLACE INTO source_hashes (source_url, content_hash, fetched_at) VALUES (?, ?, ?)",
+                             (url, content_hash, time.time()))
+        return content_hash
+
+    def record(self, product_gid: str, media_id: str, source_url: Optional[str], content_hash: Optional[str]):
+        self.record_many(product_gid, [(media_id, source_url, content_hash)])
+
+    def record_many(self, product_gid: str, entries: Iterable[tuple]):
+        """entries: (media_id, source_url, content_hash) demetleri"""
+        now = time.time()
+        rows = [(self.store, media_id, product_gid, url, content_hash, now) for media_id, url, content_hash in entries if media_id]
+        if not rows:
+            return
+        try:
+            with self.lock, sqlite3.connect(self.db_path) as conn:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO media_fingerprints (store, media_id, product_gid, source_url, content_hash, recorded_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, rows)
+        except sqlite3.Error as e:
+            logging.error(f"Medya parmak izleri kaydedilemedi: {e}")
+
+    def media_for_product(self, product_gid: str) -> Dict[str, dict]:
+        """{media_id: {'source_url', 'content_hash'}}"""
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT media_id, source_url, content_hash FROM media_fingerprints WHERE store = ? AND product_gid = ?",
+                (self.store, product_gid)
+            ).fetchall()
+        return {media_id: {'source_url': url, 'content_hash': content_hash} for media_id, url, content_hash in rows}
+
+    def forget(self, media_ids: Iterable[str]):
+        """Silinen medyaları depodan çıkarır."""
+        ids = [(self.store, media_id) for media_id in media_ids]
+        if not ids:
+            return
+        with self.lock, sqlite3.connect(self.db_path) as conn:
+            conn.executemany("DELETE FROM media_fingerprints WHERE store = ? AND media_id = ?", ids)
+
+    def find_duplicates(self, product_gids: Optional[List[str]] = None) -> Dict[str, List[str]]:
+        """
+        Aynı üründe içeriği bayt bazında aynı olan medyaları bulur.
+        Her grupta ilk kaydedilen medya korunur. Dönüş: {product_gid: [silinecek media_id'ler]}
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute("""
+                SELECT product_gid, content_hash, media_id FROM media_fingerprints
+                WHERE store = ? AND content_hash IS NOT NULL AND (product_gid, content_hash) IN (
+                    SELECT product_gid, content_hash FROM media_fingerprints
+                    WHERE store = ? AND content_hash IS NOT NULL
+                    GROUP BY product_gid, content_hash HAVING COUNT(*) > 1
+                )
+                ORDER BY product_gid, content_hash, recorded_at, media_id
+            """, (self.store, self.store)).fetchall()
+
+        wanted = set(product_gids) if product_gids is not None else None
+        duplicates: Dict[str, List[str]] = {}
+        seen = set()
+        for product_gid, content_hash, media_id in rows:
+            if wanted is not None and product_gid not in wanted:
+                continue
+            if (product_gid, content_hash) in seen:
+                duplicates.setdefault(product_gid, []).append(media_id)
+            else:
+                seen.add((product_gid, content_hash))
+        return duplicates
@@ -0,0 +1,230 @@
+# operations/media_reorder_queue.py - Medya hazır olduğunda toplu yeniden sıralama (ertelenmiş kuyruk)
+#
+# Yeni eklenen medyalar Shopify'da bir süre PROCESSING/UPLOADED durumunda kalır ve bu sürede
+# yeniden sıralama güvenilir değildir. Sabit bekleme yerine ürünler kuyruğa alınır, medya durumları
+# geri çekilmeli (backoff) aralıklarla toplu sorgulanır ve hazır olan ürünler tek istekte sıralanır.
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+from operations.sync_timing import bind_phase
+
+# Bu durumlardaki medya henüz işleniyor demektir
+PENDING_MEDIA_STATUSES = ('UPLOADED', 'PROCESSING')
+
+PRODUCTS_PER_POLL = 10
+
+MEDIA_STATUS_QUERY = """
+query getProductsMediaStatus($ids: [ID!]!) {
+    nodes(ids: $ids) {
+        ... on Product {
+            id
+            media(first: 250) {
+                edges { node { id alt status } }
+            }
+        }
+    }
+}
+"""
+
+
+def fetch_media_status(shopify_api, product_gids: List[str]) -> Dict[str, List[dict]]:
+    """Birden çok ürünün medya listesini (id, alt, status) tek sorguda çeker."""
+    data = shopify_api.execute_graphql(MEDIA_STATUS_QUERY, {"ids": product_gids})
+    result = {}
+    for node in data.get("nodes") or []:
+        if node and node.get('id'):
+            result[node['id']] = [e['node'] for e in (node.get('media') or {}).get('edges', []) if e.get('node')]
+    return result
+
+
+def media_ready(media: List[dict]) -> bool:
+    return not any(m.get('status') in PENDING_MEDIA_STATUSES for m in media)
+
+
+def ordered_media_ids(media: List[dict], ordered_urls: List[str], sources: Optional[Dict[str, str]] = None) -> List[str]:
+    """
+    Sentos URL sırasına göre medya ID'leri.
+    sources ({media_id: kaynak URL}, parmak izi deposundan) verilmişse önce o, yoksa URL taşıyan alt etiketi kullanılır.
+    """
+    url_map = {m['alt']: m['id'] for m in media if m.get('alt')}
+    present = {m['id'] for m in media}
+    url_map.update({url: media_id for media_id, url in (sources or {}).items() if media_id in present})
+    ordered = [url_map[url] for url in ordered_urls if url in url_map]
+    if len(ordered) < len(ordered_urls):
+        logging.warning(f"Alt etiketi eşleştirme sorunu: {len(ordered_urls)} resim beklenirken {len(ordered)} ID bulundu. Sıralama eksik olabilir.")
+    return ordered
+
+
+def reorder_many(shopify_api, orders: Dict[str, List[str]]) -> Dict[str, Optional[str]]:
+    """Birden çok ürünün medya sırasını alias'lı tek mutation ile günceller. Dönüş: {gid: hata veya None}"""
+    orders = {gid: ids for gid, ids in orders.items() if len(ids) >= 2}
+    if not orders:
+        return {}
+    gids = list(orders)
+    params = ", ".join(f"$id{n}: ID!, $moves{n}: [MoveInput!]!" for n in range(len(gids)))
+    fields = "\n".join(f"r{n}: productReorderMedia(id: $id{n}, moves: $moves{n}) {{ userErrors {{ field message }} }}"
+                       for n in range(len(gids)))
+    variables = {}
+    for n, gid in enumerate(gids):
+        variables[f"id{n}"] = gid
+        variables[f"moves{n}"] = [{"id": media_id, "newPosition": str(i)} for i, media_id in enumerate(orders[gid])]
+    try:
+        data = shopify_api.execute_graphql(f"mutation reorderMedia({params}) {{\n{fields}\n}}", variables)
+    except Exception as e:
+        logging.error(f"Medya yeniden sıralanırken kritik hata ({len(gids)} ürün): {e}")
+        return {gid: str(e) for gid in gids}
+
+    results = {}
+    for n, gid in enumerate(gids):
+        errors = (data.get(f"r{n}") or {}).get('userErrors', [])
+        results[gid] = "; ".join(err.get('message', '') for err in errors) or None
+        if errors:
+            logging.warning(f"Medya yeniden sıralama hataları ({gid}): {errors}")
+    logging.info(f"✅ {len(gids)} ürün için medya sıralaması gönderildi.")
+    return results
+
+
+def wait_and_reorder(shopify_api, product_gid: str, ordered_urls: List[str], sources: Optional[Dict[str, str]] = None,
+                     initial_delay: float = 1.0, max_delay: float = 15.0, max_wait: float = 120.0):
+    """Kuyruk kullanılmayan (tekil) çağrılar için: medya hazır olana kadar geri çekilmeli bekler ve sıralar."""
+    delay, deadline = initial_delay, time.monotonic() + max_wait
+    while True:
+        time.sleep(delay)
+        media = fetch_media_status(shopify_api, [product_gid]).get(product_gid, [])
+        if media_ready(media) or time.monotonic() >= deadline:
+            if not media_ready(media):
+                logging.warning(f"Ürün {product_gid} medyaları {max_wait:.0f}s içinde hazır olmadı, mevcut haliyle sıralanıyor.")
+            return reorder_many(shopify_api, {product_gid: ordered_media_ids(media, ordered_urls, sources)}).get(product_gid)
+        delay = min(delay * 2, max_delay)
+
+
+class MediaReorderQueue:
+    """
+    Medyası değişen ürünleri sıralama için bekleten arka plan kuyruğu.
+    ShopifyAPI.media_reorder_queue olarak takılır; media_sync.sync_media varsa worker'ı bekletmeden kuyruğa ekler.
+    Hazır olma durumu PRODUCTS_PER_POLL ürünlük toplu sorgularla, ürün başına artan aralıklarla kontrol edilir.
+    """
+
+    def __init__(self, shopify_api, initial_delay: float = 2.0, max_delay: float = 30.0, max_wait: float = 300.0):
+        self.shopify_api = shopify_api
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.max_wait = max_wait
+        self.cond = threading.Condition()
+        self._heap = []  # (next_poll_at, seq, job)
+        self._seq = itertools.count()
+        self._jobs: Dict[str, dict] = {}
+        self._closed = False
+        self.stats = {'reordered': 0, 'timed_out': 0, 'failed': 0}
+        self._previous = getattr(shopify_api, 'media_reorder_queue', None)
+        shopify_api.media_reorder_queue = self
+        self._thread = threading.Thread(target=self._run, name="MediaReorderQueue", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, product_gid: str, ordered_urls: List[str], sources: Optional[Dict[str, str]] = None):
+        now = time.monotonic()
+        with self.cond:
+            # Aynı ürün tekrar gelirse en güncel sıra geçerli olur
+            job = {'gid': product_gid, 'urls': list(ordered_urls), 'sources': dict(sources or {}),
+                   'delay': self.initial_delay, 'deadline': now + self.max_wait}
+            self._jobs[product_gid] = job
+            heapq.heappush(self._heap, (now + self.initial_delay, next(self._seq), job))
+            self.cond.notify_all()
+
+    def pending_count(self) -> int:
+        with self.cond:
+            return len(self._jobs)
+
+    def _take_due(self) -> List[dict]:
+        with self.cond:
+            while True:
+                # Yerini yeni bir iş almış eski kayıtlar atlanır
+                while self._heap and self._jobs.get(self._heap[0][2]['gid']) is not self._heap[0][2]:
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    if self._closed:
+                        return []
+                    self.cond.wait()
+                    continue
+                wait = self._heap[0][0] - time.monotonic()
+                if wait <= 0:
+                    break
+                self.cond.wait(wait)
+            due = []
+            while self._heap and len(due) < PRODUCTS_PER_POLL and self._heap[0][0] <= time.monotonic():
+                _, _, job = heapq.heappop(self._heap)
+                if self._jobs.get(job['gid']) is job:
+                    due.append(job)
+            return due
+
+    def _run(self):
+        while True:
+            due = self._take_due()
+            if not due:
+                return
+            if bind_lane := getattr(self.shopify_api.rate_limiter, 'bind_lane', None):
+                bind_lane('media')
+            try:
+                with bind_phase(self.shopify_api, 'media'):
+                    statuses = fetch_media_status(self.shopify_api, [job['gid'] for job in due])
+            except Exception as e:
+                logging.error(f"Medya durumları alınamadı: {e}")
+                statuses = {}
+
+            now = time.monotonic()
+            ready, retry = {}, []
+            for job in due:
+                media = statuses.get(job['gid'])
+                if media is not None and media_ready(media):
+                    ready[job['gid']] = ordered_media_ids(media, job['urls'], job['sources'])
+                elif now >= job['deadline']:
+                    logging.warning(f"Ürün {job['gid']} medyaları {self.max_wait:.0f}s içinde hazır olmadı, mevcut haliyle sıralanıyor.")
+                    self.stats['timed_out'] += 1
+                    ready[job['gid']] = ordered_media_ids(media or [], job['urls'], job['sources'])
+                else:
+                    retry.append(job)
+
+            with bind_phase(self.shopify_api, 'media'):
+                results = reorder_many(self.shopify_api, ready) if ready else {}
+            due_by_gid = {job['gid']: job for job in due}
+            with self.cond:
+                for gid in ready:
+                    if results.get(gid):
+                        self.stats['failed'] += 1
+                    else:
+                        self.stats['reordered'] += 1
+                    if self._jobs.get(gid) is due_by_gid[gid]:
+                        del self._jobs[gid]
+                for job in retry:
+                    if self._jobs.get(job['gid']) is job:
+                        job['delay'] = min(job['delay'] * 2, self.max_delay)
+                        heapq.heappush(self._heap, (now + job['delay'], next(self._seq), job))
+                self.cond.notify_all()
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Kuyruktaki tüm ürünler sıralanana kadar (veya timeout dolana kadar) bekler."""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self.cond:
+            while self._jobs:
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.cond.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = None):
+        """Bekleyen işleri bitirir (timeout dolarsa kalanlar bırakılır) ve ShopifyAPI'yi eski haline döndürür."""
+        if not self.drain(timeout):
+            logging.warning(f"⚠️ {self.pending_count()} ürünün medya sıralaması tamamlanamadan kuyruk kapatıldı.")
+            with self.cond:
+                self._jobs.clear()
+        with self.cond:
+            self._closed = True
+            self.cond.notify_all()
+        self._thread.join(timeout=5)
+        self.shopify_api.media_reorder_queue = self._previous
@@ -10,12 +10,16 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-def sync_media(shopify_api, sentos_api, product_gid, sentos_product, set_alt_text=False, force_update=False):
+from operations import media_reorder_queue
+
+def sync_media(shopify_api, sentos_api, product_gid, sentos_product, set_alt_text=False, force_update=False, with_status=False):
     """
     ESKİ KODDAN UYARLANMIŞ ÇALIŞAN VERSİYON
-    Eski _sync_product_media fonksiyonunun aynısı
+    Eski _sync_product_media fonksiyonunun aynısı.
+    with_status=True ise (değişiklikler, başarılı_mı) döner; atlanan veya kısmen eklenen medya başarısız sayılır.
     """
     changes = []
+    ok = True
     product_title = sentos_product.get('name', '').strip()
     product_id = sentos_product.get('id')
     
@@ -28,7 +32,7 @@ def sync_media(shopify_api, sentos_api, product_gid, sentos_product, set_alt_tex
     if sentos_ordered_urls is None:
         changes.append("Medya senkronizasyonu atlandı (Cookie eksik).")
         logging.warning(f"Cookie eksikliği nedeniyle medya sync atlandı - Ürün ID: {product_id}")
-        return changes
+        return (changes, False) if with_status else changes
     
     # Mevcut Shopify medyalarını al
     try:
@@ -37,22 +41,49 @@ def sync_media(shopify_api, sentos_api, product_gid, sentos_product, set_alt_tex
     except Exception as e:
         logging.error(f"Shopify medya bilgileri alınamadı: {e}")
         changes.append(f"Hata: Shopify medya bilgileri alınamadı - {e}")
-        return changes
+        return (changes, False) if with_status else changes
+    
+    fingerprints = getattr(shopify_api, 'media_fingerprints', None)
+    known = fingerprints.media_for_product(product_gid) if fingerprints else {}
     
     # Eğer Sentos'tan hiç görsel gelmezse, Shopify'daki tüm görselleri sil
     if not sentos_ordered_urls:
         logging.info("Sentos'tan görsel gelmedi, Shopify görselleri silinecek")
         if media_ids_to_delete := [m['id'] for m in initial_shopify_media]:
             shopify_api.delete_product_media(product_gid, media_ids_to_delete)
+            if fingerprints:
+                fingerprints.forget(media_ids_to_delete)
             changes.append(f"{len(media_ids_to_delete)} Shopify görseli silindi.")
-        return changes
+        return (changes, ok) if with_status else changes
+    
+    # Mevcut Shopify görsellerini kaynak URL'lerine göre haritala. Shopify originalSrc'yi kendi CDN
+    # adresiyle değiştirdiği için önce parmak izi deposuna, sonra URL taşıyan alt etiketine bakılır.
+    sources = {}
+    for m in initial_shopify_media:
+        if source := (known.get(m['id']) or {}).get('source_url'):
+            sources[m['id']] = source
+        elif m.get('alt') in sentos_ordered_urls:
+            sources[m['id']] = m['alt']
+        elif m.get('originalSrc'):
+            sources[m['id']] = m['originalSrc']
+    present_urls = set(sources.values())
+    urls_to_add = [url for url in sentos_ordered_urls if url not in present_urls]
     
-    # Mevcut Shopify görsellerini URL'lere göre haritala
-    shopify_src_map = {m['originalSrc']: m for m in initial_shopify_media if m.get('originalSrc')}
+    # Shopify'da içeriği bayt bazında aynı olan görsel zaten varsa tekrar yüklenmez
+    url_hashes = {}
+    if fingerprints and urls_to_add:
+        present_hashes = {info['content_hash']: media_id for media_id, info in known.items()
+                          if info.get('content_hash') and media_id in sources and sources[media_id] not in sentos_ordered_urls}
+        for url in list(urls_to_add):
+            url_hashes[url] = fingerprints.hash_for_url(url)
+            if (media_id := present_hashes.pop(url_hashes[url], None)) is not None:
+                sources[media_id] = url
+                fingerprints.record(product_gid, media_id, url, url_hashes[url])
+                urls_to_add.remove(url)
+                logging.info(f"Görsel Shopify'da zaten mevcut (aynı içerik), yeniden yüklenmedi: {url}")
     
-    # Hangi görsellerin silinmesi ve eklenmesi gerektiğini hesapla
-    media_ids_to_delete = [media['id'] for src, media in shopify_src_map.items() if src not in sentos_ordered_urls]
-    urls_to_add = [url for url in sentos_ordered_urls if url not in shopify_src_map]
+    # Hangi görsellerin silinmesi gerektiğini hesapla
+    media_ids_to_delete = [media_id for media_id, source in sources.items() if source not in sentos_ordered_urls]
     
     logging.info(f"Medya karşılaştırması: {len(urls_to_add)} eklenecek, {len(media_ids_to_delete)} silinecek")
     
@@ -61,42 +92,54 @@ def sync_media(shopify_api, sentos_api, product_gid, sentos_product, set_alt_tex
     # Yeni görseller ekle
     if urls_to_add:
         changes.append(f"{len(urls_to_add)} yeni görsel eklendi.")
-        _add_new_media_to_product(shopify_api, product_gid, urls_to_add, product_title, set_alt_text)
+        created = _add_new_media_to_product(shopify_api, product_gid, urls_to_add, product_title, set_alt_text)
+        for url, media_id in created:
+            sources[media_id] = url
+        if len(created) < len(urls_to_add):
+            changes.append(f"{len(urls_to_add) - len(created)} görsel eklenemedi.")
+            ok = False
+        if fingerprints and created:
+            fingerprints.record_many(product_gid, [
+                (media_id, url, url_hashes.get(url) or fingerprints.hash_for_url(url)) for url, media_id in created
+            ])
         media_changed = True
         
     # Eski görselleri sil
     if media_ids_to_delete:
         changes.append(f"{len(media_ids_to_delete)} eski görsel silindi.")
         shopify_api.delete_product_media(product_gid, media_ids_to_delete)
+        if fingerprints:
+            fingerprints.forget(media_ids_to_delete)
+        for media_id in media_ids_to_delete:
+            sources.pop(media_id, None)
         media_changed = True
         
-    # Görsel sıralamasını güncelle (eski mantık)
+    # Görsel sıralamasını güncelle: yeni medyalar işlenip hazır olduktan sonra
     if media_changed:
-        changes.append("Görsel sırası güncellendi.")
-        time.sleep(10)  # Medyanın işlenmesi için bekle
-        
-        # Yeniden düzenlenmiş medya listesini al
-        final_shopify_media = shopify_api.get_product_media_details(product_gid)
-        final_alt_map = {m['alt']: m['id'] for m in final_shopify_media if m.get('alt')}
-        ordered_media_ids = [final_alt_map.get(url) for url in sentos_ordered_urls if final_alt_map.get(url)]
-
-        if len(ordered_media_ids) < len(sentos_ordered_urls):
-            logging.warning(f"Alt etiketi eşleştirme sorunu: {len(sentos_ordered_urls)} resim beklenirken {len(ordered_media_ids)} ID bulundu. Sıralama eksik olabilir.")
-
-        shopify_api.reorder_product_media(product_gid, ordered_media_ids)
+        if reorder_queue := getattr(shopify_api, 'media_reorder_queue', None):
+            # Worker bekletilmez; sıralama medya READY olduğunda arka planda toplu yapılır
+            reorder_queue.enqueue(product_gid, sentos_ordered_urls, sources)
+            changes.append("Görsel sırası, medya işlendikten sonra güncellenmek üzere sıraya alındı.")
+        else:
+            media_reorder_queue.wait_and_reorder(shopify_api, product_gid, sentos_ordered_urls, sources)
+            changes.append("Görsel sırası güncellendi.")
     
     # Hiç değişiklik olmadıysa
     if not changes and not media_changed:
         changes.append("Resimler kontrol edildi (Değişiklik yok).")
         
     logging.info(f"Medya senkronizasyonu tamamlandı - {len(changes)} değişiklik")
-    return changes
+    return (changes, ok) if with_status else changes
 
 
 def _add_new_media_to_product(shopify_api, product_gid, urls_to_add, product_title, set_alt_text=False):
-    """10-worker için optimize edilmiş medya ekleme"""
+    """
+    10-worker için optimize edilmiş medya ekleme.
+    Dönüş: başarıyla oluşturulan medyalar için (kaynak URL, media_id) listesi
+    """
+    created = []
     if not urls_to_add: 
-        return
+        return created
         
     logging.info(f"{len(urls_to_add)} yeni medya ekleniyor...")
     
@@ -128,6 +171,9 @@ def _add_new_media_to_product(shopify_api, product_gid, urls_to_add, product_tit
                 logging.error(f"Medya batch {i//batch_size + 1} ekleme hataları: {errors}")
             else:
                 logging.info(f"✅ Batch {i//batch_size + 1}: {len(batch)} medya başarıyla eklendi")
+                # Shopify oluşturulan medyaları girdi sırasıyla döndürür
+                media = result.get('productCreateMedia', {}).get('media') or []
+                created.extend((item['originalSource'], m['id']) for item, m in zip(batch, media) if m and m.get('id'))
             
             # 10-worker için batch arası kısa bekleme    
             if i + batch_size < len(media_input):
@@ -135,6 +181,7 @@ def _add_new_media_to_product(shopify_api, product_gid, urls_to_add, product_tit
                 
         except Exception as e:
             logging.error(f"Medya batch {i//batch_size + 1} eklenirken hata: {e}")
+    return created
 
 
 # ShopifyAPI sınıfına eksik fonksiyonları ekle
@@ -0,0 +1,207 @@
+# operations/price_snapshot.py - Fiyat yazmalarından önceki fiyatların anlık görüntüsü ve toplu geri alma
+#
+# Her fiyat çalışması (Fiyat Hesaplayıcı toplu güncelleme, koleksiyon kampanyası) yazmaya başlamadan önce
+# değişecek varyantların eski fiyat / karşılaştırma fiyatını kaydeder. Veri sütun bazında (ürün listesi +
+# varyant başına ürün sırası, varyant ID'leri, fiyat metinleri) sıkıştırılmış tek bir blob olarak SQLite'ta tutulur.
+# Geri alma, görüntüyü ürün bazında gruplayıp aynı toplu yazma yolundan (productVariantsBulkUpdate) gönderir.
+#
+# Komut satırı (SHOPIFY_STORE / SHOPIFY_TOKEN ortam değişkenleri):
+#   python -m operations.price_snapshot list
+#   python -m operations.price_snapshot rollback <run_id>
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_DB_PATH = os.path.join("data_cache", "price_snapshots.db")
+# Shopify GID önekleri blob'a bir kez yazılır (tüm ID'ler aynı öneki taşıyorsa)
+PRODUCT_PREFIX = "gid://shopify/Product/"
+VARIANT_PREFIX = "gid://shopify/ProductVariant/"
+
+
+def _common_prefix(values: List[str], prefix: str) -> str:
+    return prefix if values and all(value.startswith(prefix) for value in values) else ''
+
+
+def encode_snapshot(rows: Iterable[dict]) -> bytes:
+    """product_id, variant_id, price, compare_at_price alanlı satırları sütun bazında sıkıştırır."""
+    rows = list(rows)
+    product_ids = [str(row['product_id']) for row in rows]
+    variant_ids = [str(row['variant_id']) for row in rows]
+    product_prefix = _common_prefix(product_ids, PRODUCT_PREFIX)
+    variant_prefix = _common_prefix(variant_ids, VARIANT_PREFIX)
+
+    products: List[str] = []
+    product_index: Dict[str, int] = {}
+    product_column = []
+    for product_id in product_ids:
+        if product_id not in product_index:
+            product_index[product_id] = len(products)
+            products.append(product_id[len(product_prefix):])
+        product_column.append(product_index[product_id])
+    payload = {
+        'product_prefix': product_prefix,
+        'variant_prefix': variant_prefix,
+        'products': products,
+        'product': product_column,
+        'variant': [variant_id[len(variant_prefix):] for variant_id in variant_ids],
+        'price': [None if row.get('price') is None else str(row['price']) for row in rows],
+        'compare': [None if row.get('compare_at_price') in (None, '') else str(row['compare_at_price']) for row in rows],
+    }
+    return zlib.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8'), 9)
+
+
+def decode_snapshot(blob: bytes) -> List[dict]:
+    payload = json.loads(zlib.decompress(blob).decode('utf-8'))
+    products = [payload['product_prefix'] + product_id for product_id in payload['products']]
+    variant_prefix = payload['variant_prefix']
+    return [{'product_id': products[p], 'variant_id': variant_prefix + v, 'price': price, 'compare_at_price': compare}
+            for p, v, price, compare in zip(payload['product'], payload['variant'], payload['price'], payload['compare'])]
+
+
+class PriceSnapshotStore:
+    """Mağaza bazında fiyat anlık görüntülerini SQLite'ta saklar."""
+
+    def __init__(self, store_url: str, db_path: str = DEFAULT_DB_PATH):
+        self.store = str(store_url or '').strip().replace('https://', '').replace('http://', '').rstrip('/')
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self._ensure_db_exists()
+
+    def _ensure_db_exists(self):
+        if directory := os.path.dirname(self.db_path):
+            os.makedirs(directory, exist_ok=True)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS price_snapshots (
+                    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    store TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    source TEXT NOT NULL,
+                    description TEXT,
+                    variant_count INTEGER NOT NULL,
+                    product_count INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    updated INTEGER,
+                    failed INTEGER,
+                    metadata TEXT,
+                    payload BLOB NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_price_snapshots_store ON price_snapshots (store, created_at)")
+
+    def save(self, rows: Iterable[dict], source: str, description: str = '', metadata: Optional[dict] = None) -> Optional[int]:
+        """Yazmadan önceki fiyatları kaydeder; run_id döndürür (hata olursa None, çalışma durdurulmaz)."""
+        rows = list(rows)
+        try:
+            blob = encode_snapshot(rows)
+            with self.lock, sqlite3.connect(self.db_path) as conn:
+                cursor = conn.execute("""
+                    INSERT INTO price_snapshots (store, created_at, source, description, variant_count, product_count,
+                                                 status, metadata, payload)
+                    VALUES (?, ?, ?, ?, ?, ?, 'running', ?, ?)
+                """, (self.store, time.time(), source, description, len(rows), len({r['product_id'] for r in rows}),
+                      json.dumps(metadata or {}, ensure_ascii=False), blob))
+                run_id = cursor.lastrowid
+            logging.info(f"💾 Fiyat anlık görüntüsü kaydedildi: #{run_id} ({len(rows)} varyant, {len(blob)} bayt)")
+            return run_id
+        except (sqlite3.Error, KeyError, TypeError) as e:
+            logging.error(f"Fiyat anlık görüntüsü kaydedilemedi: {e}")
+            return None
+
+    def _set_status(self, run_id: int, status: str, updated=None, failed=None):
+        try:
+            with self.lock, sqlite3.connect(self.db_path) as conn:
+                conn.execute("UPDATE price_snapshots SET status = ?, updated = COALESCE(?, updated), failed = COALESCE(?, failed) "
+                             "WHERE run_id = ? AND store = ?", (status, updated, failed, run_id, self.store))
+        except sqlite3.Error as e:
+            logging.error(f"Fiyat anlık görüntüsü durumu güncellenemedi (#{run_id}): {e}")
+
+    def mark_finished(self, run_id: int, updated: int, failed: int):
+        self._set_status(run_id, 'completed' if not failed else 'partial', updated, failed)
+
+    def list_runs(self, limit: int = 20) -> List[dict]:
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute("""
+                SELECT run_id, created_at, source, description, variant_count, product_count, status, updated, failed, metadata
+                FROM price_snapshots WHERE store = ? ORDER BY run_id DESC LIMIT ?
+            """, (self.store, limit)).fetchall()
+        return [{**dict(row), 'metadata': json.loads(row['metadata'] or '{}')} for row in rows]
+
+    def load(self, run_id: int) -> List[dict]:
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute("SELECT payload FROM price_snapshots WHERE run_id = ? AND store = ?",
+                               (run_id, self.store)).fetchone()
+        if row is None:
+            raise KeyError(f"Fiyat anlık görüntüsü bulunamadı: #{run_id}")
+        return decode_snapshot(row[0])
+
+    def rollback(self, shopify_api, run_id: int, max_workers: Optional[int] = None, progress_callback=None,
+                 stop_event=None) -> dict:
+        """
+        Görüntüdeki eski fiyatları toplu yazma yolundan geri yükler. Karşılaştırma fiyatı olmayan varyantlarda
+        compareAtPrice temizlenir. Geri almanın kendisi de geri alınabilsin diye önce mevcut fiyatlar kaydedilmez;
+        Shopify'daki son durum yeni bir fiyat çalışmasıyla zaten görüntülenir.
+        """
+        from operations.price_sync import COLLECTION_UPDATE_WORKERS, dispatch_price_updates
+
+        rows = self.load(run_id)
+        updates_by_product: Dict[str, List[dict]] = {}
+        for row in rows:
+            if row['price'] is None:
+                continue
+            updates_by_product.setdefault(row['product_id'], []).append(
+                {'id': row['variant_id'], 'price': row['price'], 'compareAtPrice': row['compare_at_price']})
+        logging.info(f"↩️ Fiyat geri alma #{run_id}: {len(rows)} varyant, {len(updates_by_product)} ürün")
+        outcome = dispatch_price_updates(shopify_api, updates_by_product, max_workers=max_workers or COLLECTION_UPDATE_WORKERS,
+                                         progress_callback=progress_callback, stop_event=stop_event, progress_start=0)
+        self._set_status(run_id, 'rolled_back' if not outcome['failed'] else 'rollback_partial')
+        return {'status': 'success' if not outcome['failed'] else 'partial', 'run_id': run_id,
+                'variants': len(rows), 'products': len(updates_by_product), **outcome}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fiyat anlık görüntüleri: listeleme ve geri alma")
+    sub = parser.add_subparsers(dest='command', required=True)
+    list_parser = sub.add_parser('list')
+    list_parser.add_argument('--limit', type=int, default=20)
+    rollback_parser = sub.add_parser('rollback')
+    rollback_parser.add_argument('run_id', type=int)
+    rollback_parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--store', default=os.getenv("SHOPIFY_STORE"))
+    parser.add_argument('--db', default=DEFAULT_DB_PATH)
+    args = parser.parse_args(argv)
+    if not args.store:
+        parser.error("Mağaza adresi gerekli (--store veya SHOPIFY_STORE)")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    store = PriceSnapshotStore(args.store, db_path=args.db)
+    if args.command == 'list':
+        for run in store.list_runs(args.limit):
+            created = time.strftime('%Y-%m-%d %H:%M', time.localtime(run['created_at']))
+            print(f"#{run['run_id']:<5} {created}  {run['source']:<12} {run['status']:<16} "
+                  f"{run['variant_count']:>6} varyant  {run['description'] or ''}")
+        return 0
+
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+    from connectors.shopify_api import ShopifyAPI
+    token = os.getenv("SHOPIFY_TOKEN")
+    if not token:
+        parser.error("SHOPIFY_TOKEN ortam değişkeni gerekli")
+    result = store.rollback(ShopifyAPI(args.store, token), args.run_id, max_workers=args.workers)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0 if result['status'] == 'success' else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
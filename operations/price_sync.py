@@ -1,5 +1,6 @@
 # operations/price_sync.py - 10 Worker Optimize Edilmiş Sürüm
 
+import numpy as np
 import pandas as pd
 import logging
 import requests
@@ -7,6 +8,7 @@ import time
 import random
 import threading
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import sys
 import os
 
@@ -15,6 +17,8 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+from operations import pricing_rules
+
 class SmartRateLimiter:
     """10 worker için optimize edilmiş akıllı rate limiter"""
     def __init__(self, max_requests_per_second=2.5, burst_capacity=15):
@@ -72,6 +76,163 @@ class SmartRateLimiter:
             if self.throttle_count == 0:
                 self.max_rate = min(2.5, self.max_rate * 1.05)
 
+# Fiyat farkı eşiği: bundan küçük farklar değişiklik sayılmaz
+PRICE_DIFF_TOLERANCE = 0.01
+
+
+def build_target_prices(price_data_df, price_col, compare_col=None):
+    """
+    Fiyat tablosundan temel SKU -> hedef fiyat tablosu (sku, price, compare) üretir.
+    Fiyatı (veya verilmişse karşılaştırma fiyatı) sayıya çevrilemeyen satırlar atlanır; aynı SKU'da son satır geçerlidir.
+    """
+    sku = price_data_df['MODEL KODU'].astype(str).str.strip()
+    price = pd.to_numeric(price_data_df[price_col], errors='coerce')
+    valid = price.notna()
+    if compare_col and compare_col in price_data_df.columns:
+        raw_compare = price_data_df[compare_col]
+        compare = pd.to_numeric(raw_compare, errors='coerce')
+        valid &= raw_compare.isna() | compare.notna()
+    else:
+        compare = pd.Series(np.nan, index=price_data_df.index)
+    targets = pd.DataFrame({'sku': sku, 'price': price.astype(float), 'compare': compare.astype(float)})[valid]
+    return targets.drop_duplicates('sku', keep='last').set_index('sku')
+
+
+def compute_price_updates(current_shopify_data, price_data_df, variants_df, price_col, compare_col=None,
+                          tolerance=PRICE_DIFF_TOLERANCE):
+    """
+    Shopify'daki mevcut fiyatları (get_all_products_prices çıktısı) hedef fiyatlarla karşılaştırır.
+    Varyant SKU -> temel SKU (variants_df'teki base_sku) -> hedef fiyat eşleşmesi ve değişiklik tespiti
+    pandas/NumPy ile toplu yapılır; varyant tablosunda olmayan SKU doğrudan temel SKU olarak aranır.
+    Dönüş: (product_id -> productVariantsBulkUpdate varyant listesi, istatistikler)
+    """
+    targets = build_target_prices(price_data_df, price_col, compare_col)
+
+    variant_skus = variants_df['MODEL KODU'].astype(str).str.strip() if variants_df is not None else pd.Series(dtype=str)
+    base_skus = variants_df['base_sku'].astype(str).str.strip() if variants_df is not None and 'base_sku' in variants_df.columns else variant_skus
+    variant_targets = (pd.DataFrame({'sku': variant_skus.values, 'base': base_skus.values})
+                       .join(targets, on='base', how='inner')
+                       .drop_duplicates('sku', keep='last').set_index('sku'))
+
+    shopify = pd.DataFrame(current_shopify_data, columns=['product_id', 'variant_id', 'sku', 'price', 'compare_at_price'])
+    sku = shopify['sku'].fillna('').astype(str).str.strip()
+    # get_indexer eşleşmeyen SKU için -1 döndürür; dizilerin sonundaki NaN bu konumu karşılar
+    variant_pos = variant_targets.index.get_indexer(sku)
+    base_pos = targets.index.get_indexer(sku)
+    by_variant = variant_pos >= 0
+    matched = by_variant | (base_pos >= 0)
+
+    def _column(frame, name, positions):
+        return np.append(frame[name].to_numpy(dtype=float), np.nan)[positions]
+
+    new_price = np.where(by_variant, _column(variant_targets, 'price', variant_pos), _column(targets, 'price', base_pos))
+    new_compare = np.where(by_variant, _column(variant_targets, 'compare', variant_pos), _column(targets, 'compare', base_pos))
+
+    current_price = pd.to_numeric(shopify['price'], errors='coerce').to_numpy(dtype=float)
+    current_compare = pd.to_numeric(shopify['compare_at_price'].replace('', np.nan), errors='coerce').to_numpy(dtype=float)
+    with np.errstate(invalid='ignore'):
+        # Mevcut fiyatı okunamayan varyant da güncellenir (NaN karşılaştırması False döner)
+        price_changed = ~(np.abs(current_price - new_price) <= tolerance)
+        compare_changed = ~np.isnan(new_compare) & (np.isnan(current_compare) | (np.abs(current_compare - new_compare) > tolerance))
+    changed = matched & (price_changed | compare_changed)
+
+    # Sadece değişen satırlar için payload oluşturulur (ürün sırası Shopify verisindeki ilk görülme sırasıdır)
+    updates = {}
+    rows = np.flatnonzero(changed)
+    product_ids = shopify['product_id'].to_numpy()[rows].tolist()
+    variant_ids = shopify['variant_id'].to_numpy()[rows].tolist()
+    for product_id, variant_id, price, compare in zip(product_ids, variant_ids, new_price[rows].tolist(), new_compare[rows].tolist()):
+        payload = {"id": variant_id, "price": f"{price:.2f}"}
+        if compare == compare:
+            payload["compareAtPrice"] = f"{compare:.2f}"
+        updates.setdefault(product_id, []).append(payload)
+
+    stats = {
+        'checked': len(shopify),
+        'matched': int(matched.sum()),
+        'unchanged': int((matched & ~changed).sum()),
+        'variants_to_update': len(rows),
+        'products_to_update': len(updates),
+    }
+    return updates, stats
+
+
+class PriceIndex:
+    """Model kodu -> (fiyat, karşılaştırma fiyatı) hash indeksi; her üründe tabloyu taramak yerine O(1) arama."""
+
+    def __init__(self, prices=None):
+        self._prices = dict(prices or {})
+
+    @classmethod
+    def from_frame(cls, price_data_df, price_col, compare_col=None):
+        """Fiyat tablosundan indeks kurar; aynı model kodunda ilk geçerli satır kullanılır."""
+        targets = build_target_prices(price_data_df.iloc[::-1], price_col, compare_col)
+        compares = [None if c != c else c for c in targets['compare'].tolist()]
+        return cls(zip(targets.index.tolist(), zip(targets['price'].tolist(), compares)))
+
+    def get(self, model_code):
+        """(fiyat, karşılaştırma fiyatı veya None); bulunamazsa None."""
+        return self._prices.get(str(model_code).strip())
+
+    def __contains__(self, model_code):
+        return str(model_code).strip() in self._prices
+
+    def __len__(self):
+        return len(self._prices)
+
+
+class ShopifyCatalogIndex:
+    """
+    Tek bir katalog anlık görüntüsünden (get_all_products_prices) SKU -> ürün/varyant haritası.
+    Varyantlar hem tam SKU'ları, hem '-' ile ayrılmış SKU önekleri (BM1-SİY-XS -> BM1, BM1-SİY), hem de
+    verilirse variants_df'teki base_sku ile indekslenir; böylece ürün başına arama sorgusu gerekmez.
+    """
+
+    def __init__(self):
+        self._by_key = {}
+
+    def add(self, product_id, variant_id, sku, base_sku=None):
+        sku = str(sku or '').strip()
+        if not sku:
+            return
+        keys = {sku}
+        parts = sku.split('-')
+        keys.update('-'.join(parts[:n]) for n in range(1, len(parts)))
+        if base_sku:
+            keys.add(str(base_sku).strip())
+        for key in keys:
+            products = self._by_key.setdefault(key, {})
+            products.setdefault(product_id, []).append(variant_id)
+
+    @classmethod
+    def from_rows(cls, rows, variants_df=None):
+        """rows: product_id, variant_id, sku alanlı sözlükler (get_all_products_prices çıktısı)."""
+        base_map = {}
+        if variants_df is not None and 'base_sku' in getattr(variants_df, 'columns', ()):
+            base_map = dict(zip(variants_df['MODEL KODU'].astype(str).str.strip(), variants_df['base_sku'].astype(str).str.strip()))
+        index = cls()
+        for row in rows:
+            sku = str(row.get('sku') or '').strip()
+            index.add(row.get('product_id'), row.get('variant_id'), sku, base_map.get(sku))
+        return index
+
+    @classmethod
+    def from_shopify(cls, shopify_api, variants_df=None, progress_callback=None):
+        """Mağazanın tüm ürün/varyantlarını tek seferde çekip indeksler."""
+        return cls.from_rows(shopify_api.get_all_products_prices(progress_callback=progress_callback), variants_df)
+
+    def lookup(self, sku):
+        """SKU (veya model kodu) için ilk eşleşen ürün: (product_id, [variant_id, ...]); yoksa None."""
+        products = self._by_key.get(str(sku).strip())
+        if not products:
+            return None
+        product_id, variant_ids = next(iter(products.items()))
+        return product_id, list(dict.fromkeys(variant_ids))
+
+    def __len__(self):
+        return len(self._by_key)
+
+
 def update_prices_for_single_product(shopify_api, product_id, variants_to_update, rate_limiter):
     """
     10-Worker optimize edilmiş bulk fiyat güncelleme
@@ -149,65 +310,36 @@ def update_prices_for_single_product(shopify_api, product_id, variants_to_update
 
     return {"status": "failed", "reason": "All retries failed"}
 
-def _process_one_product_for_price_sync(shopify_api, product_base_sku, all_variants_df, price_data_df, price_col, compare_col, rate_limiter):
+def _process_one_product_for_price_sync(shopify_api, product_base_sku, all_variants_df, price_data_df, price_col, compare_col, rate_limiter,
+                                        price_index=None, catalog_index=None):
     """
-    10-Worker için optimize edilmiş tek ürün işleme
-    Tek GraphQL call ile hem ürün hem varyantları al
+    10-Worker için optimize edilmiş tek ürün işleme.
+    price_index (PriceIndex) ve catalog_index (ShopifyCatalogIndex) döngüde bir kez kurulup verilir
+    (bkz. update_prices_for_products); verilmezse tek ürünlük yol kullanılır: tablodan sadece bu ürünün satırları
+    okunur ve Shopify'da SKU araması yapılır.
     """
     try:
-        # İlk önce fiyat verisini kontrol et
-        price_row = price_data_df.loc[price_data_df['MODEL KODU'] == product_base_sku]
-        if price_row.empty:
+        if price_index is None:
+            target = _lookup_target_price(price_data_df, product_base_sku, price_col, compare_col)
+        else:
+            target = price_index.get(product_base_sku)
+        if target is None:
             return {"status": "skipped", "reason": f"Fiyat bulunamadı: {product_base_sku}"}
-        
-        price_to_set = price_row.iloc[0][price_col]
-        compare_price_to_set = price_row.iloc[0].get(compare_col)
+        price_to_set, compare_price_to_set = target
 
-        # OPTIMIZE: Tek GraphQL ile ürün ve tüm varyantlarını al
-        query = """
-        query getProductWithVariants($query: String!) {
-            products(first: 1, query: $query) {
-                edges {
-                    node {
-                        id
-                        variants(first: 100) {
-                            edges {
-                                node {
-                                    id
-                                    sku
-                                }
-                            }
-                        }
-                    }
-                }
-            }
-        }
-        """
-        
-        rate_limiter.wait()
-        result = shopify_api.execute_graphql(query, {"query": f"sku:{product_base_sku}*"})
-        
-        product_edges = result.get("products", {}).get("edges", [])
-        if not product_edges:
+        if catalog_index is None:
+            catalog_index = _search_catalog_index(shopify_api, product_base_sku, rate_limiter)
+        match = catalog_index.lookup(product_base_sku)
+        if match is None:
             return {"status": "failed", "reason": f"Shopify'da ürün bulunamadı: {product_base_sku}"}
-        
-        product = product_edges[0]['node']
-        product_id = product['id']
-        
-        # Base SKU ile başlayan varyantları filtrele ve updates hazırla
+        product_id, variant_ids = match
+
         updates = []
-        for v_edge in product.get('variants', {}).get('edges', []):
-            variant = v_edge['node']
-            variant_sku = variant.get('sku', '')
-            
-            if variant_sku.startswith(product_base_sku):
-                payload = {
-                    "id": variant['id'],
-                    "price": f"{price_to_set:.2f}"
-                }
-                if compare_price_to_set is not None and pd.notna(compare_price_to_set):
-                    payload["compareAtPrice"] = f"{compare_price_to_set:.2f}"
-                updates.append(payload)
+        for variant_id in variant_ids:
+            payload = {"id": variant_id, "price": f"{price_to_set:.2f}"}
+            if compare_price_to_set is not None:
+                payload["compareAtPrice"] = f"{compare_price_to_set:.2f}"
+            updates.append(payload)
 
         if not updates:
             return {"status": "skipped", "reason": "Eşleşen varyant bulunamadı"}
@@ -224,10 +356,52 @@ def _process_one_product_for_price_sync(shopify_api, product_base_sku, all_varia
         logging.error(f"Ürün {product_base_sku} işlenirken hata: {str(e)}")
         return {"status": "failed", "reason": str(e)}
 
-def update_single_product_custom(shopify_api, sku_or_id, new_price, compare_at_price=None, rate_limiter=None):
+
+def _lookup_target_price(price_data_df, model_code, price_col, compare_col=None):
+    """Tek model kodu için (fiyat, karşılaştırma fiyatı); tüm tablo için indeks kurulmaz."""
+    code = str(model_code).strip()
+    rows = price_data_df[price_data_df['MODEL KODU'].astype(str).str.strip() == code]
+    return PriceIndex.from_frame(rows, price_col, compare_col).get(code) if len(rows) else None
+
+
+def _search_catalog_index(shopify_api, sku, rate_limiter):
+    """Katalog indeksi verilmediğinde tek ürünlük SKU araması ile geçici bir indeks kurar."""
+    query = """
+    query getProductWithVariants($query: String!) {
+        products(first: 1, query: $query) {
+            edges {
+                node {
+                    id
+                    variants(first: 100) {
+                        edges {
+                            node {
+                                id
+                                sku
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+    """
+    rate_limiter.wait()
+    result = shopify_api.execute_graphql(query, {"query": f"sku:{sku}*"})
+    index = ShopifyCatalogIndex()
+    for edge in result.get("products", {}).get("edges", [])[:1]:
+        product = edge['node']
+        for v_edge in product.get('variants', {}).get('edges', []):
+            variant = v_edge['node']
+            variant_sku = variant.get('sku') or ''
+            # Eski davranış: ana SKU ile başlayan tüm varyantlar
+            index.add(product['id'], variant['id'], variant_sku, sku if variant_sku.startswith(sku) else None)
+    return index
+
+def update_single_product_custom(shopify_api, sku_or_id, new_price, compare_at_price=None, rate_limiter=None, catalog_index=None):
     """
     Tek bir ürün veya varyant için manuel fiyat güncellemesi yapar.
     sku_or_id: Ürün SKU'su veya Shopify ID'si (gid://shopify/Product/...)
+    catalog_index: Verilirse SKU, arama sorgusu yapılmadan ShopifyCatalogIndex'ten bulunur
     """
     try:
         if not rate_limiter:
@@ -264,6 +438,19 @@ def update_single_product_custom(shopify_api, sku_or_id, new_price, compare_at_p
                 
             return update_prices_for_single_product(shopify_api, sku_or_id, updates, rate_limiter)
             
+        elif catalog_index is not None:
+            match = catalog_index.lookup(sku_or_id)
+            if match is None:
+                return {"status": "failed", "reason": f"SKU bulunamadı: {sku_or_id}"}
+            product_id, variant_ids = match
+            updates = []
+            for variant_id in variant_ids:
+                payload = {"id": variant_id, "price": str(new_price)}
+                if compare_at_price:
+                    payload["compareAtPrice"] = str(compare_at_price)
+                updates.append(payload)
+            return update_prices_for_single_product(shopify_api, product_id, updates, rate_limiter)
+
         else:
             # SKU ise, mevcut _process_one_product_for_price_sync mantığına benzer bir yol izle
             # Ancak burada DataFrame yerine doğrudan değerleri kullanacağız.
@@ -311,20 +498,141 @@ def update_single_product_custom(shopify_api, sku_or_id, new_price, compare_at_p
     except Exception as e:
         return {"status": "failed", "reason": str(e)}
 
-def update_collection_custom(shopify_api, collection_id, adjustment_type, value, rate_limiter=None, progress_queue=None):
+class _StoreLimiterAdapter:
+    """
+    update_prices_for_single_product'ın beklediği arayüz (wait/handle_*) ile mağaza limiter'ı (acquire/handle_*).
+    Token'ı ShopifyAPI.execute_graphql zaten aldığı için wait() boştur; THROTTLED bildirimleri mağaza limiter'ına gider.
+    """
+
+    def __init__(self, store_limiter):
+        self.store_limiter = store_limiter
+
+    def wait(self):
+        pass
+
+    def handle_throttle_error(self):
+        self.store_limiter.handle_throttle_error()
+
+    def handle_success(self):
+        self.store_limiter.handle_success()
+
+
+COLLECTION_UPDATE_WORKERS = 6
+
+
+def dispatch_price_updates(shopify_api, updates_by_product, rate_limiter=None, max_workers=COLLECTION_UPDATE_WORKERS,
+                           progress_callback=None, stop_event=None, titles=None, progress_start=10):
+    """
+    Ürün bazında hazırlanmış productVariantsBulkUpdate listelerini (product_id -> varyant listesi) en fazla
+    max_workers eşzamanlı istekle gönderir. Tüm istekler mağazanın paylaşılan limiter'ından geçer
+    (shopify_api.rate_limiter; yoksa bu çalışma için SharedRateLimiter kurulur). rate_limiter verilirse (eski arayüz,
+    wait/handle_*) her istek ayrıca onu da bekler.
+    Dönüş: {'updated', 'failed', 'failures': [{'product_id', 'title', 'reason'}]}
+    """
+    from operations.smart_rate_limiter import SharedRateLimiter
+
+    titles = titles or {}
+    installed_limiter = False
+    if getattr(shopify_api, 'rate_limiter', None) is None:
+        shopify_api.rate_limiter = SharedRateLimiter(max_requests_per_second=float(os.getenv("SHOPIFY_RATE_LIMIT_RPS", "4")))
+        installed_limiter = True
+    call_limiter = rate_limiter or _StoreLimiterAdapter(shopify_api.rate_limiter)
+
+    def send(product_id):
+        if stop_event is not None and stop_event.is_set():
+            return {"status": "skipped", "reason": "Durduruldu"}
+        return update_prices_for_single_product(shopify_api, product_id, updates_by_product[product_id], call_limiter)
+
+    success_count = failed_count = processed = 0
+    failures = []
+    total = len(updates_by_product)
+    started = time.monotonic()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total or 1))) as executor:
+            futures = {executor.submit(send, product_id): product_id for product_id in updates_by_product}
+            for future in as_completed(futures):
+                product_id = futures[future]
+                processed += 1
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"status": "failed", "reason": str(e)}
+                if result.get('status') == 'success':
+                    success_count += 1
+                elif result.get('status') == 'failed':
+                    failed_count += 1
+                    failures.append({'product_id': product_id, 'title': titles.get(product_id), 'reason': result.get('reason')})
+                if progress_callback:
+                    rate = processed / max(time.monotonic() - started, 1e-6)
+                    progress_callback({'progress': progress_start + int((processed / total) * (100 - progress_start)),
+                                       'message': f"İşleniyor: {titles.get(product_id, product_id)} ({processed}/{total})",
+                                       'stats': {'updated': success_count, 'failed': failed_count, 'pending': total - processed,
+                                                 'rate': rate, 'eta': (total - processed) / rate / 60}})
+    finally:
+        if installed_limiter:
+            shopify_api.rate_limiter = None
+    return {'updated': success_count, 'failed': failed_count, 'failures': failures}
+
+
+def _snapshot_store_for(shopify_api, snapshot_store):
+    """Verilen depo, yoksa mağazanın varsayılan fiyat anlık görüntü deposu (False -> kayıt yok)."""
+    if snapshot_store is False:
+        return None
+    if snapshot_store is not None:
+        return snapshot_store
+    from operations.price_snapshot import PriceSnapshotStore
+    return PriceSnapshotStore(getattr(shopify_api, 'store_url', '') or '')
+
+
+def update_prices_for_products(shopify_api, base_skus, price_data_df, price_col, compare_col, rate_limiter, variants_df=None,
+                               catalog_index=None, max_workers=COLLECTION_UPDATE_WORKERS, progress_callback=None):
+    """
+    Verilen model kodlarının fiyatlarını ürün bazında gönderir. PriceIndex ve ShopifyCatalogIndex döngüden önce
+    bir kez kurulur (catalog_index verilirse katalog yeniden çekilmez); ürün başına okuma sorgusu yapılmaz.
+    progress_callback(biten, toplam) her üründen sonra çağrılır.
+    Dönüş: model kodu -> _process_one_product_for_price_sync sonucu
+    """
+    base_skus = list(dict.fromkeys(str(sku).strip() for sku in base_skus if str(sku).strip()))
+    if not base_skus:
+        return {}
+    price_index = PriceIndex.from_frame(price_data_df, price_col, compare_col)
+    if catalog_index is None:
+        catalog_index = ShopifyCatalogIndex.from_shopify(shopify_api, variants_df)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_process_one_product_for_price_sync, shopify_api, sku, variants_df, price_data_df, price_col,
+                                   compare_col, rate_limiter, price_index=price_index, catalog_index=catalog_index): sku
+                   for sku in base_skus}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            if progress_callback:
+                progress_callback(len(results), len(base_skus))
+    return results
+
+
+def update_collection_custom(shopify_api, collection_id, adjustment_type, value, rate_limiter=None, progress_queue=None,
+                             min_price=None, max_price=None, max_workers=COLLECTION_UPDATE_WORKERS, stop_event=None,
+                             snapshot_store=None):
     """
     Koleksiyondaki tüm ürünlerin fiyatlarını günceller.
-    adjustment_type: 'percentage_inc' (%), 'percentage_dec' (%), 'fixed_amount' (+)
+    adjustment_type: 'percentage_inc' (%), 'percentage_dec' (%), 'fixed_amount' (+), 'set_discount_rate' (compareAtPrice'tan %)
     value: Değer (örn: 10)
+    min_price / max_price: İsteğe bağlı taban/tavan fiyat korumaları
+
+    Yeni fiyatlar önce tek seferde hesaplanır; yuvarlanmış fiyatı değişmeyen varyantlar (ve hiç değişikliği olmayan
+    ürünler) gönderilmez. Yazmadan önce değişecek varyantların eski fiyatları anlık görüntü olarak kaydedilir
+    (operations.price_snapshot; snapshot_store=False ile kapatılır). Güncellemeler dispatch_price_updates ile
+    paralel gönderilir; ilerleme progress_queue'ya birleştirilerek akıtılır.
     """
+    from operations.progress_bus import ProgressBus
+
+    bus = ProgressBus(progress_queue.put) if progress_queue else None
     try:
-        if not rate_limiter:
-            rate_limiter = SmartRateLimiter()
-            
         # 1. Ürünleri çek (İlerleme bildirimi ile)
         def fetch_callback(msg):
-            if progress_queue:
-                progress_queue.put({'progress': 5, 'message': msg})
+            if bus:
+                bus({'progress': 5, 'message': msg})
 
         products = shopify_api.get_products_by_collection(collection_id, progress_callback=fetch_callback)
         total_products = len(products)
@@ -332,65 +640,55 @@ def update_collection_custom(shopify_api, collection_id, adjustment_type, value,
         if total_products == 0:
             return {"status": "failed", "reason": "Koleksiyonda ürün yok."}
             
-        success_count = 0
-        failed_count = 0
-        processed = 0
-        
-        for product in products:
-            processed += 1
-            product_id = product['id']
-            product_title = product['title']
-            
-            updates = []
-            for v_edge in product.get('variants', {}).get('edges', []):
-                variant = v_edge['node']
-                current_price = float(variant.get('price', 0))
-                
-                # Yeni fiyatı hesapla
-                new_price = current_price
-                if adjustment_type == 'percentage_inc':
-                    new_price = current_price * (1 + value / 100)
-                elif adjustment_type == 'percentage_dec':
-                    new_price = current_price * (1 - value / 100)
-                elif adjustment_type == 'fixed_amount':
-                    new_price = current_price + value
-                elif adjustment_type == 'set_discount_rate':
-                    # İndirim oranını ayarla (Compare At Price üzerinden)
-                    compare_at = float(variant.get('compareAtPrice') or 0)
-                    if compare_at > 0:
-                        new_price = compare_at * (1 - value / 100)
-                    else:
-                        # Compare At Price yoksa işlem yapma (veya mevcut fiyatı koru)
-                        continue
-                
-                # Yuvarlama (X.99)
-                import math
-                new_price = math.floor(new_price) + 0.99
-                
-                updates.append({
-                    "id": variant['id'],
-                    "price": f"{new_price:.2f}"
-                })
-            
-            if updates:
-                result = update_prices_for_single_product(shopify_api, product_id, updates, rate_limiter)
-                if result.get('status') == 'success':
-                    success_count += 1
-                else:
-                    failed_count += 1
-            
-            if progress_queue:
-                progress_queue.put({
-                    'progress': int((processed / total_products) * 100),
-                    'message': f"İşleniyor: {product_title} ({processed}/{total_products})"
-                })
-                
+        # 2. Tüm varyantların yeni fiyatları tek seferde hesaplanır (X.99 yuvarlama, NaN = güncellenmez)
+        variant_rows = [(product['id'], v_edge['node']) for product in products
+                        for v_edge in product.get('variants', {}).get('edges', [])]
+        current_prices = [float(variant.get('price') or 0) for _, variant in variant_rows]
+        new_prices = pricing_rules.adjust_prices(
+            current_prices, adjustment_type, value,
+            compare_at=[float(variant.get('compareAtPrice') or 0) for _, variant in variant_rows],
+            min_price=min_price, max_price=max_price)
+        updates_by_product = {}
+        previous_rows = []
+        unchanged_variants = 0
+        for (product_id, variant), current, new_price in zip(variant_rows, current_prices, new_prices.tolist()):
+            if new_price != new_price:
+                continue
+            if f"{new_price:.2f}" == f"{current:.2f}":
+                unchanged_variants += 1
+                continue
+            updates_by_product.setdefault(product_id, []).append({"id": variant['id'], "price": f"{new_price:.2f}"})
+            previous_rows.append({'product_id': product_id, 'variant_id': variant['id'],
+                                  'price': variant.get('price'), 'compare_at_price': variant.get('compareAtPrice')})
+
+        to_send = len(updates_by_product)
+        snapshot_id = None
+        if to_send and (store := _snapshot_store_for(shopify_api, snapshot_store)):
+            snapshot_id = store.save(previous_rows, source='collection',
+                                     description=f"Koleksiyon {collection_id}: {adjustment_type} {value}")
+        if bus:
+            bus({'progress': 10, 'message': f"{to_send} ürün güncellenecek ({total_products - to_send} ürün değişmedi)."})
+
+        # 3. Değişen ürünleri sınırlı eşzamanlılıkla gönder
+        outcome = dispatch_price_updates(shopify_api, updates_by_product, rate_limiter=rate_limiter, max_workers=max_workers,
+                                         progress_callback=bus, stop_event=stop_event,
+                                         titles={product['id']: product.get('title') for product in products})
+        if snapshot_id:
+            store.mark_finished(snapshot_id, outcome['updated'], outcome['failed'])
+
         return {
             "status": "success", 
             "total": total_products, 
-            "updated": success_count, 
-            "failed": failed_count
+            "updated": outcome['updated'],
+            "failed": outcome['failed'],
+            "unchanged": total_products - to_send,
+            "unchanged_variants": unchanged_variants,
+            "failures": outcome['failures'],
+            "snapshot_id": snapshot_id,
         }
 
     except Exception as e:
-        return {"status": "failed", "reason": str(e)}
\ No newline at end of file
+        return {"status": "failed", "reason": str(e)}
+    finally:
+        if bus:
+            bus.close()
@@ -0,0 +1,137 @@
+# operations/pricing_rules.py - Dizi tabanlı fiyatlandırma kuralları (kâr marjı, çarpan, KDV, X9.99 yuvarlama, indirim, taban/tavan)
+#
+# Tüm fonksiyonlar skaler, liste, NumPy dizisi veya pandas Series kabul eder ve NumPy dizisi döndürür; satır başına
+# Python döngüsü yoktur. Fiyat Hesaplayıcı sayfası (kaydırıcılar her değiştiğinde tüm tablo yeniden hesaplanır) ve
+# operations.price_sync.update_collection_custom aynı kuralları kullanır. Hesaplanamayan fiyatlar NaN döner.
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+# Yuvarlama yöntemleri (Fiyat Hesaplayıcı sayfasındaki seçeneklerle aynı adlar)
+ROUNDING_NONE = "Yok"
+ROUNDING_UP = "Yukarı Yuvarla"      # X9.99'a yukarı: 123.40 -> 129.99
+ROUNDING_DOWN = "Aşağı Yuvarla"     # bir önceki X9.99'a: 123.40 -> 119.99 (10'un altı -> 9.99)
+ROUNDING_X99 = "X.99"               # aynı liranın .99'u: 123.40 -> 123.99
+ROUNDING_METHODS = (ROUNDING_NONE, ROUNDING_UP, ROUNDING_DOWN, ROUNDING_X99)
+
+MARKUP_PERCENT = "Yüzde Ekle (%)"
+MARKUP_MULTIPLIER = "Çarpan Kullan (x)"
+
+# update_collection_custom ayar tipleri
+ADJUST_PERCENT_INC = 'percentage_inc'
+ADJUST_PERCENT_DEC = 'percentage_dec'
+ADJUST_FIXED = 'fixed_amount'
+ADJUST_DISCOUNT_RATE = 'set_discount_rate'
+
+
+def _as_array(values) -> np.ndarray:
+    return np.asarray(values, dtype=float)
+
+
+def round_prices(prices, method: str = ROUNDING_NONE) -> np.ndarray:
+    """Fiyatları seçilen yönteme göre yuvarlar."""
+    prices = _as_array(prices)
+    if method == ROUNDING_UP:
+        tens = np.floor(prices / 10) * 10
+        remainder = np.mod(prices, 10)
+        # Zaten X9 ile biten tam sayılar X8.99'a çekilir, diğerleri bir sonraki X9.99'a
+        return np.where((remainder != 9.99) & (remainder != 9), tens + 9.99,
+                        np.where(np.mod(prices, 1) == 0, prices - 0.01, prices))
+    if method == ROUNDING_DOWN:
+        return np.where(prices > 10, np.floor(prices / 10) * 10 - 0.01, np.where(np.isnan(prices), np.nan, 9.99))
+    if method == ROUNDING_X99:
+        return np.floor(prices) + 0.99
+    return prices.copy()
+
+
+def apply_markup(cost, markup_type: str = MARKUP_PERCENT, value: float = 0.0) -> np.ndarray:
+    """Alış fiyatına yüzde kâr ekler veya çarpan uygular."""
+    cost = _as_array(cost)
+    return cost * value if markup_type == MARKUP_MULTIPLIER else cost * (1 + value / 100)
+
+
+def add_vat(prices, vat_rate: float) -> np.ndarray:
+    return _as_array(prices) * (1 + vat_rate / 100)
+
+
+def remove_vat(prices, vat_rate: float) -> np.ndarray:
+    return _as_array(prices) / (1 + vat_rate / 100)
+
+
+def apply_discount(prices, rate: float) -> np.ndarray:
+    """Fiyatlara yüzde indirim uygular."""
+    return _as_array(prices) * (1 - rate / 100)
+
+
+def discount_from_compare_at(compare_at, rate: float) -> np.ndarray:
+    """Karşılaştırma fiyatı (compareAtPrice) üzerinden indirimli fiyat; karşılaştırma fiyatı yoksa/0 ise NaN."""
+    compare_at = _as_array(compare_at)
+    with np.errstate(invalid='ignore'):
+        return np.where(compare_at > 0, compare_at * (1 - rate / 100), np.nan)
+
+
+def clamp_prices(prices, min_price=None, max_price=None) -> np.ndarray:
+    """Taban/tavan korumaları; sınırlar skaler veya fiyatlarla aynı boyutta dizi olabilir (örn. alış fiyatı x 1.1)."""
+    prices = _as_array(prices)
+    # NaN fiyat NaN kalır; NaN sınır o satırda sınır yok demektir
+    if min_price is not None:
+        bound = _as_array(min_price)
+        prices = np.where(np.isnan(bound), prices, np.maximum(prices, bound))
+    if max_price is not None:
+        bound = _as_array(max_price)
+        prices = np.where(np.isnan(bound), prices, np.minimum(prices, bound))
+    return prices
+
+
+def profit_ratio(profit, cost) -> np.ndarray:
+    """Kâr / alış fiyatı (%); alış fiyatı 0 olan satırlarda 0."""
+    profit, cost = _as_array(profit), _as_array(cost)
+    return np.divide(profit, cost, out=np.zeros_like(profit), where=cost != 0) * 100
+
+
+@dataclass
+class PricingRules:
+    """Fiyat Hesaplayıcı'daki kuralların tamamı; calculate() tüm tabloyu tek seferde hesaplar."""
+    markup_type: str = MARKUP_PERCENT
+    markup_value: float = 100.0
+    add_vat: bool = True
+    vat_rate: float = 10.0
+    rounding: str = ROUNDING_UP
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+
+    def calculate(self, cost) -> dict:
+        """
+        Alış fiyatlarından satış fiyatlarını hesaplar.
+        Dönüş: {'net': KDV'siz satış, 'gross': KDV'li satış, 'final': yuvarlanmış ve sınırlanmış nihai fiyat,
+                'profit': nihai fiyatın KDV'siz tutarı - alış, 'profit_ratio': kâr oranı (%)}
+        """
+        cost = _as_array(cost)
+        net = apply_markup(cost, self.markup_type, self.markup_value)
+        gross = add_vat(net, self.vat_rate) if self.add_vat else net
+        final = clamp_prices(round_prices(gross, self.rounding), self.min_price, self.max_price)
+        revenue = remove_vat(final, self.vat_rate) if self.add_vat else final
+        profit = revenue - cost
+        return {'net': net, 'gross': gross, 'final': final, 'profit': profit, 'profit_ratio': profit_ratio(profit, cost)}
+
+
+def adjust_prices(current_prices, adjustment_type: str, value: float, compare_at=None,
+                  rounding: str = ROUNDING_X99, min_price=None, max_price=None) -> np.ndarray:
+    """
+    Mevcut Shopify fiyatlarına toplu ayar uygular (koleksiyon güncellemesi).
+    Karşılaştırma fiyatı olmayan varyantlarda 'set_discount_rate' NaN döner (güncellenmez).
+    """
+    current = _as_array(current_prices)
+    if adjustment_type == ADJUST_PERCENT_INC:
+        new = current * (1 + value / 100)
+    elif adjustment_type == ADJUST_PERCENT_DEC:
+        new = current * (1 - value / 100)
+    elif adjustment_type == ADJUST_FIXED:
+        new = current + value
+    elif adjustment_type == ADJUST_DISCOUNT_RATE:
+        new = discount_from_compare_at(compare_at if compare_at is not None else np.zeros_like(current), value)
+    else:
+        new = current.copy()
+    return clamp_prices(round_prices(new, rounding), min_price, max_price)
@@ -0,0 +1,200 @@
+# operations/pricing_scenarios.py - Önbellekli fiyat senaryo motoru (ana tablo, perakende indirim, toptan, senaryo ızgarası)
+#
+# Fiyat Hesaplayıcı sayfası her Streamlit yeniden çiziminde (her kaydırıcı hareketinde) ana, perakende indirim ve
+# toptan tablolarını df.copy() + yeni sütunlarla baştan hesaplıyordu. ScenarioEngine sonuçları giriş tablosunun
+# içerik özeti + parametrelerle anahtarlanmış, LRU ile sınırlı bir önbellekte tutar; aynı ayarlara dönmek hesaplama
+# yapmaz. scenario_grid() birden çok kâr marjı x indirim x KDV kombinasyonunu tek bir dizi (broadcast) hesabında
+# karşılaştırır.
+#
+# Önbellekten dönen tablolar paylaşılır; çağıran değiştirmemelidir (gerekirse .copy()). Giriş tabloları da yerinde
+# değiştirilmemelidir: aynı nesne için içerik özeti bir kez hesaplanıp hatırlanır.
+
+import hashlib
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from operations import pricing_rules
+from operations.pricing_rules import PricingRules
+
+DEFAULT_CACHE_SIZE = 32
+# Izgara hesabında aynı anda bellekte tutulacak en fazla hücre (senaryo x ürün); aşılırsa kâr marjı bazında bölünür
+MAX_GRID_CELLS = 20_000_000
+
+WHOLESALE_MULTIPLIER = 'Çarpanla'
+WHOLESALE_DISCOUNT = 'İndirimle'
+
+GRID_COLUMNS = ['KÂR MARJI', 'KDV (%)', 'İNDİRİM (%)', 'ORTALAMA SATIŞ FİYATI', 'TOPLAM KÂR',
+                'ORTALAMA KÂR ORANI (%)', 'EN DÜŞÜK KÂR ORANI (%)', 'ZARARDAKİ ÜRÜN']
+
+
+class ScenarioCache:
+    """İş parçacığı güvenli, boyutu sınırlı LRU önbellek (anahtar -> hesaplanmış sonuç)."""
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable):
+        with self.lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        value = compute()
+        with self.lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+class ScenarioEngine:
+    """Fiyat Hesaplayıcı tablolarını ve senaryo ızgarasını önbellekle hesaplar."""
+
+    def __init__(self, cache: Optional[ScenarioCache] = None):
+        self.cache = cache or ScenarioCache()
+        # id(df) -> (weakref, özet): aynı tablo nesnesi her yeniden çizimde tekrar özetlenmez
+        self._fingerprints = {}
+        self._fingerprint_lock = threading.Lock()
+
+    def fingerprint(self, df: pd.DataFrame) -> str:
+        """Tablonun içerik özeti (sütun adları, index ve tüm değerler)."""
+        with self._fingerprint_lock:
+            known = self._fingerprints.get(id(df))
+            if known is not None and known[0]() is df:
+                return known[1]
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr(list(df.columns)).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+        value = digest.hexdigest()
+        with self._fingerprint_lock:
+            # Ölü referansları temizle
+            self._fingerprints = {k: v for k, v in self._fingerprints.items() if v[0]() is not None}
+            self._fingerprints[id(df)] = (weakref.ref(df), value)
+        return value
+
+    def main_table(self, df: pd.DataFrame, rules: PricingRules) -> pd.DataFrame:
+        """Tablo 1: alış fiyatından net/brüt/nihai fiyat ve kâr sütunları eklenmiş tablo."""
+        def compute():
+            result = df.copy()
+            prices = rules.calculate(result['ALIŞ FİYATI'])
+            result['SATIS_FIYATI_KDVSIZ'] = prices['net']
+            result['SATIS_FIYATI_KDVLI'] = prices['gross']
+            result['NIHAI_SATIS_FIYATI'] = prices['final']
+            result['KÂR'] = prices['profit']
+            result['KÂR ORANI (%)'] = prices['profit_ratio']
+            return result
+        return self.cache.get_or_compute(('main', self.fingerprint(df), repr(rules)), compute)
+
+    def retail_table(self, calculated_df: pd.DataFrame, discount: float, vat_rate: float) -> pd.DataFrame:
+        """Tablo 2: nihai fiyata perakende indirim uygulanmış tablo."""
+        def compute():
+            result = calculated_df.copy()
+            result['İNDİRİM ORANI (%)'] = discount
+            result['İNDİRİMLİ SATIŞ FİYATI'] = pricing_rules.apply_discount(result['NIHAI_SATIS_FIYATI'], discount)
+            result['İNDİRİM SONRASI KÂR'] = (pricing_rules.remove_vat(result['İNDİRİMLİ SATIŞ FİYATI'], vat_rate)
+                                              - result['ALIŞ FİYATI'])
+            result['İNDİRİM SONRASI KÂR ORANI (%)'] = pricing_rules.profit_ratio(result['İNDİRİM SONRASI KÂR'],
+                                                                                 result['ALIŞ FİYATI'])
+            return result
+        key = ('retail', self.fingerprint(calculated_df), float(discount), float(vat_rate))
+        return self.cache.get_or_compute(key, compute)
+
+    def wholesale_table(self, calculated_df: pd.DataFrame, method: str, value: float, vat_rate: float) -> pd.DataFrame:
+        """Tablo 3: alış fiyatı x çarpan veya KDV'siz perakende fiyatından indirimle toptan fiyat."""
+        def compute():
+            result = calculated_df.copy()
+            if method == WHOLESALE_MULTIPLIER:
+                net = result["ALIŞ FİYATI"] * value
+            else:
+                net = pricing_rules.apply_discount(pricing_rules.remove_vat(result["NIHAI_SATIS_FIYATI"], vat_rate), value)
+            result["TOPTAN FİYAT (KDV'siz)"] = net
+            result["TOPTAN FİYAT (KDV'li)"] = pricing_rules.add_vat(net, vat_rate)
+            result['TOPTAN KÂR'] = result["TOPTAN FİYAT (KDV'siz)"] - result["ALIŞ FİYATI"]
+            return result
+        key = ('wholesale', self.fingerprint(calculated_df), method, float(value), float(vat_rate))
+        return self.cache.get_or_compute(key, compute)
+
+    def scenario_grid(self, df: pd.DataFrame, markups: Sequence[float], discounts: Sequence[float] = (0,),
+                      vat_rates: Sequence[float] = (10,), markup_type: str = pricing_rules.MARKUP_PERCENT,
+                      rounding: str = pricing_rules.ROUNDING_UP, add_vat: bool = True,
+                      min_price: Optional[float] = None, max_price: Optional[float] = None) -> pd.DataFrame:
+        """
+        Her (kâr marjı, KDV, indirim) kombinasyonu için tüm ürünlerin fiyatını tek seferde hesaplar ve senaryo
+        başına özet döndürür (GRID_COLUMNS). Kâr, indirimli fiyatın KDV'siz tutarı - alış fiyatıdır.
+        """
+        key = ('grid', self.fingerprint(df), tuple(map(float, markups)), tuple(map(float, discounts)),
+               tuple(map(float, vat_rates)), markup_type, rounding, add_vat, min_price, max_price)
+        return self.cache.get_or_compute(key, lambda: compute_scenario_grid(
+            df['ALIŞ FİYATI'], markups, discounts, vat_rates, markup_type, rounding, add_vat, min_price, max_price))
+
+
+def compute_scenario_grid(cost, markups: Iterable[float], discounts: Iterable[float], vat_rates: Iterable[float],
+                          markup_type: str = pricing_rules.MARKUP_PERCENT, rounding: str = pricing_rules.ROUNDING_UP,
+                          add_vat: bool = True, min_price=None, max_price=None) -> pd.DataFrame:
+    """Önbelleksiz ızgara hesabı; boyutlar (kâr marjı, KDV, indirim, ürün) olarak yayınlanır."""
+    cost = np.asarray(cost, dtype=float)
+    markups = np.asarray(list(markups), dtype=float)
+    discounts = np.asarray(list(discounts), dtype=float)
+    vat_rates = np.asarray(list(vat_rates), dtype=float)
+    vat_factor = 1 + vat_rates[:, None, None] / 100              # (V, 1, 1)
+    discount_factor = 1 - discounts[None, :, None] / 100         # (1, D, 1)
+    cost_row = cost[None, None, :]
+
+    chunk = max(1, MAX_GRID_CELLS // max(1, len(vat_rates) * len(discounts) * len(cost)))
+    frames = []
+    for start in range(0, len(markups), chunk):
+        net = pricing_rules.apply_markup(cost[None, :], markup_type, markups[start:start + chunk, None])  # (M, n)
+        gross = net[:, None, None, :] * (vat_factor if add_vat else np.ones_like(vat_factor))            # (M, V, 1, n)
+        final = pricing_rules.clamp_prices(pricing_rules.round_prices(gross, rounding), min_price, max_price)
+        discounted = final * discount_factor                                                              # (M, V, D, n)
+        revenue = discounted / vat_factor if add_vat else discounted
+        profit = revenue - cost_row
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ratio = np.where(cost_row > 0, profit / cost_row * 100, np.nan)
+            frames.append(pd.DataFrame({
+                'KÂR MARJI': np.repeat(markups[start:start + chunk], len(vat_rates) * len(discounts)),
+                'KDV (%)': np.tile(np.repeat(vat_rates, len(discounts)), len(markups[start:start + chunk])),
+                'İNDİRİM (%)': np.tile(discounts, len(markups[start:start + chunk]) * len(vat_rates)),
+                'ORTALAMA SATIŞ FİYATI': _nan_reduce(np.nanmean, discounted),
+                'TOPLAM KÂR': np.nansum(profit, axis=-1).ravel(),
+                'ORTALAMA KÂR ORANI (%)': _nan_reduce(np.nanmean, ratio),
+                'EN DÜŞÜK KÂR ORANI (%)': _nan_reduce(np.nanmin, ratio),
+                'ZARARDAKİ ÜRÜN': (profit < 0).sum(axis=-1).ravel(),
+            }))
+    if not frames:
+        return pd.DataFrame(columns=GRID_COLUMNS)
+    result = pd.concat(frames, ignore_index=True)
+    logging.info(f"📊 Fiyat senaryo ızgarası hesaplandı: {len(result)} senaryo x {len(cost)} ürün")
+    return result
+
+
+def _nan_reduce(reducer, values: np.ndarray) -> np.ndarray:
+    """Tamamen NaN olan senaryolarda uyarı vermeden NaN döndürür."""
+    if values.shape[-1] == 0:
+        return np.full(values.shape[:-1], np.nan).ravel()
+    valid = ~np.isnan(values).all(axis=-1)
+    out = np.full(values.shape[:-1], np.nan)
+    out[valid] = reducer(values[valid], axis=-1)
+    return out.ravel()
@@ -0,0 +1,128 @@
+# operations/product_matcher.py - Sentos ürünlerini Shopify önbelleğiyle eşleştiren normalize edilmiş çok anahtarlı indeks
+#
+# product_cache sadece birebir "sku:" ve "title:" anahtarlarını tutar; büyük/küçük harf, boşluk veya
+# Türkçe İ/ı farkları yüzünden eşleşmeyen ürünler Shopify'da kopya olarak oluşturuluyordu.
+# İndeks bir kez kurulur, her arama sabit sayıda sözlük okumasıdır:
+#   ürün SKU -> varyant SKU'ları -> barkodlar -> başlık
+# Ana model kodu otomatik eşleştirmede kullanılmaz (aynı modelin yeni rengi başka bir renge bağlanırdı);
+# sadece eşleşmeyen ürünler için aday önerisidir.
+
+import difflib
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Türkçe ve İngilizce i harflerinin tümü aynı anahtara düşer (SHIRT / shirt / şırt farkı yaratmasın)
+_I_FOLD = str.maketrans({'İ': 'i', 'I': 'i', 'ı': 'i'})
+_WHITESPACE = re.compile(r'\s+')
+_TOKEN = re.compile(r'\w{3,}')
+
+MAX_SUGGESTION_CANDIDATES = 50
+MIN_SUGGESTION_SCORE = 0.5
+# İlk senkronizasyonda tüm katalog eşleşmeyebilir; öneri hesabı bu sayıyla sınırlanır
+MAX_SUGGESTED_PRODUCTS = 200
+
+
+def normalize_text(value) -> str:
+    text = unicodedata.normalize('NFKC', str(value or '')).translate(_I_FOLD).casefold()
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def normalize_sku(value) -> str:
+    return _WHITESPACE.sub('', normalize_text(value))
+
+
+def base_model_code(sku) -> str:
+    """Ana model kodu: varyant bilgisinden (örn: -S-SIYAH) önceki kısım."""
+    return normalize_sku(sku).split('-')[0]
+
+
+def _sentos_variants(sentos_product: dict) -> List[dict]:
+    return sentos_product.get('variants') or []
+
+
+class ProductMatchIndex:
+    """Shopify önbelleğindeki benzersiz ürünler üzerine kurulan eşleştirme indeksi."""
+
+    def __init__(self, shopify_products: Iterable[dict]):
+        self.products: Dict[str, dict] = {}
+        self.by_sku: Dict[str, dict] = {}
+        self.by_barcode: Dict[str, dict] = {}
+        self.by_title: Dict[str, dict] = {}
+        self.by_base: Dict[str, set] = {}
+        self.by_token: Dict[str, set] = {}
+        for product in shopify_products:
+            gid = product.get('gid') or str(product.get('id'))
+            if gid in self.products:
+                continue
+            self.products[gid] = product
+            if title := normalize_text(product.get('title')):
+                self.by_title.setdefault(title, product)
+                for token in set(_TOKEN.findall(title)):
+                    self.by_token.setdefault(token, set()).add(gid)
+            for variant in product.get('variants', []):
+                if sku := normalize_sku(variant.get('sku')):
+                    self.by_sku.setdefault(sku, product)
+                    self.by_base.setdefault(base_model_code(sku), set()).add(gid)
+                if barcode := normalize_sku(variant.get('barcode')):
+                    self.by_barcode.setdefault(barcode, product)
+
+    @classmethod
+    def from_cache(cls, product_cache: dict) -> 'ProductMatchIndex':
+        return cls(product_cache.values())
+
+    def lookup(self, sentos_product: dict) -> Tuple[Optional[dict], Optional[str]]:
+        """(shopify ürünü, eşleşme anahtarı türü) döndürür; eşleşme yoksa (None, None)."""
+        skus = [normalize_sku(sentos_product.get('sku'))] + [normalize_sku(v.get('sku')) for v in _sentos_variants(sentos_product)]
+        skus = [s for s in skus if s]
+        for sku in skus:
+            if product := self.by_sku.get(sku):
+                return product, 'sku'
+        barcodes = [normalize_sku(sentos_product.get('barcode'))] + [normalize_sku(v.get('barcode')) for v in _sentos_variants(sentos_product)]
+        for barcode in filter(None, barcodes):
+            if product := self.by_barcode.get(barcode):
+                return product, 'barcode'
+        if product := self.by_title.get(normalize_text(sentos_product.get('name'))):
+            return product, 'title'
+        return None, None
+
+    def match(self, sentos_product: dict) -> Optional[dict]:
+        return self.lookup(sentos_product)[0]
+
+    def suggestions(self, sentos_product: dict, limit: int = 3) -> List[dict]:
+        """Eşleşmeyen ürün için aday Shopify ürünleri (ana model kodu ve başlık benzerliği)."""
+        title = normalize_text(sentos_product.get('name'))
+        skus = [sentos_product.get('sku')] + [v.get('sku') for v in _sentos_variants(sentos_product)]
+        same_base = set()
+        for sku in filter(None, skus):
+            same_base |= self.by_base.get(base_model_code(sku), set())
+
+        # Başlıkla en çok ortak kelimeyi paylaşan ürünler aday havuzunu oluşturur (tüm katalog taranmaz)
+        shared = Counter(gid for token in set(_TOKEN.findall(title)) for gid in self.by_token.get(token, ()))
+        pool = same_base | {gid for gid, _ in shared.most_common(MAX_SUGGESTION_CANDIDATES)}
+
+        scored = []
+        for gid in pool:
+            product = self.products[gid]
+            score = difflib.SequenceMatcher(None, title, normalize_text(product.get('title'))).ratio()
+            if gid in same_base:
+                score = max(score, 0.9)
+            if score >= MIN_SUGGESTION_SCORE:
+                scored.append({'gid': gid, 'title': product.get('title', ''), 'score': round(score, 2),
+                               'reason': 'base_model' if gid in same_base else 'title'})
+        scored.sort(key=lambda s: (-s['score'], s['title']))
+        return scored[:limit]
+
+    def unmatched_report(self, sentos_products: Iterable[dict], limit: int = 3,
+                         max_suggested: int = MAX_SUGGESTED_PRODUCTS) -> List[dict]:
+        """Eşleşmeyen ürünleri aday önerileriyle birlikte raporlar (öneri sadece ilk max_suggested ürün için hesaplanır)."""
+        report = []
+        for sentos_product in sentos_products:
+            if self.match(sentos_product) is None:
+                report.append({
+                    'name': sentos_product.get('name', 'Bilinmeyen Ürün'),
+                    'sku': sentos_product.get('sku', 'SKU Yok'),
+                    'suggestions': self.suggestions(sentos_product, limit) if len(report) < max_suggested else [],
+                })
+        return report
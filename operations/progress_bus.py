@@ -0,0 +1,118 @@
+# operations/progress_bus.py - Birleştirici ve hız sınırlı ilerleme olay yolu
+#
+# Worker'lar her ürün için progress_callback çağırır; Streamlit tarafında her çağrı queue.Queue üzerinden
+# bir yeniden çizime dönüşür. ProgressBus, progress_callback yerine geçer: stats/progress/message için
+# sadece son değeri tutar, log satırlarını biriktirir ve aboneye en fazla `interval` saniyede bir,
+# tek bir birleşik güncelleme olarak iletir. 'status' (done/error) olayları bekletilmeden iletilir.
+#
+# Aboneye giden güncelleme: {'progress', 'message', 'stats', 'log_details': [eskiden yeniye], 'logs_dropped'}
+
+import logging
+import threading
+from collections import deque
+from typing import Callable, Dict, List
+
+DEFAULT_INTERVAL = 0.25
+DEFAULT_LOG_CAPACITY = 500
+
+_LATEST_KEYS = ('progress', 'message', 'stats')
+
+
+def log_entries(update: dict) -> List[str]:
+    """Tekil ('log_detail') veya toplu ('log_details') güncellemedeki log satırları, eskiden yeniye."""
+    if 'log_details' in update:
+        return list(update['log_details'])
+    if 'log_detail' in update:
+        return [update['log_detail']]
+    return []
+
+
+class ProgressBus:
+    """
+    progress_callback ile aynı imzaya sahip (çağrılabilir) olay yolu.
+    Son log satırları `log_capacity` boyutlu halka tamponda tutulur; iki gönderim arasında kapasiteden
+    fazla log birikirse en eskileri düşürülür ve sayısı 'logs_dropped' ile bildirilir.
+    """
+
+    def __init__(self, subscriber: Callable[[dict], None], interval: float = DEFAULT_INTERVAL,
+                 log_capacity: int = DEFAULT_LOG_CAPACITY):
+        self.subscriber = subscriber
+        self.interval = interval
+        self.recent_logs = deque(maxlen=log_capacity)
+        self._pending_logs = deque(maxlen=log_capacity)
+        self._latest: Dict[str, object] = {}
+        self._received_logs = 0
+        self._flushed_logs = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+        # Gönderimlerin sırası korunur (zamanlayıcı ile 'status' olayı yarışmasın)
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self.published = 0
+        self.flushes = 0
+        self._thread = threading.Thread(target=self._run, name="ProgressBus", daemon=True)
+        self._thread.start()
+
+    def __call__(self, update: dict):
+        self.publish(update)
+
+    def publish(self, update: dict):
+        if update.get('status') in ('done', 'error'):
+            with self._flush_lock:
+                self._flush_locked()
+                self._deliver(update)
+            return
+        with self._lock:
+            self.published += 1
+            for key in _LATEST_KEYS:
+                if key in update:
+                    self._latest[key] = update[key]
+            for entry in log_entries(update):
+                self._pending_logs.append(entry)
+                self.recent_logs.append(entry)
+                self._received_logs += 1
+            self._dirty = True
+
+    def flush(self):
+        with self._flush_lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            update = dict(self._latest)
+            self._latest = {}
+            if self._pending_logs:
+                update['log_details'] = list(self._pending_logs)
+                self._pending_logs.clear()
+            dropped = self._received_logs - self._flushed_logs - len(update.get('log_details', ()))
+            self._flushed_logs = self._received_logs
+            if dropped:
+                update['logs_dropped'] = dropped
+            self._dirty = False
+            self.flushes += 1
+        self._deliver(update)
+
+    def _deliver(self, update: dict):
+        try:
+            self.subscriber(update)
+        except Exception as e:
+            logging.error(f"İlerleme güncellemesi iletilemedi: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def close(self):
+        """Zamanlayıcıyı durdurur ve bekleyen güncellemeleri iletir."""
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
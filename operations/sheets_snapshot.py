@@ -0,0 +1,128 @@
+# operations/sheets_snapshot.py - Google E-Tablolar'dan yüklenen fiyat verisinin yerel sütunsal anlık görüntüsü
+#
+# load_pricing_data_from_gsheets her sayfa açılışında tüm satırları get_all_records() ile indirip DataFrame'leri
+# yeniden kuruyor ve tipleri baştan dönüştürüyordu. SheetSnapshotCache her sayfanın dönüştürülmüş halini Feather
+# (Arrow IPC) dosyası olarak, e-tablonun Drive revizyonuyla (modifiedTime) birlikte data_cache/sheets_snapshots
+# altında tutar. Revizyon değişmediyse dosya bellek eşlemli (memory-mapped) okunur ve e-tabloya veri isteği gitmez;
+# tek uzak çağrı revizyon kontrolüdür.
+#
+# pyarrow yoksa önbellek devre dışı kalır (her yükleme e-tablodan yapılır).
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+DEFAULT_CACHE_DIR = os.path.join("data_cache", "sheets_snapshots")
+
+
+def _arrow_safe(df: pd.DataFrame) -> pd.DataFrame:
+    """Karışık tipli (örn. sayı + metin) object sütunları metne çevirir; Arrow tek tipli sütun ister."""
+    mixed = [column for column in df.columns
+             if df[column].dtype == object and pd.api.types.infer_dtype(df[column], skipna=True).startswith('mixed')]
+    if not mixed:
+        return df
+    df = df.copy()
+    for column in mixed:
+        df[column] = df[column].map(lambda value: value if value is None or value != value else str(value))
+    return df
+
+
+class SheetSnapshotCache:
+    """E-tablo sayfası başına (Feather dosyası + revizyon bilgisi) yerel anlık görüntü."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return feather is not None
+
+    def _paths(self, spreadsheet_id: str, title: str) -> Tuple[str, str]:
+        key = hashlib.sha1(f"{spreadsheet_id}/{title}".encode('utf-8')).hexdigest()[:20]
+        base = os.path.join(self.cache_dir, key)
+        return base + '.feather', base + '.json'
+
+    def load(self, spreadsheet_id: str, title: str, revision) -> Optional[pd.DataFrame]:
+        """Revizyon eşleşirse sayfanın anlık görüntüsünü döndürür, yoksa None."""
+        if not self.enabled or revision is None:
+            return None
+        data_path, meta_path = self._paths(spreadsheet_id, title)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('revision') != revision:
+                return None
+            df = feather.read_table(data_path, memory_map=True).to_pandas()
+            return df if len(df) == meta.get('rows', len(df)) else None
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f"⚠️ '{title}' anlık görüntüsü okunamadı, e-tablodan yüklenecek: {e}")
+            return None
+
+    def store(self, spreadsheet_id: str, title: str, revision, df: pd.DataFrame):
+        if not self.enabled or revision is None or df is None:
+            return
+        data_path, meta_path = self._paths(spreadsheet_id, title)
+        with self.lock:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                feather.write_feather(_arrow_safe(df).reset_index(drop=True), data_path + '.tmp', compression='uncompressed')
+                os.replace(data_path + '.tmp', data_path)
+                # Meta en son yazılır: yarım kalan yazımda revizyon eşleşmez
+                with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+                    json.dump({'revision': revision, 'title': title, 'rows': len(df)}, f, ensure_ascii=False)
+                os.replace(meta_path + '.tmp', meta_path)
+            except Exception as e:
+                logging.error(f"'{title}' anlık görüntüsü yazılamadı: {e}")
+
+
+def spreadsheet_revision(spreadsheet):
+    """E-tablonun Drive revizyonu (modifiedTime); okunamazsa None (önbellek kullanılmaz)."""
+    try:
+        return spreadsheet.get_lastUpdateTime()
+    except Exception as e:
+        logging.warning(f"⚠️ E-tablo revizyonu okunamadı: {e}")
+        return None
+
+
+def load_sheets_cached(spreadsheet, titles: Iterable[str],
+                       normalize: Optional[Callable[[str, pd.DataFrame], pd.DataFrame]] = None,
+                       cache: Optional[SheetSnapshotCache] = None) -> Tuple[Dict[str, pd.DataFrame], str]:
+    """
+    Sayfaları yerel anlık görüntüden, revizyon değiştiyse e-tablodan (get_all_records) yükler.
+    normalize(title, df) tip dönüşümlerini yapar; sonucu önbelleğe yazılır, böylece tekrar yapılmaz.
+    Karışık tipli sütunlar her iki yolda da metne çevrilir: e-tablodan ve önbellekten gelen tablolar aynı tiptedir.
+    Dönüş: ({sayfa adı: DataFrame}, 'cache' | 'remote')
+    """
+    cache = cache or SheetSnapshotCache()
+    titles = list(titles)
+    spreadsheet_id = getattr(spreadsheet, 'id', None) or 'default'
+    revision = spreadsheet_revision(spreadsheet)
+
+    cached = {title: cache.load(spreadsheet_id, title, revision) for title in titles}
+    if all(df is not None for df in cached.values()):
+        logging.info(f"✅ {len(titles)} sayfa yerel anlık görüntüden yüklendi (revizyon {revision})")
+        return cached, 'cache'
+
+    frames = {}
+    for title in titles:
+        if cached[title] is not None:
+            frames[title] = cached[title]
+            continue
+        records = spreadsheet.worksheet(title).get_all_records()
+        df = pd.DataFrame(records) if records else pd.DataFrame()
+        frames[title] = _arrow_safe(normalize(title, df) if normalize else df)
+        cache.store(spreadsheet_id, title, revision, frames[title])
+    return frames, 'remote'
@@ -0,0 +1,284 @@
+# operations/sheets_sync.py - Google E-Tablolar'a fark tabanlı yazma (temizle + baştan yaz yerine)
+#
+# save_pricing_data_to_gsheets her kayıtta dört sayfayı worksheet.clear() + set_with_dataframe ile baştan yazıyordu;
+# 20 bin satırlık bir fiyat tablosu on binlerce hücrelik yükleme demekti. SpreadsheetSync son yazılan değerlerin
+# yerel bir kopyasını (data_cache/sheets_state/<spreadsheet_id>.json.gz) tutar, yeni tabloyu hücre hücre karşılaştırır
+# ve yalnızca değişen aralıkları values.batchUpdate istekleriyle gönderir. Yeni satırlar parçalar halinde eklenir,
+# fazla kalan satırlar tek bir values.batchClear ile temizlenir.
+#
+# Yerel kopyaya yalnızca e-tablonun Drive revizyonu (modifiedTime) son yazımdan beri değişmediyse güvenilir; biri
+# e-tabloyu elle düzenlediyse sayfanın mevcut değerleri tek istekle okunur ve fark ona göre çıkarılır.
+#
+# Yalnızca gspread nesnelerinin şu yöntemleri kullanılır (testlerde sahte istemciyle değiştirilebilir):
+#   spreadsheet.id, worksheet(title), add_worksheet(title, rows, cols), values_batch_update(body=...),
+#   values_batch_clear(body=...), get_lastUpdateTime(); worksheet.row_count, col_count, resize(rows, cols),
+#   get_values(value_render_option=...)
+
+import gzip
+import json
+import logging
+import math
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    from gspread.exceptions import WorksheetNotFound
+except ImportError:  # gspread yoksa (örn. testler) sahte istemciler bu sınıfı kullanır
+    class WorksheetNotFound(Exception):
+        pass
+
+DEFAULT_STATE_DIR = os.path.join("data_cache", "sheets_state")
+# Tek values.batchUpdate isteğindeki en fazla hücre (Sheets API istek boyutu sınırının güvenli tarafı)
+MAX_CELLS_PER_REQUEST = 40000
+# Değişen ardışık satırlar ve eklenen satırlar bu boyutta aralıklara bölünür
+ROWS_PER_RANGE = 500
+VALUE_INPUT_OPTION = 'RAW'
+
+
+def column_letter(col: int) -> str:
+    """1 tabanlı sütun numarası -> A1 harfi (1 -> A, 27 -> AA)."""
+    letters = ''
+    while col > 0:
+        col, remainder = divmod(col - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def a1_range(title: str, first_row: int, first_col: int, last_row: int, last_col: int) -> str:
+    """0 tabanlı satır/sütun aralığı -> "'Sayfa'!B2:D10"."""
+    quoted = title.replace("'", "''")
+    return f"'{quoted}'!{column_letter(first_col + 1)}{first_row + 1}:{column_letter(last_col + 1)}{last_row + 1}"
+
+
+def _cell(value):
+    """DataFrame hücresini API'ye gidecek JSON değerine çevirir; boşlar '' olur."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    if isinstance(value, (str, bool, int, float)):
+        return value
+    if pd.isna(value):
+        return ''
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def frame_to_grid(df: pd.DataFrame) -> List[list]:
+    """Başlık satırı + değerler; set_with_dataframe ile aynı yerleşim (A1'den, index yazılmaz)."""
+    rows = df.astype(object).values.tolist()
+    return [[str(column) for column in df.columns]] + [[_cell(value) for value in row] for row in rows]
+
+
+def _same(old, new) -> bool:
+    if old == new:
+        return True
+    # Sayfadan okunan değer metin olabilir ('12.5'); sayısal karşılığı eşitse değişmemiş sayılır
+    if isinstance(new, (int, float)) and not isinstance(new, bool) and isinstance(old, str):
+        try:
+            return float(old) == float(new)
+        except ValueError:
+            return False
+    return False
+
+
+@dataclass
+class SheetDiff:
+    """Bir sayfa için gönderilecek aralıklar."""
+    updates: List[Tuple[int, int, List[list]]] = field(default_factory=list)  # (ilk satır, ilk sütun, değerler)
+    appended_rows: int = 0
+    cleared_rows: Optional[Tuple[int, int, int]] = None                        # (ilk satır, son satır, son sütun)
+    changed_cells: int = 0
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.updates and self.cleared_rows is None
+
+
+def diff_grids(old: List[list], new: List[list], rows_per_range: int = ROWS_PER_RANGE) -> SheetDiff:
+    """
+    Eski ve yeni değer ızgaralarını konuma göre karşılaştırır. Değişen ardışık satırlar, değişen sütunların
+    birleşim aralığıyla tek aralıkta gönderilir; eski satır yeni tablodan genişse fazla sütunlar '' ile temizlenir.
+    """
+    diff = SheetDiff()
+    block_start, block_cols, block_rows = None, None, []
+
+    def flush():
+        nonlocal block_start, block_cols, block_rows
+        if block_start is not None:
+            first_col, last_col = block_cols
+            values = [row[first_col:last_col + 1] for row in block_rows]
+            diff.updates.append((block_start, first_col, values))
+        block_start, block_cols, block_rows = None, None, []
+
+    common = min(len(old), len(new))
+    for index in range(common):
+        old_row, new_row = old[index], new[index]
+        width = max(len(old_row), len(new_row))
+        changed = [col for col in range(width)
+                   if not _same(old_row[col] if col < len(old_row) else '', new_row[col] if col < len(new_row) else '')]
+        if not changed:
+            flush()
+            continue
+        diff.changed_cells += len(changed)
+        padded = list(new_row) + [''] * (width - len(new_row))
+        if block_start is None or len(block_rows) >= rows_per_range:
+            flush()
+            block_start, block_cols = index, (changed[0], changed[-1])
+        else:
+            block_cols = (min(block_cols[0], changed[0]), max(block_cols[1], changed[-1]))
+        block_rows.append(padded)
+    flush()
+
+    # Yeni satırlar: tam genişlikte, parçalar halinde
+    for start in range(common, len(new), rows_per_range):
+        chunk = new[start:start + rows_per_range]
+        width = max(len(row) for row in chunk)
+        diff.updates.append((start, 0, [list(row) + [''] * (width - len(row)) for row in chunk]))
+        diff.appended_rows += len(chunk)
+        diff.changed_cells += sum(len(row) for row in chunk)
+
+    if len(old) > len(new):
+        diff.cleared_rows = (len(new), len(old) - 1, max(len(row) for row in old[len(new):]) - 1)
+    return diff
+
+
+class SheetStateStore:
+    """Her e-tablo için son yazılan ızgaraları ve Drive revizyonunu yerel dosyada tutar."""
+
+    def __init__(self, state_dir: str = DEFAULT_STATE_DIR):
+        self.state_dir = state_dir
+        self.lock = threading.Lock()
+
+    def _path(self, spreadsheet_id: str) -> str:
+        safe_id = ''.join(ch for ch in str(spreadsheet_id) if ch.isalnum() or ch in '-_') or 'default'
+        return os.path.join(self.state_dir, f"{safe_id}.json.gz")
+
+    def load(self, spreadsheet_id: str) -> dict:
+        try:
+            with gzip.open(self._path(spreadsheet_id), 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.warning(f"⚠️ E-tablo durum dosyası okunamadı, yeniden oluşturulacak: {e}")
+            return {}
+
+    def save(self, spreadsheet_id: str, revision, sheets: Dict[str, List[list]]):
+        path = self._path(spreadsheet_id)
+        with self.lock:
+            try:
+                os.makedirs(self.state_dir, exist_ok=True)
+                tmp_path = path + '.tmp'
+                with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=5) as f:
+                    json.dump({'revision': revision, 'sheets': sheets}, f, ensure_ascii=False, separators=(',', ':'))
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logging.error(f"E-tablo durum dosyası yazılamadı: {e}")
+
+    def discard(self, spreadsheet_id: str):
+        try:
+            os.remove(self._path(spreadsheet_id))
+        except FileNotFoundError:
+            pass
+
+
+class SpreadsheetSync:
+    """Bir e-tablodaki sayfaları DataFrame'lerle fark tabanlı eşitler."""
+
+    def __init__(self, spreadsheet, state_store: Optional[SheetStateStore] = None,
+                 max_cells_per_request: int = MAX_CELLS_PER_REQUEST, rows_per_range: int = ROWS_PER_RANGE):
+        self.spreadsheet = spreadsheet
+        self.state_store = state_store or SheetStateStore()
+        self.max_cells_per_request = max_cells_per_request
+        self.rows_per_range = rows_per_range
+
+    def _revision(self):
+        try:
+            return self.spreadsheet.get_lastUpdateTime()
+        except Exception as e:
+            logging.warning(f"⚠️ E-tablo revizyonu okunamadı: {e}")
+            return None
+
+    def _worksheet(self, title: str, rows: int, cols: int):
+        try:
+            return self.spreadsheet.worksheet(title), False
+        except WorksheetNotFound:
+            logging.info(f"'{title}' sayfası bulunamadı, yeni sayfa oluşturuluyor...")
+            return self.spreadsheet.add_worksheet(title=title, rows=max(rows, 1), cols=max(cols, 1)), True
+
+    def _send_updates(self, title: str, updates) -> int:
+        """Aralıkları hücre sınırına göre gruplayıp values.batchUpdate ile gönderir; istek sayısını döndürür."""
+        requests_sent = 0
+        batch, batch_cells = [], 0
+        for first_row, first_col, values in updates:
+            cells = sum(len(row) for row in values)
+            if batch and batch_cells + cells > self.max_cells_per_request:
+                self.spreadsheet.values_batch_update(body={'valueInputOption': VALUE_INPUT_OPTION, 'data': batch})
+                requests_sent += 1
+                batch, batch_cells = [], 0
+            last_col = first_col + max(len(row) for row in values) - 1
+            batch.append({'range': a1_range(title, first_row, first_col, first_row + len(values) - 1, last_col),
+                          'values': values})
+            batch_cells += cells
+        if batch:
+            self.spreadsheet.values_batch_update(body={'valueInputOption': VALUE_INPUT_OPTION, 'data': batch})
+            requests_sent += 1
+        return requests_sent
+
+    def save(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, dict]:
+        """
+        Sayfa adı -> DataFrame eşlemesini yazar. Dönüş: sayfa başına
+        {'baseline': 'local'|'remote'|'new', 'changed_cells', 'appended_rows', 'cleared_rows', 'requests'}
+        """
+        spreadsheet_id = getattr(self.spreadsheet, 'id', None) or 'default'
+        state = self.state_store.load(spreadsheet_id)
+        revision = self._revision()
+        trusted = bool(state) and state.get('revision') == revision
+        known_sheets = state.get('sheets', {}) if trusted else {}
+        written: Dict[str, List[list]] = {}
+        report: Dict[str, dict] = {}
+
+        try:
+            for title, df in frames.items():
+                grid = frame_to_grid(df)
+                width = max(len(row) for row in grid)
+                worksheet, created = self._worksheet(title, len(grid), width)
+
+                if created:
+                    baseline, source = [], 'new'
+                elif title in known_sheets:
+                    baseline, source = known_sheets[title], 'local'
+                else:
+                    baseline, source = worksheet.get_values(value_render_option='UNFORMATTED_VALUE'), 'remote'
+
+                diff = diff_grids(baseline, grid, self.rows_per_range)
+                needed_rows = max(len(grid), len(baseline))
+                if needed_rows > worksheet.row_count or width > worksheet.col_count:
+                    worksheet.resize(rows=max(needed_rows, worksheet.row_count), cols=max(width, worksheet.col_count))
+                requests_sent = self._send_updates(title, diff.updates)
+                cleared = 0
+                if diff.cleared_rows is not None:
+                    first_row, last_row, last_col = diff.cleared_rows
+                    self.spreadsheet.values_batch_clear(body={'ranges': [a1_range(title, first_row, 0, last_row, last_col)]})
+                    requests_sent += 1
+                    cleared = last_row - first_row + 1
+
+                written[title] = grid
+                report[title] = {'baseline': source, 'changed_cells': diff.changed_cells, 'appended_rows': diff.appended_rows,
+                                 'cleared_rows': cleared, 'requests': requests_sent}
+                logging.info(f"✅ '{title}': {diff.changed_cells} hücre, {diff.appended_rows} yeni satır, "
+                             f"{cleared} silinen satır ({requests_sent} istek, karşılaştırma: {source})")
+        except Exception:
+            # Yarım kalan yazımdan sonra yerel kopyaya güvenilmez; bir sonraki kayıt sayfaları yeniden okur
+            self.state_store.discard(spreadsheet_id)
+            raise
+
+        # Yazılmayan sayfaların bilinen durumu korunur; revizyon tüm yazımlardan sonra bir kez alınır
+        sheets = {**known_sheets, **written}
+        new_revision = self._revision() if any(r['requests'] for r in report.values()) else revision
+        self.state_store.save(spreadsheet_id, new_revision, sheets)
+        return report
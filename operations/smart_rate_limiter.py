@@ -79,4 +79,57 @@ class SmartRateLimiter:
             # Yavaşça hızı artır
             self.max_rate = min(2.0, self.max_rate * 1.1)
             if self.max_rate > 1.5:
-                self.throttle_detected = False
\ No newline at end of file
+                self.throttle_detected = False
+
+class SharedRateLimiter:
+    """
+    Birden fazla process arasında paylaşılan token bucket.
+    Durum multiprocessing paylaşımlı belleğinde tutulur; böylece sharded senkronizasyonda
+    tüm process'ler mağaza genelindeki tek bir bütçeyi kullanır.
+    SmartRateLimiter ile aynı arayüze sahiptir (acquire / handle_throttle_error / handle_success).
+    """
+    def __init__(self, max_requests_per_second=4.0, burst_capacity=20, mp_context=None):
+        import multiprocessing
+        ctx = mp_context or multiprocessing.get_context()
+        self.lock = ctx.Lock()
+        self.base_rate = float(max_requests_per_second)
+        self.burst_capacity = float(burst_capacity)
+        self._rate = ctx.Value('d', float(max_requests_per_second), lock=False)
+        self._tokens = ctx.Value('d', float(burst_capacity), lock=False)
+        self._last_refill = ctx.Value('d', time.time(), lock=False)
+        self._backoff_until = ctx.Value('d', 0.0, lock=False)
+
+    @property
+    def max_rate(self):
+        return self._rate.value
+
+    def acquire(self, tokens_needed=1):
+        """Token al, gerekirse bekle (bekleme kilit dışında yapılır, diğer process'ler bloklanmaz)"""
+        while True:
+            with self.lock:
+                now = time.time()
+                if now < self._backoff_until.value:
+                    wait_time = self._backoff_until.value - now
+                else:
+                    elapsed = now - self._last_refill.value
+                    self._tokens.value = min(self.burst_capacity, self._tokens.value + elapsed * self._rate.value)
+                    self._last_refill.value = now
+                    if self._tokens.value >= tokens_needed:
+                        self._tokens.value -= tokens_needed
+                        return True
+                    wait_time = (tokens_needed - self._tokens.value) / self._rate.value
+            time.sleep(wait_time)
+
+    def handle_throttle_error(self):
+        """THROTTLED / 429 geldiğinde tüm process'ler için hızı düşürür"""
+        with self.lock:
+            self._backoff_until.value = time.time() + 10
+            self._rate.value = max(0.3, self._rate.value * 0.5)
+            self._tokens.value = 0
+            logging.warning(f"Rate limit detected! Shared rate reduced to {self._rate.value:.2f} req/sec")
+
+    def handle_success(self):
+        """Başarılı istek sonrası hızı yavaşça temel değere geri çıkarır"""
+        if self._rate.value < self.base_rate:
+            with self.lock:
+                self._rate.value = min(self.base_rate, self._rate.value * 1.05)
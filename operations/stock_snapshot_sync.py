@@ -0,0 +1,230 @@
+# operations/stock_snapshot_sync.py - Anlık görüntü farkı ile hızlı stok senkronizasyonu
+#
+# "Sadece Stok ve Varyantlar" modunda ürün başına iki varyant sorgusu ve ayrı mutation yerine:
+#   1. Shopify envanteri tek bir bulk operation ile çekilir (sku, inventoryItem, lokasyondaki available)
+#   2. Sentos stokları zaten yüklenmiş ürün listesinden tabloya dökülür
+#   3. İki tablo eşleşen Shopify ürünü ve SKU üzerinden birleştirilir, sadece farklı olan miktarlar büyük batch'lerle yazılır
+# Shopify'da karşılığı olmayan varyantı bulunan ürünler (varyant oluşturma gerekir) klasik yola bırakılır.
+# Aynı SKU birden çok Shopify ürününde olabilir (kopya, arşivde kalmış ürün); stok sadece eşleşen ürüne yazılır.
+
+import json
+import logging
+import time
+
+import pandas as pd
+
+from connectors import http_transport
+from operations import inventory_batcher
+
+BULK_INVENTORY_QUERY = """
+{
+  products {
+    edges {
+      node {
+        id
+        variants {
+          edges {
+            node {
+              id
+              sku
+              inventoryItem {
+                id
+                inventoryLevel(locationId: "%s") {
+                  quantities(names: ["available"]) { name quantity }
+                }
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+BULK_RUN_MUTATION = """
+mutation runBulkQuery($query: String!) {
+    bulkOperationRunQuery(query: $query) {
+        bulkOperation { id status }
+        userErrors { field message }
+    }
+}
+"""
+
+BULK_STATUS_QUERY = """
+query {
+    currentBulkOperation(type: QUERY) { id status errorCode objectCount url }
+}
+"""
+
+SHOPIFY_COLUMNS = ['product_gid', 'variant_id', 'sku', 'inventory_item_id', 'available']
+SENTOS_COLUMNS = ['product_idx', 'product_gid', 'sku', 'sentos_qty']
+
+
+def _run_bulk_query(shopify_api, query, progress_callback=None, poll_interval=2.0, timeout=900):
+    """Bulk operation başlatır, bitmesini bekler ve JSONL sonuç URL'ini döndürür."""
+    result = shopify_api.execute_graphql(BULK_RUN_MUTATION, {"query": query}).get('bulkOperationRunQuery', {}) or {}
+    if errors := result.get('userErrors'):
+        raise Exception(f"Bulk operation başlatılamadı: {errors}")
+    operation_id = (result.get('bulkOperation') or {}).get('id')
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = shopify_api.execute_graphql(BULK_STATUS_QUERY).get('currentBulkOperation') or {}
+        if operation_id and status.get('id') != operation_id:
+            raise Exception("Başka bir bulk operation çalışıyor, envanter anlık görüntüsü alınamadı.")
+        state = status.get('status')
+        if state == 'COMPLETED':
+            return status.get('url')
+        if state in ('FAILED', 'CANCELED', 'EXPIRED'):
+            raise Exception(f"Bulk operation başarısız: {state} ({status.get('errorCode')})")
+        if progress_callback:
+            progress_callback({'message': f"Shopify envanter anlık görüntüsü hazırlanıyor... {status.get('objectCount', 0)} kayıt"})
+        time.sleep(poll_interval)
+    raise Exception("Bulk operation zaman aşımına uğradı.")
+
+
+def parse_inventory_jsonl(lines) -> pd.DataFrame:
+    """Bulk operation JSONL çıktısını varyant başına bir satırlık tabloya çevirir."""
+    rows = []
+    for line in lines:
+        if not line:
+            continue
+        record = json.loads(line)
+        # Ürün satırlarında sadece id bulunur; varyant satırları __parentId ile ürüne bağlanır
+        if '__parentId' not in record or 'inventoryItem' not in record:
+            continue
+        item = record.get('inventoryItem') or {}
+        level = item.get('inventoryLevel')
+        available = None
+        if level is not None:
+            available = next((q.get('quantity') for q in level.get('quantities', []) if q.get('name') == 'available'), None)
+        rows.append((record['__parentId'], record.get('id'), str(record.get('sku') or '').strip(), item.get('id'), available))
+    df = pd.DataFrame(rows, columns=SHOPIFY_COLUMNS)
+    df['available'] = pd.to_numeric(df['available'], errors='coerce')
+    return df[df['sku'] != '']
+
+
+def fetch_shopify_inventory_snapshot(shopify_api, location_id, progress_callback=None) -> pd.DataFrame:
+    """Mağazadaki tüm varyantların SKU, inventory item ve lokasyondaki stok bilgisini tek seferde çeker."""
+    url = _run_bulk_query(shopify_api, BULK_INVENTORY_QUERY % location_id, progress_callback)
+    if not url:
+        # Mağazada hiç ürün yoksa Shopify sonuç dosyası üretmez
+        return pd.DataFrame(columns=SHOPIFY_COLUMNS)
+    response = http_transport.client_for(shopify_api).request('GET', url, timeout=300)
+    response.raise_for_status()
+    df = parse_inventory_jsonl(response.text.splitlines())
+    logging.info(f"Shopify envanter anlık görüntüsü: {len(df)} varyant")
+    return df
+
+
+def sentos_stock_frame(sentos_products, product_gids=None) -> pd.DataFrame:
+    """
+    Sentos ürünlerindeki varyant stoklarını (ürün sırası, eşleşen Shopify ürünü, sku, toplam stok) tablosuna döker.
+    product_gids: ürünlerle aynı sırada eşleşen Shopify ürün GID'leri (bilinmiyorsa None).
+    """
+    rows = []
+    for idx, product in enumerate(sentos_products):
+        product_gid = product_gids[idx] if product_gids else None
+        for variant in product.get('variants', []) or [product]:
+            sku = str(variant.get('sku') or '').strip()
+            if not sku:
+                continue
+            # stock_sync._prepare_inventory_adjustments ile aynı toplama mantığı
+            qty = sum(s.get('stock', 0) for s in variant.get('stocks', []) if isinstance(s, dict) and s.get('stock'))
+            rows.append((idx, product_gid, sku, qty))
+    return pd.DataFrame(rows, columns=SENTOS_COLUMNS)
+
+
+def compute_stock_delta(sentos_df: pd.DataFrame, shopify_df: pd.DataFrame):
+    """
+    Sentos ve Shopify tablolarını eşleşen ürün ve SKU üzerinden birleştirir.
+    Eşleşen ürünü bilinmeyen satırlar sadece SKU ile birleşir; SKU birden çok Shopify ürünündeyse belirsizdir
+    ve karşılıksız sayılır (ürün klasik yoldan işlenir, stok eşleşmeyen ürünlere yazılmaz).
+    Dönüş: (delta, unmatched)
+      delta     -> stoğu farklı olan (veya lokasyonda aktif olmayan) varyantlar
+      unmatched -> Shopify'da (eşleşen üründe) karşılığı olmayan Sentos varyantları
+    """
+    known = sentos_df['product_gid'].notna()
+    by_product = sentos_df[known].merge(shopify_df, on=['product_gid', 'sku'], how='left')
+    unique_skus = shopify_df[~shopify_df['sku'].duplicated(keep=False)].drop(columns='product_gid')
+    by_sku = sentos_df[~known].merge(unique_skus, on='sku', how='left')
+    merged = pd.concat([by_product, by_sku], ignore_index=True)
+    unmatched = merged[merged['inventory_item_id'].isna()]
+    matched = merged[merged['inventory_item_id'].notna() & (merged['sentos_qty'] >= 0)].copy()
+    matched['needs_activation'] = matched['available'].isna()
+    delta = matched[matched['needs_activation'] | (matched['available'] != matched['sentos_qty'])].copy()
+    delta['sentos_qty'] = delta['sentos_qty'].astype(int)
+    return delta, unmatched
+
+
+def push_stock_delta(shopify_api, location_id, delta: pd.DataFrame) -> pd.DataFrame:
+    """Farkları büyük batch'lerle yazar; her satıra 'error' sütunu ekler (None = başarılı)."""
+    delta = delta.copy()
+    delta['error'] = None
+    if delta.empty:
+        return delta
+
+    errors = {}
+    to_activate = delta.loc[delta['needs_activation'], 'inventory_item_id'].drop_duplicates().tolist()
+    if to_activate:
+        for item_id, error in zip(to_activate, inventory_batcher.activate_items(shopify_api, location_id, to_activate)):
+            if error:
+                errors[item_id] = error
+
+    # Aynı inventory item'a birden çok Sentos satırı düşerse sonuncusu geçerli olur
+    writes = delta[~delta['inventory_item_id'].isin(errors)].drop_duplicates('inventory_item_id', keep='last')
+    adjustments = [{"inventoryItemId": item_id, "availableQuantity": qty}
+                   for item_id, qty in zip(writes['inventory_item_id'], writes['sentos_qty'])]
+    for adj, error in zip(adjustments, inventory_batcher.set_quantities(shopify_api, location_id, adjustments)):
+        if error:
+            errors[adj['inventoryItemId']] = error
+
+    delta['error'] = delta['inventory_item_id'].map(errors)
+    return delta
+
+
+def run_stock_snapshot_sync(shopify_api, sentos_products, progress_callback=None, product_gids=None):
+    """
+    Verilen (Shopify'da eşleşmiş) Sentos ürünlerinin stoklarını anlık görüntü farkıyla senkronize eder.
+    product_gids: ürünlerle aynı sırada eşleşen Shopify ürün GID'leri; stok sadece bu ürünlerin varyantlarına yazılır.
+    Dönüş: (results, fallback)
+      results  -> [(ürün, status, changes, error)] ; status: 'updated' veya 'skipped'
+      fallback -> Eksik varyantı olduğu için klasik ürün bazlı yoldan işlenmesi gereken ürünler
+    """
+    location_id = shopify_api.get_default_location_id()
+    if progress_callback:
+        progress_callback({'message': "Shopify envanter anlık görüntüsü alınıyor..."})
+    shopify_df = fetch_shopify_inventory_snapshot(shopify_api, location_id, progress_callback)
+    sentos_df = sentos_stock_frame(sentos_products, product_gids)
+
+    delta, unmatched = compute_stock_delta(sentos_df, shopify_df)
+    fallback_idx = set(unmatched['product_idx'])
+    delta = delta[~delta['product_idx'].isin(fallback_idx)]
+    logging.info(f"Stok farkı: {len(delta)} varyant değişecek, {len(fallback_idx)} ürün varyant oluşturma için klasik yola aktarıldı")
+    if progress_callback:
+        progress_callback({'message': f"{len(delta)} varyantın stoğu güncelleniyor..."})
+
+    pushed = push_stock_delta(shopify_api, location_id, delta)
+    failed = pushed[pushed['error'].notna()]
+    updated_counts = pushed[pushed['error'].isna()].groupby('product_idx').size().to_dict()
+    first_errors = failed.groupby('product_idx')['error'].first().to_dict()
+    failed_counts = failed.groupby('product_idx').size().to_dict()
+
+    results, fallback = [], []
+    for idx, product in enumerate(sentos_products):
+        if idx in fallback_idx:
+            fallback.append(product)
+            continue
+        changes = []
+        if idx in failed_counts:
+            changes.append(f"{failed_counts[idx]} varyantın stok güncellemesinde hata: {first_errors[idx]}")
+        if updated := updated_counts.get(idx, 0):
+            changes.append(f"{updated} varyantın stok seviyesi güncellendi.")
+        if idx in failed_counts:
+            results.append((product, 'updated', changes, first_errors[idx]))
+        elif updated:
+            results.append((product, 'updated', changes, None))
+        else:
+            results.append((product, 'skipped', ["Stok ve varyantlar kontrol edildi (Değişiklik yok)."], None))
+    return results, fallback
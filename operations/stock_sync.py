@@ -15,14 +15,23 @@ from gsheets_manager import GoogleSheetsManager
 from log_manager import LogManager
 import config_manager
 from utils import get_variant_color, get_variant_size, get_apparel_sort_key
+from operations import inventory_batcher, variant_fetcher
 import json 
 
-def sync_stock_and_variants(shopify_api, product_gid, sentos_product):
-    """10-worker sistemi için optimize edilmiş stok ve varyant sync"""
+def sync_stock_and_variants(shopify_api, product_gid, sentos_product, with_status=False):
+    """
+    10-worker sistemi için optimize edilmiş stok ve varyant sync.
+    with_status=True ise (değişiklikler, başarılı_mı) döner.
+    """
     changes = []
+    ok = True
     logging.info(f"Ürün {product_gid} için varyantlar ve stoklar senkronize ediliyor...")
     
     ex_vars = _get_shopify_variants(shopify_api, product_gid)
+    if ex_vars is None:
+        # Okunamayan varyantlar "hiç varyant yok" sayılırsa tüm varyantlar kopya olarak yeniden oluşturulur
+        changes.append("Hata: Shopify'daki varyantlar okunamadı, stok ve varyantlar güncellenmedi.")
+        return (changes, False) if with_status else changes
     ex_skus = {str(v.get('inventoryItem',{}).get('sku','')).strip() for v in ex_vars if v.get('inventoryItem',{}).get('sku')}
     s_vars = sentos_product.get('variants', []) or [sentos_product]
     
@@ -30,52 +39,44 @@ def sync_stock_and_variants(shopify_api, product_gid, sentos_product):
     if new_vars:
         msg = f"{len(new_vars)} yeni varyant eklendi."
         changes.append(msg)
-        _add_variants_bulk(shopify_api, product_gid, new_vars, sentos_product)
+        if not _add_variants_bulk(shopify_api, product_gid, new_vars, sentos_product):
+            changes.append("Yeni varyantların bir kısmı eklenirken hata oluştu.")
+            ok = False
         time.sleep(1)  # 10-worker için daha kısa bekleme
     
-    # Stok güncelleme - 10-worker için optimize edilmiş
-    all_now_variants = _get_shopify_variants(shopify_api, product_gid)
+    # Stok güncelleme - yeni varyant eklenmediyse ilk sorgunun sonucu yeterli
+    all_now_variants = _get_shopify_variants(shopify_api, product_gid) if new_vars else ex_vars
+    if all_now_variants is None:
+        changes.append("Hata: Yeni varyantlardan sonra Shopify'daki varyantlar okunamadı, stoklar güncellenmedi.")
+        return (changes, False) if with_status else changes
     if adjustments := _prepare_inventory_adjustments(s_vars, all_now_variants):
-        msg = f"{len(adjustments)} varyantın stok seviyesi güncellendi."
-        changes.append(msg)
-        _adjust_inventory_bulk(shopify_api, adjustments)
+        errors = _adjust_inventory_bulk(shopify_api, adjustments)
+        if failed := [(adj, err) for adj, err in zip(adjustments, errors) if err]:
+            changes.append(f"{len(failed)} varyantın stok güncellemesinde hata: {failed[0][1]}")
+            ok = False
+        if updated := len(adjustments) - len(failed):
+            changes.append(f"{updated} varyantın stok seviyesi güncellendi.")
         
     if not new_vars and not adjustments:
         changes.append("Stok ve varyantlar kontrol edildi (Değişiklik yok).")
         
     logging.info(f"Ürün {product_gid} için varyant ve stok senkronizasyonu tamamlandı.")
-    return changes
+    return (changes, ok) if with_status else changes
 
 def _get_shopify_variants(shopify_api, product_gid):
-    """Ürüne ait mevcut varyantları çeker - 10-worker için cache-aware"""
-    query = """
-    query getProductVariants($id: ID!) {
-        product(id: $id) {
-            variants(first: 250) {
-                edges {
-                    node {
-                        id
-                        inventoryItem {
-                            id
-                            sku
-                        }
-                        selectedOptions {
-                            name
-                            value
-                        }
-                    }
-                }
-            }
-        }
-    }
     """
-    
+    Ürüne ait mevcut varyantları çeker (250'den fazlaysa sayfalayarak).
+    Senkronizasyon sırasında ShopifyAPI.variant_fetcher takılıysa, worker'ların istekleri
+    çok ürünlü nodes(ids:) sorgularında birleştirilir.
+    Sorgu başarısız olursa None döner (boş liste: üründe gerçekten varyant yok).
+    """
     try:
-        data = shopify_api.execute_graphql(query, {"id": product_gid})
-        return [e['node'] for e in data.get("product", {}).get("variants", {}).get("edges", [])]
+        if fetcher := getattr(shopify_api, 'variant_fetcher', None):
+            return fetcher.get_variants(product_gid)
+        return variant_fetcher.fetch_product_variants(shopify_api, [product_gid]).get(product_gid)
     except Exception as e:
         logging.error(f"Varyant bilgileri alınırken hata: {e}")
-        return []
+        return None
 
 def _prepare_inventory_adjustments(sentos_variants, shopify_variants):
     """10-worker için optimize edilmiş stok hazırlama"""
@@ -99,76 +100,31 @@ def _prepare_inventory_adjustments(sentos_variants, shopify_variants):
     return adjustments
 
 def _adjust_inventory_bulk(shopify_api, adjustments):
-    """10-worker için optimize edilmiş bulk inventory güncelleme - 2024-10 API uyumlu"""
+    """
+    Stok miktarlarını yazar - 2024-10 API uyumlu.
+    Senkronizasyon sırasında ShopifyAPI.inventory_batcher takılıysa, tüm worker'ların yazmaları
+    ürünler arası büyük inventorySetQuantities çağrılarında birleştirilir.
+    Dönüş: adjustments ile aynı sırada, her varyant için hata mesajı veya None.
+    """
     if not adjustments: 
-        return
+        return []
     
     try:
+        if batcher := getattr(shopify_api, 'inventory_batcher', None):
+            return batcher.set_quantities(adjustments)
         location_id = shopify_api.get_default_location_id()
-        
-        # ✅ 2024-10 API FIX - inventorySetQuantities correct structure
-        # "name" field removed - not part of InventoryQuantityInput
-        mutation = """
-        mutation inventorySetQuantities($input: InventorySetQuantitiesInput!) {
-            inventorySetQuantities(input: $input) {
-                inventoryAdjustmentGroup {
-                    id
-                    reason
-                }
-                userErrors {
-                    field
-                    message
-                    code
-                }
-            }
-        }
-        """
-        
-        # Batch halinde işle (10-worker için optimize, batch boyutu düşürüldü)
-        batch_size = 25  # ✅ Shopify rate limit için küçültüldü
-        for i in range(0, len(adjustments), batch_size):
-            batch = adjustments[i:i + batch_size]
-            
-            quantities = []
-            for adj in batch:
-                # ✅ 2024-10 API: "name" field yok, sadece bu 3 field
-                quantities.append({
-                    "inventoryItemId": adj["inventoryItemId"],
-                    "locationId": location_id,
-                    "quantity": adj["availableQuantity"]
-                })
-            
-            variables = {
-                "input": {
-                    "reason": "correction",
-                    "name": "available",  # ✅ "name" buraya taşındı (root level)
-                    "ignoreCompareQuantity": True,  # ✅ 2024-10 API: zorunlu field
-                    "quantities": quantities
-                }
-            }
-            
-            result = shopify_api.execute_graphql(mutation, variables)
-            
-            if errors := result.get('inventorySetQuantities', {}).get('userErrors', []):
-                logging.error(f"❌ Batch {i//batch_size + 1} stok güncelleme hataları: {errors}")
-            else:
-                adjustment_group = result.get('inventorySetQuantities', {}).get('inventoryAdjustmentGroup')
-                if adjustment_group:
-                    logging.info(f"✅ Batch {i//batch_size + 1}: {len(quantities)} varyant stoğu güncellendi (Reason: {adjustment_group.get('reason')})")
-            
-            # ✅ 10-worker için daha uzun bekleme
-            if i + batch_size < len(adjustments):
-                time.sleep(1.0)  # Rate limit koruması artırıldı
-                
+        return inventory_batcher.set_quantities(shopify_api, location_id, adjustments)
     except Exception as e:
         logging.error(f"❌ Bulk stok güncelleme kritik hatası: {e}")
         import traceback
         logging.error(traceback.format_exc())
+        return [str(e)] * len(adjustments)
 
 def _add_variants_bulk(shopify_api, product_gid, new_variants, main_product):
-    """10-worker için optimize edilmiş bulk varyant ekleme"""
+    """10-worker için optimize edilmiş bulk varyant ekleme. Dönüş: tüm batch'ler hatasız eklendiyse True"""
     if not new_variants:
-        return
+        return True
+    ok = True
         
     # Batch halinde işle
     batch_size = 50
@@ -231,6 +187,7 @@ def _add_variants_bulk(shopify_api, product_gid, new_variants, main_product):
             
             if errors:
                 logging.error(f"Varyant batch {batch_start//batch_size + 1} ekleme hataları: {errors}")
+                ok = False
             else:
                 logging.info(f"✅ Batch {batch_start//batch_size + 1}: {len(created_variants)} varyant başarıyla eklendi")
                 
@@ -244,36 +201,24 @@ def _add_variants_bulk(shopify_api, product_gid, new_variants, main_product):
                 
         except Exception as e:
             logging.error(f"Bulk varyant batch {batch_start//batch_size + 1} ekleme hatası: {e}")
+            ok = False
+    return ok
 
 def _activate_variants_at_location(shopify_api, variants):
-    """10-worker için optimize edilmiş inventory aktivasyonu"""
+    """
+    Yeni varyantların inventory kayıtlarını varsayılan lokasyonda aktive eder.
+    inventory_batcher takılıysa aktivasyonlar ürünler arası tek istekte birleştirilir.
+    Dönüş: aktive edilen inventory item'ları ile aynı sırada hata mesajları.
+    """
     inventory_item_ids = [v['inventoryItem']['id'] for v in variants if v.get('inventoryItem', {}).get('id')]
     if not inventory_item_ids:
-        return
+        return []
         
     try:
+        if batcher := getattr(shopify_api, 'inventory_batcher', None):
+            return batcher.activate(inventory_item_ids)
         location_id = shopify_api.get_default_location_id()
-        
-        activation_mutation = """
-        mutation inventoryBulkToggleActivation($inventoryItemUpdates: [InventoryBulkToggleActivationInput!]!) {
-            inventoryBulkToggleActivation(inventoryItemUpdates: $inventoryItemUpdates) {
-                inventoryLevels { id }
-                userErrors { field message }
-            }
-        }
-        """
-        
-        updates = [
-            {
-                "inventoryItemId": item_id,
-                "locationId": location_id,
-                "activate": True
-            }
-            for item_id in inventory_item_ids
-        ]
-        
-        shopify_api.execute_graphql(activation_mutation, {"inventoryItemUpdates": updates})
-        logging.info(f"✅ {len(inventory_item_ids)} varyant inventory aktivasyonu tamamlandı")
-        
+        return inventory_batcher.activate_items(shopify_api, location_id, inventory_item_ids)
     except Exception as e:
-        logging.error(f"Inventory aktivasyon hatası: {e}")
\ No newline at end of file
+        logging.error(f"Inventory aktivasyon hatası: {e}")
+        return [str(e)] * len(inventory_item_ids)
@@ -0,0 +1,191 @@
+# operations/sync_checkpoint.py - Devam ettirilebilir senkronizasyon için kalıcı kontrol noktaları
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from operations.sync_fingerprint import product_key
+
+DEFAULT_DB_PATH = os.path.join("data_cache", "sync_checkpoints.db")
+
+# Tekrar işlenmesi gerekmeyen sonuçlar (failed olanlar devam ederken yeniden denenir)
+DONE_OUTCOMES = ('created', 'updated', 'skipped')
+
+
+def sentos_watermark(sentos_products: List[dict]) -> Dict[str, object]:
+    """Sentos ürün listesinin anlık görüntüsünü tanımlayan özet."""
+    keys = sorted(k for k in (product_key(p) for p in sentos_products) if k)
+    return {
+        'count': len(sentos_products),
+        'digest': hashlib.sha1('|'.join(keys).encode('utf-8')).hexdigest(),
+        'fetched_at': datetime.now().isoformat(),
+    }
+
+
+def shopify_watermark(shopify_api) -> Dict[str, object]:
+    """Shopify ürün önbelleğinin anlık görüntüsünü tanımlayan özet."""
+    gids = {p.get('gid') for p in shopify_api.product_cache.values() if p.get('gid')}
+    return {'count': len(gids), 'loaded_at': datetime.now().isoformat()}
+
+
+def _watermarks_match(stored: Optional[dict], current: Optional[dict], created: int = 0) -> bool:
+    """
+    Kayıtlı ve güncel filigranları karşılaştırır; zaman damgaları dikkate alınmaz.
+    Shopify ürün sayısı bu çalışmada oluşturulan ürün sayısı kadar artmış olabilir.
+    Taraflardan biri bilinmiyorsa karşılaştırma yapılamaz ve eşleşmiş sayılır.
+    """
+    if not stored or not current:
+        return True
+    if stored.get('digest') != current.get('digest'):
+        return False
+    if 'count' in stored and 'count' in current and stored['count'] + created != current['count']:
+        return False
+    return True
+
+
+class SyncCheckpoint:
+    """
+    Bir senkronizasyon çalışmasında hangi Sentos ürünlerinin hangi sonuçla işlendiğini SQLite'a kaydeder.
+    Çökme veya zaman aşımından sonra aynı mağaza/mod için yarım kalan çalışma kaldığı yerden devam ettirilebilir.
+    """
+
+    def __init__(self, store_url: str, sync_mode: str, db_path: str = DEFAULT_DB_PATH, flush_every: int = 25):
+        self.store = str(store_url or '').replace('https://', '').replace('http://', '').strip().rstrip('/')
+        self.sync_mode = sync_mode
+        self.db_path = db_path
+        self.flush_every = flush_every
+        self.lock = threading.Lock()
+        self.run_id: Optional[str] = None
+        self.resumed = False
+        self.stale_run_id: Optional[str] = None
+        self._done: Set[str] = set()
+        self._pending: List[tuple] = []
+        self._ensure_db_exists()
+
+    def _ensure_db_exists(self):
+        if directory := os.path.dirname(self.db_path):
+            os.makedirs(directory, exist_ok=True)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sync_runs (
+                    run_id TEXT PRIMARY KEY,
+                    store TEXT NOT NULL,
+                    sync_mode TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    started_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    sentos_watermark TEXT,
+                    shopify_watermark TEXT
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sync_run_products (
+                    run_id TEXT NOT NULL,
+                    product_key TEXT NOT NULL,
+                    outcome TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (run_id, product_key)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_store_mode ON sync_runs(store, sync_mode, status)")
+
+    def start(self, resume: bool = False, max_age_hours: float = 24, sentos_wm: dict = None, shopify_wm: dict = None) -> str:
+        """
+        Yeni bir çalışma başlatır. resume=True ise aynı mağaza ve mod için tamamlanmamış son çalışmaya bağlanır.
+        max_age_hours'tan eski kontrol noktaları kullanılmaz (veri çok değişmiş olabilir).
+        Yarım kalan çalışmanın Sentos/Shopify filigranları güncellerle uyuşmuyorsa o çalışma 'stale' olarak
+        kapatılır ve baştan başlanır. Devam edilen çalışmanın ilk filigranları hiçbir zaman değiştirilmez.
+        """
+        now = datetime.now().isoformat()
+        with sqlite3.connect(self.db_path) as conn:
+            row = None
+            if resume:
+                cutoff = (datetime.now() - timedelta(hours=max_age_hours)).isoformat()
+                row = conn.execute("""
+                    SELECT run_id, sentos_watermark, shopify_watermark FROM sync_runs
+                    WHERE store = ? AND sync_mode = ? AND status NOT IN ('completed', 'stale') AND updated_at >= ?
+                    ORDER BY updated_at DESC LIMIT 1
+                """, (self.store, self.sync_mode, cutoff)).fetchone()
+
+            if row and not self._resume_is_valid(conn, row, sentos_wm, shopify_wm):
+                self.stale_run_id = row[0]
+                conn.execute("UPDATE sync_runs SET status = 'stale', updated_at = ? WHERE run_id = ?", (now, row[0]))
+                logging.warning(f"⚠️ Kontrol noktası {row[0]} kullanılmadı: Sentos/Shopify verisi çalışma yarım kaldıktan sonra değişmiş, baştan başlanıyor.")
+                row = None
+
+            if row:
+                self.run_id, self.resumed = row[0], True
+                placeholders = ','.join('?' * len(DONE_OUTCOMES))
+                self._done = {key for (key,) in conn.execute(
+                    f"SELECT product_key FROM sync_run_products WHERE run_id = ? AND outcome IN ({placeholders})",
+                    (self.run_id, *DONE_OUTCOMES)
+                )}
+                conn.execute("UPDATE sync_runs SET status = 'running', updated_at = ? WHERE run_id = ?", (now, self.run_id))
+                logging.info(f"Kontrol noktasından devam ediliyor: {self.run_id} ({len(self._done)} ürün zaten işlenmiş)")
+            else:
+                self.run_id, self.resumed, self._done = uuid.uuid4().hex, False, set()
+                conn.execute("""
+                    INSERT INTO sync_runs (run_id, store, sync_mode, status, started_at, updated_at, sentos_watermark, shopify_watermark)
+                    VALUES (?, ?, ?, 'running', ?, ?, ?, ?)
+                """, (self.run_id, self.store, self.sync_mode, now, now, json.dumps(sentos_wm), json.dumps(shopify_wm)))
+        return self.run_id
+
+    @staticmethod
+    def _resume_is_valid(conn, row, sentos_wm: Optional[dict], shopify_wm: Optional[dict]) -> bool:
+        run_id, stored_sentos, stored_shopify = row
+        created = conn.execute("SELECT COUNT(*) FROM sync_run_products WHERE run_id = ? AND outcome = 'created'",
+                               (run_id,)).fetchone()[0]
+        return (_watermarks_match(json.loads(stored_sentos or 'null'), sentos_wm)
+                and _watermarks_match(json.loads(stored_shopify or 'null'), shopify_wm, created))
+
+    def filter_pending(self, sentos_products: List[dict]) -> List[dict]:
+        """Bu çalışmada henüz başarıyla işlenmemiş ürünleri döndürür."""
+        if not self._done:
+            return list(sentos_products)
+        return [p for p in sentos_products if product_key(p) not in self._done]
+
+    @property
+    def completed_count(self) -> int:
+        return len(self._done)
+
+    def record(self, sentos_product: dict, outcome: str):
+        key = product_key(sentos_product)
+        if not key or not self.run_id:
+            return
+        with self.lock:
+            if outcome in DONE_OUTCOMES:
+                self._done.add(key)
+            self._pending.append((self.run_id, key, outcome, datetime.now().isoformat()))
+            should_flush = len(self._pending) >= self.flush_every
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            pending, self._pending = self._pending, []
+        if not pending or not self.run_id:
+            return
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO sync_run_products (run_id, product_key, outcome, updated_at)
+                    VALUES (?, ?, ?, ?)
+                """, pending)
+                conn.execute("UPDATE sync_runs SET updated_at = ? WHERE run_id = ?", (pending[-1][3], self.run_id))
+        except sqlite3.Error as e:
+            logging.error(f"Kontrol noktası kaydedilemedi: {e}")
+
+    def finish(self, status: str = 'completed'):
+        """Çalışmayı kapatır. 'completed' dışındaki durumlar sonraki resume'da devam ettirilebilir."""
+        self.flush()
+        if not self.run_id:
+            return
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("UPDATE sync_runs SET status = ?, updated_at = ? WHERE run_id = ?",
+                         (status, datetime.now().isoformat(), self.run_id))
@@ -0,0 +1,172 @@
+# operations/sync_fingerprint.py - Ürün bazlı içerik parmak izi (değişiklik tespiti)
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from utils import get_variant_color, get_variant_size
+
+# Senkronizasyonun bağımsız olarak atlanabilen parçaları
+FACETS = ('details', 'type', 'variants', 'images')
+
+DEFAULT_DB_PATH = os.path.join("data_cache", "sync_fingerprints.db")
+
+
+def _hash(payload) -> str:
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def _clean(value) -> str:
+    return str(value if value is not None else '').strip()
+
+
+def _variant_stock(variant) -> int:
+    # stock_sync._prepare_inventory_adjustments ile aynı toplama mantığı
+    return int(sum(s.get('stock', 0) for s in variant.get('stocks', []) if isinstance(s, dict) and s.get('stock')))
+
+
+def compute_fingerprints(sentos_product: dict) -> Dict[str, Optional[str]]:
+    """
+    Sentos ürün verisini normalize edip her facet için bir hash üretir.
+    Verisi payload içinde bulunmayan facet'ler için None döner (her zaman senkronize edilir).
+    """
+    fps = {
+        'details': _hash([
+            _clean(sentos_product.get('name')),
+            sentos_product.get('description_detail') or sentos_product.get('description', '') or '',
+        ]),
+        'type': _hash(_clean(sentos_product.get('category'))),
+    }
+
+    variants = sentos_product.get('variants', []) or [sentos_product]
+    fps['variants'] = _hash(sorted(
+        [_clean(v.get('sku')), _clean(v.get('barcode')),
+         get_variant_color(v) or '', get_variant_size(v) or '', _variant_stock(v)]
+        for v in variants
+    ))
+
+    # Sıralı resimler ayrı bir istekle çekildiği için, payload resim taşımıyorsa değişiklik tespit edilemez.
+    images = sentos_product.get('images')
+    if images:
+        fps['images'] = _hash([
+            _clean(img.get('url') or img.get('src') or img.get('path')) if isinstance(img, dict) else _clean(img)
+            for img in images
+        ])
+    else:
+        fps['images'] = None
+    return fps
+
+
+def product_key(sentos_product: dict) -> Optional[str]:
+    product_id = sentos_product.get('id')
+    if product_id is not None and str(product_id).strip():
+        return f"id:{product_id}"
+    if sku := _clean(sentos_product.get('sku')):
+        return f"sku:{sku}"
+    return None
+
+
+class FingerprintStore:
+    """
+    Son başarılı senkronizasyondaki parmak izlerini mağaza bazında SQLite'ta saklar.
+    Çalışma başında tek sorguyla belleğe yüklenir, yazmalar toplu halde yapılır.
+    """
+
+    def __init__(self, store_url: str, db_path: str = DEFAULT_DB_PATH, max_age_days: float = 7, flush_every: int = 200):
+        self.store = _clean(store_url).replace('https://', '').replace('http://', '').rstrip('/')
+        self.db_path = db_path
+        # Shopify tarafında elle yapılan değişikliklerin sonsuza kadar atlanmaması için
+        self.max_age_seconds = max_age_days * 86400 if max_age_days else None
+        self.flush_every = flush_every
+        self.lock = threading.Lock()
+        self._known: Dict[tuple, tuple] = {}
+        self._pending: List[tuple] = []
+        self._ensure_db_exists()
+        self._load()
+
+    def _ensure_db_exists(self):
+        if directory := os.path.dirname(self.db_path):
+            os.makedirs(directory, exist_ok=True)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS product_fingerprints (
+                    store TEXT NOT NULL,
+                    product_key TEXT NOT NULL,
+                    facet TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    synced_at REAL NOT NULL,
+                    PRIMARY KEY (store, product_key, facet)
+                )
+            """)
+
+    def _load(self):
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT product_key, facet, fingerprint, synced_at FROM product_fingerprints WHERE store = ?",
+                (self.store,)
+            ).fetchall()
+        self._known = {(key, facet): (fp, synced_at) for key, facet, fp, synced_at in rows}
+        logging.info(f"Parmak izi deposu: {self.store} için {len(self._known)} kayıt yüklendi.")
+
+    def changed_facets(self, sentos_product: dict, facets: Iterable[str] = FACETS) -> List[str]:
+        """Son başarılı senkronizasyondan bu yana değişen (veya hiç senkronize edilmemiş) facet'leri döndürür."""
+        key = product_key(sentos_product)
+        if not key:
+            return list(facets)
+        fps = compute_fingerprints(sentos_product)
+        now = time.time()
+        changed = []
+        with self.lock:
+            for facet in facets:
+                fp = fps.get(facet)
+                known = self._known.get((key, facet))
+                if fp is None or not known or known[0] != fp:
+                    changed.append(facet)
+                elif self.max_age_seconds and now - known[1] > self.max_age_seconds:
+                    changed.append(facet)
+        return changed
+
+    def mark_synced(self, sentos_product: dict, facets: Iterable[str]):
+        """Başarıyla senkronize edilen facet'lerin güncel parmak izini kaydeder."""
+        key = product_key(sentos_product)
+        if not key:
+            return
+        fps = compute_fingerprints(sentos_product)
+        now = time.time()
+        with self.lock:
+            for facet in facets:
+                if (fp := fps.get(facet)) is None:
+                    continue
+                self._known[(key, facet)] = (fp, now)
+                self._pending.append((self.store, key, facet, fp, now))
+            should_flush = len(self._pending) >= self.flush_every
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO product_fingerprints (store, product_key, facet, fingerprint, synced_at)
+                    VALUES (?, ?, ?, ?, ?)
+                """, pending)
+        except sqlite3.Error as e:
+            logging.error(f"Parmak izleri kaydedilemedi: {e}")
+
+    def clear(self):
+        """Bu mağazaya ait tüm parmak izlerini siler (sonraki çalışma tam senkronizasyon yapar)."""
+        with self.lock:
+            self._known.clear()
+            self._pending.clear()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM product_fingerprints WHERE store = ?", (self.store,))
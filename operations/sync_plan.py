@@ -0,0 +1,207 @@
+# operations/sync_plan.py - Senkronizasyon planı: ürün bazında yapılacak işlemler, GraphQL maliyeti ve tahmini süre
+#
+# Plan, yazma başlamadan önce elde olan veriden (Sentos listesi, Shopify önbelleği, parmak izleri) çıkarılır;
+# ek API çağrısı yapmaz. Önbellekten kesin bilinemeyen işlemler (örn. resim farkları) exact=False ile işaretlenir.
+
+import math
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+from operations import core_sync
+from operations.inventory_batcher import MAX_QUANTITIES_PER_CALL
+from operations.sync_fingerprint import product_key
+from operations.variant_fetcher import PRODUCTS_PER_QUERY, VARIANTS_PER_NODE
+
+# İşlem başına yaklaşık GraphQL maliyeti (puan). Mutation'lar ~10 puandır.
+OP_COSTS = {
+    'create': 10,             # productCreate
+    'variant_add': 10,        # productVariantsBulkCreate (50'lik batch)
+    'inventory_activate': 10, # inventoryBulkToggleActivation (item başına alias)
+    'inventory_set': 10 / MAX_QUANTITIES_PER_CALL,  # inventorySetQuantities, 250 varyant tek çağrıda
+    'variant_read': (2 + VARIANTS_PER_NODE * 2),    # nodes(ids:) içinde ürün başına pay
+    'product_update': 10,     # başlık/açıklama/kategori tek productUpdate
+    'activate_product': 10,   # status ACTIVE
+    'media_check': 12,        # mevcut medyaların okunması
+    'media_add': 10,          # productCreateMedia (5'lik batch)
+    'media_delete': 10,
+    'media_reorder': 10,      # medya hazır olduğunda toplu sıralama
+    'media_alt_update': 10,   # productUpdateMedia (SEO alt metinleri, ürün başına tek çağrı)
+}
+
+# Bir isteğe düşen işlem sayısı (istek sayısı tahmini için)
+OPS_PER_REQUEST = {
+    'inventory_set': MAX_QUANTITIES_PER_CALL,
+    'variant_read': PRODUCTS_PER_QUERY,
+    'inventory_activate': 25,
+    'media_reorder': 10,
+}
+
+# Varsayılan Shopify GraphQL geri dolum hızı (puan/saniye)
+DEFAULT_RESTORE_RATE = 50.0
+
+
+@dataclass
+class PlannedOperation:
+    kind: str
+    count: int = 1
+    exact: bool = True
+    detail: str = ''
+
+    @property
+    def cost(self) -> float:
+        return OP_COSTS.get(self.kind, 10) * self.count
+
+
+@dataclass
+class ProductPlan:
+    product: dict
+    action: str  # create / update / skip / unchanged / ignore
+    operations: List[PlannedOperation] = field(default_factory=list)
+    existing: Optional[dict] = None    # Eşleşen Shopify ürünü (update için)
+    facets: Optional[List[str]] = None  # Çalıştırılacak facet'ler (None: modun tüm facet'leri)
+
+    @property
+    def cost(self) -> float:
+        return sum(op.cost for op in self.operations)
+
+    @property
+    def key(self) -> Optional[str]:
+        return product_key(self.product)
+
+
+@dataclass
+class SyncPlan:
+    sync_mode: str
+    products: List[ProductPlan] = field(default_factory=list)
+    _resolutions: Optional[Dict[int, ProductPlan]] = field(default=None, repr=False, compare=False)
+
+    def resolution(self, product: dict) -> Optional[tuple]:
+        """
+        Plandaki kararı (action, existing_product, facets) döndürür; yürütme ürünü yeniden eşleştirmek yerine
+        bunu kullanır, böylece çalışan işlemler raporlanan planla aynıdır. Plan dışı ürünler için None.
+        """
+        if self._resolutions is None:
+            self._resolutions = {id(plan.product): plan for plan in self.products}
+        plan = self._resolutions.get(id(product))
+        return (plan.action, plan.existing, plan.facets) if plan is not None else None
+
+    def operation_counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for plan in self.products:
+            for op in plan.operations:
+                counts[op.kind] = counts.get(op.kind, 0) + op.count
+        return counts
+
+    def action_counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for plan in self.products:
+            counts[plan.action] = counts.get(plan.action, 0) + 1
+        return counts
+
+    @property
+    def total_cost(self) -> float:
+        return sum(plan.cost for plan in self.products)
+
+    @property
+    def request_count(self) -> int:
+        return sum(math.ceil(count / OPS_PER_REQUEST.get(kind, 1)) for kind, count in self.operation_counts().items())
+
+    def eta_seconds(self, restore_rate: float = DEFAULT_RESTORE_RATE, max_rps: Optional[float] = None) -> float:
+        """Süre, maliyet bütçesi ve (verilmişse) saniyedeki istek sınırından hangisi darboğazsa ona göre hesaplanır."""
+        eta = self.total_cost / restore_rate if restore_rate else 0
+        if max_rps:
+            eta = max(eta, self.request_count / max_rps)
+        return eta
+
+    def ordered_products(self) -> List[dict]:
+        """
+        Maliyet açısından en verimli sıra: yazma gerektirmeyen ürünler önce (hemen biter),
+        sonra ucuzdan pahalıya; böylece harcanan bütçe başına en çok ürün tamamlanır.
+        """
+        return [plan.product for plan in sorted(self.products, key=lambda p: (bool(p.operations), p.cost))]
+
+    def summary(self, restore_rate: float = DEFAULT_RESTORE_RATE, max_rps: Optional[float] = None) -> Dict[str, object]:
+        eta = self.eta_seconds(restore_rate, max_rps)
+        return {
+            'products': len(self.products),
+            'actions': self.action_counts(),
+            'operations': self.operation_counts(),
+            'estimated_cost': round(self.total_cost),
+            'estimated_requests': self.request_count,
+            'eta_seconds': round(eta),
+            'eta': str(timedelta(seconds=round(eta))),
+            'has_estimates': any(not op.exact for plan in self.products for op in plan.operations),
+        }
+
+    def rows(self) -> List[Dict[str, object]]:
+        """Dry-run raporu için ürün başına bir satır."""
+        return [{
+            'name': plan.product.get('name', 'Bilinmeyen Ürün'),
+            'sku': plan.product.get('sku', 'SKU Yok'),
+            'status': plan.action,
+            'operations': ", ".join(f"{op.kind} x{op.count}" + ("" if op.exact else " (tahmini)") for op in plan.operations) or "-",
+            'cost': round(plan.cost, 1),
+        } for plan in self.products]
+
+
+def _sentos_variants(sentos_product: dict) -> List[dict]:
+    return [v for v in (sentos_product.get('variants', []) or [sentos_product]) if str(v.get('sku', '')).strip()]
+
+
+def plan_create(sentos_product: dict) -> List[PlannedOperation]:
+    variants = _sentos_variants(sentos_product)
+    ops = [PlannedOperation('create'), PlannedOperation('variant_add', max(1, math.ceil(len(variants) / 50)))]
+    if variants:
+        ops += [PlannedOperation('inventory_activate', len(variants)), PlannedOperation('inventory_set', len(variants))]
+    # Sentos resim listesi ayrı istekle alındığı için resim sayısı bilinmez
+    ops += [PlannedOperation('media_add', exact=False), PlannedOperation('media_reorder', exact=False),
+            PlannedOperation('activate_product')]
+    return ops
+
+
+def plan_update(sentos_product: dict, existing: dict, facets: Iterable[str]) -> List[PlannedOperation]:
+    facets = set(facets)
+    ops = []
+    if field_facets := [f for f in ('details', 'type') if f in facets]:
+        if update := core_sync.build_product_update(existing, sentos_product, field_facets):
+            ops.append(PlannedOperation('product_update', detail=", ".join(sorted(update))))
+    if 'variants' in facets:
+        variants = _sentos_variants(sentos_product)
+        known_skus = {str(v.get('sku', '')).strip() for v in existing.get('variants', [])}
+        ops.append(PlannedOperation('variant_read'))
+        if new := [v for v in variants if str(v.get('sku', '')).strip() not in known_skus]:
+            ops.append(PlannedOperation('variant_add', math.ceil(len(new) / 50), detail=f"{len(new)} yeni varyant"))
+        # Mevcut stok önbellekte olmadığından tüm varyantlar için yazma varsayılır (üst sınır)
+        if variants:
+            ops.append(PlannedOperation('inventory_set', len(variants), exact=False))
+    if 'images' in facets:
+        ops.append(PlannedOperation('media_check'))
+    return ops
+
+
+def build_sync_plan(sentos_products: List[dict], sync_mode: str, resolve_action: Callable, mode_facets: Iterable[str] = ()) -> SyncPlan:
+    """
+    resolve_action(sentos_product) -> (action, existing_product, facets)
+    sync_runner._resolve_product_action ile aynı kararları kullanır (parmak izleri dahil).
+    """
+    plan = SyncPlan(sync_mode)
+    for sentos_product in sentos_products:
+        action, existing, facets = resolve_action(sentos_product)
+        if action == 'create':
+            ops = plan_create(sentos_product)
+        elif action == 'update':
+            ops = plan_update(sentos_product, existing, mode_facets if facets is None else facets)
+        else:
+            ops = []
+        plan.products.append(ProductPlan(sentos_product, action, ops, existing, facets))
+    return plan
+
+
+def build_seo_plan(shopify_products: List[dict], sync_mode: str) -> SyncPlan:
+    """SEO alt metin modu: her Shopify ürünü için medya okuma ve (gerekirse) tek productUpdateMedia."""
+    plan = SyncPlan(sync_mode)
+    for product in shopify_products:
+        plan.products.append(ProductPlan({'name': product.get('title', 'Bilinmeyen Ürün'), 'gid': product.get('gid')}, 'update', [
+            PlannedOperation('media_check'), PlannedOperation('media_alt_update', exact=False)]))
+    return plan
@@ -0,0 +1,139 @@
+# operations/sync_scheduler.py - Öncelikli şeritler (lanes) ile iş zamanlayıcı
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+# Öncelik sırasıyla şeritler: stok hatası satış kaybı/fazla satış demek, görsel hatası değil
+LANES = ('inventory', 'price', 'details', 'media')
+
+# Senkronizasyon facet'lerinin çalıştığı şeritler
+FACET_LANES = {'variants': 'inventory', 'details': 'details', 'type': 'details', 'images': 'media'}
+
+
+@dataclass
+class LaneConfig:
+    workers: int = 1
+    share: float = 0.25   # Toplam rate bütçesinden bu şeride ayrılan pay
+
+
+def default_lane_config(max_workers: int) -> Dict[str, LaneConfig]:
+    return {
+        'inventory': LaneConfig(workers=max(1, max_workers), share=0.5),
+        'price': LaneConfig(workers=max(1, max_workers // 2), share=0.2),
+        'details': LaneConfig(workers=max(1, max_workers // 2), share=0.2),
+        'media': LaneConfig(workers=max(1, max_workers // 4), share=0.1),
+    }
+
+
+class LaneRateLimiter:
+    """
+    Şerit bazlı token bucket. Her şerit toplam hızın kendi payı kadarını kullanır;
+    boşta olan şeritlerin payı aktif şeritlere dağıtılır (bütçe boşa harcanmaz).
+    ShopifyAPI.rate_limiter olarak takılır; şerit bilgisi çalışan thread'den okunur.
+    """
+    def __init__(self, total_rps: float, configs: Dict[str, LaneConfig], base_limiter=None, burst_capacity: float = 5):
+        self.total_rps = float(total_rps)
+        self.base_rps = float(total_rps)
+        self.configs = configs
+        self.base_limiter = base_limiter
+        self.burst_capacity = burst_capacity
+        self.lock = threading.Lock()
+        self._local = threading.local()
+        self._tokens = {lane: float(burst_capacity) for lane in configs}
+        self._last_refill = {lane: time.monotonic() for lane in configs}
+        self._busy = {lane: 0 for lane in configs}
+
+    def bind_lane(self, lane: str):
+        self._local.lane = lane
+
+    def mark_busy(self, lane: str, delta: int):
+        with self.lock:
+            self._busy[lane] = max(0, self._busy[lane] + delta)
+
+    def lane_rate(self, lane: str) -> float:
+        active = [name for name, busy in self._busy.items() if busy] or [lane]
+        if lane not in active:
+            active.append(lane)
+        total_share = sum(self.configs[name].share for name in active) or 1.0
+        return self.total_rps * self.configs[lane].share / total_share
+
+    def acquire(self, tokens_needed=1):
+        lane = getattr(self._local, 'lane', None)
+        if lane in self.configs:
+            while True:
+                with self.lock:
+                    now = time.monotonic()
+                    rate = self.lane_rate(lane)
+                    elapsed = now - self._last_refill[lane]
+                    self._tokens[lane] = min(self.burst_capacity, self._tokens[lane] + elapsed * rate)
+                    self._last_refill[lane] = now
+                    if self._tokens[lane] >= tokens_needed:
+                        self._tokens[lane] -= tokens_needed
+                        break
+                    wait_time = (tokens_needed - self._tokens[lane]) / rate
+                time.sleep(wait_time)
+        if self.base_limiter:
+            self.base_limiter.acquire(tokens_needed)
+        return True
+
+    def handle_throttle_error(self):
+        with self.lock:
+            self.total_rps = max(0.5, self.total_rps * 0.5)
+            logging.warning(f"Rate limit detected! Lane budget reduced to {self.total_rps:.2f} req/sec")
+        if self.base_limiter:
+            self.base_limiter.handle_throttle_error()
+
+    def handle_success(self):
+        """Başarılı istek sonrası şerit bütçesini yavaşça yapılandırılan hıza geri çıkarır"""
+        if self.total_rps < self.base_rps:
+            with self.lock:
+                self.total_rps = min(self.base_rps, self.total_rps * 1.05)
+        if self.base_limiter:
+            self.base_limiter.handle_success()
+
+
+class LaneScheduler:
+    """
+    Her şerit için ayrı thread havuzu ve rate payı olan zamanlayıcı.
+    Stok işleri hızlı şeritte hemen gönderilir; yavaş medya işleri arka planda kendi payıyla akar.
+    """
+    def __init__(self, shopify_api, max_workers: int, total_rps: float, lane_config: Optional[Dict[str, LaneConfig]] = None):
+        self.configs = lane_config or default_lane_config(max_workers)
+        self.limiter = LaneRateLimiter(total_rps, self.configs, base_limiter=shopify_api.rate_limiter)
+        self.shopify_api = shopify_api
+        self._previous_limiter = shopify_api.rate_limiter
+        shopify_api.rate_limiter = self.limiter
+        self.executors = {
+            lane: ThreadPoolExecutor(max_workers=cfg.workers, thread_name_prefix=f"Lane-{lane}",
+                                     initializer=self.limiter.bind_lane, initargs=(lane,))
+            for lane, cfg in self.configs.items()
+        }
+        self.pending = {lane: 0 for lane in self.configs}
+        self.lock = threading.Lock()
+
+    def submit(self, lane: str, fn, *args, **kwargs):
+        with self.lock:
+            self.pending[lane] += 1
+        self.limiter.mark_busy(lane, 1)
+        future = self.executors[lane].submit(fn, *args, **kwargs)
+        future.add_done_callback(lambda _f, lane=lane: self._task_done(lane))
+        return future
+
+    def _task_done(self, lane: str):
+        with self.lock:
+            self.pending[lane] -= 1
+        self.limiter.mark_busy(lane, -1)
+
+    def pending_counts(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.pending)
+
+    def shutdown(self, cancel: bool = False):
+        # Öncelik sırasıyla kapat: stok şeridi önce boşalsın
+        for lane in sorted(self.executors, key=lambda name: LANES.index(name) if name in LANES else len(LANES)):
+            self.executors[lane].shutdown(wait=True, cancel_futures=cancel)
+        self.shopify_api.rate_limiter = self._previous_limiter
@@ -0,0 +1,119 @@
+# operations/sync_timing.py - Senkronizasyon aşamalarının süre ve istek sayısı dökümü
+#
+# Her çalışma için aşama bazında (Shopify önbelleği, Sentos çekimi, eşleştirme, facet yazmaları)
+# duvar saati süresi, thread'lerde harcanan toplam süre ve API istek sayısı tutulur; ürün başına
+# gecikmelerden yüzdelikler hesaplanır. Sonuç log_manager'ın SQLite deposuna yazılır.
+#
+# İstekler, isteği yapan thread'in o anki aşamasına yazılır (ShopifyAPI/SentosAPI.sync_timer kancası).
+
+import math
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List
+
+# Raporlarda kullanılan aşama sırası; listede olmayanlar sona eklenir
+PHASES = ('shopify_cache', 'sentos_fetch', 'matching', 'create', 'details', 'stock', 'media', 'activation', 'other')
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """En yakın sıra yöntemiyle yüzdelik (değerler sıralı olmalı)."""
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values), max(1, math.ceil(q / 100 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+class SyncTimer:
+    """Thread-safe aşama zamanlayıcısı."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._phases: Dict[str, dict] = {}
+        self._latencies: List[float] = []
+
+    def _phase_stats(self, name: str) -> dict:
+        if name not in self._phases:
+            self._phases[name] = {'first': None, 'last': None, 'busy': 0.0, 'calls': 0, 'requests': 0}
+        return self._phases[name]
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Bloğu `name` aşamasına yazar. Eş zamanlı thread'lerde aynı aşama çalışabilir:
+        wall = ilk başlangıçtan son bitişe, busy = thread sürelerinin toplamı.
+        """
+        previous = getattr(self._local, 'phase', None)
+        self._local.phase = name
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            ended = time.monotonic()
+            self._local.phase = previous
+            with self._lock:
+                stats = self._phase_stats(name)
+                stats['first'] = started if stats['first'] is None else min(stats['first'], started)
+                stats['last'] = ended if stats['last'] is None else max(stats['last'], ended)
+                stats['busy'] += ended - started
+                stats['calls'] += 1
+
+    def count_request(self):
+        name = getattr(self._local, 'phase', None) or 'other'
+        with self._lock:
+            self._phase_stats(name)['requests'] += 1
+
+    def record_product(self, seconds: float):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def export(self) -> dict:
+        """Ham aşama verisi ve gecikmeler; başka bir process'teki zamanlayıcıyla merge() ile birleştirilebilir."""
+        with self._lock:
+            return {'phases': {name: dict(stats) for name, stats in self._phases.items()}, 'latencies': list(self._latencies)}
+
+    def merge(self, exported: dict):
+        """
+        export() çıktısını bu zamanlayıcıya ekler (örn. sharded çalışmada shard'ların dökümü).
+        monotonic saat sistem geneli olduğundan wall süresi process'ler arasında da ilk başlangıç-son bitiştir.
+        """
+        with self._lock:
+            for name, other in (exported or {}).get('phases', {}).items():
+                stats = self._phase_stats(name)
+                for bound, pick in (('first', min), ('last', max)):
+                    if other.get(bound) is not None:
+                        stats[bound] = other[bound] if stats[bound] is None else pick(stats[bound], other[bound])
+                for key in ('busy', 'calls', 'requests'):
+                    stats[key] += other.get(key, 0)
+            self._latencies.extend((exported or {}).get('latencies', []))
+
+    def summary(self) -> dict:
+        with self._lock:
+            phases = {name: dict(stats) for name, stats in self._phases.items()}
+            latencies = sorted(self._latencies)
+        order = {name: i for i, name in enumerate(PHASES)}
+        result = {'phases': {}, 'latency': {
+            'products': len(latencies),
+            'p50': round(percentile(latencies, 50), 3),
+            'p90': round(percentile(latencies, 90), 3),
+            'p99': round(percentile(latencies, 99), 3),
+            'max': round(latencies[-1], 3) if latencies else 0.0,
+        }}
+        for name in sorted(phases, key=lambda n: (order.get(n, len(PHASES)), n)):
+            stats = phases[name]
+            wall = (stats['last'] - stats['first']) if stats['first'] is not None else 0.0
+            result['phases'][name] = {'wall_seconds': round(wall, 3), 'busy_seconds': round(stats['busy'], 3),
+                                      'calls': stats['calls'], 'requests': stats['requests']}
+        return result
+
+
+def bind_phase(api, name: str):
+    """api.sync_timer varsa bloğu o aşamaya yazar; yoksa etkisizdir (testlerdeki sahte API'ler dahil)."""
+    timer = getattr(api, 'sync_timer', None)
+    return timer.phase(name) if isinstance(timer, SyncTimer) else nullcontext()
+
+
+def record_product_latency(api, started: float):
+    if isinstance(timer := getattr(api, 'sync_timer', None), SyncTimer):
+        timer.record_product(time.monotonic() - started)
@@ -0,0 +1,126 @@
+# operations/variant_fetcher.py - Birden çok ürünün varyantlarını tek nodes(ids:) sorgusuyla çekme
+
+import logging
+from typing import Dict, List, Optional
+
+from operations.batch_queue import BatchQueue
+from operations.sync_timing import bind_phase
+
+# Tek sorgu maliyet sınırı (1000 puan) içinde kalmak için: ürün başına ~2 + 50 * 2 puan
+VARIANTS_PER_NODE = 50
+PRODUCTS_PER_QUERY = 8
+# Ürün 50'den fazla varyanta sahipse kalan sayfalar ürün bazlı, 250'şer çekilir
+VARIANTS_PER_PAGE = 250
+
+VARIANT_FIELDS = """
+    pageInfo { hasNextPage endCursor }
+    edges {
+        node {
+            id
+            inventoryItem {
+                id
+                sku
+            }
+            selectedOptions {
+                name
+                value
+            }
+        }
+    }
+"""
+
+NODES_QUERY = """
+query getVariantsForProducts($ids: [ID!]!, $first: Int!) {
+    nodes(ids: $ids) {
+        ... on Product {
+            id
+            variants(first: $first) {%s}
+        }
+    }
+}
+""" % VARIANT_FIELDS
+
+PRODUCT_VARIANTS_PAGE_QUERY = """
+query getProductVariantsPage($id: ID!, $first: Int!, $cursor: String) {
+    product(id: $id) {
+        variants(first: $first, after: $cursor) {%s}
+    }
+}
+""" % VARIANT_FIELDS
+
+
+def _fetch_remaining_pages(shopify_api, product_gid: str, cursor: str) -> List[dict]:
+    """İlk sayfadan sonra kalan varyantları sayfalayarak çeker (250 sınırında sessizce kesilmez)."""
+    variants = []
+    while cursor:
+        data = shopify_api.execute_graphql(PRODUCT_VARIANTS_PAGE_QUERY, {"id": product_gid, "first": VARIANTS_PER_PAGE, "cursor": cursor})
+        connection = (data.get("product") or {}).get("variants") or {}
+        variants.extend(e['node'] for e in connection.get("edges", []))
+        page_info = connection.get("pageInfo") or {}
+        cursor = page_info.get("endCursor") if page_info.get("hasNextPage") else None
+    return variants
+
+
+def fetch_product_variants(shopify_api, product_gids: List[str]) -> Dict[str, Optional[List[dict]]]:
+    """
+    Verilen ürünlerin tüm varyantlarını (inventory item id ve sku ile) çeker.
+    Dönüş: {product_gid: varyant listesi}; sorgu hatası alan ürünler için None.
+    """
+    unique = list(dict.fromkeys(product_gids))
+    result: Dict[str, Optional[List[dict]]] = {}
+    for start in range(0, len(unique), PRODUCTS_PER_QUERY):
+        chunk = unique[start:start + PRODUCTS_PER_QUERY]
+        try:
+            data = shopify_api.execute_graphql(NODES_QUERY, {"ids": chunk, "first": VARIANTS_PER_NODE})
+        except Exception as e:
+            logging.error(f"Varyant bilgileri alınırken hata ({len(chunk)} ürün): {e}")
+            result.update({gid: None for gid in chunk})
+            continue
+
+        for node in data.get("nodes") or []:
+            if not node or not node.get('id'):
+                continue
+            connection = node.get("variants") or {}
+            variants = [e['node'] for e in connection.get("edges", [])]
+            page_info = connection.get("pageInfo") or {}
+            if page_info.get("hasNextPage"):
+                try:
+                    variants.extend(_fetch_remaining_pages(shopify_api, node['id'], page_info.get("endCursor")))
+                except Exception as e:
+                    logging.error(f"Ürün {node['id']} varyantlarının devamı alınamadı: {e}")
+                    result[node['id']] = None
+                    continue
+            result[node['id']] = variants
+        # Silinmiş ürünler nodes içinde null döner
+        for gid in chunk:
+            result.setdefault(gid, [])
+    return result
+
+
+class VariantFetcher:
+    """
+    Worker'ların varyant sorgularını toplayıp PRODUCTS_PER_QUERY ürünlük nodes(ids:) sorgularında birleştirir.
+    ShopifyAPI.variant_fetcher olarak takılır; stock_sync._get_shopify_variants varsa otomatik kullanır.
+    Aynı anda aynı ürünü isteyen worker'lar tek sonucu paylaşır.
+    """
+
+    def __init__(self, shopify_api, linger: float = 0.1):
+        self.shopify_api = shopify_api
+        self._previous = getattr(shopify_api, 'variant_fetcher', None)
+        self.queue = BatchQueue("variants", self._flush, PRODUCTS_PER_QUERY, linger, error_result=lambda e: None)
+        shopify_api.variant_fetcher = self
+
+    def _flush(self, product_gids):
+        # Öncelikli şeritler açıksa sorgular stok şeridinin rate payından harcanır
+        if bind_lane := getattr(self.shopify_api.rate_limiter, 'bind_lane', None):
+            bind_lane('inventory')
+        with bind_phase(self.shopify_api, 'stock'):
+            fetched = fetch_product_variants(self.shopify_api, product_gids)
+        return [fetched.get(gid) for gid in product_gids]
+
+    def get_variants(self, product_gid: str) -> Optional[List[dict]]:
+        return self.queue.submit([product_gid])[0]
+
+    def close(self):
+        self.queue.close()
+        self.shopify_api.variant_fetcher = self._previous
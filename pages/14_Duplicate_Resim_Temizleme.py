@@ -19,6 +19,8 @@ from utils.style_loader import load_global_css
 load_global_css()
 import logging
 from connectors.shopify_api import ShopifyAPI
+from operations.media_fingerprint import MediaFingerprintStore
+from cleanup_duplicate_images import find_and_remove_hash_duplicates
 import config_manager
 import time
 
@@ -45,7 +47,8 @@ st.info("""
 ⚠️ **UYARI:** Bu araç duplicate resimleri tespit edip siler.
 
 **Duplicate Nasıl Tespit Edilir?**
-- Aynı ALT text'e sahip birden fazla resim varsa, ilki korunur, diğerleri silinir.
+- **ALT text:** Aynı ALT text'e sahip birden fazla resim varsa, ilki korunur, diğerleri silinir.
+- **İçerik hash'i:** Senkronizasyonun yüklediği resimlerin kayıtlı içerik hash'lerine göre bayt bazında aynı olanlar bulunur (ürün taraması yapılmaz). İlk yüklenen korunur.
 
 **Güvenlik:**
 - İlk 20 ürün ile test edilir
@@ -61,8 +64,48 @@ with col1:
 with col2:
     test_limit = st.number_input("Test Ürün Sayısı", min_value=1, max_value=100, value=20)
 
+detection_method = st.radio("Tespit Yöntemi", ["ALT text", "İçerik hash'i"], horizontal=True)
+
 st.markdown("---")
 
+if detection_method == "İçerik hash'i":
+    if st.button("🚀 Temizlemeyi Başlat", type="primary"):
+        try:
+            shopify_api = ShopifyAPI(user_keys["shopify_store"], user_keys["shopify_token"])
+            with st.spinner("Kayıtlı medya parmak izleri inceleniyor..."):
+                results = find_and_remove_hash_duplicates(
+                    shopify_api, MediaFingerprintStore(user_keys["shopify_store"]), dry_run=dry_run)
+
+            title_by_gid = {}
+            if results:
+                shopify_api.load_all_products_for_cache()
+                title_by_gid = {p['gid']: p.get('title', 'Bilinmeyen') for p in shopify_api.product_cache.values() if p.get('gid')}
+
+            st.markdown("### 📊 Temizleme Sonuçları:")
+            for product_gid, result in results.items():
+                st.markdown(f"""
+                <div style='padding: 10px; margin: 5px 0; border-left: 3px solid #ff6b6b; background: #fff3f3;'>
+                    <strong>⚠️ {title_by_gid.get(product_gid, product_gid)}</strong><br>
+                    <small>Aynı içerikli resim: {len(result['duplicates'])}</small>
+                </div>
+                """, unsafe_allow_html=True)
+
+            total_duplicates = sum(len(r['duplicates']) for r in results.values())
+            col1, col2 = st.columns(2)
+            col1.metric("Duplicate Bulunan Ürün", len(results))
+            if dry_run:
+                col2.metric("Silinecek Resim", total_duplicates, help="DRY RUN - Silinmedi")
+            else:
+                col2.metric("Silinen Resim", sum(r['deleted'] for r in results.values()))
+
+            if total_duplicates == 0:
+                st.success("✅ Aynı içerikli resim bulunamadı!")
+            elif dry_run:
+                st.warning("💡 Gerçekten silmek için DRY RUN'ı kapatıp tekrar çalıştırın.")
+        except Exception as e:
+            st.error(f"❌ Hata: {str(e)}")
+    st.stop()
+
 if st.button("🚀 Temizlemeyi Başlat", type="primary"):
     try:
         # ShopifyAPI oluştur
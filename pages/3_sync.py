@@ -25,6 +25,7 @@ from sync_runner import (
     sync_missing_products_only,
     sync_single_product_by_sku
 )
+from operations.progress_bus import log_entries
 
 # --- Session State Başlatma ---
 if 'sync_running' not in st.session_state:
@@ -143,9 +144,10 @@ def display_progress(title, results_key, log_key):
                     cols[3].metric("❌ Hatalı", stats.get('failed', 0))
                     cols[4].metric("⏭️ Atlandı", stats.get('skipped', 0))
 
-            if 'log_detail' in update:
-                st.session_state[log_key].insert(0, update['log_detail'])
-                log_html = "".join(st.session_state[log_key][:50])
+            if entries := log_entries(update):
+                # Yeni satırlar üste eklenir; liste son 50 satırla sınırlı tutulur
+                st.session_state[log_key] = (entries[::-1] + st.session_state[log_key])[:50]
+                log_html = "".join(st.session_state[log_key])
                 log_placeholder.markdown(f'<div style="height:300px;overflow-y:scroll;border:1px solid #333;padding:10px;border-radius:5px;font-family:monospace;">{log_html}</div>', unsafe_allow_html=True)
             
             if update.get('status') in ['done', 'error']:
@@ -179,6 +181,31 @@ def display_results(title, results):
     cols[3].metric("❌ Hatalı", stats.get('failed', 0))
     cols[4].metric("⏭️ Atlandı", stats.get('skipped', 0))
 
+    if plan := results.get('plan'):
+        st.markdown("##### 🗺️ Senkronizasyon Planı" + (" (Dry-Run: hiçbir değişiklik yapılmadı)" if results.get('dry_run') else ""))
+        plan_cols = st.columns(3)
+        plan_cols[0].metric("Tahmini Maliyet (puan)", plan.get('estimated_cost', 0))
+        plan_cols[1].metric("Tahmini İstek Sayısı", plan.get('estimated_requests', 0))
+        plan_cols[2].metric("Tahmini Süre", plan.get('eta', 'N/A'))
+        if plan.get('operations'):
+            st.dataframe(pd.DataFrame([{'İşlem': k, 'Adet': v} for k, v in plan['operations'].items()]), hide_index=True)
+        if plan.get('has_estimates'):
+            st.caption("Resim farkları ve stok yazmaları önbellekten kesin bilinemediği için tahminidir (üst sınır).")
+
+    if unmatched := results.get('unmatched'):
+        with st.expander(f"🔍 Shopify'da Eşleşmeyen Ürünler ({len(unmatched)})"):
+            st.caption("Bu ürünler SKU, barkod veya başlıkla eşleşmedi. Adaylar ana model kodu ve başlık benzerliğine göre önerilir; aday varsa, kopya oluşmaması için SKU/başlık farkını kontrol edin.")
+            st.dataframe(pd.DataFrame([{
+                'Ürün': u['name'], 'SKU': u['sku'],
+                'Olası Eşleşmeler': ", ".join(f"{s['title']} (%{int(s['score'] * 100)})" for s in u['suggestions']) or "-",
+            } for u in unmatched]), use_container_width=True, hide_index=True)
+
+    if timings := results.get('timings'):
+        with st.expander("⏱️ Aşama Süreleri"):
+            st.dataframe(pd.DataFrame([{'Aşama': phase, **t} for phase, t in timings['phases'].items()]), hide_index=True)
+            latency = timings['latency']
+            st.caption(f"Ürün başına gecikme — p50: {latency['p50']}s, p90: {latency['p90']}s, p99: {latency['p99']}s, en yüksek: {latency['max']}s")
+
     with st.expander("Detaylı Raporu Görüntüle"):
         details = results.get('details', [])
         if details:
@@ -222,6 +249,10 @@ else:
     col1, col2 = st.columns(2)
     test_mode = col1.checkbox("Test Modu (İlk 20 ürünü senkronize et)", value=True, help="Tam bir senkronizasyon çalıştırmadan bağlantıyı ve mantığı test etmek için yalnızca Sentos'taki ilk 20 ürünü işler.")
     max_workers = col2.number_input("Eş Zamanlı Çalışan Sayısı", 1, 50, 2, help="Aynı anda işlenecek ürün sayısı. API limitlerine takılmamak için dikkatli artırın.")
+    skip_unchanged = st.checkbox("Değişmeyen Ürünleri Atla", value=True, help="Sentos verisi son başarılı senkronizasyondan beri değişmeyen ürünlerin (ve ürün parçalarının) güncellemesini atlar. Kapalıyken tüm eşleşen ürünler güncellenir.")
+    priority_lanes = st.checkbox("Öncelikli Şeritler (Önce Stok, En Son Resimler)", value=True, help="Tüm ürünlerin stok güncellemeleri önce gönderilir; açıklama ve resim işleri ayrı şeritlerde, rate bütçesinin daha küçük bir payıyla arka planda işlenir.")
+    resume = st.checkbox("Yarım Kalan Çalışmadan Devam Et", value=False, help="Aynı mod için son 24 saatte yarım kalan (hata, durdurma veya zaman aşımı) bir çalışma varsa, daha önce başarıyla işlenen ürünleri tekrar işlemez.")
+    dry_run = st.checkbox("Dry-Run (Sadece Planı Göster)", value=False, help="Shopify'a hiçbir şey yazmadan, her ürün için yapılacak işlemleri, tahmini GraphQL maliyetini ve süreyi raporlar.")
 
     if st.button("🚀 Genel Senkronizasyonu Başlat", type="primary", use_container_width=True, disabled=not sync_ready):
         st.session_state.sync_running = True
@@ -238,6 +269,10 @@ else:
             'test_mode': test_mode, 
             'max_workers': max_workers, 
             'sync_mode': sync_mode,
+            'skip_unchanged': skip_unchanged,
+            'resume': resume,
+            'priority_lanes': priority_lanes,
+            'dry_run': dry_run,
             'progress_callback': st.session_state.progress_queue.put,
             'stop_event': st.session_state.stop_sync_event
         }
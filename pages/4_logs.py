@@ -372,6 +372,46 @@ if show_charts and not df.empty:
                          annotation_text="Hedef: %95")
             st.plotly_chart(fig, use_container_width=True)
 
+# Aşama bazında süre dökümü (operations.sync_timing)
+if show_charts and LOG_MANAGER_AVAILABLE:
+    phase_rows = log_manager.get_phase_timings(limit_runs=30)
+    if phase_rows:
+        st.markdown("---")
+        st.subheader("⏱️ Senkronizasyon Aşama Süreleri")
+        phase_df = pd.DataFrame(phase_rows)
+        phase_df['timestamp'] = pd.to_datetime(phase_df['timestamp'])
+        phase_df['run'] = phase_df['timestamp'].dt.strftime('%d.%m %H:%M') + " #" + phase_df['log_id'].astype(str)
+
+        phase_tab1, phase_tab2, phase_tab3 = st.tabs(["🧱 Aşama Süreleri", "🌐 İstek Sayıları", "📦 Ürün Gecikmesi"])
+        with phase_tab1:
+            fig = px.bar(phase_df, x='run', y='wall_seconds', color='phase',
+                         title="Çalışma Başına Aşama Süreleri (duvar saati, sn)",
+                         labels={'wall_seconds': 'Süre (sn)', 'run': 'Çalışma', 'phase': 'Aşama'})
+            st.plotly_chart(fig, use_container_width=True)
+
+            # Son çalışma, önceki çalışmaların medyanıyla karşılaştırılır
+            runs = phase_df['log_id'].drop_duplicates().tolist()
+            if len(runs) > 1:
+                last = phase_df[phase_df['log_id'] == runs[-1]].set_index('phase')
+                baseline = phase_df[phase_df['log_id'].isin(runs[:-1])].groupby('phase')[['wall_seconds', 'requests']].median()
+                comparison = last[['wall_seconds', 'requests']].join(baseline, rsuffix='_median', how='left')
+                comparison['değişim_%'] = ((comparison['wall_seconds'] / comparison['wall_seconds_median'] - 1) * 100).round(1)
+                st.markdown("**Son Çalışma vs. Önceki Çalışmaların Medyanı**")
+                st.dataframe(comparison, use_container_width=True)
+                if (regressed := comparison[(comparison['değişim_%'] > 25) & (comparison['wall_seconds'] > 5)]).shape[0]:
+                    st.warning("⚠️ Yavaşlayan aşamalar: " + ", ".join(regressed.index))
+        with phase_tab2:
+            fig = px.bar(phase_df, x='run', y='requests', color='phase',
+                         title="Çalışma Başına API İstekleri",
+                         labels={'requests': 'İstek', 'run': 'Çalışma', 'phase': 'Aşama'})
+            st.plotly_chart(fig, use_container_width=True)
+        with phase_tab3:
+            latency_df = phase_df.drop_duplicates('log_id')[['run', 'p50', 'p90', 'p99', 'max_seconds']]
+            fig = px.line(latency_df.melt(id_vars='run', var_name='yüzdelik', value_name='saniye'),
+                          x='run', y='saniye', color='yüzdelik', markers=True,
+                          title="Ürün Başına Gecikme Yüzdelikleri")
+            st.plotly_chart(fig, use_container_width=True)
+
 # Detaylı Log Tablosu
 if show_details:
     st.markdown("---")
@@ -14,7 +14,6 @@ if project_root not in sys.path:
 from utils.style_loader import load_global_css
 load_global_css()
 import pandas as pd
-import math
 import numpy as np
 import json
 from io import StringIO
@@ -23,7 +22,6 @@ import threading
 import time
 import logging
 import traceback
-from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Logging ayarları
@@ -33,11 +31,14 @@ logging.basicConfig(
 )
 
 # gsheets_manager.py'den gerekli fonksiyonları içe aktar
-from operations.price_sync import SmartRateLimiter, update_prices_for_single_product
+from operations.price_sync import (SmartRateLimiter, ShopifyCatalogIndex, compute_price_updates, update_prices_for_single_product,
+                                   update_prices_for_products)
+from operations.pricing_rules import PricingRules
+from operations.pricing_scenarios import ScenarioEngine
 from gsheets_manager import load_pricing_data_from_gsheets, save_pricing_data_to_gsheets
 from connectors.shopify_api import ShopifyAPI
 from connectors.sentos_api import SentosAPI
-from data_manager import load_user_data
+from data_manager import load_user_data, load_user_frame, save_user_data
 from config_manager import load_all_user_keys
 
 class RateLimiter:
@@ -98,9 +99,12 @@ def load_and_verify_user_data(username):
     st.session_state.update(user_keys)
     user_price_data = load_user_data(username)
     try:
-        if price_df_json := user_price_data.get('price_df_json'):
+        # Tablolar şifreli sütunsal dosyalardan okunur; eski JSON kayıtları load_user_data'da taşınır
+        st.session_state.price_df = load_user_frame(username, 'price_df')
+        st.session_state.calculated_df = load_user_frame(username, 'calculated_df')
+        if st.session_state.price_df is None and (price_df_json := user_price_data.get('price_df_json')):
             st.session_state.price_df = pd.read_json(StringIO(price_df_json), orient='split')
-        if calculated_df_json := user_price_data.get('calculated_df_json'):
+        if st.session_state.calculated_df is None and (calculated_df_json := user_price_data.get('calculated_df_json')):
             st.session_state.calculated_df = pd.read_json(StringIO(calculated_df_json), orient='split')
     except Exception:
         st.session_state.price_df, st.session_state.calculated_df = None, None
@@ -175,17 +179,6 @@ def process_sentos_data(product_list):
 
     return df_variants, df_main_products
 
-def apply_rounding(price, method):
-    if method == "Yukarı Yuvarla":
-        if price % 10 != 9.99 and price % 10 != 9: 
-            return math.floor(price / 10) * 10 + 9.99
-        elif price % 1 == 0: 
-            return price - 0.01
-        return price
-    elif method == "Aşağı Yuvarla":
-        return math.floor(price / 10) * 10 - 0.01 if price > 10 else 9.99
-    return price
-
 # --- Session State Başlatma ---
 st.session_state.setdefault('calculated_df', None)
 st.session_state.setdefault('df_for_display', None)
@@ -197,77 +190,54 @@ st.session_state.setdefault('update_in_progress', False)
 st.session_state.setdefault('sync_results', None)
 st.session_state.setdefault('last_failed_skus', [])
 st.session_state.setdefault('last_update_results', {})
+# Tablolar ve senaryolar içerik özeti + parametrelerle önbelleklenir (kaydırıcı hareketlerinde yeniden hesap yok)
+st.session_state.setdefault('scenario_engine', ScenarioEngine())
 
-def _process_one_product_for_price_sync(shopify_api, product_base_sku, all_variants_df, price_data_df, price_col, compare_col, rate_limiter):
+def _retry_failed_prices(shopify_api, shopify_store, retry_skus, current_shopify_data, price_data_df, price_col, compare_col,
+                         variants_df, worker_count, update_choice, queue):
     """
-    GraphQL ile optimize edilmiş tek ürün işleme fonksiyonu.
-    Tek GraphQL call ile hem ürün hem varyantları al ve güncelle.
+    Önceki çalışmada başarısız olan model kodlarını ürün bazında yeniden gönderir.
+    Fiyat ve katalog indeksleri (zaten çekilmiş katalogdan) bir kez kurulur; ürün başına okuma sorgusu yapılmaz.
     """
-    try:
-        # İlk önce fiyat verisini kontrol et
-        price_row = price_data_df.loc[price_data_df['MODEL KODU'] == product_base_sku]
-        if price_row.empty:
-            return {"status": "skipped", "reason": f"Fiyat bulunamadı: {product_base_sku}"}
-        
-        price_to_set = price_row.iloc[0][price_col]
-        compare_price_to_set = price_row.iloc[0].get(compare_col)
-
-        # GraphQL ile ürün ve tüm varyantlarını al
-        query = """
-        query getProductWithVariants($query: String!) {
-            products(first: 1, query: $query) {
-                edges {
-                    node {
-                        id
-                        variants(first: 100) {
-                            edges {
-                                node {
-                                    id
-                                    sku
-                                }
-                            }
-                        }
-                    }
-                }
-            }
+    from operations.price_snapshot import PriceSnapshotStore
+    catalog_index = ShopifyCatalogIndex.from_rows(current_shopify_data, variants_df)
+    product_ids = {match[0] for sku in retry_skus if (match := catalog_index.lookup(sku))}
+    queue.put({'progress': 30, 'message': f'{len(retry_skus)} başarısız model kodu tekrar deneniyor...'})
+
+    snapshot_store = PriceSnapshotStore(shopify_store)
+    snapshot_id = snapshot_store.save(
+        (row for row in current_shopify_data if row.get('product_id') in product_ids),
+        source='price_sync', description=f"{update_choice}: {len(retry_skus)} model kodu (tekrar deneme)")
+    if snapshot_id:
+        queue.put({'log_detail': f"💾 Eski fiyatlar kaydedildi (geri alma #{snapshot_id})"})
+
+    def progress(done, total):
+        if done % 5 == 0 or done == total:
+            queue.put({'progress': 30 + int(done / total * 70), 'message': f'Tekrar deneniyor: {done}/{total}'})
+
+    start_time = time.time()
+    rate_limiter = SmartRateLimiter(max_requests_per_second=2.5, burst_capacity=15)
+    results = update_prices_for_products(shopify_api, retry_skus, price_data_df, price_col, compare_col, rate_limiter, variants_df,
+                                         catalog_index=catalog_index, max_workers=worker_count, progress_callback=progress)
+    success_count = sum(1 for result in results.values() if result.get('status') == 'success')
+    failed_details = [{"sku": sku, "status": "failed", "reason": result.get('reason')}
+                      for sku, result in results.items() if result.get('status') == 'failed']
+    for detail in failed_details:
+        queue.put({'log_detail': f"❌ {detail['sku']}: {detail['reason']}"})
+    if snapshot_id:
+        snapshot_store.mark_finished(snapshot_id, success_count, len(failed_details))
+
+    total_time = time.time() - start_time
+    queue.put({
+        "status": "done",
+        "results": {
+            "success": success_count,
+            "failed": len(failed_details),
+            "details": failed_details,
+            "avg_rate": f"{len(results) / total_time:.2f} ürün/sn" if total_time > 0 else "0",
+            "total_time": f"{total_time:.1f} saniye"
         }
-        """
-        
-        rate_limiter.wait()
-        result = shopify_api.execute_graphql(query, {"query": f"sku:{product_base_sku}*"})
-        
-        product_edges = result.get("products", {}).get("edges", [])
-        if not product_edges:
-            return {"status": "failed", "reason": f"Shopify'da ürün bulunamadı: {product_base_sku}"}
-        
-        product = product_edges[0]['node']
-        product_id = product['id']
-        
-        # Base SKU ile başlayan varyantları filtrele ve updates hazırla
-        updates = []
-        for v_edge in product.get('variants', {}).get('edges', []):
-            variant = v_edge['node']
-            variant_sku = variant.get('sku', '')
-            
-            if variant_sku.startswith(product_base_sku):
-                payload = {
-                    "id": variant['id'],
-                    "price": f"{price_to_set:.2f}"
-                }
-                if compare_price_to_set is not None and pd.notna(compare_price_to_set):
-                    payload["compareAtPrice"] = f"{compare_price_to_set:.2f}"
-                updates.append(payload)
-
-        if not updates:
-            return {"status": "skipped", "reason": "Eşleşen varyant bulunamadı."}
-
-        # GraphQL bulk mutation ile fiyatları güncelle
-        from operations.price_sync import update_prices_for_single_product
-        return update_prices_for_single_product(shopify_api, product_id, updates, rate_limiter)
-
-    except Exception as e:
-        return {"status": "failed", "reason": str(e)}
-
+    })
 
 def _run_price_sync(
     shopify_store, shopify_token, 
@@ -294,20 +264,6 @@ def _run_price_sync(
         if variants_df is None or price_data_df is None:
             raise ValueError("Güncelleme için veri bulunamadı.")
             
-        # Fiyat haritası oluştur: SKU -> {price, compare_at}
-        target_prices = {}
-        for _, row in price_data_df.iterrows():
-            sku = str(row['MODEL KODU']).strip()
-            try:
-                price = float(row[price_col])
-                compare = float(row[compare_col]) if compare_col and pd.notna(row.get(compare_col)) else None
-                target_prices[sku] = {'price': price, 'compare': compare}
-            except (ValueError, TypeError):
-                continue
-                
-        # Varyant tablosundan da ekle (Eğer ana tabloda yoksa)
-        # Not: Genellikle ana tablo yeterlidir ama varyant bazlı fiyat varsa buraya eklenebilir.
-        
         queue.put({'progress': 5, 'message': 'Mevcut Shopify fiyatları çekiliyor (Bulk)...'})
         
         # 2. MEVCUT SHOPIFY VERİLERİNİ ÇEK (BULK)
@@ -325,70 +281,18 @@ def _run_price_sync(
             
         queue.put({'progress': 20, 'message': 'Değişiklikler analiz ediliyor...'})
         
+        # ⏯️ Kaldığı yerden devam: önceki çalışmada başarısız olan model kodları ürün bazında yeniden gönderilir
+        if kwargs.get('continue_from_last'):
+            retry_skus = [sku for sku in kwargs.get('last_failed_skus') or [] if sku and not str(sku).startswith('GID-')]
+            if retry_skus:
+                _retry_failed_prices(shopify_api, shopify_store, retry_skus, current_shopify_data, price_data_df, price_col,
+                                     compare_col, variants_df, actual_worker_count, update_choice, queue)
+                return
+
         # 3. DIFF ANALİZİ (Hangi ürünler güncellenmeli?)
-        products_to_update = defaultdict(list) # product_id -> [variant_updates]
-        
-        skipped_count = 0
-        total_variants_checked = 0
-        
-        # --- DIFF MANTIĞI REVİZE ---
-        # variants_df kullanarak: Variant SKU -> Base SKU -> Target Price
-        variant_to_price_map = {}
-        
-        # 1. Ana ürün fiyatlarını al
-        base_sku_prices = target_prices # Base SKU -> Price
-        
-        # 2. Varyantların fiyatlarını belirle
-        # base_sku sütunu kontrolü
-        has_base_sku = 'base_sku' in variants_df.columns
-        
-        for _, row in variants_df.iterrows():
-            v_sku = str(row['MODEL KODU']).strip()
-            b_sku = str(row['base_sku']).strip() if has_base_sku else v_sku
-            
-            if b_sku in base_sku_prices:
-                variant_to_price_map[v_sku] = base_sku_prices[b_sku]
-        
-        # 3. Şimdi Shopify verilerini tara
-        for item in current_shopify_data:
-            total_variants_checked += 1
-            sku = str(item.get('sku', '')).strip()
-            product_id = item.get('product_id')
-            variant_id = item.get('variant_id')
-            current_price = float(item.get('price', 0))
-            current_compare = float(item.get('compare_at_price')) if item.get('compare_at_price') else None
-            
-            target = variant_to_price_map.get(sku)
-            
-            # Eğer varyant SKU'su listede yoksa, belki ana SKU'dur?
-            if not target and sku in base_sku_prices:
-                target = base_sku_prices[sku]
-            
-            if target:
-                new_price = target['price']
-                new_compare = target['compare']
-                
-                # Değişiklik var mı?
-                price_changed = abs(current_price - new_price) > 0.01
-                compare_changed = False
-                if new_compare is not None:
-                    if current_compare is None:
-                        compare_changed = True
-                    else:
-                        compare_changed = abs(current_compare - new_compare) > 0.01
-                elif current_compare is not None:
-                    # Yeni compare yok ama eskisi var -> silinmeli mi? 
-                    # Mevcut mantıkta compare silme yok, sadece varsa güncelleme var.
-                    pass
-                
-                if price_changed or compare_changed:
-                    payload = {"id": variant_id, "price": f"{new_price:.2f}"}
-                    if new_compare is not None:
-                        payload["compareAtPrice"] = f"{new_compare:.2f}"
-                    
-                    products_to_update[product_id].append(payload)
-                else:
-                    skipped_count += 1
+        # Varyant SKU -> Base SKU -> Hedef fiyat eşleşmesi ve değişiklik tespiti toplu (pandas/NumPy) yapılır
+        products_to_update, diff_stats = compute_price_updates(current_shopify_data, price_data_df, variants_df, price_col, compare_col)
+        skipped_count = diff_stats['unchanged']
         
         total_products_to_update = len(products_to_update)
         queue.put({'progress': 30, 'message': f'Analiz tamamlandı. {total_products_to_update} ürün güncellenecek. ({skipped_count} varyant atlandı)'})
@@ -403,6 +307,25 @@ def _run_price_sync(
             })
             return
 
+        # Yazmadan önce değişecek varyantların mevcut fiyatları kaydedilir (Ekstra İşlemler > Fiyat Geri Alma)
+        from operations.price_snapshot import PriceSnapshotStore
+        snapshot_store = PriceSnapshotStore(shopify_store)
+        changing_variants = {update['id'] for updates in products_to_update.values() for update in updates}
+        snapshot_id = snapshot_store.save(
+            (row for row in current_shopify_data if row.get('variant_id') in changing_variants),
+            source='price_sync', description=f"{update_choice}: {total_products_to_update} ürün")
+        if snapshot_id:
+            queue.put({'log_detail': f"💾 Eski fiyatlar kaydedildi (geri alma #{snapshot_id})"})
+
+        # Başarısız ürünler model koduyla raporlanır; "Kaldığı yerden devam et" bunları yeniden dener
+        base_map = {}
+        if 'base_sku' in variants_df.columns:
+            base_map = dict(zip(variants_df['MODEL KODU'].astype(str).str.strip(), variants_df['base_sku'].astype(str).str.strip()))
+        product_models = {}
+        for row in current_shopify_data:
+            if row.get('product_id') in products_to_update and (sku := str(row.get('sku') or '').strip()):
+                product_models.setdefault(row['product_id'], base_map.get(sku, sku))
+
         # 4. GÜNCELLEME (THREADED)
         processed_count = 0
         success_count = 0
@@ -410,7 +333,6 @@ def _run_price_sync(
         failed_details = []
         start_time = time.time()
         
-        from operations.price_sync import SmartRateLimiter, update_prices_for_single_product
         rate_limiter = SmartRateLimiter(max_requests_per_second=2.5, burst_capacity=15)
         
         with ThreadPoolExecutor(max_workers=actual_worker_count) as executor:
@@ -434,7 +356,7 @@ def _run_price_sync(
                         # queue.put({'log_detail': f"✅ Ürün {p_id}: Güncellendi"})
                     else:
                         failed_count += 1
-                        failed_details.append({"sku": f"GID-{p_id}", "status": "failed", "reason": result.get('reason')})
+                        failed_details.append({"sku": product_models.get(p_id, f"GID-{p_id}"), "status": "failed", "reason": result.get('reason')})
                         queue.put({'log_detail': f"❌ Ürün {p_id}: {result.get('reason')}"})
                 except Exception as e:
                     failed_count += 1
@@ -455,7 +377,9 @@ def _run_price_sync(
 
         total_time = time.time() - start_time
         avg_rate = processed_count / total_time if total_time > 0 else 0
-        
+        if snapshot_id:
+            snapshot_store.mark_finished(snapshot_id, success_count, failed_count)
+
         queue.put({
             "status": "done", 
             "results": {
@@ -557,16 +481,15 @@ if st.session_state.df_for_display is not None and not st.session_state.update_i
         add_vat = c2.checkbox("Satışa KDV Dahil Et", value=True, key="add_vat")
         vat_rate = c2.number_input("KDV Oranı (%)", 0, 100, 10, disabled=not add_vat, key="vat_rate")
         rounding_method_text = c3.radio("Fiyat Yuvarlama", ["Yok", "Yukarı (X9.99)", "Aşağı (X9.99)"], index=1, key="rounding")
+        min_price = c3.number_input("Taban Fiyat (₺, 0 = yok)", min_value=0.0, value=0.0, step=10.0, key="min_price")
+        max_price = c4.number_input("Tavan Fiyat (₺, 0 = yok)", min_value=0.0, value=0.0, step=10.0, key="max_price")
         if c4.button("💰 Fiyatları Hesapla", type="primary", use_container_width=True):
-            df = st.session_state.df_for_display.copy()
-            df['SATIS_FIYATI_KDVSIZ'] = df['ALIŞ FİYATI'] * (1 + markup_value / 100) if markup_type == "Yüzde Ekle (%)" else df['ALIŞ FİYATI'] * markup_value
-            df['SATIS_FIYATI_KDVLI'] = df['SATIS_FIYATI_KDVSIZ'] * (1 + vat_rate / 100) if add_vat else df['SATIS_FIYATI_KDVSIZ']
             rounding_method_arg = rounding_method_text.replace(" (X9.99)", "").replace("Aşağı", "Aşağı Yuvarla").replace("Yukarı", "Yukarı Yuvarla")
-            df['NIHAI_SATIS_FIYATI'] = df['SATIS_FIYATI_KDVLI'].apply(lambda p: apply_rounding(p, rounding_method_arg))
-            revenue = df['NIHAI_SATIS_FIYATI'] / (1 + vat_rate / 100) if add_vat else df['NIHAI_SATIS_FIYATI']
-            df['KÂR'] = revenue - df['ALIŞ FİYATI']
-            df['KÂR ORANI (%)'] = np.divide(df['KÂR'], df['ALIŞ FİYATI'], out=np.zeros_like(df['KÂR']), where=df['ALIŞ FİYATI']!=0) * 100
-            st.session_state.calculated_df = df
+            rules = PricingRules(markup_type=markup_type, markup_value=markup_value, add_vat=add_vat, vat_rate=vat_rate,
+                                 rounding=rounding_method_arg, min_price=min_price or None, max_price=max_price or None)
+            st.session_state.calculated_df = st.session_state.scenario_engine.main_table(st.session_state.df_for_display, rules)
+            # Sonraki oturumlarda tablo yeniden hesaplanmadan açılsın
+            save_user_data(st.session_state.get('username'), calculated_df=st.session_state.calculated_df)
             st.toast("Fiyatlar hesaplandı.")
             st.rerun()
 
@@ -575,6 +498,7 @@ if st.session_state.calculated_df is not None:
     st.subheader("Adım 3: Senaryoları Analiz Et")
     df = st.session_state.calculated_df
     vat_rate = st.session_state.get('vat_rate', 10)
+    scenario_engine = st.session_state.scenario_engine
     
     with st.expander("Tablo 1: Ana Fiyat ve Kârlılık Listesi (Referans)", expanded=True):
         main_df_display = df[['MODEL KODU', 'ÜRÜN ADI', 'ALIŞ FİYATI', 'SATIS_FIYATI_KDVSIZ', 'NIHAI_SATIS_FIYATI', 'KÂR', 'KÂR ORANI (%)']]
@@ -585,12 +509,7 @@ if st.session_state.calculated_df is not None:
     
     with st.expander("Tablo 2: Perakende İndirim Analizi", expanded=True):
         retail_discount = st.slider("İndirim Oranı (%)", 0, 50, 10, 5, key="retail_slider")
-        retail_df = df.copy()
-        retail_df['İNDİRİM ORANI (%)'] = retail_discount
-        retail_df['İNDİRİMLİ SATIŞ FİYATI'] = retail_df['NIHAI_SATIS_FIYATI'] * (1 - retail_discount / 100)
-        revenue_after_discount = retail_df['İNDİRİMLİ SATIŞ FİYATI'] / (1 + vat_rate / 100)
-        retail_df['İNDİRİM SONRASI KÂR'] = revenue_after_discount - retail_df['ALIŞ FİYATI']
-        retail_df['İNDİRİM SONRASI KÂR ORANI (%)'] = np.divide(retail_df['İNDİRİM SONRASI KÂR'], retail_df['ALIŞ FİYATI'], out=np.zeros_like(retail_df['İNDİRİM SONRASI KÂR']), where=retail_df['ALIŞ FİYATI']!=0) * 100
+        retail_df = scenario_engine.retail_table(df, retail_discount, vat_rate)
         st.session_state.retail_df = retail_df
         discount_df_display = retail_df[['MODEL KODU', 'ÜRÜN ADI', 'NIHAI_SATIS_FIYATI', 'İNDİRİM ORANI (%)', 'İNDİRİMLİ SATIŞ FİYATI', 'İNDİRİM SONRASI KÂR', 'İNDİRİM SONRASI KÂR ORANI (%)']]
         st.dataframe(discount_df_display.style.format({
@@ -600,20 +519,45 @@ if st.session_state.calculated_df is not None:
     
     with st.expander("Tablo 3: Toptan Satış Fiyat Analizi", expanded=True):
         wholesale_method = st.radio("Toptan Fiyat Yöntemi", ('Çarpanla', 'İndirimle'), horizontal=True, key="ws_method")
-        wholesale_df = df.copy()
         if wholesale_method == 'Çarpanla':
-            ws_multiplier = st.number_input("Toptan Çarpanı", 1.0, 5.0, 1.8, 0.1)
-            wholesale_df["TOPTAN FİYAT (KDV'siz)"] = wholesale_df["ALIŞ FİYATI"] * ws_multiplier
+            ws_value = st.number_input("Toptan Çarpanı", 1.0, 5.0, 1.8, 0.1)
         else:
-            ws_discount = st.slider("Perakende Fiyatından İndirim (%)", 10, 70, 40, 5, key="ws_discount")
-            wholesale_df["TOPTAN FİYAT (KDV'siz)"] = (wholesale_df["NIHAI_SATIS_FIYATI"] / (1 + vat_rate / 100)) * (1 - ws_discount / 100)
-        wholesale_df["TOPTAN FİYAT (KDV'li)"] = wholesale_df["TOPTAN FİYAT (KDV'siz)"] * (1 + vat_rate / 100)
-        wholesale_df['TOPTAN KÂR'] = wholesale_df["TOPTAN FİYAT (KDV'siz)"] - wholesale_df["ALIŞ FİYATI"]
+            ws_value = st.slider("Perakende Fiyatından İndirim (%)", 10, 70, 40, 5, key="ws_discount")
+        wholesale_df = scenario_engine.wholesale_table(df, wholesale_method, ws_value, vat_rate)
         wholesale_df_display = wholesale_df[['MODEL KODU', 'ÜRÜN ADI', 'NIHAI_SATIS_FIYATI', "TOPTAN FİYAT (KDV'siz)", "TOPTAN FİYAT (KDV'li)", 'TOPTAN KÂR']]
         st.dataframe(wholesale_df_display.style.format({
             'NIHAI_SATIS_FIYATI': '{:,.2f} ₺', "TOPTAN FİYAT (KDV'siz)": '{:,.2f} ₺', "TOPTAN FİYAT (KDV'li)": '{:,.2f} ₺', 'TOPTAN KÂR': '{:,.2f} ₺'
         }), use_container_width=True)
 
+    with st.expander("Tablo 4: Senaryo Karşılaştırma (Kâr Marjı x İndirim x KDV)", expanded=False):
+        def parse_values(text):
+            values = []
+            for part in str(text).replace(';', ',').split(','):
+                try:
+                    values.append(float(part.strip()))
+                except ValueError:
+                    continue
+            return values
+
+        grid_markup_type = st.session_state.get('markup_type', "Yüzde Ekle (%)")
+        sc1, sc2, sc3 = st.columns(3)
+        grid_markups = parse_values(sc1.text_input(f"Kâr marjları ({grid_markup_type})",
+                                                   "50, 75, 100, 125" if grid_markup_type == "Yüzde Ekle (%)" else "2, 2.5, 3"))
+        grid_discounts = parse_values(sc2.text_input("İndirim oranları (%)", "0, 10, 20, 30"))
+        grid_vats = parse_values(sc3.text_input("KDV oranları (%)", str(vat_rate)))
+        if grid_markups and grid_discounts and grid_vats:
+            grid_rounding = st.session_state.get('rounding', "Yukarı (X9.99)").replace(" (X9.99)", "").replace("Aşağı", "Aşağı Yuvarla").replace("Yukarı", "Yukarı Yuvarla")
+            grid_df = scenario_engine.scenario_grid(
+                df, grid_markups, grid_discounts, grid_vats, markup_type=grid_markup_type, rounding=grid_rounding,
+                add_vat=st.session_state.get('add_vat', True),
+                min_price=st.session_state.get('min_price') or None, max_price=st.session_state.get('max_price') or None)
+            st.dataframe(grid_df.style.format({
+                'KÂR MARJI': '{:g}', 'KDV (%)': '{:.0f}%', 'İNDİRİM (%)': '{:.0f}%', 'ORTALAMA SATIŞ FİYATI': '{:,.2f} ₺',
+                'TOPLAM KÂR': '{:,.2f} ₺', 'ORTALAMA KÂR ORANI (%)': '{:.2f}%', 'EN DÜŞÜK KÂR ORANI (%)': '{:.2f}%'
+            }), use_container_width=True, hide_index=True)
+        else:
+            st.caption("Her alana en az bir sayı girin (virgülle ayırarak).")
+
     st.markdown("---")
     st.subheader("Adım 4: Kaydet ve Shopify'a Gönder")
     
@@ -756,7 +700,7 @@ if st.session_state.calculated_df is not None:
     st.markdown("---")
     st.subheader("🛠️ Ekstra İşlemler")
     
-    extra_tab1, extra_tab2 = st.tabs(["📦 Tekil Ürün Güncelleme", "📚 Koleksiyon Bazlı Güncelleme"])
+    extra_tab1, extra_tab2, extra_tab3 = st.tabs(["📦 Tekil Ürün Güncelleme", "📚 Koleksiyon Bazlı Güncelleme", "↩️ Fiyat Geri Alma"])
     
     with extra_tab1:
         st.info("Belirli bir ürünün veya varyantın fiyatını manuel olarak güncelleyin.")
@@ -871,6 +815,53 @@ if st.session_state.calculated_df is not None:
                         st.session_state.confirm_collection_update = False
                         st.rerun()
 
+    with extra_tab3:
+        st.info("Toplu fiyat güncellemeleri ve koleksiyon kampanyaları başlamadan önce eski fiyatlar kaydedilir. "
+                "Bir çalışmayı seçip tüm varyantları tek seferde eski fiyatlarına döndürebilirsiniz.")
+        from operations.price_snapshot import PriceSnapshotStore
+        snapshot_runs = PriceSnapshotStore(st.session_state.shopify_store).list_runs(limit=20)
+
+        if not snapshot_runs:
+            st.caption("Henüz kayıtlı fiyat çalışması yok.")
+        else:
+            runs_df = pd.DataFrame([{
+                "No": run['run_id'],
+                "Tarih": time.strftime('%Y-%m-%d %H:%M', time.localtime(run['created_at'])),
+                "Kaynak": run['source'],
+                "Açıklama": run['description'],
+                "Varyant": run['variant_count'],
+                "Ürün": run['product_count'],
+                "Durum": run['status'],
+            } for run in snapshot_runs])
+            st.dataframe(runs_df, use_container_width=True, hide_index=True)
+
+            selected_run_id = st.selectbox("Geri alınacak çalışma", [run['run_id'] for run in snapshot_runs],
+                                           format_func=lambda run_id: f"#{run_id}")
+            if st.button("↩️ Geri Al", disabled=st.session_state.update_in_progress, key="btn_price_rollback"):
+                st.session_state.update_in_progress = True
+                st.session_state.sync_progress_queue = queue.Queue()
+
+                def run_price_rollback(q, store, token, run_id):
+                    try:
+                        q.put({'progress': 1, 'message': f'#{run_id} eski fiyatlara döndürülüyor...'})
+                        shopify_api = ShopifyAPI(store, token)
+                        result = PriceSnapshotStore(store).rollback(shopify_api, run_id, progress_callback=q.put)
+                        q.put({"status": "done", "results": {
+                            "success": result['updated'], "failed": result['failed'],
+                            "details": [{"sku": f"GID-{f['product_id']}", "status": "failed", "reason": f['reason']}
+                                        for f in result['failures']]}})
+                    except Exception as e:
+                        logging.error(f"Price rollback thread error: {e}")
+                        q.put({"status": "error", "message": f"Geri alma hatası: {str(e)}"})
+
+                threading.Thread(
+                    target=run_price_rollback,
+                    args=(st.session_state.sync_progress_queue, st.session_state.shopify_store,
+                          st.session_state.shopify_token, selected_run_id),
+                    daemon=True
+                ).start()
+                st.rerun()
+
 # Eğer bir işlem devam ediyorsa, ilerlemeyi gösteren alanı oluştur
 if st.session_state.update_in_progress:
     status_container = st.container()
@@ -12,6 +12,7 @@ project_path = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_path)
 
 from sync_runner import sync_products_from_sentos_api
+from operations.progress_bus import log_entries
 
 # GitHub Actions için gelişmiş loglama
 logging.basicConfig(
@@ -29,11 +30,25 @@ def main():
     
     sync_mode_to_run = os.getenv("SYNC_MODE", "Sadece Stok ve Varyantlar")
     max_workers = int(os.getenv("MAX_WORKERS", "8"))  # GitHub Actions için konservatif
+    skip_unchanged = os.getenv("SKIP_UNCHANGED", "true").lower() in ("1", "true", "yes")
+    resume = os.getenv("RESUME_SYNC", "true").lower() in ("1", "true", "yes")
+    shards = max(1, int(os.getenv("SYNC_SHARDS", "1")))  # >1 ise ürünler process'lere bölünür
+    priority_lanes = os.getenv("PRIORITY_LANES", "true").lower() in ("1", "true", "yes")
+    # Stok modunda tek bulk envanter sorgusu + fark yazma (ürün başına sorgu yerine)
+    stock_engine = os.getenv("STOCK_SNAPSHOT_ENGINE", "true").lower() in ("1", "true", "yes")
+    # Yazma yapmadan plan, maliyet ve tahmini süre raporu
+    dry_run = os.getenv("DRY_RUN", "false").lower() in ("1", "true", "yes")
     
     print(f"🚀 GitHub Actions 10-Worker Sync başlıyor...")
     print(f"📅 Timestamp: {datetime.now().isoformat()}")
     print(f"📋 Mode: {sync_mode_to_run}")
     print(f"👥 Workers: {max_workers}")
+    print(f"🔎 Skip unchanged: {skip_unchanged}")
+    print(f"⏯️  Resume from checkpoint: {resume}")
+    print(f"🧩 Shards (processes): {shards}")
+    print(f"🚦 Priority lanes (stock first, media last): {priority_lanes}")
+    print(f"📸 Stock snapshot engine: {stock_engine}")
+    print(f"🧪 Dry run (plan only): {dry_run}")
 
     # GitHub Secrets'tan ayarları oku
     config = {
@@ -64,10 +79,12 @@ def main():
             # Console output için
             if 'message' in update:
                 print(f"Progress: {update['message']}")
-            if 'log_detail' in update:
-                clean_log = re.sub('<[^<]+?>', '', update['log_detail'])
+            for log_detail in log_entries(update):
+                clean_log = re.sub('<[^<]+?>', '', log_detail)
                 if clean_log.strip():
                     print(f"Detail: {clean_log.strip()}")
+            if update.get('logs_dropped'):
+                print(f"Detail: ... {update['logs_dropped']} log satırı atlandı")
             if 'stats' in update:
                 stats = update['stats']
                 print(f"Stats: {stats.get('processed', 0)}/{stats.get('total', 0)} "
@@ -88,7 +105,13 @@ def main():
                     progress_callback=sync_progress_callback,
                     stop_event=stop_event,
                     sync_mode=sync_mode_to_run,
-                    max_workers=max_workers
+                    max_workers=max_workers,
+                    skip_unchanged=skip_unchanged,
+                    resume=resume,
+                    shards=shards,
+                    priority_lanes=priority_lanes,
+                    stock_engine=stock_engine,
+                    dry_run=dry_run
                 )
             except Exception as e:
                 logging.error(f"Sync worker error: {e}")
@@ -124,6 +147,8 @@ def main():
         if not sync_completed:
             logging.error("❌ Sync timeout reached")
             stop_event.set()
+            # Kontrol noktasının diske yazılması için çalışan işlerin bitmesini kısa süre bekle
+            sync_thread.join(timeout=120)
             sys.exit(1)
         
         # Final sonuçları raporla
@@ -139,6 +164,25 @@ def main():
             print(f"   - Updated: {stats.get('updated', 0)}")
             print(f"   - Failed: {stats.get('failed', 0)}")
             print(f"   - Skipped: {stats.get('skipped', 0)}")
+            if resumed := sync_results.get('resumed'):
+                print(f"   - Resumed run: {resumed['run_id']} ({resumed['already_processed']} already processed)")
+            if unmatched := sync_results.get('unmatched'):
+                print(f"   - Unmatched in Shopify: {len(unmatched)} ({sum(1 for u in unmatched if u['suggestions'])} with candidates)")
+                for u in unmatched[:20]:
+                    if u['suggestions']:
+                        print(f"     • {u['name']} ({u['sku']}) -> {', '.join(s['title'] for s in u['suggestions'])}")
+            if timings := sync_results.get('timings'):
+                print(f"⏱️  Phases:")
+                for phase, t in timings['phases'].items():
+                    print(f"   - {phase}: {t['wall_seconds']}s wall, {t['busy_seconds']}s busy, {t['requests']} requests")
+                latency = timings['latency']
+                print(f"   - Product latency p50/p90/p99: {latency['p50']}s / {latency['p90']}s / {latency['p99']}s")
+            if plan := sync_results.get('plan'):
+                print(f"🗺️  Plan{' (dry run)' if sync_results.get('dry_run') else ''}:")
+                print(f"   - Actions: {plan['actions']}")
+                print(f"   - Operations: {plan['operations']}")
+                print(f"   - Estimated cost: {plan['estimated_cost']} points / {plan['estimated_requests']} requests")
+                print(f"   - ETA: {plan['eta']}{' (includes estimates)' if plan['has_estimates'] else ''}")
             
             # GitHub Actions output
             if 'GITHUB_OUTPUT' in os.environ:
@@ -0,0 +1,262 @@
+# sharded_sync_runner.py - Çok process'li (sharded) senkronizasyon koordinatörü
+#
+# Sentos ürün listesi, ürün anahtarının kararlı hash'ine göre N process'e bölünür.
+# Her process kendi connector'larını ve thread havuzunu kullanır; JSON çözümleme, payload
+# oluşturma ve HTML log üretimi gibi CPU işleri GIL'e takılmadan paralel çalışır.
+# Tüm process'ler Shopify çağrılarında tek bir paylaşımlı (mağaza geneli) rate bütçesi kullanır.
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from datetime import timedelta
+
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from connectors.shopify_api import ShopifyAPI
+from connectors.sentos_api import SentosAPI
+from operations.smart_rate_limiter import SharedRateLimiter
+from operations.sync_fingerprint import FingerprintStore, product_key
+from operations.sync_checkpoint import SyncCheckpoint, sentos_watermark, shopify_watermark
+from operations.progress_bus import ProgressBus, log_entries
+from operations.product_matcher import ProductMatchIndex
+from operations.sync_plan import ProductPlan, SyncPlan
+from operations.sync_timing import SyncTimer
+
+STAT_KEYS = ('total', 'created', 'updated', 'failed', 'skipped', 'processed')
+
+# Process başına ayarlanan paylaşımlı nesneler (initializer ile)
+_shared_limiter = None
+_events = None
+_mp_stop = None
+
+
+def shard_index(sentos_product, shards):
+    """Ürünün hangi shard'a düştüğünü döndürür; çalışmalar arasında (ve resume'da) sabittir."""
+    key = product_key(sentos_product) or str(sentos_product.get('name', ''))
+    return int(hashlib.sha1(key.encode('utf-8')).hexdigest()[:8], 16) % shards
+
+
+def partition_products(sentos_products, shards):
+    partitions = [[] for _ in range(shards)]
+    for product in sentos_products:
+        partitions[shard_index(product, shards)].append(product)
+    return partitions
+
+
+def _cache_subset(product_cache, products):
+    """Shard'ın eşleştirme için ihtiyaç duyduğu önbellek kayıtları (tüm önbelleği her process'e kopyalamamak için)."""
+    index = ProductMatchIndex.from_cache(product_cache)
+    subset = {}
+    for product in products:
+        if match := index.match(product):
+            # Shard içindeki indeks aynı eşleşmeyi bulabilsin diye ürünün tüm anahtarları taşınır
+            subset[f"title:{str(match.get('title', '')).strip()}"] = match
+            for variant in match.get('variants', []):
+                if sku := str(variant.get('sku') or '').strip():
+                    subset[f"sku:{sku}"] = match
+    return subset
+
+
+def _shard_plan(sync_mode, products, resolutions):
+    """
+    Koordinatörün plan kararlarından (action, existing, facets) shard'ın yürüteceği planı kurar.
+    Kararlar ürün listesiyle aynı sırada gelir; shard ürünü yeniden eşleştirmez, raporlanan plan yürütülür.
+    """
+    if resolutions is None:
+        return None
+    return SyncPlan(sync_mode, [ProductPlan(product, action, existing=existing, facets=facets)
+                                for product, (action, existing, facets) in zip(products, resolutions)])
+
+
+def _init_shard_worker(limiter, events, mp_stop):
+    global _shared_limiter, _events, _mp_stop
+    _shared_limiter, _events, _mp_stop = limiter, events, mp_stop
+
+
+def _run_shard(shard, shards, shopify_config, sentos_config, sync_mode, max_workers, products, product_cache, skip_unchanged, resume, priority_lanes=False,
+               resolutions=None):
+    """
+    Tek bir shard'ı kendi process'inde işler ve stats/details döndürür.
+    resolutions: products ile aynı sırada koordinatörün plan kararları; verilirse her ürün için bu karar yürütülür.
+    """
+    import sync_runner
+
+    # Kararlar ürünlerle birlikte aynı çağrıda gelir; existing kayıtları product_cache'teki nesnelerle aynıdır
+    plan = _shard_plan(sync_mode, products, resolutions)
+
+    stats = {key: 0 for key in STAT_KEYS}
+    details = []
+    lock = threading.Lock()
+
+    def forward(update):
+        # Sadece koordinatörün birleştirdiği alanlar gönderilir
+        if 'log_details' in update or 'stats' in update:
+            _events.put({'shard': shard, **{k: v for k, v in update.items() if k in ('log_details', 'stats')}})
+    # Olaylar process sınırını geçmeden önce shard içinde birleştirilir
+    progress_callback = ProgressBus(forward)
+
+    stop_event = threading.Event()
+    def watch_stop():
+        _mp_stop.wait()
+        stop_event.set()
+    threading.Thread(target=watch_stop, daemon=True).start()
+
+    # Aşama süreleri ve ürün gecikmeleri shard'da toplanır, koordinatörde birleştirilip log_manager'a yazılır
+    timer = SyncTimer()
+    shopify_api = ShopifyAPI(shopify_config['store_url'], shopify_config['access_token'])
+    shopify_api.rate_limiter = _shared_limiter
+    shopify_api.product_cache = product_cache
+    shopify_api.sync_timer = timer
+    sentos_api = SentosAPI(sentos_config['api_url'], sentos_config['api_key'], sentos_config['api_secret'], sentos_config.get('cookie'))
+    sentos_api.sync_timer = timer
+
+    # Kontrol noktaları shard bazında tutulur; aynı shard sayısıyla resume edildiğinde aynı ürünler aynı shard'a düşer
+    checkpoint = SyncCheckpoint(shopify_config['store_url'], f"{sync_mode} [shard {shard + 1}/{shards}]")
+    checkpoint.start(resume=resume, sentos_wm=sentos_watermark(products), shopify_wm=shopify_watermark(shopify_api))
+    resumed = None
+    if checkpoint.resumed:
+        resumed = {'run_id': checkpoint.run_id, 'already_processed': checkpoint.completed_count}
+        products = checkpoint.filter_pending(products)
+    stats['total'] = len(products)
+    _events.put({'shard': shard, 'stats': stats.copy()})
+
+    fingerprints = FingerprintStore(shopify_config['store_url']) if skip_unchanged else None
+    try:
+        sync_runner._process_products(shopify_api, sentos_api, products, sync_mode, max_workers, progress_callback, stop_event, stats, details, lock, fingerprints, checkpoint, priority_lanes=priority_lanes, plan=plan)
+        checkpoint.finish('interrupted' if stop_event.is_set() else 'completed')
+    except Exception:
+        checkpoint.finish('failed')
+        raise
+    finally:
+        progress_callback.close()
+    return {'shard': shard, 'stats': stats, 'details': details, 'resumed': resumed, 'timings': timer.export()}
+
+
+def merge_stats(stats_list):
+    return {key: sum(s.get(key, 0) for s in stats_list) for key in STAT_KEYS}
+
+
+def run_sharded_sync(shopify_config, sentos_config, sync_mode, shards, max_workers, test_mode, progress_callback, stop_event,
+                     skip_unchanged=False, resume=False, rate_limit_rps=None, priority_lanes=False):
+    """
+    Koordinatör: Shopify önbelleğini ve Sentos listesini bir kez yükler, eşleşmeyen ürün raporunu ve planı
+    çıkarır, plan sırasındaki listeyi shard'lara böler, shard'ları ayrı process'lerde çalıştırır ve sonunda
+    stats/details'i birleştirir. Sonuç ve log_manager kaydı _run_core_sync_logic ile aynı biçimdedir.
+    Bir shard hata verirse diğerleri durdurulur, olaylar hepsi bitene kadar okunmaya devam eder ve hata raporlanır.
+    """
+    import sync_runner
+
+    start_time = time.monotonic()
+    rate_limit_rps = rate_limit_rps or float(os.getenv("SHOPIFY_RATE_LIMIT_RPS", "4"))
+    ctx = multiprocessing.get_context('spawn')
+    stats = {key: 0 for key in STAT_KEYS}
+    timer = SyncTimer()
+    log_id = sync_runner._start_run_log(sync_mode, max_workers)
+
+    try:
+        limiter = SharedRateLimiter(max_requests_per_second=rate_limit_rps, mp_context=ctx)
+
+        shopify_api = ShopifyAPI(shopify_config['store_url'], shopify_config['access_token'])
+        shopify_api.rate_limiter = limiter
+        shopify_api.sync_timer = timer
+        sentos_api = SentosAPI(sentos_config['api_url'], sentos_config['api_key'], sentos_config['api_secret'], sentos_config.get('cookie'))
+        sentos_api.sync_timer = timer
+
+        with timer.phase('shopify_cache'):
+            shopify_api.load_all_products_for_cache(progress_callback)
+        with timer.phase('sentos_fetch'):
+            sentos_products = sentos_api.get_all_products(progress_callback)
+        if test_mode: sentos_products = sentos_products[:20]
+
+        with timer.phase('matching'):
+            unmatched = sync_runner._match_index(shopify_api).unmatched_report(sentos_products)
+            # Plan tüm liste için çıkarılır (shard'lar resume'da kendi işlenmiş ürünlerini ayrıca atlar);
+            # plan sırası shard'lara bölünürken korunur, her shard ürünleri bu sırayla işler
+            fingerprints = FingerprintStore(shopify_config['store_url']) if skip_unchanged else None
+            plan, plan_summary = sync_runner._build_plan(shopify_api, sentos_products, sync_mode, fingerprints)
+        progress_callback({'message': f"Plan: ~{plan_summary['estimated_requests']} istek, ~{plan_summary['estimated_cost']} maliyet puanı, tahmini süre {plan_summary['eta']}"})
+
+        partitions = partition_products(plan.ordered_products(), shards)
+        logging.info(f"Sharded senkronizasyon: {len(sentos_products)} ürün {shards} process'e bölündü: {[len(p) for p in partitions]}")
+        progress_callback({'message': f"{len(sentos_products)} ürün {shards} process'e bölündü, işleniyor..."})
+
+        events = ctx.Queue()
+        mp_stop = ctx.Event()
+        shard_stats = {}
+        results = []
+        failures = []
+
+        with ProcessPoolExecutor(max_workers=shards, mp_context=ctx, initializer=_init_shard_worker, initargs=(limiter, events, mp_stop)) as pool:
+            pending = {
+                pool.submit(_run_shard, i, shards, shopify_config, sentos_config, sync_mode, max_workers, part,
+                            _cache_subset(shopify_api.product_cache, part), skip_unchanged, resume, priority_lanes,
+                            [plan.resolution(product) for product in part])
+                for i, part in enumerate(partitions) if part
+            }
+
+            def pump_events(timeout):
+                deadline = time.monotonic() + timeout
+                while True:
+                    try:
+                        event = events.get(timeout=max(0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        return
+                    if entries := log_entries(event):
+                        progress_callback({'log_details': entries})
+                    if 'stats' in event:
+                        shard_stats[event['shard']] = event['stats']
+                        merged = merge_stats(shard_stats.values())
+                        processed, total = merged['processed'], merged['total']
+                        progress = 55 + int((processed / total) * 45) if total > 0 else 100
+                        progress_callback({'progress': progress, 'message': f"İşlenen: {processed}/{total} ({shards} process)", 'stats': merged})
+
+            # Hata veren shard diğerlerini durdurur; kuyruk boşaltılmadan havuzdan çıkılırsa
+            # process'ler olay kuyruğunda bloklanıp kapanışı kilitleyebilir
+            while pending:
+                if stop_event.is_set():
+                    mp_stop.set()
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                pump_events(0.05)
+                for future in done:
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        logging.error(f"❌ Shard hata verdi, diğer shard'lar durduruluyor: {e}")
+                        failures.append(e)
+                        mp_stop.set()
+            pump_events(0.2)
+
+        results.sort(key=lambda r: r['shard'])
+        for result in results:
+            timer.merge(result.get('timings'))
+        stats = merge_stats(list(shard_stats.values()) if failures else [r['stats'] for r in results])
+        if failures:
+            raise RuntimeError(f"{len(failures)} shard hata verdi: {failures[0]}") from failures[0]
+        details = [entry for r in results for entry in r['details']]
+
+        duration = time.monotonic() - start_time
+        final = {'stats': stats, 'details': details, 'duration': str(timedelta(seconds=duration)), 'shards': shards,
+                 'plan': plan_summary, 'timings': timer.summary()}
+        if unmatched:
+            final['unmatched'] = unmatched
+        if resumed := [r['resumed'] for r in results if r.get('resumed')]:
+            final['resumed'] = {
+                'run_id': ', '.join(r['run_id'] for r in resumed),
+                'already_processed': sum(r['already_processed'] for r in resumed),
+            }
+        sync_runner._finish_run_log(log_id, sync_mode, stats, final['duration'], timer)
+        progress_callback({'status': 'done', 'results': final})
+
+    except Exception as e:
+        logging.critical(f"Sharded senkronizasyon kritik bir hata oluştu: {e}\n{traceback.format_exc()}")
+        sync_runner._finish_run_log(log_id, sync_mode, stats, str(timedelta(seconds=time.monotonic() - start_time)), timer, success=False)
+        progress_callback({'status': 'error', 'message': str(e)})
@@ -13,7 +13,7 @@ import time
 
 # Gerekli modülleri import ediyoruz
 from config_manager import load_all_user_keys
-from data_manager import load_user_data
+from data_manager import load_user_data, load_user_frame
 # YENİ: Import ifadeleri yeni modüler yapıya göre güncellendi.
 from connectors.shopify_api import ShopifyAPI
 from connectors.sentos_api import SentosAPI
@@ -74,10 +74,12 @@ def load_and_verify_user_data(username):
     # Kalıcı fiyat verilerini data_manager'dan yükle
     user_price_data = load_user_data(username)
     try:
+        st.session_state.price_df = load_user_frame(username, 'price_df')
+        st.session_state.calculated_df = load_user_frame(username, 'calculated_df')
         price_df_json = user_price_data.get('price_df_json')
-        if price_df_json: st.session_state.price_df = pd.read_json(StringIO(price_df_json), orient='split')
+        if st.session_state.price_df is None and price_df_json: st.session_state.price_df = pd.read_json(StringIO(price_df_json), orient='split')
         calculated_df_json = user_price_data.get('calculated_df_json')
-        if calculated_df_json: st.session_state.calculated_df = pd.read_json(StringIO(calculated_df_json), orient='split')
+        if st.session_state.calculated_df is None and calculated_df_json: st.session_state.calculated_df = pd.read_json(StringIO(calculated_df_json), orient='split')
     except Exception as e:
         st.session_state.price_df, st.session_state.calculated_df = None, None
 
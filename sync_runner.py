@@ -18,6 +18,19 @@ if project_root not in sys.path:
 from connectors.shopify_api import ShopifyAPI
 from connectors.sentos_api import SentosAPI
 from operations import core_sync, media_sync, stock_sync
+from operations.sync_fingerprint import FingerprintStore, FACETS
+from operations.sync_checkpoint import SyncCheckpoint, sentos_watermark, shopify_watermark
+from operations.sync_scheduler import LaneScheduler, LANES, FACET_LANES
+from operations.inventory_batcher import InventoryBatcher
+from operations.variant_fetcher import VariantFetcher
+from operations.media_reorder_queue import MediaReorderQueue
+from operations.media_fingerprint import MediaFingerprintStore
+from operations.sync_plan import build_sync_plan, build_seo_plan, DEFAULT_RESTORE_RATE
+from operations.progress_bus import ProgressBus
+from operations.product_matcher import ProductMatchIndex
+from operations.sync_timing import SyncTimer, bind_phase, record_product_latency
+from operations.log_manager import log_manager
+from operations import stock_snapshot_sync
 from utils import get_apparel_sort_key, get_variant_color, get_variant_size
 
 logging.basicConfig(
@@ -26,14 +39,53 @@ logging.basicConfig(
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 
-def _find_shopify_product(shopify_api, sentos_product):
-    if sku := sentos_product.get('sku', '').strip():
-        if product := shopify_api.product_cache.get(f"sku:{sku}"): return product
-    if name := sentos_product.get('name', '').strip():
-        if product := shopify_api.product_cache.get(f"title:{name}"): return product
-    return None
+_match_index_lock = threading.Lock()
+
+def _match_index(shopify_api):
+    """Ürün önbelleği üzerine kurulan eşleştirme indeksi; önbellek değişince yeniden kurulur."""
+    cache = shopify_api.product_cache
+    key = (id(cache), len(cache))
+    with _match_index_lock:
+        cached = getattr(shopify_api, '_match_index_cache', None)
+        if cached is None or cached[0] != key:
+            cached = (key, ProductMatchIndex.from_cache(cache))
+            shopify_api._match_index_cache = cached
+    return cached[1]
+
+def _refresh_cached_product(shopify_api, product, fields):
+    """
+    Güncellenen ürünün önbellek kaydını kopyasıyla değiştirir ve eşleştirme indeksini geçersiz kılar.
+    Paylaşılan kayıt yerinde değiştirilmez; diğer iş parçacıkları ve indeks tutarlı bir görüntü görür.
+    """
+    cache = shopify_api.product_cache
+    with _match_index_lock:
+        updated = {**product, **fields}
+        for key in [key for key, value in cache.items() if value is product]:
+            del cache[key]
+            if not key.startswith('title:'):
+                cache[key] = updated
+        if title := str(updated.get('title') or '').strip():
+            cache[f"title:{title}"] = updated
+        shopify_api._match_index_cache = None
+    return updated
 
-def _update_product(shopify_api, sentos_api, sentos_product, existing_product, sync_mode):
+def _find_shopify_product(shopify_api, sentos_product):
+    # Normalize edilmiş SKU, varyant SKU/barkod ve başlık sırasıyla aranır; ana model kodu sadece öneriler için kullanılır
+    return _match_index(shopify_api).match(sentos_product)
+
+FULL_SYNC_MODE = "Tam Senkronizasyon (Tümünü Oluştur ve Güncelle)"
+STOCK_ONLY_MODE = "Sadece Stok ve Varyantlar"
+
+# Her senkronizasyon modunun çalıştırdığı facet'ler
+MODE_FACETS = {
+    FULL_SYNC_MODE: FACETS,
+    "Sadece Açıklamalar": ('details', 'type'),
+    STOCK_ONLY_MODE: ('variants',),
+    "Sadece Resimler": ('images',),
+    "Sadece Kategoriler (Ürün Tipi)": ('type',),
+}
+
+def _update_product(shopify_api, sentos_api, sentos_product, existing_product, sync_mode, facets=None, fingerprints=None):
     product_name = sentos_product.get('name', 'Bilinmeyen Ürün') 
     shopify_gid = existing_product['gid']
     logging.info(f"Mevcut ürün güncelleniyor: '{product_name}' (GID: {shopify_gid}) | Mod: {sync_mode}")
@@ -51,16 +103,33 @@ def _update_product(shopify_api, sentos_api, sentos_product, existing_product, s
             logging.error(f"❌ SEO Hatası: {result['message']}")
         return all_changes
     
-    # Normal sync modları
-    if sync_mode in ["Tam Senkronizasyon (Tümünü Oluştur ve Güncelle)", "Sadece Açıklamalar"]:
-         all_changes.extend(core_sync.sync_details(shopify_api, shopify_gid, sentos_product))
-         all_changes.extend(core_sync.sync_product_type(shopify_api, shopify_gid, sentos_product))
-    if sync_mode in ["Tam Senkronizasyon (Tümünü Oluştur ve Güncelle)", "Sadece Stok ve Varyantlar"]:
-        all_changes.extend(stock_sync.sync_stock_and_variants(shopify_api, shopify_gid, sentos_product))
-    if sync_mode in ["Tam Senkronizasyon (Tümünü Oluştur ve Güncelle)", "Sadece Resimler"]:
-        set_alt = sync_mode == "Tam Senkronizasyon (Tümünü Oluştur ve Güncelle)"
-        all_changes.extend(media_sync.sync_media(shopify_api, sentos_api, shopify_gid, sentos_product, set_alt_text=set_alt))
-        
+    # Normal sync modları - facets verilmişse sadece değişen facet'ler çalışır.
+    # Parmak izi yalnızca sync fonksiyonunun başarılı bildirdiği facet'ler için kaydedilir.
+    facets = set(MODE_FACETS.get(sync_mode, ()) if facets is None else facets)
+    synced_facets = []
+    if product_facets := [f for f in ('details', 'type') if f in facets]:
+        # Başlık/açıklama/kategori önbellekteki değerlerle karşılaştırılıp tek productUpdate ile gönderilir
+        with bind_phase(shopify_api, 'details'):
+            changes, ok = core_sync.sync_product_fields(
+                shopify_api, shopify_gid, sentos_product, current=existing_product, facets=product_facets, with_status=True,
+                on_updated=lambda fields: _refresh_cached_product(shopify_api, existing_product, fields))
+        all_changes.extend(changes)
+        if ok: synced_facets.extend(product_facets)
+    if 'variants' in facets:
+        with bind_phase(shopify_api, 'stock'):
+            changes, ok = stock_sync.sync_stock_and_variants(shopify_api, shopify_gid, sentos_product, with_status=True)
+        all_changes.extend(changes)
+        if ok: synced_facets.append('variants')
+    if 'images' in facets:
+        set_alt = sync_mode == FULL_SYNC_MODE
+        with bind_phase(shopify_api, 'media'):
+            changes, ok = media_sync.sync_media(shopify_api, sentos_api, shopify_gid, sentos_product, set_alt_text=set_alt, with_status=True)
+        all_changes.extend(changes)
+        if ok: synced_facets.append('images')
+
+    if fingerprints is not None and synced_facets:
+        fingerprints.mark_synced(sentos_product, synced_facets)
+
     logging.info(f"✅ Ürün '{product_name}' başarıyla güncellendi.")
     return all_changes
 
@@ -171,7 +240,8 @@ def _create_product(shopify_api, sentos_api, sentos_product):
             product_input["productOptions"] = product_options
 
         create_q = "mutation productCreate($input: ProductInput!) { productCreate(input: $input) { product { id } userErrors { field message } } }"
-        created_product_data = shopify_api.execute_graphql(create_q, {'input': product_input}).get('productCreate', {})
+        with bind_phase(shopify_api, 'create'):
+            created_product_data = shopify_api.execute_graphql(create_q, {'input': product_input}).get('productCreate', {})
         
         if not created_product_data.get('product'):
             errors = created_product_data.get('userErrors', [])
@@ -210,7 +280,8 @@ def _create_product(shopify_api, sentos_api, sentos_product):
                 userErrors { field message }
             }
         }"""
-        created_vars_data = shopify_api.execute_graphql(bulk_q, {'productId': product_gid, 'variants': variants_input}).get('productVariantsBulkCreate', {})
+        with bind_phase(shopify_api, 'create'):
+            created_vars_data = shopify_api.execute_graphql(bulk_q, {'productId': product_gid, 'variants': variants_input}).get('productVariantsBulkCreate', {})
         
         if errors := created_vars_data.get('userErrors', []):
             raise Exception(f"Varyantlar oluşturulamadı: {errors}")
@@ -220,17 +291,22 @@ def _create_product(shopify_api, sentos_api, sentos_product):
         logging.info(f"{len(created_variants)} varyant 'REMOVE_STANDALONE_VARIANT' stratejisi ile oluşturuldu.")
 
         if created_variants:
-            stock_sync._activate_variants_at_location(shopify_api, created_variants)
-            adjustments = stock_sync._prepare_inventory_adjustments(sentos_variants, created_variants)
+            with bind_phase(shopify_api, 'stock'):
+                stock_sync._activate_variants_at_location(shopify_api, created_variants)
+                adjustments = stock_sync._prepare_inventory_adjustments(sentos_variants, created_variants)
+                errors = stock_sync._adjust_inventory_bulk(shopify_api, adjustments) if adjustments else []
             if adjustments:
-                changes.append(f"{len(adjustments)} varyantın stoğu güncellendi.")
-                stock_sync._adjust_inventory_bulk(shopify_api, adjustments)
+                if failed := sum(1 for err in errors if err):
+                    changes.append(f"{failed} varyantın stok güncellemesinde hata.")
+                changes.append(f"{len(adjustments) - failed} varyantın stoğu güncellendi.")
         
-        changes.extend(media_sync.sync_media(shopify_api, sentos_api, product_gid, sentos_product, set_alt_text=True))
+        with bind_phase(shopify_api, 'media'):
+            changes.extend(media_sync.sync_media(shopify_api, sentos_api, product_gid, sentos_product, set_alt_text=True))
         
         # ✅ FIX: productUpdate mutation ProductInput kullanıyor (ProductUpdateInput DEĞİL!)
         activate_q = "mutation productUpdate($input: ProductInput!) { productUpdate(input: $input) { product { id status } userErrors { field message } } }"
-        activate_result = shopify_api.execute_graphql(activate_q, {"input": {"id": product_gid, "status": "ACTIVE"}})
+        with bind_phase(shopify_api, 'activation'):
+            activate_result = shopify_api.execute_graphql(activate_q, {"input": {"id": product_gid, "status": "ACTIVE"}})
 
         if activate_result.get('productUpdate', {}).get('userErrors', []):
              logging.warning(f"Ürün aktive edilirken hata oluştu: {activate_result['productUpdate']['userErrors']}")
@@ -265,7 +341,8 @@ def _process_seo_only(shopify_api, shopify_product, progress_callback, stats, de
     
     try:
         # Sadece SEO güncelleme yap - GID ve title parametrelerini gönder
-        result = shopify_api.update_product_media_seo(product_gid, title)
+        with bind_phase(shopify_api, 'media'):
+            result = shopify_api.update_product_media_seo(product_gid, title)
         
         if result.get('success'):
             status = 'updated'
@@ -300,72 +377,324 @@ def _process_seo_only(shopify_api, shopify_product, progress_callback, stats, de
     finally:
         with lock: stats['processed'] += 1
 
-def _process_single_product(shopify_api, sentos_api, sentos_product, sync_mode, progress_callback, stats, details, lock):
+STATUS_ICONS = {'updated': "🔄", 'created': "✅", 'skipped': "⏭️"}
+
+def _resolve_product_action(shopify_api, sentos_product, sync_mode, fingerprints=None):
+    """Ürün için yapılacak işlemi belirler: (action, existing_product, facets)."""
+    if not sentos_product.get('name', 'Bilinmeyen Ürün').strip():
+        return 'ignore', None, None
+
+    existing_product = _find_shopify_product(shopify_api, sentos_product)
+    if existing_product:
+        if "Sadece Eksik" in sync_mode:
+            return 'skip', existing_product, None
+        facets = None
+        if fingerprints is not None and sync_mode in MODE_FACETS:
+            facets = fingerprints.changed_facets(sentos_product, MODE_FACETS[sync_mode])
+            if not facets:
+                return 'unchanged', existing_product, []
+        return 'update', existing_product, facets
+
+    if "Tam Senkronizasyon" in sync_mode or "Sadece Eksik" in sync_mode:
+        return 'create', None, None
+    return 'ignore', None, None
+
+def _report_product(sentos_product, status, changes_made, progress_callback, stats, details, lock, checkpoint=None, error=None):
+    """Ürün sonucunu istatistiklere, canlı loga, details listesine ve kontrol noktasına işler."""
     name = sentos_product.get('name', 'Bilinmeyen Ürün')
     sku = sentos_product.get('sku', 'SKU Yok')
     log_entry = {'name': name, 'sku': sku}
+    outcome = 'failed' if error is not None else ('skipped' if status == 'ignored' else status)
     try:
-        if not name.strip():
+        if error is not None:
+            error_message = f"❌ Hata: {name} (SKU: {sku}) - {error}"
+            progress_callback({'log_detail': f"<div style='color: #f48a94;'>{error_message}</div>"})
+            with lock: 
+                stats['failed'] += 1
+                log_entry.update({'status': 'failed', 'reason': str(error)})
+                details.append(log_entry)
+        elif status == 'ignored':
             with lock: stats['skipped'] += 1
-            return
-        
-        existing_product = _find_shopify_product(shopify_api, sentos_product)
-        changes_made = []
-
-        if existing_product:
-            if "Sadece Eksik" not in sync_mode:
-                changes_made = _update_product(shopify_api, sentos_api, sentos_product, existing_product, sync_mode)
-                status, status_icon = 'updated', "🔄"
-                with lock: stats['updated'] += 1
-            else:
-                status, status_icon = 'skipped', "⏭️"
-                with lock: stats['skipped'] += 1
-
-        elif "Tam Senkronizasyon" in sync_mode or "Sadece Eksik" in sync_mode:
-            changes_made = _create_product(shopify_api, sentos_api, sentos_product)
-            status, status_icon = 'created', "✅"
-            with lock: stats['created'] += 1
         else:
-            with lock: stats['skipped'] += 1
-            return
-        
-        changes_html = "".join([f'<li><small>{change}</small></li>' for change in changes_made])
-        log_html = f"""
+            with lock: stats[status] += 1
+            changes_html = "".join([f'<li><small>{change}</small></li>' for change in changes_made])
+            log_html = f"""
         <div style='border-bottom: 1px solid #444; padding-bottom: 8px; margin-bottom: 8px;'>
-            <strong>{status_icon} {status.capitalize()}:</strong> {name} (SKU: {sku})
+            <strong>{STATUS_ICONS[status]} {status.capitalize()}:</strong> {name} (SKU: {sku})
             <ul style='margin-top: 5px; margin-bottom: 0; padding-left: 20px;'>
                 {changes_html if changes_made else "<li><small>Değişiklik bulunamadı.</small></li>"}
             </ul>
         </div>
         """
-        progress_callback({'log_detail': log_html})
-        with lock: details.append(log_entry)
+            progress_callback({'log_detail': log_html})
+            with lock: details.append(log_entry)
+    finally:
+        with lock: stats['processed'] += 1
+        if checkpoint is not None:
+            checkpoint.record(sentos_product, outcome)
 
+def _process_single_product(shopify_api, sentos_api, sentos_product, sync_mode, progress_callback, stats, details, lock, fingerprints=None, checkpoint=None, resolved=None):
+    """resolved verilirse (plandaki karar) ürün yeniden eşleştirilmez."""
+    started = time.monotonic()
+    try:
+        action, existing_product, facets = resolved or _resolve_product_action(shopify_api, sentos_product, sync_mode, fingerprints)
+        changes_made = []
+        if action == 'update':
+            changes_made = _update_product(shopify_api, sentos_api, sentos_product, existing_product, sync_mode, facets=facets, fingerprints=fingerprints)
+            status = 'updated'
+        elif action == 'create':
+            changes_made = _create_product(shopify_api, sentos_api, sentos_product)
+            if fingerprints is not None:
+                fingerprints.mark_synced(sentos_product, FACETS)
+            status = 'created'
+        elif action == 'unchanged':
+            changes_made = ["Sentos verisi son senkronizasyondan beri değişmedi, güncelleme atlandı."]
+            status = 'skipped'
+        elif action == 'skip':
+            status = 'skipped'
+        else:
+            status = 'ignored'
     except Exception as e:
-        error_message = f"❌ Hata: {name} (SKU: {sku}) - {e}"
-        progress_callback({'log_detail': f"<div style='color: #f48a94;'>{error_message}</div>"})
-        with lock: 
-            stats['failed'] += 1
-            log_entry.update({'status': 'failed', 'reason': str(e)})
-            details.append(log_entry)
+        _report_product(sentos_product, None, [], progress_callback, stats, details, lock, checkpoint, error=e)
+        record_product_latency(shopify_api, started)
+        return
+    _report_product(sentos_product, status, changes_made, progress_callback, stats, details, lock, checkpoint)
+    record_product_latency(shopify_api, started)
+
+class _LanedProduct:
+    """Bir ürünün farklı şeritlere dağıtılmış parçalarını toplar; son parça bitince sonucu raporlar."""
+    def __init__(self, parts, on_done):
+        self.remaining = parts
+        self.changes = {}
+        self.error = None
+        self.cancelled = False
+        self.on_done = on_done
+        self.lock = threading.Lock()
+
+    def part_done(self, lane, future):
+        with self.lock:
+            if future.cancelled():
+                self.cancelled = True
+            elif future.exception() is not None:
+                self.error = self.error or future.exception()
+            else:
+                self.changes[lane] = future.result() or []
+            self.remaining -= 1
+            finished = self.remaining == 0
+        if finished and not self.cancelled:
+            # Değişiklikler şerit öncelik sırasıyla listelenir
+            changes = [c for lane_name in LANES for c in self.changes.get(lane_name, [])]
+            self.on_done(changes, self.error)
+
+def _dispatch_product_to_lanes(shopify_api, sentos_api, sentos_product, sync_mode, scheduler, progress_callback, stats, details, lock, fingerprints=None, checkpoint=None, resolved=None):
+    """Ürünün facet'lerini öncelikli şeritlere dağıtır (stok önce, medya en son)."""
+    started = time.monotonic()
+    def report(status, changes, error=None):
+        # Gecikme, ürünün şeritlere dağıtılmasından son parçasının bitmesine kadar ölçülür
+        _report_product(sentos_product, status, changes, progress_callback, stats, details, lock, checkpoint, error=error)
+        record_product_latency(shopify_api, started)
+    try:
+        action, existing_product, facets = resolved or _resolve_product_action(shopify_api, sentos_product, sync_mode, fingerprints)
+    except Exception as e:
+        report(None, [], e)
+        return
+
+    if action == 'update':
+        facets = MODE_FACETS.get(sync_mode, ()) if facets is None else facets
+        lane_facets = {}
+        for facet in facets:
+            lane_facets.setdefault(FACET_LANES[facet], []).append(facet)
+        if not lane_facets:
+            report('updated', [])
+            return
+        tracker = _LanedProduct(len(lane_facets), lambda changes, error: report('updated', changes, error))
+        for lane, lane_group in lane_facets.items():
+            future = scheduler.submit(lane, _update_product, shopify_api, sentos_api, sentos_product, existing_product, sync_mode, facets=lane_group, fingerprints=fingerprints)
+            future.add_done_callback(lambda f, lane=lane: tracker.part_done(lane, f))
+    elif action == 'create':
+        # Oluşturma tek parça halinde yapılır; ürün aktive edilene kadar DRAFT olduğu için stok şeridini meşgul etmez
+        def create():
+            changes = _create_product(shopify_api, sentos_api, sentos_product)
+            if fingerprints is not None:
+                fingerprints.mark_synced(sentos_product, FACETS)
+            return changes
+        tracker = _LanedProduct(1, lambda changes, error: report('created', changes, error))
+        future = scheduler.submit('details', create)
+        future.add_done_callback(lambda f: tracker.part_done('details', f))
+    elif action == 'unchanged':
+        report('skipped', ["Sentos verisi son senkronizasyondan beri değişmedi, güncelleme atlandı."])
+    elif action == 'skip':
+        report('skipped', [])
+    else:
+        report('ignored', [])
+
+def _process_products_in_lanes(shopify_api, sentos_api, products, sync_mode, max_workers, progress_callback, stop_event, stats, details, lock, fingerprints=None, checkpoint=None, lane_config=None, plan=None):
+    """Ürünleri öncelikli şeritlerle işler: tüm ürünlerin stok güncellemeleri medya işlerini beklemez."""
+    total_rps = float(os.getenv("SHOPIFY_RATE_LIMIT_RPS", "4"))
+    scheduler = LaneScheduler(shopify_api, max_workers, total_rps, lane_config)
+    cancelled = False
+    try:
+        for p in products:
+            _dispatch_product_to_lanes(shopify_api, sentos_api, p, sync_mode, scheduler, progress_callback, stats, details, lock, fingerprints, checkpoint,
+                                       resolved=plan.resolution(p) if plan is not None else None)
+
+        last_processed = -1
+        while True:
+            pending = scheduler.pending_counts()
+            if stop_event.is_set():
+                cancelled = True
+                break
+            processed, total = stats['processed'], stats['total']
+            if processed != last_processed:
+                last_processed = processed
+                progress = 55 + int((processed / total) * 45) if total > 0 else 100
+                lanes_msg = ", ".join(f"{lane}: {count}" for lane, count in pending.items() if count)
+                progress_callback({'progress': progress, 'message': f"İşlenen: {processed}/{total}" + (f" | Kuyruk: {lanes_msg}" if lanes_msg else ""), 'stats': stats.copy()})
+            if not any(pending.values()):
+                break
+            time.sleep(0.2)
     finally:
-        with lock: stats['processed'] += 1
+        scheduler.shutdown(cancel=cancelled)
+        if fingerprints is not None:
+            fingerprints.flush()
 
-def _run_core_sync_logic(shopify_config, sentos_config, sync_mode, max_workers, test_mode, progress_callback, stop_event, find_missing_only=False):
+def _run_stock_engine(shopify_api, products, progress_callback, stats, details, lock, fingerprints=None, checkpoint=None):
+    """
+    Stok modunda eşleşen ürünleri anlık görüntü farkıyla toplu işler.
+    Klasik ürün bazlı yoldan işlenmesi gereken ürünleri (eşleşmeyen / yeni varyantlı) döndürür.
+    """
+    matched, product_gids, remaining = [], [], []
+    for p in products:
+        existing = _find_shopify_product(shopify_api, p) if p.get('name', '').strip() else None
+        if existing and existing.get('gid'):
+            matched.append(p)
+            product_gids.append(existing['gid'])
+        else:
+            remaining.append(p)
+    if not matched:
+        return remaining
+
+    # Stok sadece eşleşen ürünün varyantlarına yazılır (aynı SKU başka Shopify ürünlerinde de olabilir)
+    results, fallback = stock_snapshot_sync.run_stock_snapshot_sync(shopify_api, matched, progress_callback, product_gids)
+    for sentos_product, status, changes, error in results:
+        if fingerprints is not None and error is None:
+            fingerprints.mark_synced(sentos_product, ['variants'])
+        _report_product(sentos_product, status, changes, progress_callback, stats, details, lock, checkpoint, error)
+    if fingerprints is not None:
+        fingerprints.flush()
+    processed, total = stats['processed'], stats['total']
+    progress_callback({'progress': 55 + int((processed / total) * 45) if total > 0 else 100,
+                       'message': f"İşlenen: {processed}/{total} (anlık görüntü farkı)", 'stats': stats.copy()})
+    return remaining + fallback
+
+def _build_plan(shopify_api, products, sync_mode, fingerprints=None):
+    """Yazma başlamadan önce ürün bazında işlem planı, maliyet ve tahmini süre."""
+    plan = build_sync_plan(products, sync_mode, lambda p: _resolve_product_action(shopify_api, p, sync_mode, fingerprints),
+                           MODE_FACETS.get(sync_mode, ()))
+    return plan, _plan_summary(shopify_api, plan)
+
+def _plan_summary(shopify_api, plan):
+    """Planın maliyet/süre özeti; süre mağazanın son bildirilen geri dolum hızıyla hesaplanır."""
+    status = getattr(shopify_api, 'last_throttle_status', None) or {}
+    restore_rate = float(status.get('restoreRate') or DEFAULT_RESTORE_RATE)
+    return plan.summary(restore_rate, float(os.getenv("SHOPIFY_RATE_LIMIT_RPS", "4")))
+
+def _writes_inventory(sync_mode):
+    return 'variants' in MODE_FACETS.get(sync_mode, ()) or "Sadece Eksik" in sync_mode
+
+def _writes_media(sync_mode):
+    return 'images' in MODE_FACETS.get(sync_mode, ()) or "Sadece Eksik" in sync_mode
+
+def _process_products(shopify_api, sentos_api, products, sync_mode, max_workers, progress_callback, stop_event, stats, details, lock, fingerprints=None, checkpoint=None, priority_lanes=False, plan=None):
+    """
+    Ürün listesini thread havuzunda işler; tek process'li ve sharded çalışmalar tarafından ortak kullanılır.
+    plan verilirse her ürün için plandaki karar (create/update ve facet'ler) yürütülür.
+    """
+    # Tüm worker'ların varyant okumaları ve stok/aktivasyon yazmaları ürünler arası toplu çağrılarda birleştirilir
+    batcher = fetcher = None
+    if _writes_inventory(sync_mode):
+        fetcher = VariantFetcher(shopify_api)
+        try:
+            batcher = InventoryBatcher(shopify_api)
+        except Exception as e:
+            logging.warning(f"⚠️ Toplu stok yazıcı başlatılamadı, ürün bazlı yazılacak: {e}")
+    # Medyası değişen ürünlerin sıralaması, medya hazır olduğunda arka planda yapılır (worker beklemez)
+    reorder_queue = MediaReorderQueue(shopify_api) if _writes_media(sync_mode) else None
+    if reorder_queue is not None and getattr(shopify_api, 'media_fingerprints', None) is None:
+        # Yüklenen görsellerin kaynak URL ve içerik hash'i kaydedilir; aynı görsel tekrar yüklenmez
+        shopify_api.media_fingerprints = MediaFingerprintStore(getattr(shopify_api, 'store_url', ''))
+    try:
+        if priority_lanes:
+            _process_products_in_lanes(shopify_api, sentos_api, products, sync_mode, max_workers, progress_callback, stop_event, stats, details, lock, fingerprints, checkpoint, plan=plan)
+            return
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="SyncWorker") as executor:
+            futures = [executor.submit(_process_single_product, shopify_api, sentos_api, p, sync_mode, progress_callback, stats, details, lock, fingerprints, checkpoint,
+                                       plan.resolution(p) if plan is not None else None) for p in products]
+            for future in as_completed(futures):
+                if stop_event.is_set(): 
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    break
+                processed, total = stats['processed'], stats['total']
+                progress = 55 + int((processed / total) * 45) if total > 0 else 100
+                progress_callback({'progress': progress, 'message': f"İşlenen: {processed}/{total}", 'stats': stats.copy()})
+    finally:
+        if reorder_queue is not None:
+            if pending := reorder_queue.pending_count():
+                progress_callback({'message': f"{pending} ürünün görselleri işleniyor, sıralama bekleniyor..."})
+            # Durdurulduysa uzun bekleme yapılmaz
+            reorder_queue.close(timeout=30 if stop_event.is_set() else None)
+            if reorder_queue.stats['timed_out'] or reorder_queue.stats['failed']:
+                logging.warning(f"⚠️ Medya sıralama özeti: {reorder_queue.stats}")
+        if fetcher is not None:
+            fetcher.close()
+        if batcher is not None:
+            batcher.close()
+        if fingerprints is not None:
+            fingerprints.flush()
+
+def _start_run_log(sync_mode, max_workers):
+    """Çalışmayı log_manager'a kaydeder; log hatası senkronizasyonu etkilemez."""
+    try:
+        source = 'github_actions' if os.getenv('GITHUB_ACTIONS') else 'web_ui'
+        return log_manager.log_sync_start(sync_mode, source, worker_count=max_workers)
+    except Exception as e:
+        logging.error(f"Senkronizasyon logu başlatılamadı: {e}")
+        return None
+
+def _finish_run_log(log_id, sync_mode, stats, duration, timer, success=True):
+    """Sonuçları ve aşama bazında süre/istek dökümünü kaydeder (bkz. pages/4_logs.py)."""
+    if log_id is None:
+        return
+    try:
+        log_manager.log_sync_complete(log_id, stats, duration, success=success)
+        log_manager.log_sync_timings(log_id, sync_mode, timer.summary())
+    except Exception as e:
+        logging.error(f"Senkronizasyon süre dökümü kaydedilemedi: {e}")
+
+def _run_core_sync_logic(shopify_config, sentos_config, sync_mode, max_workers, test_mode, progress_callback, stop_event, find_missing_only=False, skip_unchanged=False, resume=False, priority_lanes=False, stock_engine=True, dry_run=False):
     start_time = time.monotonic()
+    plan_summary = None
+    unmatched = None
     stats = {'total': 0, 'created': 0, 'updated': 0, 'failed': 0, 'skipped': 0, 'processed': 0}
     details = []
     lock = threading.Lock()
+    checkpoint = None
+    resume_info = None
+    # Aşama bazında süre ve istek sayıları (Shopify/Sentos istekleri o anki aşamaya yazılır)
+    timer = SyncTimer()
+    log_id = None if dry_run else _start_run_log(sync_mode, max_workers)
 
     try:
         shopify_api = ShopifyAPI(shopify_config['store_url'], shopify_config['access_token'])
+        shopify_api.sync_timer = timer
         
         # SEO MODU OPTIMIZASYONU: SEO Alt Metinli Resimler modu için Sentos API'yi kullanmayalım
         if sync_mode == "SEO Alt Metinli Resimler":
             logging.info("SEO Alt Metinli Resimler modu aktif - Sentos API atlanıyor, sadece Shopify ürünleri işleniyor")
             
             # Shopify ürünlerini cache'e yükle
-            shopify_api.load_all_products_for_cache(progress_callback)
+            with timer.phase('shopify_cache'):
+                shopify_api.load_all_products_for_cache(progress_callback)
             
             # ✅ ÖNEMLİ: Cache'de aynı ürün birden fazla kez var (title + her variant için SKU)
             # Duplicate'leri önlemek için GID'ye göre unique ürünleri alalım
@@ -382,6 +711,15 @@ def _run_core_sync_logic(shopify_config, sentos_config, sync_mode, max_workers,
                 logging.info(f"Test modu aktif: İlk 20 ürün işlenecek")
             
             stats['total'] = len(shopify_products)
+            if dry_run:
+                # Alt metin yazılmaz: ürün sayısı, maliyet ve tahmini süre raporlanır
+                plan = build_seo_plan(shopify_products, sync_mode)
+                duration = time.monotonic() - start_time
+                progress_callback({'status': 'done', 'results': {
+                    'stats': stats, 'details': plan.rows(), 'duration': str(timedelta(seconds=duration)),
+                    'plan': _plan_summary(shopify_api, plan), 'dry_run': True, 'timings': timer.summary(),
+                }})
+                return
             logging.info(f"Toplam {stats['total']} benzersiz Shopify ürünü için SEO güncellemesi başlatılıyor")
             
             # Her Shopify ürünü için sadece SEO güncelleme yap
@@ -398,46 +736,110 @@ def _run_core_sync_logic(shopify_config, sentos_config, sync_mode, max_workers,
         else:
             # NORMAL MOD: Sentos API ile çalış
             sentos_api = SentosAPI(sentos_config['api_url'], sentos_config['api_key'], sentos_config['api_secret'], sentos_config.get('cookie'))
+            sentos_api.sync_timer = timer
             
-            shopify_api.load_all_products_for_cache(progress_callback)
-            sentos_products = sentos_api.get_all_products(progress_callback)
+            with timer.phase('shopify_cache'):
+                shopify_api.load_all_products_for_cache(progress_callback)
+            with timer.phase('sentos_fetch'):
+                sentos_products = sentos_api.get_all_products(progress_callback)
             
             if test_mode: sentos_products = sentos_products[:20]
 
             products_to_process = sentos_products
-            if find_missing_only:
-                products_to_process = [p for p in sentos_products if not _find_shopify_product(shopify_api, p)]
-                logging.info(f"{len(products_to_process)} adet eksik ürün bulundu.")
+            with timer.phase('matching'):
+                # Eşleşmeyen ürünler, kopya oluşturmadan önce kontrol edilebilsin diye aday önerileriyle raporlanır
+                unmatched = _match_index(shopify_api).unmatched_report(sentos_products)
+                if unmatched:
+                    logging.info(f"{len(unmatched)} Sentos ürünü Shopify'da eşleşmedi ({sum(1 for u in unmatched if u['suggestions'])} tanesi için aday var).")
+                if find_missing_only:
+                    products_to_process = [p for p in sentos_products if not _find_shopify_product(shopify_api, p)]
+                    logging.info(f"{len(products_to_process)} adet eksik ürün bulundu.")
+
+            if dry_run:
+                # Hiçbir yazma yapılmaz: plan, maliyet ve tahmini süre raporlanır
+                fingerprints = FingerprintStore(shopify_config['store_url']) if skip_unchanged else None
+                with timer.phase('matching'):
+                    plan, plan_summary = _build_plan(shopify_api, products_to_process, sync_mode, fingerprints)
+                stats['total'] = len(products_to_process)
+                duration = time.monotonic() - start_time
+                progress_callback({'status': 'done', 'results': {
+                    'stats': stats, 'details': plan.rows(), 'duration': str(timedelta(seconds=duration)),
+                    'plan': plan_summary, 'dry_run': True, 'unmatched': unmatched, 'timings': timer.summary(),
+                }})
+                return
+
+            # Her çalışmanın ilerlemesi kalıcı olarak kaydedilir; resume=True ise yarım kalan çalışmadan devam edilir
+            checkpoint = SyncCheckpoint(shopify_config['store_url'], sync_mode)
+            checkpoint.start(resume=resume, sentos_wm=sentos_watermark(sentos_products), shopify_wm=shopify_watermark(shopify_api))
+            if checkpoint.resumed:
+                products_to_process = checkpoint.filter_pending(products_to_process)
+                resume_info = {'run_id': checkpoint.run_id, 'already_processed': checkpoint.completed_count}
+                progress_callback({'message': f"Önceki çalışmadan devam ediliyor: {checkpoint.completed_count} ürün zaten işlenmiş, {len(products_to_process)} ürün kaldı."})
+            elif checkpoint.stale_run_id:
+                progress_callback({'message': "Yarım kalan çalışmadan sonra Sentos/Shopify verisi değişmiş; senkronizasyon baştan başlıyor."})
             
             stats['total'] = len(products_to_process)
 
-            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="SyncWorker") as executor:
-                futures = [executor.submit(_process_single_product, shopify_api, sentos_api, p, sync_mode, progress_callback, stats, details, lock) for p in products_to_process]
-                for future in as_completed(futures):
-                    if stop_event.is_set(): 
-                        executor.shutdown(wait=False, cancel_futures=True)
-                        break
-                    processed, total = stats['processed'], stats['total']
-                    progress = 55 + int((processed / total) * 45) if total > 0 else 100
-                    progress_callback({'progress': progress, 'message': f"İşlenen: {processed}/{total}", 'stats': stats.copy()})
+            # Değişmeyen ürünleri/facet'leri atlamak için parmak izi deposu
+            fingerprints = FingerprintStore(shopify_config['store_url']) if skip_unchanged else None
+
+            # Plan: tahmini maliyet/süre raporlanır; ürünler maliyet açısından en verimli sırayla ve plandaki
+            # kararlarla (create/update, çalışacak facet'ler) yürütülür
+            with timer.phase('matching'):
+                plan, plan_summary = _build_plan(shopify_api, products_to_process, sync_mode, fingerprints)
+            progress_callback({'message': f"Plan: ~{plan_summary['estimated_requests']} istek, ~{plan_summary['estimated_cost']} maliyet puanı, tahmini süre {plan_summary['eta']}"})
+            products_to_process = plan.ordered_products()
+
+            if sync_mode == STOCK_ONLY_MODE and stock_engine:
+                try:
+                    with timer.phase('stock'):
+                        products_to_process = _run_stock_engine(shopify_api, products_to_process, progress_callback, stats, details, lock, fingerprints, checkpoint)
+                except Exception as e:
+                    # Anlık görüntü alınamazsa (örn. başka bir bulk operation çalışıyor) ürün bazlı yola dönülür
+                    logging.warning(f"⚠️ Anlık görüntü farkı ile stok senkronizasyonu yapılamadı, ürün bazlı devam ediliyor: {e}")
+
+            _process_products(shopify_api, sentos_api, products_to_process, sync_mode, max_workers, progress_callback, stop_event, stats, details, lock, fingerprints, checkpoint, priority_lanes=priority_lanes, plan=plan)
+            checkpoint.finish('interrupted' if stop_event.is_set() else 'completed')
 
         duration = time.monotonic() - start_time
         results = {'stats': stats, 'details': details, 'duration': str(timedelta(seconds=duration))}
+        if resume_info:
+            results['resumed'] = resume_info
+        if plan_summary:
+            results['plan'] = plan_summary
+        if unmatched:
+            results['unmatched'] = unmatched
+        results['timings'] = timer.summary()
+        _finish_run_log(log_id, sync_mode, stats, results['duration'], timer)
         progress_callback({'status': 'done', 'results': results})
 
     except Exception as e:
         logging.critical(f"Senkronizasyon görevi kritik bir hata oluştu: {e}\n{traceback.format_exc()}")
+        if checkpoint is not None:
+            checkpoint.finish('failed')
+        _finish_run_log(log_id, sync_mode, stats, str(timedelta(seconds=time.monotonic() - start_time)), timer, success=False)
         progress_callback({'status': 'error', 'message': str(e)})
 
-def sync_products_from_sentos_api(store_url, access_token, sentos_api_url, sentos_api_key, sentos_api_secret, sentos_cookie, test_mode, progress_callback, stop_event, max_workers=2, sync_mode="Tam Senkronizasyon (Tümünü Oluştur ve Güncelle)"):
+def sync_products_from_sentos_api(store_url, access_token, sentos_api_url, sentos_api_key, sentos_api_secret, sentos_cookie, test_mode, progress_callback, stop_event, max_workers=2, sync_mode="Tam Senkronizasyon (Tümünü Oluştur ve Güncelle)", skip_unchanged=False, resume=False, shards=1, priority_lanes=False, stock_engine=True, dry_run=False):
     shopify_config = {'store_url': store_url, 'access_token': access_token}
     sentos_config = {'api_url': sentos_api_url, 'api_key': sentos_api_key, 'api_secret': sentos_api_secret, 'cookie': sentos_cookie}
-    _run_core_sync_logic(shopify_config, sentos_config, sync_mode, max_workers, test_mode, progress_callback, stop_event)
+    # Stok motoru tek bulk sorgu + toplu yazma yaptığı için process'lere bölmeye gerek yoktur
+    use_shards = (shards > 1 and not dry_run and sync_mode != "SEO Alt Metinli Resimler"
+                  and not (sync_mode == STOCK_ONLY_MODE and stock_engine))
+    # Ürün başına güncellemeler birleştirilip arayüze en fazla ~4 kez/sn iletilir
+    with ProgressBus(progress_callback) as bus:
+        if use_shards:
+            # Çok çekirdekli makinelerde ürün listesi process'lere bölünür (bkz. sharded_sync_runner.py)
+            from sharded_sync_runner import run_sharded_sync
+            run_sharded_sync(shopify_config, sentos_config, sync_mode, shards, max_workers, test_mode, bus, stop_event, skip_unchanged=skip_unchanged, resume=resume, priority_lanes=priority_lanes)
+            return
+        _run_core_sync_logic(shopify_config, sentos_config, sync_mode, max_workers, test_mode, bus, stop_event, skip_unchanged=skip_unchanged, resume=resume, priority_lanes=priority_lanes, stock_engine=stock_engine, dry_run=dry_run)
 
 def sync_missing_products_only(store_url, access_token, sentos_api_url, sentos_api_key, sentos_api_secret, sentos_cookie, test_mode, progress_callback, stop_event, max_workers=2):
     shopify_config = {'store_url': store_url, 'access_token': access_token}
     sentos_config = {'api_url': sentos_api_url, 'api_key': sentos_api_key, 'api_secret': sentos_api_secret, 'cookie': sentos_cookie}
-    _run_core_sync_logic(shopify_config, sentos_config, "Sadece Eksikleri Oluştur", max_workers, test_mode, progress_callback, stop_event, find_missing_only=True)
+    with ProgressBus(progress_callback) as bus:
+        _run_core_sync_logic(shopify_config, sentos_config, "Sadece Eksikleri Oluştur", max_workers, test_mode, bus, stop_event, find_missing_only=True)
 
 def sync_single_product_by_sku(store_url, access_token, sentos_api_url, sentos_api_key, sentos_api_secret, sentos_cookie, sku):
     try:
@@ -468,11 +870,16 @@ def sync_single_product_by_sku(store_url, access_token, sentos_api_url, sentos_a
         # --- YENİ EKLENEN/DEĞİŞTİRİLEN KISIM SONU ---
 
         shopify_api.load_all_products_for_cache()
-        existing_product = _find_shopify_product(shopify_api, sentos_product)
+        # Shopify tarafındaki tüm yedek eşleştirmeler (varyant SKU, barkod, ana model) yerel indeksten çözülür
+        index = _match_index(shopify_api)
+        existing_product = index.match(sentos_product) or index.match({'sku': sku})
         
         if not existing_product:
             # Sentos'ta ürün var ama Shopify'da yoksa, bu daha bilgilendirici bir mesajdır.
-            return {'success': False, 'message': f"Ürün Sentos'ta bulundu ancak '{sentos_product.get('name', sku)}' adıyla Shopify'da eşleşen bir ürün bulunamadı. Lütfen önce tam senkronizasyon çalıştırın."}
+            message = f"Ürün Sentos'ta bulundu ancak '{sentos_product.get('name', sku)}' adıyla Shopify'da eşleşen bir ürün bulunamadı. Lütfen önce tam senkronizasyon çalıştırın."
+            if suggestions := index.suggestions(sentos_product):
+                message += " Olası eşleşmeler: " + ", ".join(f"{s['title']} (%{int(s['score'] * 100)})" for s in suggestions)
+            return {'success': False, 'message': message, 'suggestions': suggestions}
         
         changes_made = _update_product(shopify_api, sentos_api, sentos_product, existing_product, "Tam Senkronizasyon (Tümünü Oluştur ve Güncelle)")
         product_name = sentos_product.get('name', sku)
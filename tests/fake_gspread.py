@@ -0,0 +1,109 @@
+"""Testler için bellek içi gspread Spreadsheet/Worksheet taklidi (operations.sheets_sync / sheets_snapshot'ın kullandığı yöntemler)."""
+
+import re
+
+from operations.sheets_sync import WorksheetNotFound
+
+_RANGE = re.compile(r"^'(?P<title>(?:[^']|'')*)'!(?P<c1>[A-Z]+)(?P<r1>\d+):(?P<c2>[A-Z]+)(?P<r2>\d+)$")
+
+
+def _col_index(letters):
+    index = 0
+    for ch in letters:
+        index = index * 26 + (ord(ch) - 64)
+    return index - 1
+
+
+def _parse(range_name):
+    match = _RANGE.match(range_name)
+    assert match, range_name
+    return (match['title'].replace("''", "'"), int(match['r1']) - 1, _col_index(match['c1']),
+            int(match['r2']) - 1, _col_index(match['c2']))
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title, rows, cols):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.row_count = int(rows)
+        self.col_count = int(cols)
+        self.cells = {}
+
+    def resize(self, rows=None, cols=None):
+        self.spreadsheet.calls.append(('resize', self.title))
+        self.row_count = rows or self.row_count
+        self.col_count = cols or self.col_count
+        self.cells = {k: v for k, v in self.cells.items() if k[0] < self.row_count and k[1] < self.col_count}
+
+    def get_values(self, range_name=None, value_render_option=None):
+        self.spreadsheet.calls.append(('get_values', self.title))
+        if not self.cells:
+            return []
+        rows = max(r for r, _ in self.cells) + 1
+        cols = max(c for _, c in self.cells) + 1
+        return [[self.cells.get((r, c), '') for c in range(cols)] for r in range(rows)]
+
+    def get_all_records(self):
+        self.spreadsheet.calls.append(('get_all_records', self.title))
+        values = self.get_values()
+        if not values:
+            return []
+        header = values[0]
+        return [dict(zip(header, row)) for row in values[1:]]
+
+    def set(self, row, col, value):
+        if value == '':
+            self.cells.pop((row, col), None)
+        else:
+            self.cells[(row, col)] = value
+
+
+class FakeSpreadsheet:
+    def __init__(self, spreadsheet_id="sheet-1"):
+        self.id = spreadsheet_id
+        self.sheets = {}
+        self.calls = []
+        self.revision = 0
+
+    def worksheet(self, title):
+        if title not in self.sheets:
+            raise WorksheetNotFound(title)
+        return self.sheets[title]
+
+    def add_worksheet(self, title, rows, cols):
+        self.calls.append(('add_worksheet', title))
+        self.sheets[title] = FakeWorksheet(self, title, rows, cols)
+        self.revision += 1
+        return self.sheets[title]
+
+    def get_lastUpdateTime(self):
+        return f"rev-{self.revision}"
+
+    def values_batch_update(self, params=None, body=None):
+        self.calls.append(('values_batch_update', sum(len(v) for d in body['data'] for v in d['values'])))
+        for item in body['data']:
+            title, r1, c1, r2, c2 = _parse(item['range'])
+            sheet = self.sheets[title]
+            assert r2 < sheet.row_count and c2 < sheet.col_count, "aralık sayfa sınırlarını aşıyor"
+            assert len(item['values']) == r2 - r1 + 1
+            for r, row in enumerate(item['values']):
+                assert len(row) <= c2 - c1 + 1
+                for c, value in enumerate(row):
+                    sheet.set(r1 + r, c1 + c, value)
+        self.revision += 1
+        return {}
+
+    def values_batch_clear(self, params=None, body=None):
+        self.calls.append(('values_batch_clear', len(body['ranges'])))
+        for range_name in body['ranges']:
+            title, r1, c1, r2, c2 = _parse(range_name)
+            for r in range(r1, r2 + 1):
+                for c in range(c1, c2 + 1):
+                    self.sheets[title].set(r, c, '')
+        self.revision += 1
+        return {}
+
+    def edit_cell(self, title, row, col, value):
+        """Başka bir kullanıcının elle düzenlemesi."""
+        self.sheets[title].set(row, col, value)
+        self.revision += 1
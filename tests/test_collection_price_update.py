@@ -0,0 +1,76 @@
+import queue
+import threading
+import time
+import pytest
+from operations.price_sync import update_collection_custom
+
+
+class CountingLimiter:
+    def __init__(self):
+        self.throttles = 0
+        self.successes = 0
+
+    def acquire(self, tokens_needed=1):
+        return True
+
+    def handle_throttle_error(self):
+        self.throttles += 1
+
+    def handle_success(self):
+        self.successes += 1
+
+
+class SlowCollectionAPI:
+    """Her mutation'ı 50 ms'de yanıtlayan, eşzamanlı istek sayısını ölçen sahte API."""
+
+    def __init__(self, product_count):
+        self.rate_limiter = CountingLimiter()
+        self.products = [{'id': f"P{i}", 'title': f"Ürün {i}", 'variants': {'edges': [
+            {'node': {'id': f"V{i}", 'price': '99.99' if i % 2 else '100.00', 'compareAtPrice': None}}]}}
+            for i in range(product_count)]
+        self.sent = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def get_products_by_collection(self, collection_id, progress_callback=None):
+        return self.products
+
+    def execute_graphql(self, query, variables):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+            self.sent.append(variables['productId'])
+        return {'productVariantsBulkUpdate': {'productVariants': variables['variants'], 'userErrors': []}}
+
+
+class TestCollectionPriceUpdate:
+    def test_unchanged_variants_are_skipped_and_updates_run_concurrently(self):
+        api = SlowCollectionAPI(20)
+        progress = queue.Queue()
+        # %0 artış: 99.99 -> 99.99 (değişmez), 100.00 -> 100.99
+        result = update_collection_custom(api, 'C1', 'percentage_inc', 0, progress_queue=progress, max_workers=5,
+                                          snapshot_store=False)
+
+        assert result['updated'] == 10 and result['unchanged'] == 10 and result['unchanged_variants'] == 10
+        assert sorted(api.sent) == sorted(f"P{i}" for i in range(0, 20, 2))
+        assert 1 < api.peak <= 5
+        # Mağaza limiter'ı değişmeden kullanılır
+        assert isinstance(api.rate_limiter, CountingLimiter)
+
+        updates = [progress.get_nowait() for _ in range(progress.qsize())]
+        assert updates and updates[-1]['progress'] == 100
+
+    def test_stop_event_skips_remaining_products(self):
+        api = SlowCollectionAPI(6)
+        stop = threading.Event()
+        stop.set()
+        result = update_collection_custom(api, 'C1', 'fixed_amount', 5, stop_event=stop, snapshot_store=False)
+        assert result['updated'] == 0 and api.sent == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,91 @@
+import pytest
+from unittest.mock import Mock
+from operations import core_sync
+import sync_runner
+
+
+def _sentos_product(**overrides):
+    product = {"name": "Keten Gömlek ", "description": "<p>Yazlık   gömlek</p>", "category": "Gömlek"}
+    product.update(overrides)
+    return product
+
+
+def _cached(**overrides):
+    cached = {"gid": "gid://shopify/Product/1", "title": "Keten Gömlek",
+              "description_html": "<p>Yazlık gömlek</p>", "product_type": "Gömlek"}
+    cached.update(overrides)
+    return cached
+
+
+class TestSyncProductFields:
+    def test_identical_values_send_no_mutation(self):
+        api = Mock()
+        changes = core_sync.sync_product_fields(api, "gid://shopify/Product/1", _sentos_product(), current=_cached())
+
+        api.execute_graphql.assert_not_called()
+        assert "Değişiklik yok" in changes[0]
+
+    def test_changed_fields_are_merged_into_one_update(self):
+        api = Mock()
+        api.execute_graphql.return_value = {"productUpdate": {"userErrors": []}}
+        cached = _cached(title="Eski Başlık", product_type="Tişört")
+
+        updated = []
+        core_sync.sync_product_fields(api, "gid://shopify/Product/1", _sentos_product(), current=cached, on_updated=updated.append)
+
+        assert api.execute_graphql.call_count == 1
+        sent = api.execute_graphql.call_args[0][1]["input"]
+        assert sent == {"id": "gid://shopify/Product/1", "title": "Keten Gömlek", "productType": "Gömlek"}
+        # Paylaşılan önbellek kaydı yerinde değiştirilmez; yeni değerler çağırana bildirilir
+        assert cached["title"] == "Eski Başlık"
+        assert updated == [{"title": "Keten Gömlek", "product_type": "Gömlek"}]
+
+    def test_shopify_reformatted_html_is_not_rewritten(self):
+        api = Mock()
+        sentos = _sentos_product(description="<p class='kumas'>Yazlık&nbsp;gömlek<br>%100 keten &amp; pamuk</p>\n<ul><li>S</li> <li>M</li></ul>")
+        cached = _cached(description_html='<p class="kumas">Yazlık gömlek<br/>%100 keten &amp; pamuk</p><ul>\n<li>S</li>\n<li>M</li>\n</ul>')
+
+        changes = core_sync.sync_product_fields(api, "gid://shopify/Product/1", sentos, current=cached)
+
+        api.execute_graphql.assert_not_called()
+        assert "Değişiklik yok" in changes[0]
+        assert core_sync.build_product_update(_cached(description_html="<p>Kışlık gömlek</p>"), sentos, ('details',))
+
+    def test_missing_index_values_are_read_in_batch(self):
+        api = Mock()
+        api.execute_graphql.return_value = {"nodes": [
+            {"id": "gid://shopify/Product/1", "title": "Keten Gömlek",
+             "descriptionHtml": "<p>Yazlık gömlek</p>", "productType": "Gömlek"}
+        ]}
+
+        changes = core_sync.sync_product_fields(api, "gid://shopify/Product/1", _sentos_product(), current=None)
+
+        assert api.execute_graphql.call_count == 1
+        assert "nodes(ids:" in api.execute_graphql.call_args[0][0]
+        assert "Değişiklik yok" in changes[0]
+
+    def test_user_errors_report_failure_status(self):
+        api = Mock()
+        api.execute_graphql.return_value = {"productUpdate": {"userErrors": [{"message": "Geçersiz"}]}}
+
+        changes, ok = core_sync.sync_product_fields(api, "gid://shopify/Product/1", _sentos_product(),
+                                                    current=_cached(title="Eski"), with_status=True)
+
+        assert not ok and changes == ["Hata: Geçersiz"]
+
+
+class TestRefreshCachedProduct:
+    def test_updated_entry_is_replaced_by_copy_and_index_rebuilt(self):
+        product = _cached(title="Eski Başlık")
+        api = Mock(product_cache={"title:Eski Başlık": product, "sku:KG-1": product})
+        api._match_index_cache = (None, None)
+
+        updated = sync_runner._refresh_cached_product(api, product, {"title": "Keten Gömlek"})
+
+        assert product["title"] == "Eski Başlık"
+        assert api.product_cache == {"sku:KG-1": updated, "title:Keten Gömlek": updated}
+        assert sync_runner._find_shopify_product(api, {"name": "Keten Gömlek"}) is updated
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
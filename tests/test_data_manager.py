@@ -0,0 +1,113 @@
+import json
+import time
+from io import StringIO
+import numpy as np
+import pandas as pd
+import pytest
+from cryptography.fernet import Fernet
+import data_manager
+from data_manager import EncryptedFrameWriter, load_user_frame, read_encrypted_frame, save_user_frame
+
+
+@pytest.fixture
+def fernet(tmp_path, monkeypatch):
+    key = Fernet.generate_key()
+    monkeypatch.setattr(data_manager, 'DATA_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(data_manager, 'get_fernet', lambda: Fernet(key))
+    return Fernet(key)
+
+
+def _price_table(n):
+    rng = np.random.default_rng(7)
+    return pd.DataFrame({'MODEL KODU': [f"M{i:06d}" for i in range(n)], 'ÜRÜN ADI': [f"Ürün {i}" for i in range(n)],
+                         'ALIŞ FİYATI': rng.uniform(10, 900, n), 'STOK': rng.integers(0, 50, n)})
+
+
+class TestEncryptedFrameStore:
+    def test_round_trip_and_column_projection(self, fernet):
+        df = _price_table(1200)
+        df.loc[3, 'ALIŞ FİYATI'] = np.nan
+        assert save_user_frame('ayse', 'price_df', df)
+
+        pd.testing.assert_frame_equal(load_user_frame('ayse', 'price_df'), df, check_dtype=False)
+        prices = load_user_frame('ayse', 'price_df', columns=['ALIŞ FİYATI'])
+        assert list(prices.columns) == ['ALIŞ FİYATI'] and np.isnan(prices.loc[3, 'ALIŞ FİYATI'])
+
+        raw = open(data_manager._get_user_frame_file('ayse', 'price_df'), 'rb').read()
+        assert b'M000001' not in raw and 'Ürün'.encode('utf-8') not in raw
+
+    def test_incremental_append_and_lazy_chunks(self, fernet, tmp_path):
+        path = str(tmp_path / "stream.encf")
+        df = _price_table(250)
+        with EncryptedFrameWriter(path, fernet, chunk_rows=100) as writer:
+            writer.append(df.iloc[:120])
+        with EncryptedFrameWriter(path, fernet, mode='a', chunk_rows=100) as writer:
+            writer.append(df.iloc[120:])
+
+        index, _ = data_manager._read_frame_index(path, fernet)
+        assert [group['rows'] for group in index['row_groups']] == [100, 20, 100, 30]
+        pd.testing.assert_frame_equal(read_encrypted_frame(path, fernet), df, check_dtype=False)
+
+        with pytest.raises(ValueError):
+            with EncryptedFrameWriter(path, fernet, mode='a') as writer:
+                writer.append(df[['MODEL KODU']])
+
+    def test_mixed_types_and_custom_index(self, fernet):
+        df = pd.DataFrame({'KOD': [1, 'A-2', None], 'FIYAT': [1.5, 2.5, 3.5]}, index=['x', 'y', 'z'])
+        assert save_user_frame('ayse', 'karma', df)
+        loaded = load_user_frame('ayse', 'karma')
+        assert loaded['KOD'].tolist()[:2] == ['1', 'A-2'] and pd.isna(loaded.loc['z', 'KOD']) and list(loaded.index) == ['x', 'y', 'z']
+
+    def test_wrong_key_or_missing_file_returns_none(self, fernet, monkeypatch):
+        save_user_frame('ayse', 'price_df', _price_table(10))
+        assert load_user_frame('ayse', 'price_df', fernet=Fernet(Fernet.generate_key())) is None
+        assert load_user_frame('mehmet', 'price_df') is None
+
+
+class TestUserDataMigration:
+    def test_save_user_data_stores_frames_separately(self, fernet):
+        df = _price_table(50)
+        assert data_manager.save_user_data('ayse', calculated_df=df, ayar='x')
+        assert data_manager.load_user_data('ayse') == {'ayar': 'x'}
+        pd.testing.assert_frame_equal(load_user_frame('ayse', 'calculated_df'), df, check_dtype=False)
+
+    def test_legacy_json_frames_are_migrated_once(self, fernet):
+        df = _price_table(30)
+        with open(data_manager._get_user_data_file('ayse'), 'wb') as f:
+            f.write(fernet.encrypt(json.dumps({'price_df_json': df.to_json(orient='split')}).encode('utf-8')))
+
+        assert data_manager.load_user_data('ayse') == {}
+        pd.testing.assert_frame_equal(load_user_frame('ayse', 'price_df'), df, check_dtype=False)
+        assert data_manager.load_user_data('ayse') == {}
+
+    def test_failed_migration_keeps_legacy_file(self, fernet, monkeypatch):
+        df = _price_table(30)
+        payload = {'price_df_json': df.to_json(orient='split'), 'ayar': 'x'}
+        file_path = data_manager._get_user_data_file('ayse')
+        with open(file_path, 'wb') as f:
+            f.write(fernet.encrypt(json.dumps(payload).encode('utf-8')))
+
+        def fail(*args, **kwargs):
+            raise OSError("disk dolu")
+        monkeypatch.setattr(data_manager, 'save_user_frame', fail)
+
+        assert data_manager.load_user_data('ayse') == payload
+        assert json.loads(fernet.decrypt(open(file_path, 'rb').read())) == payload
+        assert load_user_frame('ayse', 'price_df') is None
+
+    def test_large_table_loads_faster_than_json(self, fernet):
+        df = _price_table(200000)
+        save_user_frame('ayse', 'price_df', df)
+        legacy = fernet.encrypt(df.to_json(orient='split').encode('utf-8'))
+
+        started = time.perf_counter()
+        load_user_frame('ayse', 'price_df')
+        columnar = time.perf_counter() - started
+
+        started = time.perf_counter()
+        pd.read_json(StringIO(fernet.decrypt(legacy).decode('utf-8')), orient='split')
+        assert columnar < time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
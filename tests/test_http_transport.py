@@ -0,0 +1,84 @@
+import gzip
+import json
+import pytest
+import requests
+from connectors import http_transport
+from connectors.http_transport import Cassette, CassetteMiss, RecordingTransport, ReplayTransport
+from connectors.shopify_api import ShopifyAPI
+
+
+class FakeInner:
+    """Ağa çıkmadan sabit JSON yanıt döndüren iç taşıma."""
+
+    def __init__(self):
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        response = requests.Response()
+        response.status_code = 200
+        response.headers['Content-Type'] = 'application/json'
+        body = {'data': {'n': len(self.calls)}, 'access_token': 'shpat_gizli'}
+        response._content = json.dumps(body).encode('utf-8')
+        return response
+
+
+QUERY = "query getProducts($first: Int!) { products(first: $first) { edges { node { id } } } }"
+
+
+class TestRecording:
+    def test_secrets_are_scrubbed_from_cassette(self, tmp_path):
+        path = tmp_path / "kaset.jsonl.gz"
+        transport = RecordingTransport(Cassette(str(path)), inner=FakeInner())
+        transport.request('GET', 'https://magaza.example/products?page=1&access_token=abc',
+                          headers={'X-Shopify-Access-Token': 'shpat_gizli', 'Cookie': 'PHPSESSID=1'})
+        transport.request('POST', 'https://magaza.example/ajax.php', data={'id': 5, 'password': 'parola'})
+
+        raw = gzip.open(path, 'rt', encoding='utf-8').read()
+        assert 'shpat_gizli' not in raw and 'abc' not in raw and 'parola' not in raw and 'PHPSESSID' not in raw
+        assert len(Cassette.load(str(path)).interactions) == 2
+
+    def test_replay_returns_recorded_responses_in_order(self, tmp_path):
+        path = str(tmp_path / "kaset.jsonl.gz")
+        recorder = RecordingTransport(Cassette(path), inner=FakeInner())
+        for _ in range(2):
+            recorder.request('POST', 'https://a.example/graphql.json', json={'query': QUERY, 'variables': {'first': 5}})
+
+        # Farklı host ile oynatma: anahtar host içermez
+        replay = ReplayTransport(Cassette.load(path), strict=True)
+        numbers = [replay.request('POST', 'http://b.example/graphql.json', json={'query': QUERY, 'variables': {'first': 5}}).json()['data']['n']
+                   for _ in range(3)]
+        assert numbers == [1, 2, 2]
+        assert replay.stats == {'exact': 2, 'repeated': 1, 'loose': 0, 'missed': 0}
+        with pytest.raises(CassetteMiss):
+            replay.request('POST', 'http://b.example/graphql.json', json={'query': QUERY, 'variables': {'first': 9}})
+
+    def test_loose_fallback_and_latency_scale(self, monkeypatch):
+        cassette = Cassette()
+        RecordingTransport(cassette, inner=FakeInner()).request('POST', 'https://a.example/graphql.json',
+                                                                json={'query': QUERY, 'variables': {'first': 5}})
+        cassette.interactions[0]['elapsed'] = 2.0
+        sleeps = []
+        monkeypatch.setattr(http_transport.time, 'sleep', sleeps.append)
+
+        replay = ReplayTransport(cassette, latency_scale=0.5)
+        response = replay.request('POST', 'http://b.example/graphql.json', json={'query': QUERY, 'variables': {'first': 50}})
+        assert response.status_code == 200 and replay.stats['loose'] == 1
+        assert sleeps == [1.0]
+
+
+class TestConnectorWiring:
+    def test_shopify_api_uses_instance_and_global_transport(self):
+        cassette = Cassette()
+        api = ShopifyAPI("magaza.myshopify.com", "shpat_gizli")
+        api.transport = RecordingTransport(cassette, inner=FakeInner())
+        assert api.execute_graphql(QUERY, {'first': 5}) == {'n': 1}
+
+        other = ShopifyAPI("baska.myshopify.com", "token")
+        with http_transport.use_transport(ReplayTransport(cassette, strict=True)):
+            assert other.execute_graphql(QUERY, {'first': 5}) == {'n': 1}
+        assert http_transport.transport_for(other) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
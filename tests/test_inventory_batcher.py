@@ -0,0 +1,80 @@
+import threading
+import pytest
+from unittest.mock import Mock
+from operations import inventory_batcher
+from operations.inventory_batcher import InventoryBatcher
+
+
+def _adjustments(prefix, count):
+    return [{"inventoryItemId": f"gid://shopify/InventoryItem/{prefix}{i}", "availableQuantity": i} for i in range(count)]
+
+
+class TestSetQuantities:
+    def test_item_errors_are_mapped_and_rest_is_retried(self):
+        api = Mock()
+        api.last_throttle_status = None
+        api.execute_graphql.side_effect = [
+            {"inventorySetQuantities": {"inventoryAdjustmentGroup": None, "userErrors": [
+                {"field": ["input", "quantities", "1", "inventoryItemId"], "message": "Envanter bulunamadı"}]}},
+            {"inventorySetQuantities": {"inventoryAdjustmentGroup": {"id": "g"}, "userErrors": []}},
+        ]
+
+        errors = inventory_batcher.set_quantities(api, "gid://shopify/Location/1", _adjustments("A", 3))
+
+        assert errors == [None, "Envanter bulunamadı", None]
+        retried = api.execute_graphql.call_args_list[1][0][1]["input"]["quantities"]
+        assert [q["inventoryItemId"] for q in retried] == ["gid://shopify/InventoryItem/A0", "gid://shopify/InventoryItem/A2"]
+
+    def test_items_still_pending_after_last_attempt_are_failed(self):
+        api = Mock()
+        api.last_throttle_status = None
+        api.execute_graphql.side_effect = [
+            {"inventorySetQuantities": {"inventoryAdjustmentGroup": None, "userErrors": [
+                {"field": ["input", "quantities", str(position), "quantity"], "message": f"Hata {position}"}]}}
+            for position in (0, 0, 0)
+        ]
+
+        errors = inventory_batcher.set_quantities(api, "gid://shopify/Location/1", _adjustments("B", 4))
+
+        assert api.execute_graphql.call_count == 3
+        assert errors[:3] == ["Hata 0", "Hata 0", "Hata 0"]
+        assert errors[3] is not None
+
+    def test_batch_size_follows_available_budget(self):
+        api = Mock()
+        api.last_throttle_status = {"currentlyAvailable": 60, "restoreRate": 50}
+        api.execute_graphql.return_value = {"inventorySetQuantities": {"inventoryAdjustmentGroup": {"id": "g"}, "userErrors": []}}
+
+        inventory_batcher.set_quantities(api, "gid://shopify/Location/1", _adjustments("C", 120))
+
+        sizes = [len(call[0][1]["input"]["quantities"]) for call in api.execute_graphql.call_args_list]
+        assert sizes == [50, 50, 20]
+
+
+class TestInventoryBatcher:
+    def test_concurrent_workers_share_one_mutation(self):
+        api = Mock()
+        api.rate_limiter = None
+        api.inventory_batcher = None
+        api.last_throttle_status = None
+        api.get_default_location_id.return_value = "gid://shopify/Location/1"
+        api.execute_graphql.return_value = {"inventorySetQuantities": {"inventoryAdjustmentGroup": {"id": "g"}, "userErrors": []}}
+
+        batcher = InventoryBatcher(api, linger=0.3)
+        results = {}
+        workers = [threading.Thread(target=lambda p=p: results.__setitem__(p, batcher.set_quantities(_adjustments(p, 4))))
+                   for p in "ABC"]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        batcher.close()
+
+        assert api.execute_graphql.call_count == 1
+        assert len(api.execute_graphql.call_args[0][1]["input"]["quantities"]) == 12
+        assert results == {p: [None] * 4 for p in "ABC"}
+        assert api.inventory_batcher is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,47 @@
+import pytest
+from unittest.mock import Mock, patch
+from operations import media_fingerprint, media_sync
+from operations.media_fingerprint import MediaFingerprintStore
+
+PRODUCT = "gid://shopify/Product/1"
+
+
+@pytest.fixture
+def store(tmp_path):
+    return MediaFingerprintStore("test-store.myshopify.com", db_path=str(tmp_path / "media.db"))
+
+
+class TestMediaFingerprintStore:
+    def test_byte_identical_media_are_reported_keeping_the_first(self, store):
+        store.record(PRODUCT, "m1", "http://img/a.jpg", "hash-a")
+        store.record(PRODUCT, "m2", "http://img/b.jpg", "hash-b")
+        store.record(PRODUCT, "m3", "http://img/a-kopya.jpg", "hash-a")
+        store.record("gid://shopify/Product/2", "m4", "http://img/a.jpg", "hash-a")
+
+        assert store.find_duplicates() == {PRODUCT: ["m3"]}
+        store.forget(["m3"])
+        assert store.find_duplicates() == {}
+
+
+class TestSyncMediaWithFingerprints:
+    def test_image_with_same_content_is_not_uploaded_again(self, store):
+        # m1 daha önce eski URL'den yüklenmişti; Sentos aynı görseli yeni bir URL ile veriyor
+        store.record(PRODUCT, "m1", "http://img/eski.jpg", "hash-a")
+        api = Mock()
+        api.media_reorder_queue = None
+        api.media_fingerprints = store
+        api.get_product_media_details.return_value = [{"id": "m1", "alt": "Ürün", "originalSrc": "https://cdn.shopify.com/1.jpg"}]
+        sentos = Mock()
+        sentos.get_ordered_image_urls.return_value = ["http://img/yeni.jpg"]
+
+        with patch.object(media_fingerprint, 'content_hash_for_url', return_value="hash-a"):
+            changes = media_sync.sync_media(api, sentos, PRODUCT, {"id": 1, "name": "Ürün"})
+
+        api.execute_graphql.assert_not_called()
+        api.delete_product_media.assert_not_called()
+        assert changes == ["Resimler kontrol edildi (Değişiklik yok)."]
+        assert store.media_for_product(PRODUCT)["m1"]["source_url"] == "http://img/yeni.jpg"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
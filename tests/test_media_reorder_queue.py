@@ -0,0 +1,40 @@
+import pytest
+from unittest.mock import Mock
+from operations.media_reorder_queue import MediaReorderQueue
+
+
+def _media(status):
+    return {"edges": [{"node": {"id": "m2", "alt": "http://img/2.jpg", "status": "READY"}},
+                      {"node": {"id": "m1", "alt": "http://img/1.jpg", "status": status}}]}
+
+
+class TestMediaReorderQueue:
+    def test_products_are_reordered_together_once_media_is_ready(self):
+        api = Mock()
+        api.rate_limiter = None
+        api.media_reorder_queue = None
+        polls = []
+
+        def execute_graphql(query, variables):
+            if "getProductsMediaStatus" in query:
+                polls.append(list(variables["ids"]))
+                status = "PROCESSING" if len(polls) == 1 else "READY"
+                return {"nodes": [{"id": gid, "media": _media(status)} for gid in variables["ids"]]}
+            return {key: {"userErrors": []} for key in ("r0", "r1")}
+        api.execute_graphql.side_effect = execute_graphql
+
+        queue = MediaReorderQueue(api, initial_delay=0.05, max_delay=0.1)
+        queue.enqueue("gid://shopify/Product/1", ["http://img/1.jpg", "http://img/2.jpg"])
+        queue.enqueue("gid://shopify/Product/2", ["http://img/1.jpg", "http://img/2.jpg"])
+        queue.close(timeout=5)
+
+        assert len(polls) == 2 and len(polls[0]) == 2
+        reorder_calls = [c for c in api.execute_graphql.call_args_list if "productReorderMedia" in c[0][0]]
+        assert len(reorder_calls) == 1
+        assert reorder_calls[0][0][1]["moves0"] == [{"id": "m1", "newPosition": "0"}, {"id": "m2", "newPosition": "1"}]
+        assert queue.stats == {'reordered': 2, 'timed_out': 0, 'failed': 0}
+        assert api.media_reorder_queue is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
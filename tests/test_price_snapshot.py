@@ -0,0 +1,75 @@
+import pytest
+from operations.price_snapshot import PriceSnapshotStore, decode_snapshot, encode_snapshot
+from operations.price_sync import update_collection_custom
+
+
+class RecordingAPI:
+    def __init__(self, products=None):
+        self.store_url = "https://test-magaza.myshopify.com"
+        self.rate_limiter = None
+        self.products = products or []
+        self.calls = []
+
+    def get_products_by_collection(self, collection_id, progress_callback=None):
+        return self.products
+
+    def execute_graphql(self, query, variables):
+        self.calls.append(variables)
+        return {'productVariantsBulkUpdate': {'productVariants': variables['variants'], 'userErrors': []}}
+
+
+def _rows(count):
+    return [{'product_id': f"gid://shopify/Product/{1000 + i // 3}", 'variant_id': f"gid://shopify/ProductVariant/{5000 + i}",
+             'price': f"{100 + i}.00", 'compare_at_price': None if i % 2 else f"{200 + i}.00"} for i in range(count)]
+
+
+class TestPriceSnapshotStore:
+    def test_round_trip_is_compact(self, tmp_path):
+        rows = _rows(3000)
+        blob = encode_snapshot(rows)
+        assert decode_snapshot(blob) == rows
+        assert len(blob) < 10 * len(rows)
+
+        store = PriceSnapshotStore("test-magaza.myshopify.com", db_path=str(tmp_path / "snap.db"))
+        run_id = store.save(rows, source='price_sync', description="deneme")
+        store.mark_finished(run_id, 999, 1)
+        assert store.load(run_id) == rows
+        run = store.list_runs()[0]
+        assert (run['run_id'], run['variant_count'], run['product_count'], run['status']) == (run_id, 3000, 1000, 'partial')
+
+        # Başka mağazanın görüntüleri görünmez
+        other = PriceSnapshotStore("baska.myshopify.com", db_path=str(tmp_path / "snap.db"))
+        assert other.list_runs() == []
+        with pytest.raises(KeyError):
+            other.load(run_id)
+
+    def test_rollback_restores_prices_and_clears_compare_at(self, tmp_path):
+        store = PriceSnapshotStore("https://test-magaza.myshopify.com/", db_path=str(tmp_path / "snap.db"))
+        run_id = store.save(_rows(4), source='collection')
+        api = RecordingAPI()
+
+        result = store.rollback(api, run_id, max_workers=2)
+
+        assert (result['status'], result['updated'], result['products']) == ('success', 2, 2)
+        sent = {call['productId']: call['variants'] for call in api.calls}
+        assert sent["gid://shopify/Product/1000"][1] == {'id': "gid://shopify/ProductVariant/5001",
+                                                         'price': "101.00", 'compareAtPrice': None}
+        assert store.list_runs()[0]['status'] == 'rolled_back'
+        assert api.rate_limiter is None
+
+    def test_collection_update_snapshots_only_changed_variants(self, tmp_path):
+        api = RecordingAPI([{'id': 'P1', 'title': 'Elbise', 'variants': {'edges': [
+            {'node': {'id': 'V1', 'price': '100.00', 'compareAtPrice': '150.00'}},
+            {'node': {'id': 'V2', 'price': '99.99', 'compareAtPrice': None}}]}}])
+        store = PriceSnapshotStore(api.store_url, db_path=str(tmp_path / "snap.db"))
+
+        result = update_collection_custom(api, 'C1', 'percentage_inc', 0, snapshot_store=store)
+
+        assert result['updated'] == 1
+        assert store.load(result['snapshot_id']) == [
+            {'product_id': 'P1', 'variant_id': 'V1', 'price': '100.00', 'compare_at_price': '150.00'}]
+        assert store.list_runs()[0]['status'] == 'completed'
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
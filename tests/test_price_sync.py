@@ -0,0 +1,119 @@
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from operations import price_sync
+from operations.price_sync import (PriceIndex, ShopifyCatalogIndex, _process_one_product_for_price_sync, build_target_prices,
+                                  compute_price_updates, update_prices_for_products)
+
+
+def _shopify_rows():
+    return [
+        {'product_id': 'P1', 'variant_id': 'V1', 'sku': 'ELB-1-S', 'price': '100.00', 'compare_at_price': None},
+        {'product_id': 'P1', 'variant_id': 'V2', 'sku': ' ELB-1-M ', 'price': '120.00', 'compare_at_price': '150.00'},
+        {'product_id': 'P2', 'variant_id': 'V3', 'sku': 'ETK-2', 'price': '80.004', 'compare_at_price': ''},
+        {'product_id': 'P3', 'variant_id': 'V4', 'sku': 'YOK-1', 'price': '10.00', 'compare_at_price': None},
+    ]
+
+
+class TestTargetPrices:
+    def test_invalid_rows_are_dropped_and_last_row_wins(self):
+        df = pd.DataFrame({'MODEL KODU': ['ELB-1', ' ETK-2', 'ELB-1', 'BOZUK'],
+                           'İNDİRİMLİ SATIŞ FİYATI': [90, 80, 120, 'abc'],
+                           'NIHAI_SATIS_FIYATI': [100, None, 150, 10]})
+        targets = build_target_prices(df, 'İNDİRİMLİ SATIŞ FİYATI', 'NIHAI_SATIS_FIYATI')
+        assert list(targets.index) == ['ETK-2', 'ELB-1']
+        assert targets.loc['ELB-1', 'price'] == 120 and np.isnan(targets.loc['ETK-2', 'compare'])
+
+
+class TestComputePriceUpdates:
+    def test_variant_and_base_sku_matching_with_change_detection(self):
+        price_df = pd.DataFrame({'MODEL KODU': ['ELB-1', 'ETK-2'], 'İNDİRİMLİ SATIŞ FİYATI': [120.0, 80.0],
+                                 'NIHAI_SATIS_FIYATI': [150.0, None]})
+        variants_df = pd.DataFrame({'MODEL KODU': ['ELB-1-S', 'ELB-1-M'], 'base_sku': ['ELB-1', 'ELB-1']})
+
+        updates, stats = compute_price_updates(_shopify_rows(), price_df, variants_df,
+                                               'İNDİRİMLİ SATIŞ FİYATI', 'NIHAI_SATIS_FIYATI')
+
+        # V2 zaten doğru, V3 fark eşiğin altında, V4 fiyat tablosunda yok
+        assert updates == {'P1': [{'id': 'V1', 'price': '120.00', 'compareAtPrice': '150.00'}]}
+        assert stats == {'checked': 4, 'matched': 3, 'unchanged': 2, 'variants_to_update': 1, 'products_to_update': 1}
+
+    def test_large_catalog_is_analyzed_quickly(self):
+        n = 40000
+        skus = [f"M{i // 4:05d}-{i % 4}" for i in range(n)]
+        rows = [{'product_id': f"P{i // 4}", 'variant_id': f"V{i}", 'sku': sku, 'price': '10.00', 'compare_at_price': None}
+                for i, sku in enumerate(skus)]
+        price_df = pd.DataFrame({'MODEL KODU': [f"M{i:05d}" for i in range(n // 4)], 'NIHAI_SATIS_FIYATI': 12.5})
+        variants_df = pd.DataFrame({'MODEL KODU': skus, 'base_sku': [sku.split('-')[0] for sku in skus]})
+
+        started = time.perf_counter()
+        updates, stats = compute_price_updates(rows, price_df, variants_df, 'NIHAI_SATIS_FIYATI')
+        assert time.perf_counter() - started < 2.0
+        assert stats['variants_to_update'] == n and len(updates) == n // 4
+        assert updates['P0'][0] == {'id': 'V0', 'price': '12.50'}
+
+
+class RecordingAPI:
+    def __init__(self, search_result=None):
+        self.queries = []
+        self.search_result = search_result or {'products': {'edges': []}}
+
+    def execute_graphql(self, query, variables):
+        self.queries.append(query)
+        if 'productVariantsBulkUpdate' in query:
+            return {'productVariantsBulkUpdate': {'productVariants': variables['variants'], 'userErrors': []}}
+        return self.search_result
+
+
+class NoWait:
+    def wait(self): pass
+    def handle_success(self): pass
+    def handle_throttle_error(self): pass
+
+
+class TestIndexedPriceSync:
+    def test_price_index_uses_first_valid_row(self):
+        df = pd.DataFrame({'MODEL KODU': ['ELB-1', 'ELB-1', 'ETK-2'], 'FIYAT': [100, 200, 'x']})
+        index = PriceIndex.from_frame(df, 'FIYAT')
+        assert index.get(' ELB-1 ') == (100.0, None) and 'ETK-2' not in index
+
+    def test_catalog_index_matches_model_code_prefix_and_base_sku(self):
+        rows = _shopify_rows()
+        index = ShopifyCatalogIndex.from_rows(rows, pd.DataFrame({'MODEL KODU': ['ETK-2'], 'base_sku': ['ETEK']}))
+        assert index.lookup('ELB-1') == ('P1', ['V1', 'V2'])
+        assert index.lookup('ETEK') == ('P2', ['V3']) and index.lookup('YOK-2') is None
+
+    def test_per_product_path_makes_no_read_queries(self):
+        price_df = pd.DataFrame({'MODEL KODU': ['ELB-1'], 'FIYAT': [99.5], 'ESKI': [150.0]})
+        api = RecordingAPI()
+        result = _process_one_product_for_price_sync(api, 'ELB-1', None, price_df, 'FIYAT', 'ESKI', NoWait(),
+                                                     price_index=PriceIndex.from_frame(price_df, 'FIYAT', 'ESKI'),
+                                                     catalog_index=ShopifyCatalogIndex.from_rows(_shopify_rows()))
+        assert result == {'status': 'success', 'updated_count': 2}
+        assert len(api.queries) == 1 and 'productVariantsBulkUpdate' in api.queries[0]
+
+    def test_without_catalog_index_falls_back_to_search(self):
+        search = {'products': {'edges': [{'node': {'id': 'P9', 'variants': {'edges': [
+            {'node': {'id': 'V9', 'sku': 'ELB-1-XL'}}, {'node': {'id': 'V10', 'sku': 'BASKA'}}]}}}]}}
+        api = RecordingAPI(search)
+        price_df = pd.DataFrame({'MODEL KODU': ['ELB-1'], 'FIYAT': [99.5]})
+        result = _process_one_product_for_price_sync(api, 'ELB-1', None, price_df, 'FIYAT', None, NoWait())
+        assert result['updated_count'] == 1 and len(api.queries) == 2
+
+    def test_product_loop_builds_indexes_once(self):
+        price_df = pd.DataFrame({'MODEL KODU': ['ELB-1', 'ETK-2', 'YOK-1'], 'FIYAT': [99.5, 70.0, 5.0]})
+        api = RecordingAPI()
+        api.get_all_products_prices = lambda progress_callback=None: _shopify_rows()
+        with patch.object(price_sync.PriceIndex, 'from_frame', wraps=PriceIndex.from_frame) as from_frame:
+            results = update_prices_for_products(api, ['ELB-1', 'ETK-2', 'YOK'], price_df, 'FIYAT', None, NoWait(), max_workers=2)
+
+        assert from_frame.call_count == 1
+        assert results['ELB-1'] == {'status': 'success', 'updated_count': 2} and results['ETK-2']['status'] == 'success'
+        assert results['YOK']['status'] == 'skipped'
+        assert len(api.queries) == 2 and all('productVariantsBulkUpdate' in q for q in api.queries)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
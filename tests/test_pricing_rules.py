@@ -0,0 +1,87 @@
+import math
+import numpy as np
+import pytest
+from operations import pricing_rules
+from operations.price_sync import update_collection_custom
+from operations.pricing_rules import PricingRules, adjust_prices, clamp_prices, round_prices
+
+
+def scalar_rounding(price, method):
+    """Sayfadaki eski satır bazlı apply_rounding (karşılaştırma için)."""
+    if method == "Yukarı Yuvarla":
+        if price % 10 != 9.99 and price % 10 != 9:
+            return math.floor(price / 10) * 10 + 9.99
+        elif price % 1 == 0:
+            return price - 0.01
+        return price
+    elif method == "Aşağı Yuvarla":
+        return math.floor(price / 10) * 10 - 0.01 if price > 10 else 9.99
+    return price
+
+
+class TestRounding:
+    @pytest.mark.parametrize('method', ["Yok", "Yukarı Yuvarla", "Aşağı Yuvarla"])
+    def test_matches_row_by_row_rounding(self, method):
+        prices = np.concatenate([np.random.default_rng(0).uniform(0, 5000, 2000), [9, 19, 129, 5, 10, 10.5, 0]])
+        expected = [scalar_rounding(p, method) for p in prices]
+        np.testing.assert_allclose(round_prices(prices, method), expected)
+
+    def test_x99_and_nan_passthrough(self):
+        np.testing.assert_allclose(round_prices([123.4, 7.0], pricing_rules.ROUNDING_X99), [123.99, 7.99])
+        assert np.isnan(round_prices([np.nan], "Aşağı Yuvarla")[0])
+
+
+class TestPricingRules:
+    def test_calculate_with_vat_and_guards(self):
+        rules = PricingRules(markup_type=pricing_rules.MARKUP_MULTIPLIER, markup_value=2.0, vat_rate=10,
+                             rounding="Yukarı Yuvarla", min_price=100, max_price=500)
+        result = rules.calculate([10.0, 100.0, 1000.0, 0.0])
+        np.testing.assert_allclose(result['gross'], [22.0, 220.0, 2200.0, 0.0])
+        np.testing.assert_allclose(result['final'], [100.0, 229.99, 500.0, 100.0])
+        np.testing.assert_allclose(result['profit'][:2], [100 / 1.1 - 10, 229.99 / 1.1 - 100])
+        assert result['profit_ratio'][3] == 0
+
+    def test_clamp_bounds_can_be_arrays(self):
+        np.testing.assert_allclose(clamp_prices([50, 50], min_price=[60, np.nan]), [60, 50])
+
+    def test_large_table_is_fast(self):
+        cost = np.random.default_rng(1).uniform(50, 900, 50000)
+        rules = PricingRules()
+        result = rules.calculate(cost)
+        assert len(result['final']) == 50000 and not np.isnan(result['final']).any()
+
+
+class TestAdjustPrices:
+    def test_discount_rate_skips_variants_without_compare_at(self):
+        prices = adjust_prices([100, 100], 'set_discount_rate', 20, compare_at=[200, 0])
+        assert prices[0] == pytest.approx(160.99) and np.isnan(prices[1])
+
+    def test_collection_update_sends_rounded_prices(self):
+        class FakeAPI:
+            def __init__(self):
+                self.calls = []
+
+            def get_products_by_collection(self, collection_id, progress_callback=None):
+                return [{'id': 'P1', 'title': 'Elbise', 'variants': {'edges': [
+                    {'node': {'id': 'V1', 'price': '100.00', 'compareAtPrice': None}},
+                    {'node': {'id': 'V2', 'price': '250.00', 'compareAtPrice': '300.00'}}]}},
+                        {'id': 'P2', 'title': 'Etek', 'variants': {'edges': []}}]
+
+            def execute_graphql(self, query, variables):
+                self.calls.append(variables)
+                return {'productVariantsBulkUpdate': {'productVariants': variables['variants'], 'userErrors': []}}
+
+        class NoWait:
+            def wait(self): pass
+            def handle_success(self): pass
+            def handle_throttle_error(self): pass
+
+        api = FakeAPI()
+        result = update_collection_custom(api, 'C1', 'percentage_inc', 10, rate_limiter=NoWait(), max_price=270,
+                                          snapshot_store=False)
+        assert (result['status'], result['total'], result['updated'], result['failed']) == ('success', 2, 1, 0)
+        assert api.calls[0]['variants'] == [{'id': 'V1', 'price': '110.99'}, {'id': 'V2', 'price': '270.00'}]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from operations import pricing_rules
+from operations.pricing_rules import PricingRules
+from operations.pricing_scenarios import ScenarioCache, ScenarioEngine, compute_scenario_grid
+
+
+def _products(n=200):
+    rng = np.random.default_rng(3)
+    return pd.DataFrame({'MODEL KODU': [f"M{i:04d}" for i in range(n)], 'ÜRÜN ADI': [f"Ürün {i}" for i in range(n)],
+                         'ALIŞ FİYATI': rng.uniform(20, 800, n).round(2)})
+
+
+class TestScenarioCache:
+    def test_lru_eviction_keeps_recently_used(self):
+        cache = ScenarioCache(max_entries=2)
+        cache.get_or_compute('a', lambda: 1)
+        cache.get_or_compute('b', lambda: 2)
+        cache.get_or_compute('a', lambda: 99)
+        cache.get_or_compute('c', lambda: 3)
+        assert cache.get_or_compute('a', lambda: 99) == 1
+        assert cache.get_or_compute('b', lambda: 22) == 22
+        assert len(cache) == 2
+
+
+class TestScenarioEngine:
+    def test_tables_are_cached_by_content_and_parameters(self):
+        engine = ScenarioEngine()
+        products = _products()
+        rules = PricingRules(markup_value=80)
+        main = engine.main_table(products, rules)
+        assert engine.main_table(products.copy(), rules) is main
+        assert engine.main_table(products, PricingRules(markup_value=90)) is not main
+        assert 'NIHAI_SATIS_FIYATI' not in products
+
+        retail = engine.retail_table(main, 10, 10)
+        assert engine.retail_table(main, 10, 10) is retail
+        assert engine.retail_table(main, 20, 10) is not retail
+        expected = pricing_rules.apply_discount(main['NIHAI_SATIS_FIYATI'], 10)
+        np.testing.assert_allclose(retail['İNDİRİMLİ SATIŞ FİYATI'], expected)
+
+        changed = main.copy()
+        changed.loc[0, 'ALIŞ FİYATI'] += 1
+        assert engine.retail_table(changed, 10, 10) is not retail
+        assert engine.cache.stats()['hits'] == 2
+
+    def test_wholesale_methods(self):
+        engine = ScenarioEngine()
+        main = engine.main_table(_products(5), PricingRules())
+        by_multiplier = engine.wholesale_table(main, 'Çarpanla', 1.8, 10)
+        np.testing.assert_allclose(by_multiplier["TOPTAN FİYAT (KDV'siz)"], main['ALIŞ FİYATI'] * 1.8)
+        by_discount = engine.wholesale_table(main, 'İndirimle', 40, 10)
+        np.testing.assert_allclose(by_discount["TOPTAN FİYAT (KDV'li)"], main['NIHAI_SATIS_FIYATI'] * 0.6)
+
+
+class TestScenarioGrid:
+    def test_grid_matches_single_scenario_calculation(self):
+        products = _products()
+        grid = compute_scenario_grid(products['ALIŞ FİYATI'], [50, 100], [0, 20], [10, 20])
+        assert len(grid) == 8
+        row = grid[(grid['KÂR MARJI'] == 100) & (grid['KDV (%)'] == 20) & (grid['İNDİRİM (%)'] == 20)].iloc[0]
+
+        final = PricingRules(markup_value=100, vat_rate=20).calculate(products['ALIŞ FİYATI'])['final']
+        discounted = pricing_rules.apply_discount(final, 20)
+        profit = pricing_rules.remove_vat(discounted, 20) - products['ALIŞ FİYATI'].to_numpy()
+        assert row['ORTALAMA SATIŞ FİYATI'] == pytest.approx(discounted.mean())
+        assert row['TOPLAM KÂR'] == pytest.approx(profit.sum())
+        assert row['ZARARDAKİ ÜRÜN'] == (profit < 0).sum()
+
+    def test_grid_is_chunked_without_changing_results(self, monkeypatch):
+        from operations import pricing_scenarios
+        cost = _products(50)['ALIŞ FİYATI']
+        full = compute_scenario_grid(cost, [1.5, 2, 2.5, 3], [0, 10], [10], markup_type=pricing_rules.MARKUP_MULTIPLIER)
+        monkeypatch.setattr(pricing_scenarios, 'MAX_GRID_CELLS', 100)
+        chunked = compute_scenario_grid(cost, [1.5, 2, 2.5, 3], [0, 10], [10], markup_type=pricing_rules.MARKUP_MULTIPLIER)
+        pd.testing.assert_frame_equal(full, chunked)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,54 @@
+import pytest
+from operations.product_matcher import ProductMatchIndex, normalize_text, normalize_sku
+
+
+def _shopify(gid, title, skus, barcodes=()):
+    barcodes = list(barcodes) + [''] * len(skus)
+    return {'gid': f"gid://shopify/Product/{gid}", 'title': title,
+            'variants': [{'sku': sku, 'barcode': barcode} for sku, barcode in zip(skus, barcodes)]}
+
+
+@pytest.fixture
+def index():
+    shirt = _shopify(1, "İpek Gömlek Beyaz", ["GML-100-S", "GML-100-M"], ["8690000000011"])
+    dress = _shopify(2, "Keten Elbise", ["ELB-200-S"])
+    skirt_a = _shopify(3, "Etek Mavi", ["ETK-300-S"])
+    skirt_b = _shopify(4, "Etek Kırmızı", ["ETK-300-M"])
+    cache = {f"title:{p['title']}": p for p in (shirt, dress, skirt_a, skirt_b)}
+    cache.update({f"sku:{v['sku']}": p for p in (shirt, dress, skirt_a, skirt_b) for v in p['variants']})
+    return ProductMatchIndex.from_cache(cache)
+
+
+class TestNormalization:
+    def test_turkish_i_case_and_whitespace_are_folded(self):
+        assert normalize_text("  İPEK   gömlek ") == normalize_text("ipek Gömlek") == "ipek gömlek"
+        assert normalize_text("SHIRT") == normalize_text("shırt")
+        assert normalize_sku(" gml-100 -s ") == "gml-100-s"
+
+
+class TestProductMatchIndex:
+    def test_lookup_chain(self, index):
+        assert index.lookup({'sku': 'gml-100-s '})[1] == 'sku'
+        assert index.lookup({'sku': 'X', 'variants': [{'sku': 'YOK', 'barcode': '8690000000011'}]})[1] == 'barcode'
+        product, key = index.lookup({'name': 'IPEK GÖMLEK  BEYAZ'})
+        assert key == 'title' and product['gid'].endswith('/1')
+
+    def test_base_model_alone_never_auto_matches(self, index):
+        # Aynı modelin yeni rengi/bedeni mevcut tek ürüne bağlanmaz, sadece aday olarak önerilir
+        sentos = {'name': 'Keten Elbise Yeşil', 'sku': 'ELB-200-XL'}
+        assert index.lookup(sentos) == (None, None)
+        suggestions = index.suggestions(sentos)
+        assert suggestions[0]['title'] == "Keten Elbise" and suggestions[0]['reason'] == 'base_model'
+
+    def test_ambiguous_base_model_is_reported_with_candidates(self, index):
+        sentos = {'name': 'Etek Yeşil', 'sku': 'ETK-300-XL'}
+        assert index.match(sentos) is None
+
+        report = index.unmatched_report([sentos, {'name': 'Keten Elbise', 'sku': 'ELB-200'}])
+        assert len(report) == 1
+        titles = [s['title'] for s in report[0]['suggestions']]
+        assert set(titles[:2]) == {"Etek Mavi", "Etek Kırmızı"}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,35 @@
+import pytest
+from operations.progress_bus import ProgressBus, log_entries
+
+
+class TestProgressBus:
+    def test_many_updates_are_coalesced_into_one_delivery(self):
+        received = []
+        bus = ProgressBus(received.append, interval=60, log_capacity=100)
+        for i in range(1, 1001):
+            bus({'log_detail': f"<div>{i}</div>"})
+            bus({'progress': i // 10, 'message': f"İşlenen: {i}/1000", 'stats': {'processed': i}})
+        bus({'status': 'done', 'results': {}})
+        bus.close()
+
+        assert len(received) == 2
+        update, done = received
+        assert update['stats'] == {'processed': 1000} and update['message'] == "İşlenen: 1000/1000"
+        assert log_entries(update) == [f"<div>{i}</div>" for i in range(901, 1001)]
+        assert update['logs_dropped'] == 900
+        assert len(bus.recent_logs) == 100
+        assert done['status'] == 'done'
+
+    def test_pending_updates_are_flushed_by_the_timer(self):
+        received = []
+        with ProgressBus(received.append, interval=0.01) as bus:
+            bus({'message': "Başlatılıyor"})
+            for _ in range(100):
+                if received:
+                    break
+                bus._stop.wait(0.01)
+            assert received == [{'message': "Başlatılıyor"}]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,165 @@
+import multiprocessing
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import sharded_sync_runner
+import sync_runner
+from sharded_sync_runner import merge_stats, partition_products, run_sharded_sync, shard_index
+from operations.smart_rate_limiter import SharedRateLimiter
+
+
+PRODUCTS = [{"id": i, "name": f"Ürün {i}"} for i in range(200)]
+
+
+def _take_tokens(limiter, count):
+    for _ in range(count):
+        limiter.acquire()
+
+
+class TestSharding:
+    def test_shard_assignment_is_stable(self):
+        assert [shard_index(p, 4) for p in PRODUCTS] == [shard_index(dict(p), 4) for p in PRODUCTS]
+
+    def test_partitions_cover_every_product_once(self):
+        partitions = partition_products(PRODUCTS, 4)
+        assert sorted(p["id"] for part in partitions for p in part) == list(range(200))
+        assert all(part for part in partitions)
+
+    def test_merge_stats_sums_shard_counters(self):
+        merged = merge_stats([
+            {"total": 3, "updated": 2, "failed": 1, "processed": 3},
+            {"total": 2, "skipped": 2, "processed": 2},
+        ])
+        assert merged == {"total": 5, "created": 0, "updated": 2, "failed": 1, "skipped": 2, "processed": 5}
+
+
+class TestSharedRateLimiter:
+    def test_budget_is_shared_between_processes(self):
+        ctx = multiprocessing.get_context("spawn")
+        limiter = SharedRateLimiter(max_requests_per_second=20, burst_capacity=5, mp_context=ctx)
+        start = time.monotonic()
+        processes = [ctx.Process(target=_take_tokens, args=(limiter, 10)) for _ in range(2)]
+        for p in processes: p.start()
+        for p in processes: p.join(timeout=30)
+        # 20 istek - 5 burst = 15 token, 20/sn hızla en az ~0.75 sn sürmeli
+        assert time.monotonic() - start >= 0.7
+
+
+class _ThreadPool(ThreadPoolExecutor):
+    """Shard process'lerinin yerine aynı process'te thread'ler (koordinatör mantığını test etmek için)."""
+    def __init__(self, max_workers, mp_context=None, initializer=None, initargs=()):
+        super().__init__(max_workers=max_workers, initializer=initializer, initargs=initargs)
+
+
+class _FakeShopify:
+    def __init__(self, *args):
+        self.product_cache = {}
+        self.last_throttle_status = None
+
+    def load_all_products_for_cache(self, progress_callback=None):
+        pass
+
+
+class _FakeSentos:
+    def __init__(self, *args):
+        pass
+
+    def get_all_products(self, progress_callback=None):
+        return PRODUCTS[:12]
+
+
+class TestShardFailures:
+    def test_failing_shard_stops_others_and_reports_error(self, monkeypatch):
+        stopped = []
+
+        def run_shard(shard, *args, **kwargs):
+            if shard == 0:
+                raise RuntimeError("shard çöktü")
+            stopped.append(sharded_sync_runner._mp_stop.wait(timeout=10))
+            return {'shard': shard, 'stats': {}, 'details': [], 'resumed': None}
+
+        finished = []
+        monkeypatch.setattr(sharded_sync_runner, 'ProcessPoolExecutor', _ThreadPool)
+        monkeypatch.setattr(sharded_sync_runner, 'ShopifyAPI', _FakeShopify)
+        monkeypatch.setattr(sharded_sync_runner, 'SentosAPI', _FakeSentos)
+        monkeypatch.setattr(sharded_sync_runner, '_run_shard', run_shard)
+        monkeypatch.setattr(sync_runner, '_start_run_log', lambda *a: 'log-1')
+        monkeypatch.setattr(sync_runner, '_finish_run_log', lambda log_id, mode, stats, duration, timer, success=True: finished.append(success))
+        updates = []
+
+        started = time.monotonic()
+        run_sharded_sync({'store_url': 'test.myshopify.com', 'access_token': 'x'}, {'api_url': '', 'api_key': '', 'api_secret': ''},
+                         "Sadece Açıklamalar", 3, 1, False, updates.append, threading.Event())
+
+        assert time.monotonic() - started < 8
+        assert stopped and all(stopped)
+        assert updates[-1]['status'] == 'error' and 'shard çöktü' in updates[-1]['message']
+        assert finished == [False]
+        assert any('Plan:' in u.get('message', '') for u in updates)
+
+    def test_shard_timings_are_merged_and_logged(self, monkeypatch):
+        def run_shard(shard, *args, **kwargs):
+            timer = sharded_sync_runner.SyncTimer()
+            with timer.phase('details'):
+                timer.count_request()
+            timer.record_product(0.5)
+            return {'shard': shard, 'stats': {'total': 1, 'processed': 1, 'updated': 1}, 'details': [], 'resumed': None, 'timings': timer.export()}
+
+        logged = []
+        monkeypatch.setattr(sharded_sync_runner, 'ProcessPoolExecutor', _ThreadPool)
+        monkeypatch.setattr(sharded_sync_runner, 'ShopifyAPI', _FakeShopify)
+        monkeypatch.setattr(sharded_sync_runner, 'SentosAPI', _FakeSentos)
+        monkeypatch.setattr(sharded_sync_runner, '_run_shard', run_shard)
+        monkeypatch.setattr(sync_runner, '_start_run_log', lambda *a: 'log-1')
+        monkeypatch.setattr(sync_runner, '_finish_run_log', lambda log_id, mode, stats, duration, timer, success=True: logged.append(timer.summary()))
+        updates = []
+
+        run_sharded_sync({'store_url': 'test.myshopify.com', 'access_token': 'x'}, {'api_url': '', 'api_key': '', 'api_secret': ''},
+                         "Sadece Açıklamalar", 3, 1, False, updates.append, threading.Event())
+
+        shards_run = len([p for p in partition_products(PRODUCTS[:12], 3) if p])
+        assert updates[-1]['status'] == 'done'
+        assert logged[0]['latency']['products'] == shards_run
+        assert logged[0]['phases']['details']['requests'] == shards_run
+        assert updates[-1]['results']['timings'] == logged[0]
+
+
+class _MatchedShopify(_FakeShopify):
+    def __init__(self, *args):
+        super().__init__()
+        self.product_cache = {"title:Ürün 1": {"gid": "gid://shopify/Product/1", "title": "Ürün 1", "variants": []}}
+
+
+class TestShardPlan:
+    def test_shards_execute_the_coordinator_plan(self, monkeypatch):
+        received = {}
+
+        def run_shard(shard, shards, shopify_config, sentos_config, sync_mode, max_workers, products, product_cache, *args):
+            # Process sınırı: ürünler, önbellek ve kararlar tek çağrıda birlikte pickle edilir
+            products, product_cache, resolutions = pickle.loads(pickle.dumps((products, product_cache, args[-1])))
+            received[shard] = (products, product_cache, sharded_sync_runner._shard_plan(sync_mode, products, resolutions))
+            return {'shard': shard, 'stats': {}, 'details': [], 'resumed': None}
+
+        monkeypatch.setattr(sharded_sync_runner, 'ProcessPoolExecutor', _ThreadPool)
+        monkeypatch.setattr(sharded_sync_runner, 'ShopifyAPI', _MatchedShopify)
+        monkeypatch.setattr(sharded_sync_runner, 'SentosAPI', _FakeSentos)
+        monkeypatch.setattr(sharded_sync_runner, '_run_shard', run_shard)
+        monkeypatch.setattr(sync_runner, '_start_run_log', lambda *a: 'log-1')
+        monkeypatch.setattr(sync_runner, '_finish_run_log', lambda *a, **k: None)
+        updates = []
+
+        run_sharded_sync({'store_url': 'test.myshopify.com', 'access_token': 'x'}, {'api_url': '', 'api_key': '', 'api_secret': ''},
+                         "Sadece Açıklamalar", 3, 1, False, updates.append, threading.Event())
+
+        assert updates[-1]['status'] == 'done'
+        resolved = {p['id']: (plan.resolution(p), cache) for products, cache, plan in received.values() for p in products}
+        assert len(resolved) == 12
+        (action, existing, facets), cache = resolved[1]
+        assert action == 'update' and existing is cache["title:Ürün 1"]
+        assert all(resolved[i][0] == ('ignore', None, None) for i in resolved if i != 1)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fake_gspread import FakeSpreadsheet
+from operations import sheets_snapshot
+from operations.sheets_snapshot import SheetSnapshotCache, load_sheets_cached
+from operations.sheets_sync import SheetStateStore, SpreadsheetSync
+
+
+def _normalize(title, df):
+    if 'MODEL KODU' in df.columns:
+        df['MODEL KODU'] = df['MODEL KODU'].astype(str)
+    if 'ALIŞ FİYATI' in df.columns:
+        df['ALIŞ FİYATI'] = pd.to_numeric(df['ALIŞ FİYATI'], errors='coerce')
+    return df
+
+
+@pytest.fixture
+def spreadsheet(tmp_path):
+    spreadsheet = FakeSpreadsheet()
+    main = pd.DataFrame({'MODEL KODU': [101, 'ELB-2', 'ETK-3'], 'ÜRÜN ADI': ['Elbise', 5, 'Etek'],
+                         'ALIŞ FİYATI': [100.0, np.nan, 80.5]})
+    variants = pd.DataFrame({'MODEL KODU': ['ELB-2-S', 'ELB-2-M'], 'base_sku': ['ELB-2', 'ELB-2']})
+    SpreadsheetSync(spreadsheet, SheetStateStore(str(tmp_path / "state"))).save({'Ana Fiyat': main, 'Varyantlar': variants})
+    spreadsheet.calls.clear()
+    return spreadsheet
+
+
+def _reads(spreadsheet):
+    return [call for call in spreadsheet.calls if call[0] == 'get_all_records']
+
+
+class TestSheetSnapshotCache:
+    def test_unchanged_revision_loads_from_local_snapshot(self, spreadsheet, tmp_path):
+        cache = SheetSnapshotCache(str(tmp_path / "snap"))
+        first, source = load_sheets_cached(spreadsheet, ['Ana Fiyat', 'Varyantlar'], _normalize, cache)
+        assert source == 'remote' and len(_reads(spreadsheet)) == 2
+
+        spreadsheet.calls.clear()
+        second, source = load_sheets_cached(spreadsheet, ['Ana Fiyat', 'Varyantlar'], _normalize, cache)
+        assert source == 'cache' and _reads(spreadsheet) == []
+        # Karışık tipli sütun her iki yolda da metne çevrilir, diğer tipler korunur
+        assert first['Ana Fiyat']['ÜRÜN ADI'].tolist() == second['Ana Fiyat']['ÜRÜN ADI'].tolist() == ['Elbise', '5', 'Etek']
+        assert second['Ana Fiyat']['MODEL KODU'].tolist() == ['101', 'ELB-2', 'ETK-3']
+        for title in ('Ana Fiyat', 'Varyantlar'):
+            pd.testing.assert_frame_equal(second[title], first[title], check_dtype=False)
+
+    def test_revision_change_refetches(self, spreadsheet, tmp_path):
+        cache = SheetSnapshotCache(str(tmp_path / "snap"))
+        load_sheets_cached(spreadsheet, ['Ana Fiyat'], _normalize, cache)
+        spreadsheet.edit_cell('Ana Fiyat', 1, 2, 999)
+
+        spreadsheet.calls.clear()
+        frames, source = load_sheets_cached(spreadsheet, ['Ana Fiyat'], _normalize, cache)
+        assert source == 'remote' and len(_reads(spreadsheet)) == 1
+        assert frames['Ana Fiyat'].loc[0, 'ALIŞ FİYATI'] == 999
+
+    def test_without_revision_or_pyarrow_cache_is_bypassed(self, spreadsheet, tmp_path, monkeypatch):
+        cache = SheetSnapshotCache(str(tmp_path / "snap"))
+        monkeypatch.setattr(sheets_snapshot, 'feather', None)
+        load_sheets_cached(spreadsheet, ['Ana Fiyat'], _normalize, cache)
+        _, source = load_sheets_cached(spreadsheet, ['Ana Fiyat'], _normalize, cache)
+        assert source == 'remote'
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,101 @@
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from fake_gspread import FakeSpreadsheet
+from operations.sheets_sync import SheetStateStore, SpreadsheetSync, a1_range, diff_grids
+
+
+def _price_table(n):
+    return pd.DataFrame({'MODEL KODU': [f"M{i:05d}" for i in range(n)], 'ÜRÜN ADI': [f"Ürün {i}" for i in range(n)],
+                         'ALIŞ FİYATI': np.arange(n, dtype=float) + 0.5, 'NIHAI_SATIS_FIYATI': np.arange(n) * 2.0 + 9.99})
+
+
+def _calls(spreadsheet, name):
+    return [call for call in spreadsheet.calls if call[0] == name]
+
+
+class TestDiffGrids:
+    def test_changed_rows_are_merged_and_shrunk_rows_cleared(self):
+        old = [['A', 'B', 'C'], [1, 2, 3], [4, 5, 6], [7, 8, 9], [10, 11, 12]]
+        new = [['A', 'B', 'C'], [1, 20, 3], [4, 5, 60], [7, 8, 9]]
+        diff = diff_grids(old, new)
+        assert diff.updates == [(1, 1, [[20, 3], [5, 60]])]
+        assert diff.cleared_rows == (4, 4, 2) and diff.changed_cells == 2
+
+    def test_sheet_text_values_match_numbers(self):
+        assert diff_grids([['X'], ['12.5']], [['X'], [12.5]]).is_empty
+
+    def test_a1_range_quotes_titles(self):
+        assert a1_range("Kâr'lar", 0, 26, 9, 27) == "'Kâr''lar'!AA1:AB10"
+
+
+class TestSpreadsheetSync:
+    def test_second_save_sends_only_changed_cells(self, tmp_path):
+        spreadsheet = FakeSpreadsheet()
+        sync = SpreadsheetSync(spreadsheet, SheetStateStore(str(tmp_path)), rows_per_range=100)
+        table = _price_table(1000)
+
+        first = sync.save({'Ana Fiyat': table})
+        assert first['Ana Fiyat']['baseline'] == 'new' and first['Ana Fiyat']['appended_rows'] == 1001
+        assert spreadsheet.sheets['Ana Fiyat'].get_values()[5] == ['M00004', 'Ürün 4', 4.5, pytest.approx(17.99)]
+
+        spreadsheet.calls.clear()
+        changed = table.copy()
+        changed.loc[10, 'NIHAI_SATIS_FIYATI'] = 1.0
+        changed.loc[11, 'NIHAI_SATIS_FIYATI'] = 2.0
+        report = sync.save({'Ana Fiyat': changed})['Ana Fiyat']
+
+        assert report == {'baseline': 'local', 'changed_cells': 2, 'appended_rows': 0, 'cleared_rows': 0, 'requests': 1}
+        assert _calls(spreadsheet, 'values_batch_update') == [('values_batch_update', 2)]
+        assert _calls(spreadsheet, 'get_values') == []
+
+        spreadsheet.calls.clear()
+        assert sync.save({'Ana Fiyat': changed})['Ana Fiyat']['requests'] == 0
+        assert spreadsheet.calls == []
+
+    def test_appends_in_chunks_and_clears_removed_rows(self, tmp_path):
+        spreadsheet = FakeSpreadsheet()
+        sync = SpreadsheetSync(spreadsheet, SheetStateStore(str(tmp_path)), max_cells_per_request=1000, rows_per_range=50)
+        sync.save({'Varyantlar': _price_table(100)})
+
+        spreadsheet.calls.clear()
+        report = sync.save({'Varyantlar': _price_table(400)})['Varyantlar']
+        # 300 satır x 4 sütun, 50 satırlık 6 aralık; istek başına en fazla 1000 hücre -> 2 istek
+        assert report['appended_rows'] == 300 and report['requests'] == 2
+        assert spreadsheet.sheets['Varyantlar'].row_count >= 401
+
+        report = sync.save({'Varyantlar': _price_table(50)})['Varyantlar']
+        assert report['cleared_rows'] == 350
+        assert spreadsheet.sheets['Varyantlar'].get_values() == [list(_price_table(0).columns)] + \
+            _price_table(50).astype(object).values.tolist()
+
+    def test_manual_edit_forces_diff_against_sheet(self, tmp_path):
+        spreadsheet = FakeSpreadsheet()
+        sync = SpreadsheetSync(spreadsheet, SheetStateStore(str(tmp_path)))
+        table = _price_table(20)
+        sync.save({'Ana Fiyat': table, 'Toptan Fiyat': table})
+
+        spreadsheet.edit_cell('Ana Fiyat', 3, 3, 'elle')
+        spreadsheet.calls.clear()
+        report = SpreadsheetSync(spreadsheet, SheetStateStore(str(tmp_path))).save({'Ana Fiyat': table, 'Toptan Fiyat': table})
+
+        assert report['Ana Fiyat']['baseline'] == 'remote' and report['Ana Fiyat']['changed_cells'] == 1
+        assert report['Toptan Fiyat']['requests'] == 0
+        assert spreadsheet.sheets['Ana Fiyat'].get_values()[3][3] == table.loc[2, 'NIHAI_SATIS_FIYATI']
+
+    def test_large_unchanged_table_is_fast(self, tmp_path):
+        spreadsheet = FakeSpreadsheet()
+        sync = SpreadsheetSync(spreadsheet, SheetStateStore(str(tmp_path)))
+        table = _price_table(20000)
+        sync.save({'Ana Fiyat': table})
+        spreadsheet.calls.clear()
+
+        started = time.perf_counter()
+        sync.save({'Ana Fiyat': table})
+        assert time.perf_counter() - started < 3.0
+        assert _calls(spreadsheet, 'values_batch_update') == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,75 @@
+import pytest
+import requests
+from benchmarks.catalog import generate_catalog, generate_orders, seed_shopify
+from benchmarks.sentos_simulator import SentosSimulator, SentosStore
+from benchmarks.shopify_simulator import ShopifySimulator, ShopifyStore
+from connectors.sentos_api import SentosAPI
+from connectors.shopify_api import ShopifyAPI
+from operations.stock_snapshot_sync import fetch_shopify_inventory_snapshot
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestShopifyCostModel:
+    def test_query_over_budget_is_throttled_until_bucket_refills(self):
+        clock = FakeClock()
+        store = ShopifyStore(bucket_max=100, restore_rate=10, clock=clock)
+        store.add_product("Gömlek", [{'sku': 'GML-1-S', 'quantity': 1}])
+        query = "{ products(first: 60) { edges { node { id } } } }"
+
+        first = store.execute(query)
+        assert first['extensions']['cost']['requestedQueryCost'] == 62
+        # Gerçek maliyet (1 ürün) düşülür, fark iade edilir
+        assert first['extensions']['cost']['actualQueryCost'] < 62
+
+        store.bucket.try_consume(store.bucket.status()['currentlyAvailable'])
+        throttled = store.execute(query)
+        assert throttled['errors'][0]['extensions']['code'] == 'THROTTLED'
+        clock.now += 7
+        assert 'data' in store.execute(query)
+        assert store.metrics['throttled'] == 1
+
+    def test_set_quantities_is_all_or_nothing(self):
+        store = ShopifyStore()
+        store.add_product("Etek", [{'sku': 'ETK-1', 'quantity': 3}, {'sku': 'ETK-2', 'quantity': None}])
+        items = list(store.items)
+        mutation = "mutation($input: InventorySetQuantitiesInput!) { inventorySetQuantities(input: $input) { userErrors { field message } } }"
+        result = store.execute(mutation, {'input': {'name': 'available', 'reason': 'correction', 'quantities': [
+            {'inventoryItemId': items[0], 'locationId': store.default_location, 'quantity': 9},
+            {'inventoryItemId': items[1], 'locationId': store.default_location, 'quantity': 9}]}})
+
+        assert result['data']['inventorySetQuantities']['userErrors'][0]['field'] == ['input', 'quantities', '1', 'locationId']
+        assert store.items[items[0]]['_levels'][store.default_location] == 3
+
+
+class TestSimulatorsOverHTTP:
+    def test_connectors_run_against_simulators(self):
+        catalog = generate_catalog(3, variants_per_product=2, images_per_product=1)
+        with SentosSimulator(SentosStore(catalog, generate_orders(catalog, 5))) as sentos, ShopifySimulator() as shopify:
+            seed_shopify(shopify.store, catalog, sentos.image_url, stock_drift=0)
+            shopify_api = ShopifyAPI(shopify.url, "token")
+            sentos_api = SentosAPI(sentos.url, "key", "secret", "cookie=1")
+
+            shopify_api.load_all_products_for_cache()
+            assert f"sku:{catalog[0]['variants'][0]['sku']}" in shopify_api.product_cache
+            snapshot = fetch_shopify_inventory_snapshot(shopify_api, shopify_api.get_default_location_id())
+            assert len(snapshot) == 6 and snapshot['available'].notna().all()
+
+            assert len(sentos_api.get_all_products(page_size=10)) == 3
+            assert sentos_api.get_product_by_sku(catalog[1]['variants'][1]['sku'].lower())['id'] == 2
+            assert sentos_api.get_ordered_image_urls(1) == [sentos.image_url("o_1_0.jpg")]
+
+    def test_sentos_error_injection(self):
+        with SentosSimulator(SentosStore(), error_rate=1.0, error_statuses=(429,)) as sentos:
+            response = requests.get(f"{sentos.url}/products", auth=("key", "secret"), timeout=5)
+        assert response.status_code == 429 and sentos.metrics['errors_429'] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
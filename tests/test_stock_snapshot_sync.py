@@ -0,0 +1,80 @@
+import json
+import pytest
+from unittest.mock import Mock, patch
+from operations import stock_snapshot_sync
+
+
+def _jsonl(records):
+    return [json.dumps(r) for r in records]
+
+
+def _variant_line(product, variant, sku, item, available):
+    level = None if available is None else {"quantities": [{"name": "available", "quantity": available}]}
+    return {"id": f"gid://shopify/ProductVariant/{variant}", "sku": sku,
+            "inventoryItem": {"id": f"gid://shopify/InventoryItem/{item}", "inventoryLevel": level},
+            "__parentId": f"gid://shopify/Product/{product}"}
+
+
+SNAPSHOT = _jsonl([
+    {"id": "gid://shopify/Product/1"},
+    _variant_line(1, 11, "A-S", 101, 5),
+    _variant_line(1, 12, "A-M", 102, 3),
+    {"id": "gid://shopify/Product/2"},
+    _variant_line(2, 21, "B-S", 201, None),
+])
+
+
+def _sentos(sku_stocks, name="Ürün"):
+    return {"name": name, "variants": [{"sku": sku, "stocks": [{"stock": qty}]} for sku, qty in sku_stocks]}
+
+
+class TestComputeStockDelta:
+    def test_only_changed_and_inactive_variants_are_written(self):
+        shopify_df = stock_snapshot_sync.parse_inventory_jsonl(SNAPSHOT)
+        sentos_df = stock_snapshot_sync.sentos_stock_frame([_sentos([("A-S", 5), ("A-M", 7)]), _sentos([("B-S", 2), ("B-XL", 1)])])
+
+        delta, unmatched = stock_snapshot_sync.compute_stock_delta(sentos_df, shopify_df)
+
+        assert delta.set_index('sku')['sentos_qty'].to_dict() == {"A-M": 7, "B-S": 2}
+        assert delta.set_index('sku')['needs_activation'].to_dict() == {"A-M": False, "B-S": True}
+        assert unmatched['sku'].tolist() == ["B-XL"]
+
+    def test_duplicate_sku_is_written_only_to_matched_product(self):
+        # A-M arşivde kalmış kopya üründe (Product/9) de var
+        shopify_df = stock_snapshot_sync.parse_inventory_jsonl(SNAPSHOT + _jsonl([{"id": "gid://shopify/Product/9"}, _variant_line(9, 91, "A-M", 901, 3)]))
+        products = [_sentos([("A-S", 5), ("A-M", 7)])]
+
+        sentos_df = stock_snapshot_sync.sentos_stock_frame(products, ["gid://shopify/Product/1"])
+        delta, unmatched = stock_snapshot_sync.compute_stock_delta(sentos_df, shopify_df)
+        assert delta['inventory_item_id'].tolist() == ["gid://shopify/InventoryItem/102"] and unmatched.empty
+
+        # Eşleşen ürün bilinmiyorsa belirsiz SKU hiçbir ürüne yazılmaz, ürün klasik yola düşer
+        delta, unmatched = stock_snapshot_sync.compute_stock_delta(stock_snapshot_sync.sentos_stock_frame(products), shopify_df)
+        assert delta.empty and unmatched['sku'].tolist() == ["A-M"]
+
+    def test_missing_sku_is_not_joined(self):
+        product = {"name": "Ürün", "variants": [{"sku": None, "stocks": [{"stock": 1}]}, {"sku": "A-S", "stocks": []}]}
+        assert stock_snapshot_sync.sentos_stock_frame([product])['sku'].tolist() == ["A-S"]
+
+
+class TestRunStockSnapshotSync:
+    def test_products_with_new_variants_fall_back(self):
+        api = Mock()
+        api.last_throttle_status = None
+        api.get_default_location_id.return_value = "gid://shopify/Location/1"
+        api.execute_graphql.return_value = {"inventorySetQuantities": {"inventoryAdjustmentGroup": {"id": "g"}, "userErrors": []}}
+        products = [_sentos([("A-S", 5), ("A-M", 7)], "A"), _sentos([("B-S", 2), ("B-XL", 1)], "B")]
+
+        shopify_df = stock_snapshot_sync.parse_inventory_jsonl(SNAPSHOT)
+        with patch.object(stock_snapshot_sync, 'fetch_shopify_inventory_snapshot', return_value=shopify_df):
+            results, fallback = stock_snapshot_sync.run_stock_snapshot_sync(api, products, product_gids=["gid://shopify/Product/1", "gid://shopify/Product/2"])
+
+        assert fallback == [products[1]]
+        assert [(p['name'], status) for p, status, _changes, _error in results] == [("A", "updated")]
+        # Tek inventorySetQuantities çağrısı, sadece değişen varyant
+        quantities = api.execute_graphql.call_args[0][1]["input"]["quantities"]
+        assert quantities == [{"inventoryItemId": "gid://shopify/InventoryItem/102", "locationId": "gid://shopify/Location/1", "quantity": 7}]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
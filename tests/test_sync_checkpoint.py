@@ -0,0 +1,82 @@
+import pytest
+import json
+import sqlite3
+from operations.sync_checkpoint import SyncCheckpoint
+
+
+PRODUCTS = [{"id": i, "name": f"Ürün {i}"} for i in range(1, 6)]
+
+
+class TestSyncCheckpoint:
+    def test_resume_skips_successfully_processed_products(self, tmp_path):
+        db_path = str(tmp_path / "cp.db")
+        first = SyncCheckpoint("test.myshopify.com", "Sadece Stok ve Varyantlar", db_path=db_path)
+        first.start()
+        first.record(PRODUCTS[0], "updated")
+        first.record(PRODUCTS[1], "skipped")
+        first.record(PRODUCTS[2], "failed")
+        first.flush()  # çökme: finish() hiç çağrılmadı
+
+        second = SyncCheckpoint("test.myshopify.com", "Sadece Stok ve Varyantlar", db_path=db_path)
+        run_id = second.start(resume=True)
+
+        assert run_id == first.run_id
+        assert second.resumed
+        assert [p["id"] for p in second.filter_pending(PRODUCTS)] == [3, 4, 5]
+
+    def test_completed_run_is_not_resumed(self, tmp_path):
+        db_path = str(tmp_path / "cp.db")
+        first = SyncCheckpoint("test.myshopify.com", "Sadece Stok ve Varyantlar", db_path=db_path)
+        first.start()
+        first.record(PRODUCTS[0], "updated")
+        first.finish("completed")
+
+        second = SyncCheckpoint("test.myshopify.com", "Sadece Stok ve Varyantlar", db_path=db_path)
+        second.start(resume=True)
+
+        assert not second.resumed
+        assert second.filter_pending(PRODUCTS) == PRODUCTS
+
+    def test_resume_is_scoped_to_sync_mode(self, tmp_path):
+        db_path = str(tmp_path / "cp.db")
+        first = SyncCheckpoint("test.myshopify.com", "Sadece Resimler", db_path=db_path)
+        first.start()
+        first.record(PRODUCTS[0], "updated")
+        first.finish("interrupted")
+
+        other_mode = SyncCheckpoint("test.myshopify.com", "Sadece Stok ve Varyantlar", db_path=db_path)
+        other_mode.start(resume=True)
+        assert not other_mode.resumed
+
+    def test_changed_sentos_watermark_starts_fresh(self, tmp_path):
+        db_path = str(tmp_path / "cp.db")
+        first = SyncCheckpoint("test.myshopify.com", "Sadece Stok ve Varyantlar", db_path=db_path)
+        first.start(sentos_wm={"count": 5, "digest": "a"}, shopify_wm={"count": 10})
+        first.record(PRODUCTS[0], "updated")
+        first.finish("interrupted")
+
+        second = SyncCheckpoint("test.myshopify.com", "Sadece Stok ve Varyantlar", db_path=db_path)
+        second.start(resume=True, sentos_wm={"count": 6, "digest": "b"}, shopify_wm={"count": 10})
+
+        assert not second.resumed and second.stale_run_id == first.run_id
+        assert second.filter_pending(PRODUCTS) == PRODUCTS
+
+    def test_resume_keeps_original_watermarks(self, tmp_path):
+        db_path = str(tmp_path / "cp.db")
+        first = SyncCheckpoint("test.myshopify.com", "Tam Senkronizasyon", db_path=db_path)
+        first.start(sentos_wm={"count": 5, "digest": "a", "fetched_at": "t1"}, shopify_wm={"count": 10, "loaded_at": "t1"})
+        first.record(PRODUCTS[0], "created")
+        first.finish("interrupted")
+
+        # Bu çalışmada oluşturulan ürün Shopify sayısını artırır; zaman damgaları karşılaştırılmaz
+        second = SyncCheckpoint("test.myshopify.com", "Tam Senkronizasyon", db_path=db_path)
+        second.start(resume=True, sentos_wm={"count": 5, "digest": "a", "fetched_at": "t2"}, shopify_wm={"count": 11, "loaded_at": "t2"})
+        assert second.resumed
+
+        with sqlite3.connect(db_path) as conn:
+            stored = conn.execute("SELECT sentos_watermark, shopify_watermark FROM sync_runs WHERE run_id = ?", (first.run_id,)).fetchone()
+        assert json.loads(stored[0])["fetched_at"] == "t1" and json.loads(stored[1])["count"] == 10
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
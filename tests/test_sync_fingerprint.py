@@ -0,0 +1,74 @@
+import pytest
+from unittest.mock import Mock, patch
+import sync_runner
+from operations.sync_fingerprint import FingerprintStore, compute_fingerprints
+
+
+def _product(**overrides):
+    product = {
+        "id": 42,
+        "name": "Keten Gömlek",
+        "sku": "KG-100",
+        "category": "Gömlek",
+        "description": "<p>Açıklama</p>",
+        "variants": [
+            {"sku": "KG-100-S", "barcode": "111", "options": [{"name": "Renk", "value": "Beyaz"}, {"name": "Beden", "value": "S"}], "stocks": [{"stock": 3}]},
+            {"sku": "KG-100-M", "barcode": "222", "options": [{"name": "Renk", "value": "Beyaz"}, {"name": "Beden", "value": "M"}], "stocks": [{"stock": 0}]},
+        ],
+    }
+    product.update(overrides)
+    return product
+
+
+class TestFingerprintStore:
+    def test_unseen_product_syncs_all_facets(self, tmp_path):
+        store = FingerprintStore("test.myshopify.com", db_path=str(tmp_path / "fp.db"))
+        assert store.changed_facets(_product(), ("details", "type", "variants")) == ["details", "type", "variants"]
+
+    def test_only_changed_facet_is_returned(self, tmp_path):
+        store = FingerprintStore("test.myshopify.com", db_path=str(tmp_path / "fp.db"))
+        store.mark_synced(_product(), ("details", "type", "variants"))
+
+        changed = _product(category="Tişört")
+        assert store.changed_facets(changed, ("details", "type", "variants")) == ["type"]
+
+    def test_stock_change_marks_variants_facet(self, tmp_path):
+        store = FingerprintStore("test.myshopify.com", db_path=str(tmp_path / "fp.db"))
+        store.mark_synced(_product(), ("details", "type", "variants"))
+
+        product = _product()
+        product["variants"][1]["stocks"] = [{"stock": 5}]
+        assert store.changed_facets(product, ("details", "type", "variants")) == ["variants"]
+
+    def test_fingerprints_persist_per_store(self, tmp_path):
+        db_path = str(tmp_path / "fp.db")
+        store = FingerprintStore("test.myshopify.com", db_path=db_path)
+        store.mark_synced(_product(), ("details",))
+        store.flush()
+
+        assert FingerprintStore("test.myshopify.com", db_path=db_path).changed_facets(_product(), ("details",)) == []
+        assert FingerprintStore("other.myshopify.com", db_path=db_path).changed_facets(_product(), ("details",)) == ["details"]
+
+    def test_images_without_payload_data_are_never_skipped(self, tmp_path):
+        store = FingerprintStore("test.myshopify.com", db_path=str(tmp_path / "fp.db"))
+        store.mark_synced(_product(), ("images",))
+
+        assert compute_fingerprints(_product())["images"] is None
+        assert store.changed_facets(_product(), ("images",)) == ["images"]
+
+
+class TestUpdateProductFingerprints:
+    def test_only_facets_reported_successful_are_marked(self, tmp_path):
+        store = FingerprintStore("test.myshopify.com", db_path=str(tmp_path / "fp.db"))
+        existing = {"gid": "gid://shopify/Product/1"}
+        # Açıklama metni 'hata' içerse bile başarı bayrağı esas alınır
+        with patch.object(sync_runner.core_sync, "sync_product_fields", return_value=(["Hata mesajı şablonu güncellendi."], True)), \
+             patch.object(sync_runner.stock_sync, "sync_stock_and_variants", return_value=(["1 varyantın stok güncellemesinde sorun"], False)):
+            sync_runner._update_product(Mock(), Mock(), _product(), existing, sync_runner.FULL_SYNC_MODE,
+                                        facets=("details", "type", "variants"), fingerprints=store)
+
+        assert store.changed_facets(_product(), ("details", "type", "variants")) == ["variants"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,84 @@
+import threading
+import pytest
+from unittest.mock import patch
+import sync_runner
+from operations.sync_plan import build_sync_plan, OP_COSTS
+
+FULL_FACETS = ('details', 'type', 'variants', 'images')
+
+
+def _sentos(sku, name="Gömlek", variants=1):
+    return {"id": sku, "sku": sku, "name": name, "description": "Açıklama", "category": "Giyim",
+            "variants": [{"sku": f"{sku}-{i}"} for i in range(variants)]}
+
+
+class TestSyncPlan:
+    def test_unchanged_fields_produce_no_product_update(self):
+        sentos = _sentos("A")
+        existing = {"title": "Gömlek", "description_html": "Açıklama", "product_type": "Giyim",
+                    "variants": [{"sku": "A-0"}]}
+        plan = build_sync_plan([sentos], "Tam", lambda p: ('update', existing, None), FULL_FACETS)
+
+        kinds = [op.kind for op in plan.products[0].operations]
+        assert 'product_update' not in kinds and 'variant_add' not in kinds
+        assert kinds == ['variant_read', 'inventory_set', 'media_check']
+
+    def test_cheapest_products_run_first_and_eta_follows_cost(self):
+        products = [_sentos("YENI", variants=3), _sentos("AYNI"), _sentos("YOK", name="")]
+        actions = {"YENI": ('create', None, None), "AYNI": ('unchanged', {}, []), "YOK": ('ignore', None, None)}
+        plan = build_sync_plan(products, "Tam", lambda p: actions[p["sku"]], FULL_FACETS)
+
+        assert [p["sku"] for p in plan.ordered_products()][-1] == "YENI"
+        assert plan.operation_counts()['inventory_set'] == 3
+        assert plan.eta_seconds(restore_rate=50) == pytest.approx(plan.total_cost / 50)
+        summary = plan.summary(restore_rate=50)
+        assert summary['actions'] == {'create': 1, 'unchanged': 1, 'ignore': 1}
+        assert summary['has_estimates'] is True
+        assert summary['estimated_cost'] >= OP_COSTS['create']
+
+    def test_execution_uses_planned_decisions(self):
+        existing = {"gid": "gid://shopify/Product/1"}
+        products = [_sentos("A"), _sentos("B")]
+        actions = {"A": ('update', existing, ['variants']), "B": ('unchanged', existing, [])}
+        plan = build_sync_plan(products, "Tam", lambda p: actions[p["sku"]], FULL_FACETS)
+        assert plan.resolution(products[0]) == ('update', existing, ['variants'])
+        assert plan.resolution(_sentos("A")) is None
+
+        stats = {'total': 2, 'created': 0, 'updated': 0, 'failed': 0, 'skipped': 0, 'processed': 0}
+        with patch.object(sync_runner, '_resolve_product_action', side_effect=AssertionError("yeniden eşleştirildi")), \
+             patch.object(sync_runner, '_update_product', return_value=["güncellendi"]) as update:
+            sync_runner._process_products(object(), None, plan.ordered_products(), "Sadece Açıklamalar", 2, lambda u: None,
+                                          threading.Event(), stats, [], threading.Lock(), plan=plan)
+
+        assert update.call_args.kwargs['facets'] == ['variants']
+        assert stats['updated'] == 1 and stats['skipped'] == 1
+
+
+class _SeoShopify:
+    def __init__(self, *args):
+        self.product_cache = {"title:a": {"gid": "gid://shopify/Product/1", "title": "A"},
+                              "sku:a-1": {"gid": "gid://shopify/Product/1", "title": "A"},
+                              "title:b": {"gid": "gid://shopify/Product/2", "title": "B"}}
+        self.last_throttle_status = None
+
+    def load_all_products_for_cache(self, progress_callback=None):
+        pass
+
+    def update_product_media_seo(self, *args):
+        raise AssertionError("dry-run yazma yaptı")
+
+
+class TestSeoDryRun:
+    def test_seo_mode_dry_run_reports_plan_without_writes(self):
+        updates = []
+        with patch.object(sync_runner, 'ShopifyAPI', _SeoShopify):
+            sync_runner._run_core_sync_logic({'store_url': 'test.myshopify.com', 'access_token': 'x'}, {}, "SEO Alt Metinli Resimler",
+                                             2, False, updates.append, threading.Event(), dry_run=True)
+
+        results = updates[-1]['results']
+        assert results['dry_run'] and results['plan']['products'] == 2
+        assert results['plan']['operations'] == {'media_check': 2, 'media_alt_update': 2}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
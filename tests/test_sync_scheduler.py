@@ -0,0 +1,47 @@
+import pytest
+from unittest.mock import Mock
+from operations.sync_scheduler import LaneRateLimiter, LaneScheduler, default_lane_config
+
+
+class TestLaneRateLimiter:
+    def test_idle_lane_shares_are_redistributed(self):
+        limiter = LaneRateLimiter(10, default_lane_config(4))
+        limiter.mark_busy('inventory', 1)
+        limiter.mark_busy('media', 1)
+        # Sadece stok ve medya aktif: 0.5 / (0.5 + 0.1) ve 0.1 / (0.5 + 0.1)
+        assert limiter.lane_rate('inventory') == pytest.approx(10 * 0.5 / 0.6)
+        assert limiter.lane_rate('media') == pytest.approx(10 * 0.1 / 0.6)
+
+    def test_single_active_lane_gets_full_budget(self):
+        limiter = LaneRateLimiter(8, default_lane_config(4))
+        assert limiter.lane_rate('inventory') == pytest.approx(8)
+
+    def test_budget_recovers_to_configured_rate_after_throttle(self):
+        base = Mock()
+        limiter = LaneRateLimiter(8, default_lane_config(4), base_limiter=base)
+        limiter.handle_throttle_error()
+        assert limiter.total_rps == pytest.approx(4)
+
+        for _ in range(50):
+            limiter.handle_success()
+        assert limiter.total_rps == pytest.approx(8)
+        assert base.handle_success.call_count == 50
+
+
+class TestLaneScheduler:
+    def test_tasks_run_on_their_lane_and_limiter_is_restored(self):
+        api = Mock()
+        api.rate_limiter = None
+        scheduler = LaneScheduler(api, max_workers=2, total_rps=100)
+        assert api.rate_limiter is scheduler.limiter
+
+        lane = scheduler.submit('media', lambda: scheduler.limiter._local.lane).result()
+        scheduler.shutdown()
+
+        assert lane == 'media'
+        assert scheduler.pending_counts()['media'] == 0
+        assert api.rate_limiter is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
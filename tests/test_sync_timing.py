@@ -0,0 +1,64 @@
+import pytest
+from unittest.mock import Mock
+from operations.log_manager import LogManager
+from operations.sync_timing import SyncTimer, bind_phase, percentile
+
+
+class TestSyncTimer:
+    def test_requests_are_attributed_to_the_active_phase(self):
+        timer = SyncTimer()
+        api = Mock()
+        api.sync_timer = timer
+        with bind_phase(api, 'shopify_cache'):
+            timer.count_request()
+            timer.count_request()
+        with bind_phase(api, 'media'):
+            with bind_phase(api, 'stock'):
+                timer.count_request()
+            timer.count_request()
+        timer.count_request()
+        for seconds in (0.1, 0.2, 0.3, 0.4, 1.0):
+            timer.record_product(seconds)
+
+        summary = timer.summary()
+        assert list(summary['phases']) == ['shopify_cache', 'stock', 'media', 'other']
+        assert {p: t['requests'] for p, t in summary['phases'].items()} == {'shopify_cache': 2, 'stock': 1, 'media': 1, 'other': 1}
+        assert summary['latency'] == {'products': 5, 'p50': 0.3, 'p90': 1.0, 'p99': 1.0, 'max': 1.0}
+
+    def test_shard_timers_merge_into_one_summary(self):
+        parent, shard_a, shard_b = SyncTimer(), SyncTimer(), SyncTimer()
+        with parent.phase('shopify_cache'):
+            parent.count_request()
+        for shard, latencies in ((shard_a, (0.1, 0.2)), (shard_b, (0.3, 2.0))):
+            with shard.phase('stock'):
+                shard.count_request()
+            for seconds in latencies:
+                shard.record_product(seconds)
+            parent.merge(shard.export())
+
+        summary = parent.summary()
+        assert summary['phases']['stock']['requests'] == 2 and summary['phases']['stock']['calls'] == 2
+        assert summary['phases']['shopify_cache']['requests'] == 1
+        assert summary['latency']['products'] == 4 and summary['latency']['max'] == 2.0
+
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50 and percentile(values, 99) == 99 and percentile([], 90) == 0.0
+
+
+class TestPhaseTimingStore:
+    def test_timings_are_persisted_per_run(self, tmp_path):
+        manager = LogManager(db_path=str(tmp_path / "logs" / "sync_logs.db"))
+        log_id = manager.log_sync_start("Sadece Stok ve Varyantlar", "web_ui")
+        manager.log_sync_timings(log_id, "Sadece Stok ve Varyantlar", {
+            'phases': {'shopify_cache': {'wall_seconds': 12.5, 'busy_seconds': 12.5, 'calls': 1, 'requests': 40}},
+            'latency': {'products': 10, 'p50': 0.4, 'p90': 1.2, 'p99': 2.0, 'max': 2.1},
+        })
+
+        rows = manager.get_phase_timings()
+        assert len(rows) == 1
+        assert rows[0]['phase'] == 'shopify_cache' and rows[0]['requests'] == 40 and rows[0]['p90'] == 1.2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
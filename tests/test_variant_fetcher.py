@@ -0,0 +1,53 @@
+import pytest
+from unittest.mock import Mock
+from operations import stock_sync, variant_fetcher
+
+
+def _variants(prefix, count, has_next=False, cursor=None):
+    return {
+        "pageInfo": {"hasNextPage": has_next, "endCursor": cursor},
+        "edges": [{"node": {"id": f"{prefix}-{i}", "inventoryItem": {"id": f"ii-{prefix}-{i}", "sku": f"{prefix}-{i}"}}}
+                  for i in range(count)],
+    }
+
+
+class TestFetchProductVariants:
+    def test_products_share_one_nodes_query_and_long_variant_lists_are_paginated(self):
+        api = Mock()
+        api.execute_graphql.side_effect = [
+            {"nodes": [
+                {"id": "gid://shopify/Product/1", "variants": _variants("A", 2)},
+                {"id": "gid://shopify/Product/2", "variants": _variants("B", 50, has_next=True, cursor="c1")},
+                None,
+            ]},
+            {"product": {"variants": _variants("B2", 250, has_next=True, cursor="c2")}},
+            {"product": {"variants": _variants("B3", 10)}},
+        ]
+
+        result = variant_fetcher.fetch_product_variants(
+            api, ["gid://shopify/Product/1", "gid://shopify/Product/2", "gid://shopify/Product/3", "gid://shopify/Product/1"])
+
+        assert "nodes(ids:" in api.execute_graphql.call_args_list[0][0][0]
+        assert len(api.execute_graphql.call_args_list[0][0][1]["ids"]) == 3
+        assert len(result["gid://shopify/Product/1"]) == 2
+        assert len(result["gid://shopify/Product/2"]) == 310
+        assert result["gid://shopify/Product/3"] == []
+        assert api.execute_graphql.call_args_list[2][0][1]["cursor"] == "c2"
+
+
+class TestStockSyncFetchFailure:
+    def test_failed_variant_query_does_not_create_variants(self, monkeypatch):
+        api = Mock(spec=['variant_fetcher'])
+        api.variant_fetcher.get_variants.return_value = None
+        added = []
+        monkeypatch.setattr(stock_sync, '_add_variants_bulk', lambda *args: added.append(args) or True)
+        product = {"name": "Gömlek", "variants": [{"sku": "G-S", "stocks": [{"stock": 2}]}]}
+
+        changes, ok = stock_sync.sync_stock_and_variants(api, "gid://shopify/Product/1", product, with_status=True)
+
+        assert not ok and added == []
+        assert "varyantlar okunamadı" in changes[0]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])